@@ -7,6 +7,7 @@ Endpoints:
 - GET /api/matches?date=2024-12-16&sport=football
 - GET /api/sports - lista dostępnych sportów
 - GET /api/dates - lista dostępnych dat
+- GET /metrics - czasy etapów scrapera (Prometheus)
 
 Run:
     python api_server.py
@@ -19,7 +20,7 @@ import json
 import glob
 import math
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_cors import CORS
 
 
@@ -68,6 +69,9 @@ CORS(app, origins=[
 # Directory with scraper results
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
 
+# Prometheus text file z czasami etapów (stage_metrics.print_stage_metrics_report)
+PROMETHEUS_METRICS_FILE = os.path.join(os.path.dirname(__file__), 'outputs', 'metrics', 'stage_metrics.prom')
+
 # Sport mappings
 SPORT_INFO = {
     'football': {'name': 'Football', 'icon': 'MdSportsSoccer'},
@@ -531,6 +535,17 @@ def health_check():
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def stage_metrics():
+    """Czasy etapów ostatniego przebiegu scrapera (format tekstowy Prometheus)."""
+    if not os.path.isfile(PROMETHEUS_METRICS_FILE):
+        return Response('# brak metryk - scraper nie zapisał jeszcze podsumowania\n',
+                        status=404, mimetype='text/plain')
+    with open(PROMETHEUS_METRICS_FILE, encoding='utf-8') as f:
+        body = f.read()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+
 # =============================================================================
 # USER BETS ENDPOINTS
 # =============================================================================
@@ -0,0 +1,109 @@
+"""
+⏱️ Benchmark parsowania strony meczu: pełne BeautifulSoup vs section_parser
+==========================================================================
+Dla każdej zapisanej strony (tennis_h2h_*.html, debug_html/*.html) mierzy
+czas parsowania + odczytu (parse_h2h_from_soup, extract_team_form,
+extract_betting_odds) i szczytową pamięć (tracemalloc), sprawdzając przy tym,
+że oba warianty zwracają te same wyniki.
+Uwaga: tracemalloc liczy pamięć obiektów Pythona - tymczasowe drzewo lxml
+(alokowane w C, zwalniane po wybraniu sekcji) nie jest wliczane.
+
+Użycie:
+    python benchmark_parsing.py
+    python benchmark_parsing.py --repeat 10 --files debug_html/h2h_page_1763382582.html
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from section_parser import parse_match_sections, LXML_AVAILABLE
+from livesport_h2h_scraper import parse_h2h_from_soup, extract_team_form, extract_betting_odds
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def default_files():
+    files = glob.glob(os.path.join(BASE_DIR, 'tennis_h2h_*.html'))
+    files += glob.glob(os.path.join(BASE_DIR, 'debug_html', '*.html'))
+    return sorted(files)
+
+
+def full_parse(html: str) -> BeautifulSoup:
+    return BeautifulSoup(html, 'html.parser')
+
+
+def run_once(parser, html: str):
+    soup = parser(html)
+    return (
+        soup.title.string if soup.title else None,
+        parse_h2h_from_soup(soup, ''),
+        extract_team_form(soup, None, 'home', ''),
+        extract_team_form(soup, None, 'away', ''),
+        extract_betting_odds(soup),
+    )
+
+
+def measure(parser, html: str, repeat: int):
+    """Zwraca (mediana ms, szczyt pamięci KB, wynik)."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run_once(parser, html)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    run_once(parser, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Benchmark parsowania stron meczu')
+    ap.add_argument('--files', nargs='*', help='Pliki HTML (domyślnie tennis_h2h_*.html i debug_html/)')
+    ap.add_argument('--repeat', type=int, default=5, help='Powtórzenia pomiaru czasu (mediana)')
+    args = ap.parse_args()
+
+    files = args.files or default_files()
+    if not files:
+        print("❌ Brak plików HTML do testu")
+        return 1
+    if not LXML_AVAILABLE:
+        print("⚠️ Brak lxml - section_parser używa pełnego parsowania (brak zysku)")
+
+    print(f"{'plik':<32} {'KB':>6} {'pełne ms':>9} {'sekcje ms':>10} {'pełne MB':>9} {'sekcje MB':>10}  wynik")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    mismatches = 0
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        full_ms, full_kb, full_result = measure(full_parse, html, args.repeat)
+        part_ms, part_kb, part_result = measure(parse_match_sections, html, args.repeat)
+        same = full_result == part_result
+        mismatches += not same
+        for i, v in enumerate((full_ms, part_ms, full_kb, part_kb)):
+            totals[i] += v
+        print(f"{os.path.basename(path)[:32]:<32} {len(html) / 1024:>6.0f} {full_ms:>9.1f} {part_ms:>10.1f} "
+              f"{full_kb / 1024:>9.1f} {part_kb / 1024:>10.1f}  {'✅' if same else '❌ RÓŻNICA'}")
+
+    n = len(files)
+    speedup = totals[0] / totals[1] if totals[1] else 0
+    print(f"\n📊 Średnio: pełne {totals[0] / n:.1f} ms / {totals[2] / n / 1024:.1f} MB, "
+          f"sekcje {totals[1] / n:.1f} ms / {totals[3] / n / 1024:.1f} MB  (x{speedup:.1f} szybciej)")
+    if mismatches:
+        print(f"❌ Różne wyniki dla {mismatches} stron")
+        return 1
+    print("✅ Wyniki identyczne dla wszystkich stron")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
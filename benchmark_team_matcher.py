@@ -0,0 +1,118 @@
+"""
+⏱️ Benchmark dopasowania nazw drużyn: pełna pętla similarity_score vs team_matcher
+================================================================================
+Generuje listę kilku tysięcy nazw drużyn (prefiksy klubowe, miasta, człony,
+sufiksy) i zapytania w wariantach z innych źródeł (bez prefiksu, bez
+polskich znaków, literówka, inny sufiks). Mierzy przepustowość
+(zapytań/s) i zgodność z pełną pętlą:
+
+- pełna pętla:  max(similarity_score(q, c) for c in kandydaci) - jak dawniej
+- shortlista:   TeamMatcher(score=similarity_score) - ten sam scoring,
+                tylko dla SHORTLIST_SIZE kandydatów z indeksu trigramów
+- sam Dice:     TeamMatcher() - tylko wektorowy scorer trigramów
+
+Użycie:
+    python benchmark_team_matcher.py
+    python benchmark_team_matcher.py --teams 5000 --queries 300
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from forebet_scraper import normalize_team_name, similarity_score
+from team_matcher import SHORTLIST_SIZE, TeamMatcher
+
+PREFIXES = ['', '', '', 'FC ', 'KS ', 'AZS ', 'SK ', 'Club ', 'Sporting ', 'Dinamo ', 'Atletico ']
+CITIES = ['Warszawa', 'Kraków', 'Gdańsk', 'Poznań', 'Łódź', 'Wrocław', 'Lublin', 'Szczecin', 'Białystok',
+          'Rzeszów', 'Bydgoszcz', 'Katowice', 'Gliwice', 'Zabrze', 'Opole', 'Kielce', 'Toruń', 'Płock',
+          'Madrid', 'Sevilla', 'Valencia', 'Porto', 'Lisboa', 'Braga', 'Milano', 'Torino', 'Napoli', 'Genova',
+          'Lyon', 'Nantes', 'Lille', 'Bordeaux', 'Praha', 'Brno', 'Plzen', 'Wien', 'Graz', 'Linz', 'Zagreb',
+          'Split', 'Beograd', 'Sofia', 'Plovdiv', 'Bucuresti', 'Cluj', 'Kyiv', 'Lviv', 'Odesa', 'Riga', 'Vilnius']
+STEMS = ['Legia', 'Wisła', 'Lechia', 'Polonia', 'Stal', 'Górnik', 'Ruch', 'Olimpia', 'Victoria', 'Union',
+         'Sparta', 'Slavia', 'Rapid', 'Unirea', 'Dynamo', 'Lokomotiv', 'Spartak', 'Akademia', 'Juventus',
+         'Olympic', 'Racing', 'Athletic', 'Real', 'Atletico', 'Academica', 'Vitoria', 'Nacional', 'Sporting',
+         'Hajduk', 'Partizan', 'Levski', 'Botev', 'Metalist', 'Karpaty', 'Zenit', 'Torpedo', 'Skonto',
+         'Zalgiris', 'Admira', 'Sturm']
+SUFFIXES = ['', '', '', ' II', ' U21', ' W', ' 1909', ' United', ' City']
+
+
+def generate_teams(count: int, rng: random.Random):
+    teams, seen = [], set()
+    while len(teams) < count:
+        name = f"{rng.choice(PREFIXES)}{rng.choice(STEMS)} {rng.choice(CITIES)}{rng.choice(SUFFIXES)}"
+        if name not in seen:
+            seen.add(name)
+            teams.append(name)
+    return teams
+
+
+def variant(name: str, rng: random.Random) -> str:
+    """Ta sama drużyna zapisana jak w innym źródle."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        for prefix in PREFIXES:
+            if prefix and name.startswith(prefix):
+                return name[len(prefix):]
+        return name
+    if kind == 1:
+        return name.translate(str.maketrans('ąćęłńóśźżĄĆĘŁŃÓŚŹŻ', 'acelnoszzACELNOSZZ'))
+    if kind == 2 and len(name) > 6:
+        i = rng.randrange(2, len(name) - 2)
+        return name[:i] + name[i + 1:]
+    return name.replace(' United', ' Utd').replace(' II', ' B')
+
+
+def brute_force(query: str, candidates):
+    best, best_score = None, 0.0
+    for candidate in candidates:
+        score = similarity_score(query, candidate)
+        if score > best_score:
+            best, best_score = candidate, score
+    return best, best_score
+
+
+def measure(label: str, lookup, queries):
+    start = time.perf_counter()
+    results = [lookup(query) for query in queries]
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<24} {len(queries) / elapsed:>10.0f} zapytań/s  ({elapsed * 1000 / len(queries):.2f} ms/zapytanie)")
+    return results, elapsed
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description='Benchmark dopasowania nazw drużyn (team_matcher)')
+    ap.add_argument('--teams', type=int, default=3000, help='Liczba nazw kandydatów')
+    ap.add_argument('--queries', type=int, default=200, help='Liczba zapytań')
+    ap.add_argument('--seed', type=int, default=7)
+    args = ap.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    teams = generate_teams(args.teams, rng)
+    targets = [rng.choice(teams) for _ in range(args.queries)]
+    queries = [variant(name, rng) for name in targets]
+
+    start = time.perf_counter()
+    shortlisted = TeamMatcher(teams, normalize=normalize_team_name, score=similarity_score)
+    dice_only = TeamMatcher(teams, normalize=normalize_team_name)
+    build_ms = (time.perf_counter() - start) * 1000 / 2
+    print(f"📊 {len(teams)} drużyn, {len(queries)} zapytań, shortlista {SHORTLIST_SIZE}, "
+          f"budowa indeksu {build_ms:.1f} ms")
+
+    full, full_time = measure('pełna pętla', lambda q: brute_force(q, teams), queries)
+    short, short_time = measure('shortlista + scoring', shortlisted.best_match, queries)
+    dice, _ = measure('sam Dice (trigramy)', dice_only.best_match, queries)
+
+    # Zgodność: ten sam wynik (remisy różnych nazw liczone jako zgodne)
+    same = sum(1 for a, b in zip(full, short) if a[0] == b[0] or abs(a[1] - b[1]) < 1e-9)
+    hits = {label: sum(1 for (name, _), target in zip(results, targets) if name == target)
+            for label, results in (('pełna', full), ('shortlista', short), ('dice', dice))}
+    print(f"\n   zgodność shortlisty z pełną pętlą: {same}/{len(queries)}  (x{full_time / short_time:.0f} szybciej)")
+    print(f"   trafienia właściwej drużyny: pełna {hits['pełna']}, shortlista {hits['shortlista']}, "
+          f"dice {hits['dice']} (z {len(queries)})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
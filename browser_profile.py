@@ -0,0 +1,198 @@
+"""
+🪶 Lean Browser Profile - lekki profil Chrome dla scrapera
+==========================================================
+Opcjonalny profil dla start_driver() (--lean-browser lub LIVESPORT_LEAN_BROWSER=1):
+- blokowanie zbędnych zasobów przez CDP Network.setBlockedURLs
+  (obrazy, fonty, media, reklamy i analityka)
+- strategia ładowania 'eager' (driver.get wraca po DOMContentLoaded,
+  nie czeka na obrazy/iframe reklam - gotowość DOM sprawdza page_readiness)
+- wyłączone rozszerzenia i funkcje Chrome, których scraper nie używa
+
+Statystyki stron (PageMetrics) liczą bajty na stronę oraz czas zaoszczędzony
+na nieczekaniu na zdarzenie 'load' - raport na koniec uruchomienia pozwala
+porównać profil lekki z domyślnym.
+"""
+
+import os
+from typing import Dict, List
+
+LEAN_ENV = 'LIVESPORT_LEAN_BROWSER'
+LEAN_PAGE_LOAD_TIMEOUT = 30  # 'eager' wraca szybciej - krótszy timeout = szybszy retry
+
+# Wzorce URL blokowane przez CDP (składnia Network.setBlockedURLs: '*' = dowolny ciąg)
+BLOCKED_RESOURCE_PATTERNS = [
+    # Obrazy (loga drużyn, flagi, banery) - scraper czyta tylko tekst
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    # Fonty
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Media
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+]
+
+BLOCKED_HOST_PATTERNS = [
+    # Reklamy
+    '*doubleclick.net*', '*googlesyndication.com*', '*googleadservices.com*',
+    '*adservice.google.*', '*amazon-adsystem.com*', '*adnxs.com*', '*criteo.*',
+    '*taboola.com*', '*outbrain.com*', '*rubiconproject.com*', '*pubmatic.com*',
+    '*smartadserver.com*', '*teads.tv*', '*adform.net*',
+    # Analityka / trackery
+    '*google-analytics.com*', '*googletagmanager.com*', '*googletagservices.com*',
+    '*scorecardresearch.com*', '*hotjar.com*', '*facebook.net*', '*connect.facebook.*',
+    '*gemius.pl*', '*quantserve.com*', '*chartbeat.*', '*newrelic.com*', '*nr-data.net*',
+]
+
+# Przełączniki Chrome niepotrzebne przy scrapowaniu
+LEAN_CHROME_ARGS = [
+    '--disable-extensions',
+    '--disable-component-extensions-with-background-pages',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-translate',
+    '--disable-notifications',
+    '--disable-client-side-phishing-detection',
+    '--disable-hang-monitor',
+    '--disable-popup-blocking',
+    '--disable-renderer-backgrounding',
+    '--metrics-recording-only',
+    '--mute-audio',
+    '--no-first-run',
+    '--blink-settings=imagesEnabled=false',
+]
+
+# Dołączane do istniejącego --disable-features (Chrome bierze tylko ostatni przełącznik)
+LEAN_DISABLED_FEATURES = [
+    'Translate', 'MediaRouter', 'OptimizationHints', 'InterestFeedContentSuggestions',
+    'AutofillServerCommunication', 'CalculateNativeWinOcclusion',
+]
+
+LEAN_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.geolocation': 2,
+    'profile.default_content_setting_values.media_stream': 2,
+    'credentials_enable_service': False,
+    'profile.password_manager_enabled': False,
+}
+
+
+def lean_enabled(lean: bool = None) -> bool:
+    """Jawny parametr ma pierwszeństwo; w innym wypadku zmienna środowiskowa (dziedziczona przez workery)."""
+    if lean is not None:
+        return lean
+    return os.getenv(LEAN_ENV, '0') == '1'
+
+
+def blocked_url_patterns() -> List[str]:
+    return BLOCKED_RESOURCE_PATTERNS + BLOCKED_HOST_PATTERNS
+
+
+def apply_lean_options(chrome_options, disabled_features: List[str], prefs: Dict) -> None:
+    """
+    Dodaje opcje profilu lekkiego do ChromeOptions.
+
+    Args:
+        chrome_options: selenium ChromeOptions
+        disabled_features: lista dla --disable-features (rozszerzana w miejscu)
+        prefs: słownik prefs (rozszerzany w miejscu, ustawiany przez wywołującego)
+    """
+    chrome_options.page_load_strategy = 'eager'
+    for arg in LEAN_CHROME_ARGS:
+        chrome_options.add_argument(arg)
+    disabled_features.extend(f for f in LEAN_DISABLED_FEATURES if f not in disabled_features)
+    prefs.update(LEAN_PREFS)
+
+
+def enable_resource_blocking(driver) -> bool:
+    """Włącza blokowanie zasobów przez CDP. Zwraca False jeśli driver nie wspiera CDP."""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns()})
+        return True
+    except Exception as e:
+        print(f"⚠️ Lean profile: blokowanie zasobów niedostępne ({type(e).__name__})")
+        return False
+
+
+# Performance API: bajty przesłane (dokument + zasoby) i czasy DOMContentLoaded / load
+_METRICS_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav) { return null; }
+var bytes = nav.transferSize || 0;
+var res = performance.getEntriesByType('resource');
+for (var i = 0; i < res.length; i++) { bytes += res[i].transferSize || 0; }
+return {
+    bytes: bytes,
+    resources: res.length,
+    dcl: nav.domContentLoadedEventEnd,
+    load: nav.loadEventEnd,
+    now: performance.now()
+};
+"""
+
+
+class PageMetrics:
+    """
+    Zbiera statystyki załadowanych stron (bajty, DOMContentLoaded, load).
+
+    Zaoszczędzony czas na stronę (tylko profil 'eager') = load - DOMContentLoaded:
+    tyle czasu driver.get() czekałby dodatkowo przy strategii 'normal'.
+    Gdy 'load' jeszcze nie nastąpił w chwili pomiaru, liczymy do chwili pomiaru (dolna granica).
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.total_bytes = 0
+        self.total_resources = 0
+        self.total_dcl_ms = 0.0
+        self.total_saved_ms = 0.0
+        self.lean = False
+
+    def record(self, driver) -> None:
+        try:
+            m = driver.execute_script(_METRICS_JS)
+        except Exception:
+            return
+        if not isinstance(m, dict):
+            return
+        self.pages += 1
+        self.total_bytes += int(m.get('bytes') or 0)
+        self.total_resources += int(m.get('resources') or 0)
+        dcl = float(m.get('dcl') or 0)
+        self.total_dcl_ms += dcl
+        if self.lean and dcl:
+            load = float(m.get('load') or 0) or float(m.get('now') or 0)
+            self.total_saved_ms += max(0.0, load - dcl)
+
+    def report(self) -> Dict:
+        pages = self.pages or 1
+        return {
+            'profile': 'lean' if self.lean else 'default',
+            'pages': self.pages,
+            'kb_per_page': round(self.total_bytes / 1024 / pages, 1),
+            'resources_per_page': round(self.total_resources / pages, 1),
+            'dcl_ms_per_page': round(self.total_dcl_ms / pages),
+            'load_saved_s_per_page': round(self.total_saved_ms / 1000 / pages, 2),
+            'load_saved_s_total': round(self.total_saved_ms / 1000, 1),
+        }
+
+    def print_report(self) -> None:
+        if not self.pages:
+            return
+        r = self.report()
+        print(f"\n🪶 PROFIL PRZEGLĄDARKI: {r['profile']}  stron={r['pages']}  "
+              f"{r['kb_per_page']:.0f} KB/stronę  ({r['resources_per_page']:.0f} zasobów)  "
+              f"DOMContentLoaded={r['dcl_ms_per_page']} ms")
+        if self.lean:
+            print(f"   Zaoszczędzone czekanie na 'load': {r['load_saved_s_per_page']:.2f}s/stronę "
+                  f"({r['load_saved_s_total']:.0f}s łącznie)")
+
+
+# Globalna instancja (per proces)
+page_metrics = PageMetrics()
+
+
+def record_page_metrics(driver) -> None:
+    page_metrics.record(driver)
+
+
+def print_page_metrics_report() -> None:
+    page_metrics.print_report()
@@ -0,0 +1,174 @@
+"""
+📈 Bypass Method Stats - adaptacyjna kolejność metod CloudflareBypass
+=====================================================================
+CloudflareBypass.get_page próbował metod w stałej kolejności - lokalnie
+najpierw start undetected Chrome (~30 s), dopiero potem tani curl_cffi.
+
+Statystyki per (domena, metoda):
+- skuteczność: sukcesy / próby z wygaszaniem (half-life) - stare wyniki
+  tracą wagę, po zmianie zabezpieczeń strony kolejność sama się odwraca
+- mediana czasu próby (ostatnie LATENCY_SAMPLES prób, udanych i nieudanych)
+- czas ostatniej porażki i ostatniego sukcesu
+
+Kolejność: rosnąco wg oczekiwanego czasu do sukcesu = mediana / skuteczność
+(optymalna kolejność prób sekwencyjnych). Metody bez historii dostają
+szacunek a priori (PRIOR_LATENCY, PRIOR_SUCCESS) - tanie metody HTTP idą
+przed przeglądarkami. Świeża porażka (bez późniejszego sukcesu) w oknie
+FAILURE_COOLDOWN mnoży koszt przez COOLDOWN_PENALTY.
+
+Statystyki są trwałe (JSON, zapis atomowy) i widoczne w print_available_methods().
+
+Konfiguracja (env):
+    CF_BYPASS_STATS_FILE=ścieżka  - plik statystyk (domyślnie outputs/cf_bypass_stats.json)
+    CF_BYPASS_ADAPTIVE=0          - stała kolejność metod (statystyki nadal zbierane)
+    CF_BYPASS_HALF_LIFE_H=24      - half-life wygaszania statystyk (godziny)
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from statistics import median
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_STATS_PATH = os.getenv('CF_BYPASS_STATS_FILE', os.path.join('outputs', 'cf_bypass_stats.json'))
+HALF_LIFE = float(os.getenv('CF_BYPASS_HALF_LIFE_H', '24')) * 3600
+
+# Ile ostatnich czasów prób trzymać (mediana)
+LATENCY_SAMPLES = 20
+
+# Szacunki a priori dla metod bez historii (sekundy / skuteczność / waga w próbach)
+PRIOR_LATENCY = {
+    'curl_cffi': 3.0, 'httpx': 3.0, 'cloudscraper': 5.0, 'archive': 8.0,
+    'zenrows': 15.0, 'scraperapi': 15.0, 'scrapingbee': 15.0,
+    'playwright': 20.0, 'drissionpage': 20.0, 'puppeteer': 25.0,
+    'flaresolverr': 25.0, 'flaresolverr_session': 30.0, 'undetected': 30.0,
+}
+DEFAULT_PRIOR_LATENCY = 20.0
+PRIOR_SUCCESS = 0.5
+PRIOR_WEIGHT = 1.0
+
+# Świeża porażka: kara w koszcie przez FAILURE_COOLDOWN sekund
+FAILURE_COOLDOWN = 600
+COOLDOWN_PENALTY = 4.0
+
+
+def adaptive_order_enabled() -> bool:
+    return os.getenv('CF_BYPASS_ADAPTIVE', '1') != '0'
+
+
+def domain_of(url: str) -> str:
+    """'https://www.forebet.com/en/...' -> 'forebet.com'."""
+    netloc = urlparse(url).netloc.lower() or url.lower()
+    return netloc[4:] if netloc.startswith('www.') else netloc
+
+
+class BypassMethodStats:
+    """
+    Trwałe statystyki metod bypass per domena.
+
+    Args:
+        path: Plik JSON (None = tylko w pamięci)
+        half_life: Half-life wygaszania (sekundy)
+        clock: Źródło czasu (testy)
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_STATS_PATH, half_life: float = HALF_LIFE, clock=time.time):
+        self.path = path
+        self.half_life = half_life
+        self.clock = clock
+        self._domains: Optional[Dict[str, Dict[str, Dict]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Dict]]:
+        # Odczyt leniwy - import modułu nie dotyka dysku
+        if self._domains is None:
+            self._domains = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        self._domains = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"      ⚠️ CF-Bypass stats: nieczytelny plik {self.path}: {e}")
+        return self._domains
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._domains, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"      ⚠️ CF-Bypass stats: zapis nieudany: {e}")
+
+    def _decay(self, entry: Dict, now: float) -> Tuple[float, float]:
+        """(sukcesy, próby) wygaszone do chwili `now`."""
+        factor = 0.5 ** (max(0.0, now - entry.get('updated', now)) / self.half_life) if self.half_life else 1.0
+        return entry.get('successes', 0.0) * factor, entry.get('attempts', 0.0) * factor
+
+    def record(self, url: str, method: str, success: bool, latency: float) -> None:
+        """Zapisuje wynik jednej próby metody."""
+        now = self.clock()
+        with self._lock:
+            methods = self._load().setdefault(domain_of(url), {})
+            entry = methods.setdefault(method, {})
+            successes, attempts = self._decay(entry, now)
+            entry['successes'] = successes + (1.0 if success else 0.0)
+            entry['attempts'] = attempts + 1.0
+            entry['updated'] = now
+            entry['latencies'] = (entry.get('latencies', []) + [round(latency, 3)])[-LATENCY_SAMPLES:]
+            entry['last_success' if success else 'last_failure'] = now
+            self._save()
+
+    def estimate(self, url: str, method: str) -> Dict:
+        """Skuteczność, mediana czasu i oczekiwany czas do sukcesu (sekundy)."""
+        now = self.clock()
+        with self._lock:
+            entry = dict(self._load().get(domain_of(url), {}).get(method, {}))
+        successes, attempts = self._decay(entry, now)
+        success_rate = (successes + PRIOR_SUCCESS * PRIOR_WEIGHT) / (attempts + PRIOR_WEIGHT)
+        latencies = entry.get('latencies')
+        latency = median(latencies) if latencies else PRIOR_LATENCY.get(method, DEFAULT_PRIOR_LATENCY)
+        expected = latency / max(success_rate, 0.01)
+        last_failure, last_success = entry.get('last_failure'), entry.get('last_success', 0)
+        cooling = bool(last_failure and last_failure > last_success and now - last_failure < FAILURE_COOLDOWN)
+        if cooling:
+            expected *= COOLDOWN_PENALTY
+        return {'success_rate': success_rate, 'attempts': attempts, 'median_latency': latency,
+                'expected': expected, 'last_failure': last_failure, 'cooling': cooling}
+
+    def order(self, url: str, methods: Sequence[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        """Metody (nazwa, funkcja) rosnąco wg oczekiwanego czasu do sukcesu (remis = kolejność wejścia)."""
+        return sorted(methods, key=lambda item: self.estimate(url, item[0])['expected'])
+
+    def domains(self) -> List[str]:
+        with self._lock:
+            return sorted(self._load())
+
+    def print_report(self, methods: Optional[Sequence[str]] = None) -> None:
+        """Tabela per domena: kolejność, skuteczność, mediana czasu, ostatnia porażka."""
+        now = self.clock()
+        for domain in self.domains():
+            with self._lock:
+                known = list(self._load()[domain])
+            names = [name for name in (methods or known) if name in known] or known
+            ranked = sorted(names, key=lambda name: self.estimate(domain, name)['expected'])
+            print(f"\n📈 {domain} - kolejność wg oczekiwanego czasu do sukcesu:")
+            for position, name in enumerate(ranked, 1):
+                stat = self.estimate(domain, name)
+                last_failure = (f"{(now - stat['last_failure']) / 60:.0f} min temu"
+                                if stat['last_failure'] else 'nigdy')
+                cooling = ' ⏸️' if stat['cooling'] else ''
+                print(f"  {position:>2}. {name:<22} skuteczność {stat['success_rate']:>4.0%} "
+                      f"({stat['attempts']:.1f} prób)  mediana {stat['median_latency']:>5.1f}s  "
+                      f"~{stat['expected']:>6.1f}s  porażka: {last_failure}{cooling}")
+
+
+# Globalna instancja (per proces)
+bypass_method_stats = BypassMethodStats()
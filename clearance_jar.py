@@ -0,0 +1,182 @@
+"""
+🍪 Clearance Jar - ponowne użycie cf_clearance w tanich klientach HTTP
+=====================================================================
+Gdy ciężka metoda (FlareSolverr, undetected Chrome, DrissionPage, Playwright)
+przejdzie Cloudflare, cookie `cf_clearance` i User-Agent, dla którego je
+wydano, były wyrzucane - kolejny URL Forebet płacił pełny koszt przeglądarki.
+
+Słoik trzyma per domena:
+- cookies z udanej sesji (cf_clearance + pozostałe, np. __cf_bm)
+- User-Agent przeglądarki (Cloudflare wiąże clearance z UA - musi się zgadzać)
+- czas wygaśnięcia (expiry cookie cf_clearance lub CLEARANCE_TTL)
+
+CloudflareBypass.get_page najpierw odtwarza clearance przez curl_cffi
+(odcisk TLS Chrome) lub httpx; przeglądarka tylko, gdy challenge wróci
+(wtedy wpis jest unieważniany).
+
+Słoik jest trwały i współdzielony między procesami (JSON, zapis atomowy,
+uprawnienia 0600 - plik zawiera cookies).
+
+Konfiguracja (env):
+    CF_CLEARANCE_FILE=ścieżka  - plik słoika (domyślnie outputs/cf_clearance.json)
+    CF_CLEARANCE=0             - wyłącza zbieranie i odtwarzanie clearance
+    CF_CLEARANCE_TTL=1800      - ważność clearance bez expiry w cookie (sekundy)
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+
+from bypass_method_stats import domain_of
+
+DEFAULT_JAR_PATH = os.getenv('CF_CLEARANCE_FILE', os.path.join('outputs', 'cf_clearance.json'))
+CLEARANCE_TTL = int(os.getenv('CF_CLEARANCE_TTL', '1800'))
+
+# Clearance wygasający za mniej niż tyle sekund nie jest już odtwarzany
+EXPIRY_MARGIN = 60
+
+CLEARANCE_COOKIE = 'cf_clearance'
+
+
+def clearance_enabled() -> bool:
+    return os.getenv('CF_CLEARANCE', '1') != '0'
+
+
+class Clearance(NamedTuple):
+    """Cookies + User-Agent, dla którego Cloudflare wydał clearance."""
+    domain: str
+    cookies: Dict[str, str]
+    user_agent: str
+    expires_at: float
+    method: str
+    harvested_at: float
+
+
+def _cookie_expiry(cookie: Dict) -> Optional[float]:
+    # FlareSolverr/Playwright: 'expires' (-1 = cookie sesyjne), Selenium: 'expiry'
+    expiry = cookie.get('expires', cookie.get('expiry'))
+    try:
+        expiry = float(expiry)
+    except (TypeError, ValueError):
+        return None
+    return expiry if expiry > 0 else None
+
+
+class ClearanceJar:
+    """
+    Słoik clearance per domena.
+
+    Args:
+        path: Plik JSON (None = tylko w pamięci)
+        ttl: Ważność clearance bez expiry w cookie (sekundy)
+        clock: Źródło czasu (testy)
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_JAR_PATH, ttl: int = CLEARANCE_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self.harvested = 0
+        self.replayed = 0
+        self.replay_hits = 0
+        self.invalidated = 0
+        self._memory: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict]:
+        # Plik czytany przy każdym dostępie - clearance zebrany przez inny proces jest od razu widoczny
+        if not self.path:
+            return dict(self._memory)
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: Dict[str, Dict]) -> None:
+        if not self.path:
+            self._memory = entries
+            return
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp_', suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"      ⚠️ Clearance jar: zapis nieudany: {e}")
+
+    def harvest(self, url: str, cookies: Union[Iterable[Dict], Dict[str, str]], user_agent: str,
+                method: str) -> Optional[Clearance]:
+        """
+        Zapisuje clearance z udanej sesji przeglądarki.
+
+        Args:
+            cookies: Lista cookies (FlareSolverr/Selenium/Playwright) lub dict nazwa -> wartość
+        Returns: Clearance lub None gdy brak cf_clearance / User-Agent
+        """
+        if not clearance_enabled() or not cookies or not user_agent:
+            return None
+        now = self.clock()
+        if isinstance(cookies, dict):
+            values, expires_at = dict(cookies), None
+        else:
+            cookies = [cookie for cookie in cookies if cookie.get('name')]
+            values = {cookie['name']: str(cookie.get('value', '')) for cookie in cookies}
+            expires_at = next((_cookie_expiry(cookie) for cookie in cookies
+                               if cookie['name'] == CLEARANCE_COOKIE), None)
+        if not values.get(CLEARANCE_COOKIE):
+            return None
+        clearance = Clearance(domain_of(url), values, user_agent, expires_at or now + self.ttl, method, now)
+        with self._lock:
+            entries = self._read()
+            entries[clearance.domain] = clearance._asdict()
+            self._write(entries)
+        self.harvested += 1
+        return clearance
+
+    def get(self, url: str) -> Optional[Clearance]:
+        """Ważny clearance dla domeny URL lub None (wygasły jest usuwany)."""
+        if not clearance_enabled():
+            return None
+        domain = domain_of(url)
+        with self._lock:
+            entries = self._read()
+            entry = entries.get(domain)
+            if not entry:
+                return None
+            if entry['expires_at'] - EXPIRY_MARGIN <= self.clock():
+                del entries[domain]
+                self._write(entries)
+                return None
+        return Clearance(**entry)
+
+    def invalidate(self, url: str) -> None:
+        """Challenge wrócił - clearance domeny jest bezużyteczny."""
+        domain = domain_of(url)
+        with self._lock:
+            entries = self._read()
+            if entries.pop(domain, None) is not None:
+                self._write(entries)
+                self.invalidated += 1
+
+    def print_report(self) -> None:
+        now = self.clock()
+        entries = self._read()
+        if not (entries or self.harvested or self.replayed):
+            return
+        print(f"\n🍪 CLEARANCE: zebrane {self.harvested}, odtworzone {self.replay_hits}/{self.replayed}, "
+              f"unieważnione {self.invalidated}")
+        for domain, entry in sorted(entries.items()):
+            left = (entry['expires_at'] - now) / 60
+            print(f"   {domain:<24} z {entry['method']:<14} ważny jeszcze {left:.0f} min")
+
+
+# Globalna instancja (per proces)
+clearance_jar = ClearanceJar()
@@ -3,7 +3,15 @@
 ==========================================
 Agresywne techniki omijania Cloudflare dla GitHub Actions.
 
-Metody (w kolejności próbowania):
+Kolejność prób jest adaptacyjna: per domena, wg zmierzonej skuteczności
+i mediany czasu (bypass_method_stats.py, trwałe między uruchomieniami).
+Listy poniżej to zbiór metod; bez historii tanie metody HTTP idą pierwsze.
+
+Przed metodami: clearance z poprzedniego przejścia (cf_clearance + User-Agent,
+clearance_jar.py) odtwarzany przez curl_cffi/httpx - przeglądarka tylko,
+gdy challenge wróci.
+
+Metody:
 1. Puppeteer Stealth (Node.js) - najskuteczniejsza!
 2. FlareSolverr (Docker service)
 3. FlareSolverr z sesją (retry)
@@ -27,6 +35,11 @@ import subprocess
 import requests
 from typing import Optional, Dict, Any
 
+from bypass_method_stats import adaptive_order_enabled, bypass_method_stats
+from clearance_jar import clearance_jar
+from flaresolverr_pool import flaresolverr_pool
+from puppeteer_worker import PuppeteerWorkerError, puppeteer_worker, puppeteer_worker_enabled
+
 # Patch for undetected_chromedriver WinError 6 on Windows
 # This must be done BEFORE importing undetected_chromedriver
 if sys.platform == 'win32':
@@ -420,13 +433,27 @@ class CloudflareBypass:
                 ('httpx', self._try_httpx),
             ]
         
+        # 📈 Kolejność wg oczekiwanego czasu do sukcesu (statystyki per domena)
+        if adaptive_order_enabled():
+            methods = bypass_method_stats.order(url, methods)
+            self.log(f"📈 Kolejność: {', '.join(name for name, _ in methods)}")
+        
         try:
+            # 🍪 Clearance z poprzedniego przejścia - tani klient HTTP zamiast przeglądarki
+            html = self._try_clearance(url, timeout)
+            if html:
+                self.method_used = 'clearance'
+                self.log(f"✅ SUKCES z clearance ({len(html)} znaków)")
+                return html
+            
             for method_name, method_func in methods:
                 if not METHODS_AVAILABLE.get(method_name, False):
                     self.log(f"{method_name}: niedostępny, pomijam")
                     continue
                 
                 self.log(f"Próbuję metodę: {method_name}")
+                started = time.time()
+                success = False
                 
                 try:
                     html = method_func(url, timeout)
@@ -444,6 +471,7 @@ class CloudflareBypass:
                         
                         if not is_challenge:
                             self.method_used = method_name
+                            success = True
                             self.log(f"✅ SUKCES z metodą: {method_name}")
                             return html
                         else:
@@ -452,6 +480,8 @@ class CloudflareBypass:
                         self.log(f"⚠️ {method_name}: za krótka odpowiedź ({len(html) if html else 0} znaków)")
                 except Exception as e:
                     self.log(f"❌ {method_name}: {str(e)[:50]}")
+                finally:
+                    bypass_method_stats.record(url, method_name, success, time.time() - started)
             
             self.log("❌ Wszystkie metody zawiodły!")
             return None
@@ -460,6 +490,52 @@ class CloudflareBypass:
             if IS_CI:
                 stop_xvfb()
     
+    def _try_clearance(self, url: str, timeout: int) -> Optional[str]:
+        """Odtwarza zebrany clearance domeny; challenge = clearance unieważniony."""
+        clearance = clearance_jar.get(url)
+        if clearance is None:
+            return None
+        self.log(f"🍪 Odtwarzam clearance z {clearance.method} ({len(clearance.cookies)} cookies)")
+        clearance_jar.replayed += 1
+        try:
+            status, html = self._replay_clearance(url, clearance, timeout)
+        except Exception as e:
+            self.log(f"⚠️ clearance: {str(e)[:50]}")
+            return None
+        if status == 200 and html and len(html) > 1000 and not self._is_cloudflare_challenge(html):
+            clearance_jar.replay_hits += 1
+            return html
+        self.log(f"⚠️ clearance: challenge wrócił (HTTP {status}) - unieważniam, próbuję metod")
+        clearance_jar.invalidate(url)
+        return None
+    
+    def _replay_clearance(self, url: str, clearance, timeout: int):
+        """GET z cookies i User-Agent clearance: curl_cffi (TLS Chrome) lub httpx. Returns: (status, html)"""
+        headers = get_browser_headers()
+        headers['User-Agent'] = clearance.user_agent
+        if METHODS_AVAILABLE.get('curl_cffi'):
+            from curl_cffi import requests as curl_requests
+            response = curl_requests.get(url, impersonate="chrome131", timeout=timeout, headers=headers,
+                                         cookies=clearance.cookies, allow_redirects=True)
+            return response.status_code, response.text
+        if METHODS_AVAILABLE.get('httpx'):
+            import httpx
+            with httpx.Client(timeout=timeout, follow_redirects=True, headers=headers,
+                              cookies=clearance.cookies) as client:
+                response = client.get(url)
+                return response.status_code, response.text
+        return None, None
+    
+    def _harvest_clearance(self, url: str, cookies, user_agent: str, method: str) -> None:
+        """Zapisuje cf_clearance + User-Agent po udanym przejściu ciężkiej metody."""
+        try:
+            clearance = clearance_jar.harvest(url, cookies, user_agent, method)
+        except Exception as e:
+            self.log(f"⚠️ clearance: {str(e)[:50]}")
+            return
+        if clearance:
+            self.log(f"🍪 Zebrano clearance dla {clearance.domain} (ważny {(clearance.expires_at - time.time()) / 60:.0f} min)")
+    
     def _try_flaresolverr(self, url: str, timeout: int) -> Optional[str]:
         """
         🔥 FlareSolverr - Docker service do omijania Cloudflare
@@ -583,6 +659,7 @@ class CloudflareBypass:
                             cookies = solution.get("cookies", [])
                             if cookies:
                                 self.log(f"🍪 Otrzymano {len(cookies)} cookies")
+                                self._harvest_clearance(url, cookies, solution.get("userAgent"), 'flaresolverr')
                             
                             self.log(f"✅ Potwierdzona strona Forebet (rcnt={has_rcnt}, tr_0/1={has_match_rows})")
                             
@@ -620,7 +697,8 @@ class CloudflareBypass:
     
     def _try_flaresolverr_with_session(self, url: str, timeout: int) -> Optional[str]:
         """
-        🔥 FlareSolverr z sesją - tworzy sesję, rozwiązuje challenge, potem pobiera stronę
+        🔥 FlareSolverr z sesją z puli (flaresolverr_pool.py) - przeglądarka w FlareSolverr
+        i rozwiązany challenge zostają między sportami i datami.
         Czasami challenge wymaga wielu prób.
         """
         # 🔥 Health check przed użyciem FlareSolverr
@@ -628,85 +706,49 @@ class CloudflareBypass:
             self.log("⚠️ FlareSolverr health check failed - skipping FlareSolverr SESSION")
             return None
         
-        import uuid
-        session_id = f"forebet_{uuid.uuid4().hex[:8]}"
-        
+        session_id = None
+        healthy = False
         try:
-            self.log(f"🐳 FlareSolverr SESSION: Tworzę sesję {session_id}")
-            
-            # 1. Utwórz sesję
-            create_payload = {
-                "cmd": "sessions.create",
-                "session": session_id
-            }
-            
-            response = requests.post(
-                FLARESOLVERR_URL,
-                headers={"Content-Type": "application/json"},
-                json=create_payload,
-                timeout=30
-            )
+            session_id = flaresolverr_pool.acquire()
+            self.log(f"🐳 FlareSolverr SESSION: sesja {session_id} z puli")
             
-            if response.status_code != 200:
-                self.log(f"⚠️ Nie można utworzyć sesji")
-                return None
-            
-            # 2. Pobierz stronę z sesją (max 3 próby)
+            # Pobierz stronę z sesją (max 3 próby)
             for attempt in range(3):
                 self.log(f"🐳 Próba {attempt + 1}/3 z sesją...")
                 
-                get_payload = {
-                    "cmd": "request.get",
-                    "url": url,
-                    "session": session_id,
-                    "maxTimeout": 120000  # 2 minuty
-                }
-                
-                response = requests.post(
-                    FLARESOLVERR_URL,
-                    headers={"Content-Type": "application/json"},
-                    json=get_payload,
-                    timeout=180
-                )
+                solution = flaresolverr_pool.request(session_id, url, max_timeout=120000)  # 2 minuty
+                html = solution.get("response", "")
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if html:
+                    # 🔥 Sprawdź czy to Cloudflare challenge (FAIL indicators)
+                    is_challenge = (
+                        'loading-verifying' in html or 
+                        'lds-ring' in html or
+                        'checking your browser' in html.lower() or
+                        'verifying you are human' in html.lower()
+                    )
                     
-                    if data.get("status") == "ok":
-                        solution = data.get("solution", {})
-                        html = solution.get("response", "")
-                        
-                        if html:
-                            # 🔥 Sprawdź czy to Cloudflare challenge (FAIL indicators)
-                            is_challenge = (
-                                'loading-verifying' in html or 
-                                'lds-ring' in html or
-                                'checking your browser' in html.lower() or
-                                'verifying you are human' in html.lower()
-                            )
-                            
-                            # Sprawdź czy to Forebet (musi być class= nie sam tekst)
-                            is_forebet = (
-                                'class="rcnt"' in html or 
-                                'class="forepr"' in html or 
-                                'class="tr_0"' in html or
-                                'class="tr_1"' in html or
-                                'class="schema' in html
-                            )
-                            
-                            if is_challenge:
-                                self.log(f"⚠️ Próba {attempt + 1}: Nadal Cloudflare challenge, czekam...")
-                                time.sleep(5)  # Czekaj przed kolejną próbą
-                            elif is_forebet:
-                                self.log(f"✅ FlareSolverr SESSION SUCCESS! ({len(html)} znaków)")
-                                self._cleanup_flaresolverr_session(session_id)
-                                return html
-                            else:
-                                self.log(f"⚠️ Próba {attempt + 1}: Brak elementów Forebet, czekam...")
-                                time.sleep(5)
-            
-            # Usuń sesję po nieudanych próbach
-            self._cleanup_flaresolverr_session(session_id)
+                    # Sprawdź czy to Forebet (musi być class= nie sam tekst)
+                    is_forebet = (
+                        'class="rcnt"' in html or 
+                        'class="forepr"' in html or 
+                        'class="tr_0"' in html or
+                        'class="tr_1"' in html or
+                        'class="schema' in html
+                    )
+                    
+                    if is_challenge:
+                        self.log(f"⚠️ Próba {attempt + 1}: Nadal Cloudflare challenge, czekam...")
+                        time.sleep(5)  # Czekaj przed kolejną próbą
+                    elif is_forebet:
+                        self.log(f"✅ FlareSolverr SESSION SUCCESS! ({len(html)} znaków)")
+                        self._harvest_clearance(url, solution.get("cookies", []), solution.get("userAgent"),
+                                                'flaresolverr_session')
+                        healthy = True
+                        return html
+                    else:
+                        self.log(f"⚠️ Próba {attempt + 1}: Brak elementów Forebet, czekam...")
+                        time.sleep(5)
             
         except requests.exceptions.ConnectionError:
             self.log("⚠️ FlareSolverr SESSION: serwer niedostępny")
@@ -715,31 +757,18 @@ class CloudflareBypass:
                 self.log("   W CI/CD: sprawdź czy FlareSolverr Docker service jest uruchomiony")
         except requests.exceptions.Timeout:
             self.log(f"⚠️ FlareSolverr SESSION: timeout")
-            self._cleanup_flaresolverr_session(session_id)
         except Exception as e:
             self.log(f"⚠️ FlareSolverr SESSION error: {type(e).__name__}: {str(e)[:80]}")
             if IS_CI:
                 self.log(f"   CI Environment: CI={os.environ.get('CI')}, GITHUB_ACTIONS={os.environ.get('GITHUB_ACTIONS')}")
-            self._cleanup_flaresolverr_session(session_id)
+        finally:
+            # Sesja wraca do puli tylko z treścią Forebet; błąd, challenge lub pusta strona
+            # = sesja zniszczona, kolejne pobranie dostanie nową
+            if session_id:
+                flaresolverr_pool.release(session_id, healthy=healthy)
         
         return None
     
-    def _cleanup_flaresolverr_session(self, session_id: str):
-        """Usuń sesję FlareSolverr"""
-        try:
-            destroy_payload = {
-                "cmd": "sessions.destroy",
-                "session": session_id
-            }
-            requests.post(
-                FLARESOLVERR_URL,
-                headers={"Content-Type": "application/json"},
-                json=destroy_payload,
-                timeout=10
-            )
-        except:
-            pass
-    
     def _try_curl_cffi(self, url: str, timeout: int) -> Optional[str]:
         """curl_cffi - emuluje TLS fingerprint przeglądarki"""
         from curl_cffi import requests as curl_requests
@@ -829,6 +858,12 @@ class CloudflareBypass:
                 human_delay(0.3, 0.7)
             
             html = page.html
+            if not self._is_cloudflare_challenge(html):
+                try:
+                    cookies = page.cookies()
+                    self._harvest_clearance(url, cookies, page.user_agent, 'drissionpage')
+                except Exception:
+                    pass
             return html
         finally:
             page.quit()
@@ -877,9 +912,10 @@ class CloudflareBypass:
         with sync_playwright() as p:
             # Użyj Firefox (mniej wykrywalny) - NIE headless!
             browser = p.firefox.launch(headless=False)
+            user_agent = get_random_user_agent()
             
             context = browser.new_context(
-                user_agent=get_random_user_agent(),
+                user_agent=user_agent,
                 viewport={'width': 1920, 'height': 1080},
                 locale='en-US',
                 timezone_id='Europe/Warsaw'
@@ -925,6 +961,8 @@ class CloudflareBypass:
                     human_delay(0.3, 0.7)
                 
                 html = page.content()
+                if not self._is_cloudflare_challenge(html):
+                    self._harvest_clearance(url, context.cookies(), user_agent, 'playwright')
                 return html
             finally:
                 browser.close()
@@ -1033,7 +1071,14 @@ class CloudflareBypass:
             
             human_delay(1, 2)
             
-            return driver.page_source
+            html = driver.page_source
+            if not self._is_cloudflare_challenge(html):
+                try:
+                    self._harvest_clearance(url, driver.get_cookies(),
+                                            driver.execute_script("return navigator.userAgent"), 'undetected')
+                except Exception:
+                    pass
+            return html
         finally:
             try:
                 driver.quit()
@@ -1063,6 +1108,10 @@ class CloudflareBypass:
         🔥 Puppeteer Extra z Stealth Plugin (Node.js)
         Najskuteczniejsza metoda dla Cloudflare!
         """
+        # 🧭 Długo żyjący worker - jedna przeglądarka dla wszystkich sportów
+        if puppeteer_worker_enabled() and puppeteer_worker.available():
+            return self._try_puppeteer_worker(url, timeout)
+        
         # Sprawdź sport z URL
         sport = 'football'
         if '/basketball/' in url:
@@ -1129,6 +1178,23 @@ class CloudflareBypass:
             self.log(f"⚠️ Puppeteer error: {str(e)[:50]}")
             return None
     
+    def _try_puppeteer_worker(self, url: str, timeout: int) -> Optional[str]:
+        """Puppeteer przez puppeteer_worker (przeglądarka uruchamiana raz na proces)."""
+        try:
+            self.log(f"🧭 Puppeteer worker: {url[:60]}...")
+            page = puppeteer_worker.fetch_forebet(url, timeout=max(timeout, 60))
+        except PuppeteerWorkerError as e:
+            self.log(f"⚠️ Puppeteer worker: {str(e)[:80]}")
+            return None
+        
+        if self._is_forebet_content(page.html) and not self._is_cloudflare_challenge(page.html):
+            self.log(f"✅ Puppeteer SUCCESS! ({len(page.html)} znaków, {page.elapsed:.1f}s)")
+            self._harvest_clearance(url, page.cookies, page.user_agent, 'puppeteer')
+            return page.html
+        
+        self.log(f"⚠️ Puppeteer nie zadziałał")
+        return None
+    
     def _try_zenrows(self, url: str, timeout: int) -> Optional[str]:
         """
         ZenRows API - darmowy tier 1000 requestów/miesiąc
@@ -1348,6 +1414,11 @@ def print_available_methods():
         status = "✅ DOSTĘPNA" if available else "❌ brak"
         print(f"  {method}: {status}")
     print("=" * 50)
+    # 📈 Zmierzone statystyki i kolejność prób (tylko dostępne metody)
+    bypass_method_stats.print_report([method for method, available in METHODS_AVAILABLE.items() if available])
+    clearance_jar.print_report()
+    flaresolverr_pool.print_report()
+    puppeteer_worker.print_report()
 
 
 # Test
@@ -39,7 +39,8 @@ python scrape_and_notify.py ^
   --sort time ^
   --use-forebet ^
   --use-sofascore ^
-  --use-odds
+  --use-odds ^
+  --deadline 11:00
 
 echo.
 echo ========================================
@@ -0,0 +1,173 @@
+"""
+⏰ Deadline Scheduler - przebieg z twardym terminem wysyłki emaila (--deadline HH:MM)
+===================================================================================
+Codzienny przebieg musi wysłać email przed godziną startu meczów. Harmonogram:
+
+1. Porządkuje URLe wg godziny rozpoczęcia (z listy dnia Livesport - LINK_KICKOFFS),
+   mecze bez godziny na końcu; mecze, które już się zaczęły (dzisiejsza data), odpadają.
+2. Mierzy rzeczywisty czas na mecz w FAZIE 1 i FAZIE 2 (odstęp między wynikami -
+   działa też dla puli workerów i potoku) oraz odsetek kwalifikujących się meczów.
+3. Szacuje pozostałą pracę i porównuje z czasem do terminu (minus rezerwa na
+   zapis wyników i wysyłkę emaila). Przy braku czasu zrzuca mniej wartościową pracę:
+
+       presja > 1.00  -> gemini
+       presja > 1.25  -> + sofascore
+       presja > 1.50  -> + advanced_form (tylko mecze z małą liczbą H2H)
+
+   (presja = szacowana praca / dostępny czas; zrzucanie jest per proces - w trybie
+   --workers dotyczy FAZY 2, workery FAZY 1 i tak nie pobierają Gemini/SofaScore)
+4. Gdy do terminu nie zmieści się kolejny mecz, faza jest przerywana - email
+   wychodzi z tym, co zebrano.
+
+Konfiguracja (env):
+    DEADLINE_EMAIL_RESERVE_MIN=10   - rezerwa (min) na zapis wyników i wysyłkę emaila
+"""
+
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from qualification import set_shed_stages
+
+EMAIL_RESERVE_MINUTES = float(os.getenv('DEADLINE_EMAIL_RESERVE_MIN', '10'))
+
+# Etapy zrzucane kolejno przy rosnącej presji czasu
+SHED_LEVELS = ((1.00, 'gemini'), (1.25, 'sofascore'), (1.50, 'advanced_form'))
+
+# Czas na mecz przed pierwszym pomiarem (s)
+DEFAULT_LATENCY = {'phase1': 20.0, 'phase2': 10.0}
+
+# Wygładzanie średniej (EWMA) - nowsze pomiary ważą więcej (np. spowolnienie strony)
+LATENCY_SMOOTHING = 0.3
+
+
+def parse_deadline(text: str, now: Optional[datetime] = None) -> datetime:
+    """'HH:MM' -> dzisiejsza data z tą godziną (ValueError dla złego formatu)."""
+    now = now or datetime.now()
+    try:
+        hour, minute = (int(part) for part in text.strip().split(':'))
+        return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Nieprawidłowy termin '{text}' - oczekiwano HH:MM")
+
+
+def order_by_kickoff(urls: List[str], kickoffs: Dict[str, str], date: str,
+                     now: Optional[datetime] = None) -> Tuple[List[str], List[str]]:
+    """
+    Sortuje URLe wg godziny rozpoczęcia (stabilnie, mecze bez godziny na końcu).
+
+    Dla dzisiejszej daty odrzuca mecze, które już się zaczęły.
+    Returns: (uporządkowane_urle, rozpoczęte_urle)
+    """
+    now = now or datetime.now()
+    today = date == now.strftime('%Y-%m-%d')
+    current = now.strftime('%H:%M')
+    started = [u for u in urls if today and kickoffs.get(u) and kickoffs[u] <= current]
+    started_set = set(started)
+    remaining = [u for u in urls if u not in started_set]
+    ordered = sorted(remaining, key=lambda u: (not kickoffs.get(u), kickoffs.get(u, '')))
+    return ordered, started
+
+
+class DeadlineScheduler:
+    """
+    Budżet czasu przebiegu do terminu.
+
+    Args:
+        deadline: Termin wysyłki emaila
+        reserve_minutes: Rezerwa przed terminem na zapis wyników i email
+        clock: Źródło czasu (time.time) - podmieniane w testach
+    """
+
+    def __init__(self, deadline: datetime, reserve_minutes: float = EMAIL_RESERVE_MINUTES,
+                 clock: Callable[[], float] = time.time):
+        self.deadline = deadline
+        self.deadline_ts = deadline.timestamp() - reserve_minutes * 60
+        self.clock = clock
+        self.latency = dict(DEFAULT_LATENCY)
+        self.measured = {'phase1': 0, 'phase2': 0}
+        self.qualified = 0
+        self.shed: List[str] = []
+        self.stopped: Dict[str, int] = {}
+        self.started_skipped = 0
+        self._last_mark: Dict[str, float] = {}
+
+    def start_phase(self, phase: str) -> None:
+        self._last_mark[phase] = self.clock()
+
+    def record(self, phase: str, seconds: float) -> None:
+        """Dodaje pomiar czasu jednego meczu (EWMA)."""
+        if self.measured[phase]:
+            self.latency[phase] += LATENCY_SMOOTHING * (seconds - self.latency[phase])
+        else:
+            self.latency[phase] = seconds
+        self.measured[phase] += 1
+
+    def mark(self, phase: str, qualified: bool = False) -> None:
+        """Mecz zakończony - mierzy odstęp od poprzedniego wyniku tej fazy."""
+        now = self.clock()
+        self.record(phase, now - self._last_mark.get(phase, now))
+        self._last_mark[phase] = now
+        if phase == 'phase1' and qualified:
+            self.qualified += 1
+
+    def time_left(self) -> float:
+        """Sekundy do terminu (po odjęciu rezerwy na email)."""
+        return self.deadline_ts - self.clock()
+
+    def qualify_rate(self) -> float:
+        return self.qualified / self.measured['phase1'] if self.measured['phase1'] else 0.1
+
+    def projected(self, phase1_left: int, phase2_left: int = 0, with_phase2: bool = True) -> float:
+        """Szacowany czas pozostałej pracy (s): FAZA 1 + FAZA 2 dla spodziewanych kandydatów."""
+        seconds = phase1_left * self.latency['phase1']
+        if with_phase2:
+            seconds += (phase2_left + phase1_left * self.qualify_rate()) * self.latency['phase2']
+        return seconds
+
+    def pressure(self, phase1_left: int, phase2_left: int = 0, with_phase2: bool = True) -> float:
+        left = self.time_left()
+        if left <= 0:
+            return float('inf')
+        return self.projected(phase1_left, phase2_left, with_phase2) / left
+
+    def update(self, phase1_left: int, phase2_left: int = 0, with_phase2: bool = True) -> List[str]:
+        """Przelicza presję czasu i ustawia zrzucane etapy (tylko narastająco)."""
+        pressure = self.pressure(phase1_left, phase2_left, with_phase2)
+        shed = [stage for threshold, stage in SHED_LEVELS if pressure > threshold]
+        if len(shed) > len(self.shed):
+            self.shed = shed
+            set_shed_stages(shed)
+            print(f"   ⏰ Presja czasu {pressure:.2f} - zrzucam: {', '.join(shed)}")
+        return self.shed
+
+    def should_stop(self, phase: str) -> bool:
+        """True gdy kolejny mecz nie zmieści się przed terminem."""
+        return self.time_left() < self.latency[phase]
+
+    def note_stop(self, phase: str, dropped: int) -> None:
+        self.stopped[phase] = self.stopped.get(phase, 0) + dropped
+        print(f"\n⏰ TERMIN {self.deadline:%H:%M}: przerywam {phase} - pominięto {dropped} meczów")
+
+    def stats(self) -> Dict:
+        return {
+            'deadline': self.deadline.strftime('%H:%M'),
+            'time_left_s': round(self.time_left()),
+            'latency_s': {phase: round(value, 2) for phase, value in self.latency.items()},
+            'qualify_rate': round(self.qualify_rate(), 3),
+            'shed': list(self.shed),
+            'stopped': dict(self.stopped),
+            'started_skipped': self.started_skipped,
+        }
+
+    def print_report(self) -> None:
+        stats = self.stats()
+        print(f"\n⏰ TERMIN {stats['deadline']}: zapas {stats['time_left_s'] / 60:.1f} min, "
+              f"czas/mecz F1 {stats['latency_s']['phase1']}s, F2 {stats['latency_s']['phase2']}s")
+        if stats['started_skipped']:
+            print(f"   ⏭️ pominięte rozpoczęte mecze: {stats['started_skipped']}")
+        if stats['shed']:
+            print(f"   ✂️ zrzucone etapy: {', '.join(stats['shed'])}")
+        for phase, dropped in stats['stopped'].items():
+            print(f"   ⛔ {phase}: nie zdążono z {dropped} meczami")
@@ -0,0 +1,141 @@
+"""
+🗂️ DOM Snapshot Cache - jeden sparsowany snapshot strony na URL (per mecz)
+==========================================================================
+Dla jednego meczu drużynowego scraper odwiedzał strony H2H wielokrotnie:
+- process_match: strona meczu -> zakładka H2H (/h2h/ogolem/)
+- extract_advanced_team_form: /h2h/ogolem/ (ponownie) i /h2h/u-siebie/
+- _extract_away_form_from_overall: /h2h/ogolem/ (po raz trzeci)
+
+Cache trzyma sparsowany BeautifulSoup per URL w małym LRU. process_match zapisuje
+snapshot zakładki H2H ogółem (klucz: h2h_page_url), więc H2H ogółem, forma
+gospodarzy, forma gości i forma gości na wyjeździe czytane są z tego samego
+snapshotu. Maksymalnie 2 ładowania strony na mecz zamiast 4.
+
+Snapshoty są per wątek: FAZA 1 na Playwright (run_phase1_playwright) prowadzi
+kilka meczów naraz w wątkach jednego procesu - każdy wątek ma własną stronę,
+własne LRU i własne begin_match(). Liczniki są wspólne (pod blokadą).
+
+Użycie:
+    from dom_snapshot_cache import h2h_snapshot_cache
+    soup = h2h_snapshot_cache.get(url)
+    if soup is None:
+        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        h2h_snapshot_cache.put(url, soup)
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_MAX_ENTRIES = 4  # Na jeden mecz wystarczą 2-3 strony (mecz/H2H ogółem, u siebie)
+
+
+def snapshot_key(url: str) -> str:
+    """
+    Normalizuje URL do klucza cache.
+
+    Usuwa fragment (#...), końcowy '/' i '/szczegoly', z query zostawia tylko 'mid'
+    - tak aby URL z driver.current_url i URL zbudowany ręcznie dawały ten sam klucz.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/')
+    if path.endswith('/szczegoly'):
+        path = path[:-len('/szczegoly')]
+    mid = parse_qs(parts.query).get('mid', [''])[0]
+    key = f"{parts.netloc.lower()}{path}"
+    return f"{key}?mid={mid}" if mid else key
+
+
+class DomSnapshotCache:
+    """
+    Małe LRU sparsowanych stron (klucz = znormalizowany URL, osobne per wątek) z licznikami trafień.
+
+    Przykład:
+        cache = DomSnapshotCache(max_entries=4)
+        cache.put(url, soup)
+        cache.get(url)      # -> soup (hit)
+        cache.stats()       # -> {'hits': 1, 'misses': 0, ...}
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max(1, max_entries)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.page_loads = 0   # Ile razy faktycznie nawigowaliśmy (driver.get)
+        self.matches = 0
+
+    @property
+    def _entries(self) -> "OrderedDict[str, object]":
+        # Snapshoty bieżącego wątku (jeden wątek = jedna strona/driver = jeden mecz naraz)
+        entries = getattr(self._local, 'entries', None)
+        if entries is None:
+            entries = self._local.entries = OrderedDict()
+        return entries
+
+    def get(self, url: str):
+        entries = self._entries
+        key = snapshot_key(url)
+        snapshot = entries.get(key)
+        with self._lock:
+            if snapshot is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        entries.move_to_end(key)
+        return snapshot
+
+    def put(self, url: str, snapshot) -> None:
+        entries = self._entries
+        key = snapshot_key(url)
+        entries[key] = snapshot
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def __contains__(self, url: str) -> bool:
+        return snapshot_key(url) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def begin_match(self) -> None:
+        """Nowy mecz = nowe snapshoty bieżącego wątku (inne wątki zachowują swoje)."""
+        self._entries.clear()
+        with self._lock:
+            self.matches += 1
+
+    def record_page_load(self) -> None:
+        with self._lock:
+            self.page_loads += 1
+
+    def stats(self) -> Dict:
+        """Liczniki wszystkich wątków; 'entries' - snapshoty bieżącego wątku."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'page_loads': self.page_loads,
+            'matches': self.matches,
+            'entries': len(self._entries),
+        }
+
+    def print_report(self) -> None:
+        s = self.stats()
+        if not (s['hits'] or s['misses']):
+            return
+        print(f"\n🗂️ DOM SNAPSHOT CACHE: trafienia={s['hits']}  chybienia={s['misses']}  "
+              f"(hit rate {s['hit_rate']*100:.0f}%), ładowania stron H2H: {s['page_loads']}")
+
+
+# Globalna instancja dla scrapera (snapshoty per wątek - jeden wątek = jeden driver = jeden mecz naraz)
+h2h_snapshot_cache = DomSnapshotCache()
+
+
+def print_snapshot_cache_report() -> None:
+    h2h_snapshot_cache.print_report()
@@ -0,0 +1,259 @@
+"""
+♻️ Driver Pool - ciepła pula Chrome z recyklingiem wg zużycia pamięci
+=====================================================================
+Zamiast zabijać i uruchamiać Chrome co 80 meczów (zimny start: szukanie
+ChromeDriver w ~/.wdm, nowy profil, ponowna akceptacja cookies) pula:
+
+- recyklinguje przeglądarkę TYLKO gdy:
+    * RSS Chrome (chromedriver + wszystkie procesy potomne) > max_rss_mb
+    * liczba kart > max_tabs
+    * health check nie przechodzi
+- trzyma rozgrzany zapasowy driver (spare) z zaakceptowanym consent,
+  uruchamiany w tle - podmiana trwa milisekundy zamiast zimnego startu
+- stary driver zamykany jest w tle
+
+Bez psutil (brak pomiaru RSS) pula wraca do recyklingu co FALLBACK_INTERVAL meczów.
+
+Użycie:
+    pool = DriverPool(headless=True, driver=driver)   # przejmuje istniejący driver
+    for url in urls:
+        info = process_match(url, driver)
+        driver = pool.after_match()                   # ewentualna podmiana
+    pool.close()
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_MAX_RSS_MB = int(os.getenv('DRIVER_MAX_RSS_MB', '1500'))
+DEFAULT_MAX_TABS = int(os.getenv('DRIVER_MAX_TABS', '3'))
+DEFAULT_CHECK_EVERY = 5        # Co ile meczów mierzymy RSS/karty (health check - co mecz)
+FALLBACK_INTERVAL = 80         # Recykling co N meczów gdy brak psutil
+WARMUP_URL = 'https://www.livesport.com/pl/'
+SPARE_WAIT_TIMEOUT = 90        # Max czekania na spare, który jeszcze się rozgrzewa
+
+
+def driver_rss_mb(driver) -> Optional[float]:
+    """RSS (MB) procesu chromedriver i wszystkich procesów Chrome pod nim; None gdy nie da się zmierzyć."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+    except Exception:
+        return None
+    total = 0
+    for proc in procs:
+        try:
+            total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+def driver_tab_count(driver) -> Optional[int]:
+    try:
+        return len(driver.window_handles)
+    except Exception:
+        return None
+
+
+def _quit_quietly(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    """
+    Aktywny driver + rozgrzany zapasowy, recykling wg progów.
+
+    Args:
+        headless: Tryb headless dla nowych driverów
+        driver: Istniejący driver do przejęcia (np. po zbieraniu linków)
+        max_rss_mb / max_tabs: Progi recyklingu
+        check_every: Co ile meczów mierzyć RSS i karty
+        warm_spare: Czy trzymać zapasowy driver w tle
+        factory / warmup / health_check: wstrzykiwane (domyślnie z livesport_h2h_scraper)
+    """
+
+    def __init__(self, headless: bool = True, driver=None, max_rss_mb: int = DEFAULT_MAX_RSS_MB,
+                 max_tabs: int = DEFAULT_MAX_TABS, check_every: int = DEFAULT_CHECK_EVERY,
+                 warm_spare: bool = True, factory: Callable = None, warmup: Callable = None,
+                 health_check: Callable = None, prefix: str = ''):
+        if factory is None or warmup is None or health_check is None:
+            # Import leniwy - livesport_h2h_scraper sam korzysta z puli
+            from livesport_h2h_scraper import start_driver, check_driver_health
+            factory = factory or (lambda: start_driver(headless=headless))
+            warmup = warmup or warm_up_driver
+            health_check = health_check or check_driver_health
+        self.factory = factory
+        self.warmup = warmup
+        self.health_check = health_check
+        self.max_rss_mb = max_rss_mb
+        self.max_tabs = max_tabs
+        self.check_every = max(1, check_every)
+        self.warm_spare = warm_spare
+        self.prefix = prefix
+
+        self.driver = driver
+        self._spare = None
+        self._spare_thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._matches_on_driver = 0
+        self.stats: Dict = {'recycles': 0, 'reasons': {}, 'swap_ms': [], 'cold_starts': 0}
+
+        if self.driver is None:
+            self.driver = self._cold_start()
+        self._start_spare()
+
+    # ------------------------------------------------------------------
+    # Spare
+    # ------------------------------------------------------------------
+
+    def _build_spare(self) -> None:
+        try:
+            spare = self.factory()
+            try:
+                self.warmup(spare)
+            except Exception as e:
+                print(f"   {self.prefix}⚠️ Rozgrzewanie spare: {type(e).__name__}")
+            with self._lock:
+                if self._spare is None:
+                    self._spare = spare
+                    return
+            _quit_quietly(spare)  # Pula zamknięta w międzyczasie
+        except Exception as e:
+            print(f"   {self.prefix}⚠️ Nie udało się przygotować spare drivera: {type(e).__name__}: {str(e)[:80]}")
+
+    def _start_spare(self) -> None:
+        if not self.warm_spare:
+            return
+        if self._spare is not None or (self._spare_thread and self._spare_thread.is_alive()):
+            return
+        self._spare_thread = threading.Thread(target=self._build_spare, daemon=True)
+        self._spare_thread.start()
+
+    def _take_spare(self):
+        if self._spare_thread and self._spare_thread.is_alive():
+            self._spare_thread.join(timeout=SPARE_WAIT_TIMEOUT)
+        with self._lock:
+            spare, self._spare = self._spare, None
+        if spare is not None and not self._is_healthy(spare):
+            _quit_quietly(spare)
+            return None
+        return spare
+
+    # ------------------------------------------------------------------
+    # Recykling
+    # ------------------------------------------------------------------
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            return bool(self.health_check(driver))
+        except Exception:
+            return False
+
+    def _cold_start(self):
+        self.stats['cold_starts'] += 1
+        last_error = None
+        for attempt in range(3):
+            try:
+                driver = self.factory()
+                if self._is_healthy(driver):
+                    return driver
+                _quit_quietly(driver)
+            except Exception as e:
+                last_error = e
+            time.sleep(2)
+        raise RuntimeError(f"Nie można uruchomić przeglądarki: {last_error}")
+
+    def recycle_reason(self) -> Optional[str]:
+        """Zwraca powód recyklingu ('health', 'rss', 'tabs', 'interval') albo None."""
+        if not self._is_healthy(self.driver):
+            return 'health'
+        if self._matches_on_driver % self.check_every != 0:
+            return None
+        rss = driver_rss_mb(self.driver)
+        if rss is not None and rss > self.max_rss_mb:
+            return 'rss'
+        tabs = driver_tab_count(self.driver)
+        if tabs is not None and tabs > self.max_tabs:
+            return 'tabs'
+        if rss is None and self._matches_on_driver >= FALLBACK_INTERVAL:
+            return 'interval'
+        return None
+
+    def recycle(self, reason: str = 'manual'):
+        """Podmienia aktywny driver na spare (lub zimny start) i zwraca nowy driver."""
+        start = time.time()
+        old = self.driver
+        new = self._take_spare()
+        cold = new is None
+        if cold:
+            new = self._cold_start()
+        self.driver = new
+        self._matches_on_driver = 0
+        swap_ms = (time.time() - start) * 1000
+
+        self.stats['recycles'] += 1
+        self.stats['reasons'][reason] = self.stats['reasons'].get(reason, 0) + 1
+        self.stats['swap_ms'].append(swap_ms)
+        print(f"   {self.prefix}♻️ Recykling przeglądarki ({reason}) - "
+              f"{'zimny start' if cold else 'rozgrzany spare'} w {swap_ms:.0f} ms")
+
+        if old is not None:
+            threading.Thread(target=_quit_quietly, args=(old,), daemon=True).start()
+        self._start_spare()
+        return new
+
+    def after_match(self):
+        """Wołane po każdym meczu; zwraca driver do użycia dla kolejnego meczu."""
+        self._matches_on_driver += 1
+        reason = self.recycle_reason()
+        if reason:
+            return self.recycle(reason)
+        return self.driver
+
+    def release_spare(self) -> None:
+        """Zamyka spare (np. po FAZIE 1, gdy recykling nie jest już potrzebny)."""
+        self.warm_spare = False
+        if self._spare_thread and self._spare_thread.is_alive():
+            self._spare_thread.join(timeout=SPARE_WAIT_TIMEOUT)
+        with self._lock:
+            spare, self._spare = self._spare, None
+        if spare is not None:
+            _quit_quietly(spare)
+
+    def close(self) -> None:
+        """Zamyka spare i aktywny driver."""
+        self.release_spare()
+        if self.driver is not None:
+            _quit_quietly(self.driver)
+            self.driver = None
+
+    def print_report(self) -> None:
+        if not self.stats['recycles']:
+            return
+        swaps = self.stats['swap_ms']
+        reasons = ', '.join(f"{k}={v}" for k, v in sorted(self.stats['reasons'].items()))
+        print(f"\n♻️ DRIVER POOL: recyklingi={self.stats['recycles']} ({reasons}), "
+              f"śr. podmiana {sum(swaps) / len(swaps):.0f} ms, zimne starty={self.stats['cold_starts']}")
+
+
+def warm_up_driver(driver) -> None:
+    """Otwiera Livesport i akceptuje consent - spare jest gotowy do pracy od razu."""
+    from livesport_h2h_scraper import _accept_cookies_on_page
+    from page_readiness import wait_for_page
+    driver.get(WARMUP_URL)
+    wait_for_page(driver, 'listing', legacy_sleep=2.0)
+    _accept_cookies_on_page(driver)
@@ -0,0 +1,242 @@
+"""
+🐳 FlareSolverr Session Pool - długo żyjące sesje FlareSolverr
+==============================================================
+_try_flaresolverr_with_session tworzył sesję, używał jej raz i ją niszczył -
+każde pobranie strony Forebet płaciło start przeglądarki wewnątrz
+FlareSolverr (i ponowne rozwiązanie challenge).
+
+Pula trzyma do POOL_SIZE sesji na cały proces (wszystkie sporty i daty):
+
+    with flaresolverr_pool.session() as session_id:
+        solution = flaresolverr_pool.request(session_id, url)
+
+- acquire: wolna sesja (najdłużej bezczynna = najpewniej wciąż żywa) lub nowa,
+  gdy pula nie jest pełna; przy pełnej puli czeka na zwolnienie
+- health check: sesja nie sprawdzana od HEALTH_INTERVAL jest szukana
+  w `sessions.list` - zniknięta (restart FlareSolverr) jest zastępowana nową
+- błąd żądania: sesja oznaczana jako niezdrowa i niszczona przy zwolnieniu
+- eksmisja: sesje bezczynne dłużej niż IDLE_TIMEOUT są niszczone
+- koniec procesu: wszystkie sesje niszczone (atexit)
+
+Konfiguracja (env):
+    FLARESOLVERR_URL=http://localhost:8191/v1
+    FLARESOLVERR_POOL_SIZE=2          - maks. liczba sesji
+    FLARESOLVERR_SESSION_IDLE=600     - eksmisja po tylu sekundach bezczynności
+    FLARESOLVERR_POOL=0               - sesja niszczona po każdym użyciu (jak dawniej)
+"""
+
+import atexit
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import requests
+
+FLARESOLVERR_URL = os.environ.get('FLARESOLVERR_URL', 'http://localhost:8191/v1')
+POOL_SIZE = int(os.getenv('FLARESOLVERR_POOL_SIZE', '2'))
+IDLE_TIMEOUT = float(os.getenv('FLARESOLVERR_SESSION_IDLE', '600'))
+
+# Jak często (sekundy) sprawdzać, czy wolna sesja wciąż istnieje w FlareSolverr
+HEALTH_INTERVAL = 60
+
+# Maks. czas oczekiwania na wolną sesję przy pełnej puli
+ACQUIRE_TIMEOUT = 300
+
+
+def flaresolverr_pool_enabled() -> bool:
+    return os.getenv('FLARESOLVERR_POOL', '1') != '0'
+
+
+class FlareSolverrError(Exception):
+    """FlareSolverr odpowiedział błędem (status != ok)."""
+
+
+class _Session:
+    __slots__ = ('session_id', 'created_at', 'last_used', 'last_checked', 'uses', 'healthy')
+
+    def __init__(self, session_id: str, now: float):
+        self.session_id = session_id
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+        self.uses = 0
+        self.healthy = True
+
+
+class FlareSolverrSessionPool:
+    """
+    Pula sesji FlareSolverr.
+
+    Args:
+        url: Endpoint FlareSolverr (/v1)
+        size: Maks. liczba sesji
+        idle_timeout: Eksmisja sesji bezczynnych dłużej (sekundy)
+        health_interval: Co ile sekund sprawdzać wolną sesję przez sessions.list
+        clock: Źródło czasu (testy)
+    """
+
+    def __init__(self, url: str = FLARESOLVERR_URL, size: int = POOL_SIZE, idle_timeout: float = IDLE_TIMEOUT,
+                 health_interval: float = HEALTH_INTERVAL, clock=time.time):
+        self.url = url
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.health_interval = health_interval
+        self.clock = clock
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.replaced = 0
+        self.destroyed = 0
+        self._idle: List[_Session] = []
+        self._busy: Dict[str, _Session] = {}
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    def _command(self, payload: Dict, timeout: float = 30) -> Dict:
+        response = requests.post(self.url, headers={"Content-Type": "application/json"}, json=payload,
+                                 timeout=timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get('status') != 'ok':
+            raise FlareSolverrError(data.get('message', 'Unknown error'))
+        return data
+
+    def _create(self) -> _Session:
+        session_id = f"forebet_{uuid.uuid4().hex[:8]}"
+        self._command({"cmd": "sessions.create", "session": session_id})
+        self.created += 1
+        return _Session(session_id, self.clock())
+
+    def _destroy(self, session: _Session) -> None:
+        try:
+            self._command({"cmd": "sessions.destroy", "session": session.session_id}, timeout=10)
+        except Exception:
+            pass  # Sesja mogła już zniknąć (restart FlareSolverr)
+        self.destroyed += 1
+
+    def _alive_sessions(self) -> Optional[set]:
+        try:
+            return set(self._command({"cmd": "sessions.list"}, timeout=10).get('sessions', []))
+        except Exception:
+            return None
+
+    def _evict_idle(self) -> List[_Session]:
+        """Zdejmuje z puli sesje bezczynne dłużej niż idle_timeout (wywołanie pod self._cond)."""
+        now = self.clock()
+        expired = [session for session in self._idle if now - session.last_used > self.idle_timeout]
+        if expired:
+            self._idle = [session for session in self._idle if session not in expired]
+            self.evicted += len(expired)
+        return expired
+
+    def acquire(self, timeout: float = ACQUIRE_TIMEOUT) -> str:
+        """ID sesji do wyłącznego użycia - zwolnij przez release()."""
+        deadline = self.clock() + timeout
+        while True:
+            with self._cond:
+                expired = self._evict_idle()
+                session = None
+                create = False
+                if self._idle:
+                    # Najdłużej bezczynna - najpierw sprawdzana, najpewniej wymaga health checku
+                    session = self._idle.pop(0)
+                elif len(self._busy) + self._pending < self.size:
+                    self._pending += 1
+                    create = True
+                elif not expired:
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        raise TimeoutError('Brak wolnej sesji FlareSolverr')
+                    self._cond.wait(min(remaining, 1.0))
+                    continue
+            for stale in expired:
+                self._destroy(stale)
+            if session is None and not create:
+                continue
+            if session is not None and self.clock() - session.last_checked > self.health_interval:
+                alive = self._alive_sessions()
+                if alive is not None and session.session_id not in alive:
+                    # FlareSolverr zrestartowany - sesji już nie ma, tworzymy nową w jej miejsce
+                    self.replaced += 1
+                    session = None
+                    with self._cond:
+                        self._pending += 1
+                    create = True
+                elif alive is not None:
+                    session.last_checked = self.clock()
+            if create:
+                try:
+                    session = self._create()
+                finally:
+                    with self._cond:
+                        self._pending -= 1
+                        if session is None:
+                            self._cond.notify()
+            else:
+                self.reused += 1
+            with self._cond:
+                session.uses += 1
+                self._busy[session.session_id] = session
+            return session.session_id
+
+    def release(self, session_id: str, healthy: bool = True) -> None:
+        """Zwraca sesję do puli (niezdrowa lub pula wyłączona - sesja niszczona)."""
+        with self._cond:
+            session = self._busy.pop(session_id, None)
+            if session is None:
+                return
+            session.last_used = self.clock()
+            keep = healthy and flaresolverr_pool_enabled()
+            if keep:
+                self._idle.append(session)
+            self._cond.notify()
+        if not keep:
+            self._destroy(session)
+
+    @contextmanager
+    def session(self, timeout: float = ACQUIRE_TIMEOUT):
+        """with pool.session() as session_id: ... - błąd w bloku oznacza sesję jako niezdrową."""
+        session_id = self.acquire(timeout)
+        healthy = False
+        try:
+            yield session_id
+            healthy = True
+        finally:
+            self.release(session_id, healthy=healthy)
+
+    def request(self, session_id: str, url: str, max_timeout: int = 120000, **extra) -> Dict:
+        """request.get w sesji; zwraca `solution` (response, cookies, userAgent, ...)."""
+        payload = {"cmd": "request.get", "url": url, "session": session_id, "maxTimeout": max_timeout, **extra}
+        return self._command(payload, timeout=max_timeout / 1000 + 60).get('solution', {})
+
+    def close(self) -> None:
+        """Niszczy wszystkie sesje (koniec procesu)."""
+        with self._cond:
+            sessions = self._idle + list(self._busy.values())
+            self._idle, self._busy = [], {}
+        for session in sessions:
+            self._destroy(session)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {'idle': len(self._idle), 'busy': len(self._busy), 'created': self.created,
+                    'reused': self.reused, 'evicted': self.evicted, 'replaced': self.replaced}
+
+    def print_report(self) -> None:
+        if not self.created:
+            return
+        stats = self.stats()
+        print(f"\n🐳 FLARESOLVERR POOL: sesje utworzone {stats['created']}, ponowne użycia {stats['reused']}, "
+              f"eksmisje {stats['evicted']}, zastąpione {stats['replaced']}, aktywne {stats['idle'] + stats['busy']}")
+
+
+# Globalna instancja (per proces) - sesje niszczone przy wyjściu
+flaresolverr_pool = FlareSolverrSessionPool()
+atexit.register(flaresolverr_pool.close)
+
+
+def print_flaresolverr_pool_report() -> None:
+    flaresolverr_pool.print_report()
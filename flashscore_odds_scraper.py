@@ -15,7 +15,6 @@ import re
 import json
 from typing import Dict, Optional, List, Tuple
 from datetime import datetime
-from difflib import SequenceMatcher
 
 try:
     from selenium import webdriver
@@ -53,15 +52,6 @@ def normalize_team_name(name: str) -> str:
     return name
 
 
-def similarity_score(name1: str, name2: str) -> float:
-    """Oblicza similarity score między dwoma nazwami"""
-    norm1 = normalize_team_name(name1)
-    norm2 = normalize_team_name(name2)
-    if not norm1 or not norm2:
-        return 0.0
-    return SequenceMatcher(None, norm1, norm2).ratio()
-
-
 class FlashScoreOddsScraper:
     """Scraper kursów z FlashScore.com"""
     
@@ -21,7 +21,7 @@ import re
 import atexit
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from difflib import SequenceMatcher
+from team_matcher import get_matcher, pair_shortlist
 from bs4 import BeautifulSoup
 
 # Patch for undetected_chromedriver WinError 6 on Windows
@@ -107,13 +107,44 @@ def normalize_team_name(name: str) -> str:
     return name
 
 
-def similarity_score(name1: str, name2: str) -> float:
-    """Oblicza similarity między nazwami drużyn"""
-    norm1 = normalize_team_name(name1)
-    norm2 = normalize_team_name(name2)
-    if not norm1 or not norm2:
-        return 0.0
-    return SequenceMatcher(None, norm1, norm2).ratio()
+def _url_teams(url: str) -> Tuple[str, str]:
+    """Nazwy drużyn ze slugów URLa Livesport: /mecz/<sport>/<gospodarze>/<goście>/?mid=..."""
+    parts = url.split('?')[0].rstrip('/').split('/')
+    if len(parts) < 2:
+        return '', ''
+    return parts[-2].replace('-', ' '), parts[-1].replace('-', ' ')
+
+
+def find_livesport_match_url(urls: List[str], home_team: str, away_team: str) -> Optional[str]:
+    """
+    URL meczu z listy dnia po nazwach drużyn.
+    
+    Kandydaci z shortlisty indeksu trigramów (team_matcher) zamiast pętli po
+    pierwszych 50 URLach; warunek jak wcześniej - główne słowa obu nazw w URLu.
+    """
+    if not urls:
+        return None
+    home_norm = normalize_team_name(home_team)
+    away_norm = normalize_team_name(away_team)
+    home_words = [w for w in home_norm.split() if len(w) > 3]
+    away_words = [w for w in away_norm.split() if len(w) > 3]
+    
+    teams = [_url_teams(url) for url in urls]
+    home_matcher = get_matcher([home for home, _ in teams], normalize_team_name)
+    away_matcher = get_matcher([away for _, away in teams], normalize_team_name)
+    
+    best_match_url = None
+    best_score = 0
+    for position in pair_shortlist(home_team, away_team, home_matcher, away_matcher):
+        url_lower = urls[position].lower()
+        home_in_url = sum(1 for w in home_words if w in url_lower)
+        away_in_url = sum(1 for w in away_words if w in url_lower)
+        # Score: ile słów pasuje
+        score = home_in_url + away_in_url
+        if score > best_score and home_in_url > 0 and away_in_url > 0:
+            best_score = score
+            best_match_url = urls[position]
+    return best_match_url
 
 
 def get_all_forebet_matches(
@@ -431,30 +462,8 @@ def search_h2h_on_livesport(
             print(f"   ⚠️ Nie znaleziono meczów {sport} na Livesport dla {date}")
             return None
         
-        # Szukaj meczu po nazwach drużyn
-        home_norm = normalize_team_name(home_team)
-        away_norm = normalize_team_name(away_team)
-        
-        best_match_url = None
-        best_score = 0.0
-        
-        for url in urls[:50]:  # Ogranicz do pierwszych 50 meczów dla wydajności
-            # URL zawiera nazwy drużyn, np. /mecz/team1-team2/
-            url_lower = url.lower()
-            
-            # Sprawdź czy główne słowa z nazw są w URL
-            home_words = [w for w in home_norm.split() if len(w) > 3]
-            away_words = [w for w in away_norm.split() if len(w) > 3]
-            
-            home_in_url = sum(1 for w in home_words if w in url_lower)
-            away_in_url = sum(1 for w in away_words if w in url_lower)
-            
-            # Score: ile słów pasuje
-            score = home_in_url + away_in_url
-            
-            if score > best_score and home_in_url > 0 and away_in_url > 0:
-                best_score = score
-                best_match_url = url
+        # Szukaj meczu po nazwach drużyn (wszystkie mecze dnia - shortlista trigramów)
+        best_match_url = find_livesport_match_url(urls, home_team, away_team)
         
         if not best_match_url:
             print(f"   ⚠️ Nie znaleziono meczu {home_team} vs {away_team} na Livesport")
@@ -0,0 +1,326 @@
+"""
+📇 Forebet Index - predykcje ze strony Forebet sparsowane raz per (sport, data)
+==============================================================================
+search_forebet_prediction przy każdym wywołaniu przechodził całe drzewo strony
+i liczył similarity dla każdego wiersza - setki kwalifikujących się meczów to
+setki pełnych skanów tej samej strony.
+
+Indeks budowany jest raz na stronę (sport, data):
+- każdy wiersz: nazwy drużyn (surowe + znormalizowane) i pola predykcji
+  (1X2, prawdopodobieństwo, dokładny wynik, over/under, BTTS, średnia goli)
+- shortlista kandydatów z indeksu trigramów (team_matcher) osobno dla
+  gospodarzy i gości; lookup liczy similarity tylko dla wierszy z którejś
+  shortlisty (mikrosekundy zamiast pełnego skanu)
+
+    index = get_index('football', '2025-10-05', html, normalize_team_name, similarity_score)
+    hit = index.lookup('Legia Warszawa', 'Lech Poznań')
+    hits = index.lookup_many([('Legia Warszawa', 'Lech Poznań'), ...])
+
+Normalizacja i scoring są wstrzykiwane (forebet_scraper.normalize_team_name /
+similarity_score) - warunki dopasowania są te same co przy pełnym skanie.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from team_matcher import TeamMatcher, pair_shortlist
+
+# Kolumny predykcji kopiowane do wyniku search_forebet_prediction
+PREDICTION_FIELDS = ('prediction', 'probability', 'exact_score', 'over_under', 'btts', 'avg_goals')
+
+# Ilu kandydatów (wg trigramów) na drużynę - para dostaje ich sumę
+SHORTLIST_PER_TEAM = 5
+
+
+class ForebetRow(NamedTuple):
+    home: str
+    away: str
+    home_norm: str
+    away_norm: str
+    prediction: Optional[str] = None
+    probability: Optional[float] = None
+    exact_score: Optional[str] = None
+    over_under: Optional[str] = None
+    btts: Optional[str] = None
+    avg_goals: Optional[float] = None
+
+    def fields(self) -> Dict:
+        """Pola predykcji (bez pustych) - do result.update()."""
+        return {name: getattr(self, name) for name in PREDICTION_FIELDS if getattr(self, name) is not None}
+
+
+class ForebetLookup(NamedTuple):
+    row: Optional[ForebetRow]   # najlepszy wiersz spełniający warunki (None = brak)
+    home_score: float
+    away_score: float
+    best_similarity: float      # najlepszy combined wśród kandydatów (decyzja o AI)
+    candidates: int             # liczba porównanych wierszy
+
+
+def find_match_rows(soup) -> Tuple[list, str]:
+    """Wiersze meczów - te same warianty struktury strony co wcześniej w search_forebet_prediction."""
+    rows = soup.find_all('div', class_='rcnt')
+    if rows:
+        return rows, 'div.rcnt'
+    rows = soup.find_all('tr', class_=['tr_0', 'tr_1'])
+    if rows:
+        return rows, 'tr.tr_0/1'
+    rows = soup.find_all('div', class_='tr')
+    if rows:
+        return rows, 'div.tr'
+    rows = [row for table in soup.find_all('table') for row in table.find_all('tr')]
+    if rows:
+        return rows, 'table>tr'
+    rows = [div for schema in soup.find_all('div', class_='schema') for div in schema.find_all('div', recursive=False)]
+    if rows:
+        return rows, 'div.schema>div'
+    links = [link for link in soup.find_all('a', href=True) if '/predictions/' in link.get('href', '')]
+    return [link.find_parent() for link in links if link.find_parent()], 'a[/predictions/]'
+
+
+def row_teams(row) -> Tuple[Optional[str], Optional[str]]:
+    """Nazwy drużyn z wiersza (span.homeTeam/awayTeam, meta schema.org, link meczu, div.tnms)."""
+    home_name = away_name = None
+    home_span = row.find('span', class_='homeTeam')
+    away_span = row.find('span', class_='awayTeam')
+    if home_span and away_span:
+        home_inner = home_span.find('span', itemprop='name')
+        away_inner = away_span.find('span', itemprop='name')
+        if home_inner and away_inner:
+            home_name = home_inner.get_text(strip=True)
+            away_name = away_inner.get_text(strip=True)
+        else:
+            home_name = home_span.get_text(strip=True)
+            away_name = away_span.get_text(strip=True)
+
+    if not home_name or not away_name:
+        meta_name = row.find('meta', itemprop='name')
+        if meta_name and ' vs ' in (meta_name.get('content') or ''):
+            parts = meta_name['content'].split(' vs ')
+            home_name, away_name = parts[0].strip(), parts[1].strip()
+
+    if not home_name or not away_name:
+        for link in row.find_all('a', href=True):
+            href = link.get('href', '')
+            if '/matches/' not in href and '/predictions/' not in href:
+                continue
+            url_part = re.sub(r'-\d+$', '', href.split('/')[-1])
+            words = url_part.split('-')
+            for i in range(1, len(words)):
+                potential_home = ' '.join(words[:i]).title()
+                potential_away = ' '.join(words[i:]).title()
+                if len(potential_home) > 2 and len(potential_away) > 2:
+                    home_name, away_name = potential_home, potential_away
+                    break
+            if home_name and away_name:
+                break
+
+    if not home_name or not away_name:
+        tnms_div = row.find('div', class_='tnms')
+        if tnms_div:
+            home_span = tnms_div.find('span', class_='homeTeam')
+            away_span = tnms_div.find('span', class_='awayTeam')
+            if home_span and away_span:
+                home_name = home_span.get_text(strip=True)
+                away_name = away_span.get_text(strip=True)
+
+    return home_name, away_name
+
+
+def _pick_1x2(probs: List[int]) -> Tuple[str, float]:
+    if len(probs) == 2:
+        return ('1' if probs[0] > probs[1] else '2'), float(max(probs))
+    max_prob = max(probs)
+    return ('1', 'X', '2')[probs.index(max_prob)], float(max_prob)
+
+
+def extract_prediction(row, sport: str) -> Dict:
+    """Pola predykcji z wiersza Forebet (div.fprc, span.forepr, div.ex_sc, div.avg_sc)."""
+    sport = (sport or '').lower()
+    fields: Dict = {}
+
+    # 1. Prawdopodobieństwa (div.fprc > spans) - 3-way lub 2-way
+    fprc_div = row.find('div', class_='fprc')
+    if fprc_div:
+        spans = fprc_div.find_all('span')
+        try:
+            if len(spans) >= 3:
+                fields['prediction'], fields['probability'] = _pick_1x2(
+                    [int(span.get_text(strip=True)) for span in spans[:3]])
+            elif len(spans) == 2:
+                fields['prediction'], fields['probability'] = _pick_1x2(
+                    [int(span.get_text(strip=True)) for span in spans])
+        except ValueError:
+            pass
+
+    # 2. Predykcja tekstowa (span.forepr)
+    forepr_elem = row.find('span', class_='forepr')
+    if forepr_elem and not fields.get('prediction'):
+        pred_text = forepr_elem.get_text(strip=True)
+        if pred_text in ('1', 'X', '2'):
+            fields['prediction'] = pred_text
+
+    # 3. Dokładny wynik (div.ex_sc)
+    ex_sc_elem = row.find('div', class_='ex_sc')
+    if ex_sc_elem:
+        scores = list(ex_sc_elem.stripped_strings) if ex_sc_elem.find('br') else []
+        fields['exact_score'] = (f"{scores[0]}-{scores[1]}" if len(scores) == 2
+                                 else ex_sc_elem.get_text(strip=True))
+
+    # 4. Średnia goli (div.avg_sc) -> over/under dla piłki i hokeja
+    avg_sc_elem = row.find('div', class_='avg_sc')
+    if avg_sc_elem:
+        try:
+            fields['avg_goals'] = float(avg_sc_elem.get_text(strip=True))
+            line = {'football': 2.5, 'soccer': 2.5, 'hockey': 5.5, 'ice-hockey': 5.5}.get(sport)
+            if line is not None:
+                fields['over_under'] = f"{'Over' if fields['avg_goals'] > line else 'Under'} {line}"
+        except ValueError:
+            pass
+
+    # 5. BTTS - tylko piłka i hokej, z dokładnego wyniku
+    if sport in ('football', 'soccer', 'hockey', 'ice-hockey') and fields.get('exact_score'):
+        score_parts = fields['exact_score'].split('-')
+        if len(score_parts) == 2:
+            try:
+                home_goals, away_goals = int(score_parts[0].strip()), int(score_parts[1].strip())
+                fields['btts'] = 'Yes' if home_goals > 0 and away_goals > 0 else 'No'
+            except ValueError:
+                pass
+
+    # 🔥 Alternatywna ekstrakcja (span.ex*, procenty w tekście wiersza)
+    if not fields.get('prediction'):
+        for ex_span in row.find_all('span', class_=['ex_sc', 'ex1', 'ex2', 'ex3']):
+            text = ex_span.get_text(strip=True)
+            if text in ('1', 'X', '2', '1X', 'X2', '12'):
+                fields['prediction'] = text
+                break
+    if not fields.get('prediction'):
+        probs = [int(p) for p in re.findall(r'(\d{1,2})%', row.get_text())]
+        if len(probs) >= 2 and sport in ('handball', 'volleyball', 'basketball', 'tennis'):
+            fields['prediction'], fields['probability'] = _pick_1x2(probs[:2])
+        elif len(probs) >= 3:
+            fields['prediction'], fields['probability'] = _pick_1x2(probs[:3])
+    return fields
+
+
+def is_match(home_score: float, away_score: float) -> bool:
+    """Warunki dopasowania meczu (v3): obie >= 0.35, suma >= 0.85, jedna >= 0.75 i druga >= 0.20, jedna >= 0.90."""
+    low, high = min(home_score, away_score), max(home_score, away_score)
+    return ((home_score >= 0.35 and away_score >= 0.35) or home_score + away_score >= 0.85
+            or (high >= 0.75 and low >= 0.20) or high >= 0.90)
+
+
+class ForebetIndex:
+    """
+    Sparsowane wiersze strony Forebet z indeksem trigramów gospodarzy i gości.
+
+    Args:
+        rows: Wiersze z nazwami drużyn i predykcją
+        normalize: Normalizacja nazwy drużyny (do tokenów)
+        score: Similarity dwóch nazw (0.0-1.0)
+        blocked: Strona Cloudflare zamiast listy meczów
+        variant: Wariant struktury strony, z którego pochodzą wiersze
+    """
+
+    def __init__(self, rows: List[ForebetRow], normalize: Callable[[str], str],
+                 score: Callable[[str, str], float], blocked: bool = False, variant: str = ''):
+        self.rows = rows
+        self.normalize = normalize
+        self.score = score
+        self.blocked = blocked
+        self.variant = variant
+        self.lookups = 0
+        self.compared = 0
+        self._home = TeamMatcher([row.home for row in rows], normalize=normalize)
+        self._away = TeamMatcher([row.away for row in rows], normalize=normalize)
+        self._exact: Dict[Tuple[str, str], int] = {}
+        for position, row in enumerate(rows):
+            self._exact.setdefault((row.home.lower(), row.away.lower()), position)
+
+    @classmethod
+    def build(cls, html: str, sport: str, normalize: Callable[[str], str],
+              score: Callable[[str, str], float]) -> 'ForebetIndex':
+        """Parsuje stronę raz - drzewo soup jest zwalniane po zbudowaniu indeksu."""
+        soup = BeautifulSoup(html, 'html.parser')
+        body_text = soup.get_text().lower()
+        if 'cloudflare' in body_text and 'checking your browser' in body_text:
+            return cls([], normalize, score, blocked=True)
+        match_rows, variant = find_match_rows(soup)
+        rows = []
+        for match_row in match_rows:
+            try:
+                home, away = row_teams(match_row)
+                if not home or not away:
+                    continue
+                rows.append(ForebetRow(home, away, normalize(home), normalize(away),
+                                       **extract_prediction(match_row, sport)))
+            except Exception as e:
+                print(f"      ⚠️ Błąd parsowania wiersza Forebet: {type(e).__name__}: {e}")
+        return cls(rows, normalize, score, variant=variant)
+
+    def candidates(self, home_team: str, away_team: str) -> List[int]:
+        """Wiersze z shortlisty gospodarzy lub gości (w kolejności strony)."""
+        return pair_shortlist(home_team, away_team, self._home, self._away, SHORTLIST_PER_TEAM)
+
+    def lookup(self, home_team: str, away_team: str) -> ForebetLookup:
+        """Najlepszy wiersz spełniający warunki dopasowania (jak przy pełnym skanie strony)."""
+        self.lookups += 1
+        candidates = self.candidates(home_team, away_team)
+        self.compared += len(candidates)
+        best = (None, 0.0, 0.0)
+        best_combined = 0.0
+        best_similarity = 0.0
+        for position in candidates:
+            row = self.rows[position]
+            home_score = self.score(home_team, row.home)
+            away_score = self.score(away_team, row.away)
+            combined = (home_score + away_score) / 2
+            best_similarity = max(best_similarity, combined)
+            if is_match(home_score, away_score) and combined > best_combined:
+                best_combined = combined
+                best = (row, home_score, away_score)
+        return ForebetLookup(best[0], best[1], best[2], best_similarity, len(candidates))
+
+    def lookup_many(self, matches: Iterable[Tuple[str, str]]) -> List[ForebetLookup]:
+        """lookup() dla listy par (gospodarze, goście) - kolejność zachowana."""
+        return [self.lookup(home_team, away_team) for home_team, away_team in matches]
+
+    def find_exact(self, home_team: str, away_team: str) -> Optional[ForebetRow]:
+        """Wiersz o dokładnie tych nazwach (bez rozróżniania wielkości liter) - np. odpowiedź AI."""
+        position = self._exact.get(((home_team or '').lower(), (away_team or '').lower()))
+        return self.rows[position] if position is not None else None
+
+    def available_matches(self) -> List[str]:
+        return [f"{row.home} vs {row.away}" for row in self.rows]
+
+
+# Indeksy per (sport, data) - przebudowa gdy zmieni się strona (np. odświeżenie cache)
+_indexes: Dict[str, Tuple[int, ForebetIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(sport: str, date: str, html: str, normalize: Callable[[str], str],
+              score: Callable[[str, str], float]) -> Tuple[ForebetIndex, bool]:
+    """
+    Indeks strony (sport, data) - budowany tylko przy pierwszym użyciu danej treści strony.
+
+    Returns: (indeks, czy_zbudowany_teraz)
+    """
+    key = f"{(sport or '').lower()}_{date}"
+    fingerprint = hash(html)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1], False
+        index = ForebetIndex.build(html, sport, normalize, score)
+        _indexes[key] = (fingerprint, index)
+        return index, True
+
+
+def clear_indexes() -> None:
+    with _indexes_lock:
+        _indexes.clear()
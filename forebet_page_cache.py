@@ -0,0 +1,311 @@
+"""
+🗄️ Forebet Page Cache - trwały, skompresowany cache stron list Forebet
+=====================================================================
+Strona list predykcji Forebet (sport + data) była trzymana tylko w pamięci
+procesu (surowy HTML + pełne drzewo BeautifulSoup, 1h) - każdy nowy proces
+(shard, --workers, ponowne uruchomienie) pobierał ją od nowa przez Cloudflare.
+
+Dwa poziomy:
+
+    dysk:    outputs/forebet_cache/<sport>_<data>.html.gz  (lub .html.zst)
+             surowy HTML, kompresja zstd (gdy jest zstandard) lub gzip,
+             zapis atomowy (plik tymczasowy + os.replace) - współdzielony
+             między procesami; czas pobrania = mtime pliku
+    pamięć:  tylko zwarty wynik - fragment HTML z wierszami meczów (div.rcnt),
+             bez drzewa soup; drzewo budowane na żądanie i zwalniane
+
+Stale-while-revalidate: przeterminowana strona (młodsza niż MAX_STALE) jest
+zwracana od razu, a odświeżenie idzie w tle (jeden wątek na stronę, plik .lock
+chroni przed równoczesnym odświeżaniem przez kilka procesów).
+
+Konfiguracja (env):
+    FOREBET_CACHE_DIR=outputs/forebet_cache  - katalog cache
+    FOREBET_CACHE_TTL=3600                   - ważność strony (s)
+    FOREBET_CACHE_SWR=1                      - stale-while-revalidate (0 = przeterminowana to brak)
+    FOREBET_CACHE_MAX_STALE=21600            - maks. wiek strony serwowanej w trybie SWR (s)
+    FOREBET_CACHE=0                          - wyłącza poziom dyskowy
+"""
+
+import gzip
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+CACHE_DIR = os.getenv('FOREBET_CACHE_DIR', os.path.join('outputs', 'forebet_cache'))
+CACHE_TTL = float(os.getenv('FOREBET_CACHE_TTL', '3600'))
+STALE_WHILE_REVALIDATE = os.getenv('FOREBET_CACHE_SWR', '1') != '0'
+MAX_STALE = float(os.getenv('FOREBET_CACHE_MAX_STALE', '21600'))
+
+# Blokada odświeżania starsza niż to (s) uznawana za porzuconą (proces padł)
+LOCK_TIMEOUT = 300
+
+_EXTENSIONS = ('.html.zst', '.html.gz')
+
+
+def disk_cache_enabled() -> bool:
+    return os.getenv('FOREBET_CACHE', '1') != '0'
+
+
+class CachedPage(NamedTuple):
+    html: str       # zwarty HTML (wiersze meczów) - do parsowania
+    age: float      # wiek strony (s)
+    stale: bool     # przeterminowana (serwowana w trybie SWR)
+    source: str     # 'memory' / 'disk'
+
+
+def compact_listing(html: str) -> str:
+    """
+    Zwarty wynik do pamięci: tylko wiersze meczów (div.rcnt).
+
+    Gdy strona ma inną strukturę (brak div.rcnt) - pełny HTML, żeby nie
+    zgubić wariantów parsowania w search_forebet_prediction.
+    """
+    rows = BeautifulSoup(html, 'html.parser').find_all('div', class_='rcnt')
+    if not rows:
+        return html
+    return '<div class="schema">' + ''.join(str(row) for row in rows) + '</div>'
+
+
+def _compress(data: bytes) -> bytes:
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(path: str, data: bytes) -> bytes:
+    if path.endswith('.zst'):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ForebetPageCache:
+    """
+    Cache stron list Forebet per (sport, data).
+
+    Args:
+        directory: Katalog plików cache (None = tylko pamięć)
+        ttl: Ważność strony (s)
+        stale_while_revalidate: Serwuj przeterminowaną stronę i odśwież w tle
+        max_stale: Maks. wiek strony serwowanej w trybie SWR (s)
+        clock: Źródło czasu (time.time) - podmieniane w testach
+    """
+
+    def __init__(self, directory: Optional[str] = CACHE_DIR, ttl: float = CACHE_TTL,
+                 stale_while_revalidate: bool = STALE_WHILE_REVALIDATE, max_stale: float = MAX_STALE,
+                 clock: Callable[[], float] = time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+        self.clock = clock
+        self.counts = {'memory': 0, 'disk': 0, 'stale': 0, 'miss': 0, 'stored': 0, 'revalidated': 0}
+        self.bytes_written = 0
+        self.bytes_raw = 0
+        self._memory: Dict[str, tuple] = {}  # klucz -> (zwarty_html, czas_pobrania)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(sport: str, date: str) -> str:
+        return f"{(sport or '').lower()}_{date}"
+
+    def _path(self, key: str, extension: str) -> str:
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', key)
+        return os.path.join(self.directory, safe + extension)
+
+    def _disk_enabled(self) -> bool:
+        return bool(self.directory) and disk_cache_enabled()
+
+    def _usable(self, age: float) -> Optional[bool]:
+        """None = za stara; False = świeża; True = przeterminowana do SWR."""
+        if age < self.ttl:
+            return False
+        if self.stale_while_revalidate and age < self.max_stale:
+            return True
+        return None
+
+    def _read_disk(self, key: str, newer_than: float = 0.0) -> Optional[tuple]:
+        """(surowy_html, czas_pobrania) z najnowszego pliku (zstd lub gzip) - tylko nowszego niż newer_than."""
+        if not self._disk_enabled():
+            return None
+        best = None
+        for extension in _EXTENSIONS:
+            path = self._path(key, extension)
+            if not os.path.exists(path) or (extension == '.html.zst' and not ZSTD_AVAILABLE):
+                continue
+            fetched_at = os.path.getmtime(path)
+            if best is None or fetched_at > best[1]:
+                best = (path, fetched_at)
+        if best is None or best[1] <= newer_than:
+            return None
+        path, fetched_at = best
+        try:
+            with open(path, 'rb') as f:
+                return _decompress(path, f.read()).decode('utf-8'), fetched_at
+        except (OSError, ValueError, EOFError) as e:
+            # Uszkodzony plik (np. przerwany zapis innej wersji) - traktuj jak brak
+            print(f"   ⚠️ Forebet cache: nie można odczytać {path}: {e}")
+            return None
+
+    def get(self, sport: str, date: str, revalidate: Optional[Callable[[], object]] = None
+            ) -> Optional[CachedPage]:
+        """
+        Strona z cache (pamięć, potem dysk) albo None.
+
+        Args:
+            revalidate: Wywoływane w tle, gdy zwracana strona jest przeterminowana
+                        (powinno pobrać stronę i zapisać ją przez put())
+        """
+        key = self.key(sport, date)
+        now = self.clock()
+        with self._lock:
+            entry = self._memory.get(key)
+        source = 'memory'
+        if entry is not None and self._usable(now - entry[1]) is None:
+            with self._lock:
+                self._memory.pop(key, None)
+            entry = None
+        if entry is None or now - entry[1] >= self.ttl:
+            # Inny proces mógł już odświeżyć stronę na dysku
+            disk = self._read_disk(key, newer_than=entry[1] if entry else 0.0)
+            if disk is not None and self._usable(now - disk[1]) is not None:
+                entry = (compact_listing(disk[0]), disk[1])
+                source = 'disk'
+                with self._lock:
+                    self._memory[key] = entry
+        if entry is None:
+            self.counts['miss'] += 1
+            return None
+
+        age = now - entry[1]
+        stale = bool(self._usable(age))
+        self.counts['stale' if stale else source] += 1
+        if stale and revalidate is not None:
+            self._revalidate_in_background(key, revalidate)
+        return CachedPage(entry[0], age, stale, source)
+
+    def put(self, sport: str, date: str, html: str) -> None:
+        """Zapisuje świeżo pobraną stronę: pamięć (zwarta) + dysk (surowa, skompresowana)."""
+        key = self.key(sport, date)
+        fetched_at = self.clock()
+        with self._lock:
+            self._memory[key] = (compact_listing(html), fetched_at)
+        self.counts['stored'] += 1
+        if not self._disk_enabled():
+            return
+        raw = html.encode('utf-8')
+        data = _compress(raw)
+        path = self._path(key, _EXTENSIONS[0] if ZSTD_AVAILABLE else _EXTENSIONS[1])
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp_', suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.utime(tmp_path, (fetched_at, fetched_at))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"   ⚠️ Forebet cache: zapis {path} nieudany: {e}")
+            return
+        self.bytes_raw += len(raw)
+        self.bytes_written += len(data)
+
+    def invalidate(self, sport: str, date: str) -> None:
+        key = self.key(sport, date)
+        with self._lock:
+            self._memory.pop(key, None)
+        if self._disk_enabled():
+            for extension in _EXTENSIONS:
+                try:
+                    os.remove(self._path(key, extension))
+                except FileNotFoundError:
+                    pass
+
+    def _acquire_refresh_lock(self, key: str) -> Optional[str]:
+        """Plik .lock między procesami (None gdy inny proces już odświeża)."""
+        if not self._disk_enabled():
+            return ''
+        path = self._path(key, '.lock')
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) > LOCK_TIMEOUT:
+                os.remove(path)
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return path
+        except FileExistsError:
+            return None
+        except OSError:
+            return ''
+
+    def _revalidate_in_background(self, key: str, revalidate: Callable[[], object]) -> Optional[threading.Thread]:
+        with self._lock:
+            if key in self._refreshing:
+                return None
+            self._refreshing.add(key)
+        lock_path = self._acquire_refresh_lock(key)
+        if lock_path is None:
+            with self._lock:
+                self._refreshing.discard(key)
+            return None
+
+        def _run():
+            try:
+                if revalidate() is not False:
+                    self.counts['revalidated'] += 1
+            except Exception as e:
+                print(f"   ⚠️ Forebet cache: odświeżanie {key} nieudane: {e}")
+            finally:
+                if lock_path:
+                    try:
+                        os.remove(lock_path)
+                    except OSError:
+                        pass
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        thread = threading.Thread(target=_run, name=f'forebet-revalidate-{key}', daemon=True)
+        thread.start()
+        return thread
+
+    def wait_for_revalidation(self, timeout: float = 30.0) -> None:
+        """Czeka na zakończenie odświeżań w tle (testy / koniec przebiegu)."""
+        end = time.time() + timeout
+        while time.time() < end:
+            with self._lock:
+                if not self._refreshing:
+                    return
+            time.sleep(0.01)
+
+    def stats(self) -> Dict:
+        stats = dict(self.counts)
+        stats['disk_kb'] = round(self.bytes_written / 1024, 1)
+        stats['ratio'] = round(self.bytes_raw / self.bytes_written, 1) if self.bytes_written else 0.0
+        return stats
+
+    def print_report(self) -> None:
+        stats = self.stats()
+        if not (stats['memory'] or stats['disk'] or stats['stale'] or stats['stored']):
+            return
+        codec = 'zstd' if ZSTD_AVAILABLE else 'gzip'
+        print(f"\n🗄️ FOREBET CACHE: pamięć {stats['memory']}, dysk {stats['disk']}, "
+              f"stare (SWR) {stats['stale']}, brak {stats['miss']}, odświeżone w tle {stats['revalidated']}")
+        if stats['stored']:
+            print(f"   💾 zapisane strony: {stats['stored']} ({stats['disk_kb']} KB {codec}, x{stats['ratio']})")
+
+
+# Globalna instancja (per proces)
+forebet_page_cache = ForebetPageCache()
+
+
+def print_forebet_page_cache_report() -> None:
+    forebet_page_cache.print_report()
@@ -31,6 +31,24 @@ const SPORT_URLS = {
     'ice-hockey': 'https://www.forebet.com/en/hockey/predictions-today'
 };
 
+// Opcje przeglądarki (wspólne z puppeteer_worker.js)
+const LAUNCH_OPTIONS = {
+    headless: 'new',  // Nowy headless mode
+    args: [
+        '--no-sandbox',
+        '--disable-setuid-sandbox',
+        '--disable-dev-shm-usage',
+        '--disable-accelerated-2d-canvas',
+        '--no-first-run',
+        '--no-zygote',
+        '--disable-gpu',
+        '--window-size=1920,1080',
+        '--disable-blink-features=AutomationControlled',
+        '--disable-features=IsolateOrigins,site-per-process',
+        '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+    ]
+};
+
 // Consent button selectors
 const CONSENT_SELECTORS = [
     'button.fc-cta-consent',
@@ -91,22 +109,22 @@ async function clickConsent(page) {
     return false;
 }
 
-async function waitForContent(page) {
-    console.log('⏳ Czekam na załadowanie treści...');
+// Możliwe selektory meczów Forebet
+const CONTENT_SELECTORS = [
+    'div.rcnt',
+    'tr.tr_0',
+    'tr.tr_1',
+    'div.schema',
+    '.contentmiddle',
+    'table.schema'
+];
 
-    // Czekaj na różne możliwe selektory meczów
-    const selectors = [
-        'div.rcnt',
-        'tr.tr_0',
-        'tr.tr_1',
-        'div.schema',
-        '.contentmiddle',
-        'table.schema'
-    ];
+async function waitForContent(page, selectors = CONTENT_SELECTORS, timeout = 10000) {
+    console.log('⏳ Czekam na załadowanie treści...');
 
     for (const selector of selectors) {
         try {
-            await page.waitForSelector(selector, { timeout: 10000 });
+            await page.waitForSelector(selector, { timeout });
             console.log(`✅ Znaleziono: ${selector}`);
             return true;
         } catch (e) {
@@ -285,26 +303,8 @@ async function scrapeForebet(sport, outputFile) {
     let browser;
 
     try {
-        // Opcje przeglądarki
-        const launchOptions = {
-            headless: 'new',  // Nowy headless mode
-            args: [
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-accelerated-2d-canvas',
-                '--no-first-run',
-                '--no-zygote',
-                '--disable-gpu',
-                '--window-size=1920,1080',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-features=IsolateOrigins,site-per-process',
-                '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-            ]
-        };
-
         console.log('🚀 Uruchamiam przeglądarkę...');
-        browser = await puppeteer.launch(launchOptions);
+        browser = await puppeteer.launch(LAUNCH_OPTIONS);
 
         const page = await browser.newPage();
 
@@ -399,21 +399,35 @@ async function scrapeForebet(sport, outputFile) {
     }
 }
 
+// Pomocnicze funkcje współdzielone z puppeteer_worker.js (jedna przeglądarka na wiele stron)
+module.exports = {
+    SPORT_URLS,
+    LAUNCH_OPTIONS,
+    CONTENT_SELECTORS,
+    delay,
+    clickConsent,
+    waitForContent,
+    simulateHumanBehavior,
+    clickLoadMore
+};
+
 // Main
-const sport = process.argv[2] || 'football';
-const outputFile = process.argv[3] || 'forebet_output.html';
-
-console.log('🔥 FOREBET PUPPETEER SCRAPER - STEALTH MODE 🔥');
-console.log(`Sport: ${sport}`);
-console.log(`Output: ${outputFile}`);
-console.log('');
-
-scrapeForebet(sport, outputFile)
-    .then(() => {
-        console.log('✅ Zakończono');
-        process.exit(0);
-    })
-    .catch(err => {
-        console.error(`❌ Fatal error: ${err.message}`);
-        process.exit(1);
-    });
+if (require.main === module) {
+    const sport = process.argv[2] || 'football';
+    const outputFile = process.argv[3] || 'forebet_output.html';
+
+    console.log('🔥 FOREBET PUPPETEER SCRAPER - STEALTH MODE 🔥');
+    console.log(`Sport: ${sport}`);
+    console.log(`Output: ${outputFile}`);
+    console.log('');
+
+    scrapeForebet(sport, outputFile)
+        .then(() => {
+            console.log('✅ Zakończono');
+            process.exit(0);
+        })
+        .catch(err => {
+            console.error(`❌ Fatal error: ${err.message}`);
+            process.exit(1);
+        });
+}
@@ -25,6 +25,7 @@ import time
 import random
 import os
 import subprocess
+import threading
 import re
 from typing import Dict, Optional, Tuple
 
@@ -40,6 +41,9 @@ _normalized_names_cache: Dict[str, str] = {}
 _ai_match_cache: Dict[str, Optional[tuple]] = {}
 _AI_CACHE_TTL = 86400  # 24 godziny - mecze się nie zmieniają
 
+# Cache czytane i zapisywane z wątków pipeline FAZY 2 (phase2_pipeline) równolegle
+_cache_lock = threading.Lock()
+
 def _get_forebet_cache_key(sport: str, home_team: str, away_team: str, match_date: str) -> str:
     """Generuje klucz cache dla danego meczu."""
     return f"{sport}|{home_team.lower().strip()}|{away_team.lower().strip()}|{match_date}"
@@ -47,20 +51,24 @@ def _get_forebet_cache_key(sport: str, home_team: str, away_team: str, match_dat
 def _get_cached_forebet(sport: str, home_team: str, away_team: str, match_date: str) -> Optional[Dict]:
     """Pobiera wynik z cache jeśli istnieje."""
     key = _get_forebet_cache_key(sport, home_team, away_team, match_date)
-    return _forebet_cache.get(key)
+    with _cache_lock:
+        return _forebet_cache.get(key)
 
 def _set_cached_forebet(sport: str, home_team: str, away_team: str, match_date: str, result: Dict):
     """Zapisuje wynik do cache."""
     key = _get_forebet_cache_key(sport, home_team, away_team, match_date)
-    _forebet_cache[key] = result
+    with _cache_lock:
+        _forebet_cache[key] = result
 
 def _get_cached_normalized_name(name: str) -> Optional[str]:
     """Pobiera znormalizowaną nazwę z cache."""
-    return _normalized_names_cache.get(name)
+    with _cache_lock:
+        return _normalized_names_cache.get(name)
 
 def _set_cached_normalized_name(name: str, normalized: str):
     """Zapisuje znormalizowaną nazwę do cache."""
-    _normalized_names_cache[name] = normalized
+    with _cache_lock:
+        _normalized_names_cache[name] = normalized
 
 def _get_ai_match_cache_key(home_team: str, away_team: str) -> str:
     """Generuje klucz cache dla AI match finding."""
@@ -69,19 +77,21 @@ def _get_ai_match_cache_key(home_team: str, away_team: str) -> str:
 def _get_cached_ai_match(home_team: str, away_team: str) -> Optional[tuple]:
     """Pobiera wynik AI match finding z cache."""
     key = _get_ai_match_cache_key(home_team, away_team)
-    cached = _ai_match_cache.get(key)
-    if cached is not None:
-        result, timestamp = cached
-        if time.time() - timestamp < _AI_CACHE_TTL:
-            return result
-        # Cache expired
-        del _ai_match_cache[key]
+    with _cache_lock:
+        cached = _ai_match_cache.get(key)
+        if cached is not None:
+            result, timestamp = cached
+            if time.time() - timestamp < _AI_CACHE_TTL:
+                return result
+            # Cache expired
+            del _ai_match_cache[key]
     return None
 
 def _set_cached_ai_match(home_team: str, away_team: str, result: Optional[tuple]):
     """Zapisuje wynik AI match finding do cache."""
     key = _get_ai_match_cache_key(home_team, away_team)
-    _ai_match_cache[key] = (result, time.time())
+    with _cache_lock:
+        _ai_match_cache[key] = (result, time.time())
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -122,14 +132,16 @@ if IS_CI_CD:
 # Cache dla wyników (żeby nie scrape'ować dwa razy tego samego)
 _forebet_cache = {}
 
-# 🔥 CACHE HTML PER SPORT - żeby nie pobierać tej samej strony 100 razy!
-# Klucz: sport (basketball, volleyball, etc.)
-# Wartość: (html_content, soup, timestamp)
-_forebet_html_cache = {}
-_FOREBET_HTML_CACHE_TTL = 3600  # 1 godzina - mecze dzienne się nie zmieniają
+# 🔥 CACHE HTML PER SPORT + DATA - żeby nie pobierać tej samej strony 100 razy!
+# Trwały (dysk, kompresja) i współdzielony między procesami - patrz forebet_page_cache.py
+from forebet_page_cache import forebet_page_cache
+from forebet_index import get_index
+from team_matcher import best_match as team_best_match
+from team_alias_store import team_alias_store
+from puppeteer_worker import PuppeteerWorkerError, puppeteer_worker, puppeteer_worker_enabled
 
 
-def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
+def prefetch_forebet_html(sport: str, match_date: str = None, force: bool = False) -> bool:
     """
     🔥 PRE-FETCH: Pobiera HTML dla sportu i zapisuje do cache.
     Wywołaj RAZ na początku przed przetwarzaniem meczów!
@@ -137,6 +149,7 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
     Args:
         sport: Sport do pobrania (basketball, volleyball, football, etc.)
         match_date: Data meczu (YYYY-MM-DD), domyślnie dzisiaj
+        force: Pobierz mimo ważnego cache (odświeżanie w tle)
     
     Returns:
         True jeśli sukces, False jeśli nie udało się pobrać
@@ -147,15 +160,13 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
     if match_date is None:
         match_date = datetime.now().strftime('%Y-%m-%d')
     
-    sport_cache_key = f"{sport_lower}_{match_date}"
-    
-    # Sprawdź czy już w cache
-    if sport_cache_key in _forebet_html_cache:
-        cached_html, _, cache_time = _forebet_html_cache[sport_cache_key]
-        cache_age = time.time() - cache_time
-        if cache_age < _FOREBET_HTML_CACHE_TTL:
-            print(f"   📋 Forebet {sport}: Już w cache ({len(cached_html)} znaków, {cache_age:.0f}s)")
-            return True
+    # Sprawdź czy już w cache (pamięć lub dysk - także z innego procesu)
+    cached_page = None if force else forebet_page_cache.get(
+        sport_lower, match_date, revalidate=lambda: prefetch_forebet_html(sport_lower, match_date, force=True))
+    if cached_page:
+        stale_note = ', odświeżam w tle' if cached_page.stale else ''
+        print(f"   📋 Forebet {sport}: Już w cache ({cached_page.source}, {cached_page.age:.0f}s{stale_note})")
+        return True
     
     print(f"   🔥 Forebet {sport}: Prefetch HTML...")
     
@@ -205,8 +216,7 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
             sport_matches_curl = any(kw in html_lower_curl for kw in keywords)
             
             if is_forebet_curl and not is_cf_block and sport_matches_curl:
-                soup = BeautifulSoup(curl_html, 'html.parser')
-                _forebet_html_cache[sport_cache_key] = (curl_html, soup, time.time())
+                forebet_page_cache.put(sport_lower, match_date, curl_html)
                 print(f"   ✅ Forebet {sport}: curl_cffi SUCCESS! ({len(curl_html)} znaków)")
                 return True
             else:
@@ -245,8 +255,7 @@ def prefetch_forebet_html(sport: str, match_date: str = None) -> bool:
                 sport_matches = any(kw in html_lower for kw in keywords)
                 
                 if is_forebet and sport_matches:
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
+                    forebet_page_cache.put(sport_lower, match_date, html_content)
                     print(f"   ✅ Forebet {sport}: Prefetch SUCCESS! ({len(html_content)} znaków)")
                     return True
                 elif is_forebet and not sport_matches:
@@ -290,6 +299,21 @@ def fetch_forebet_with_puppeteer(sport: str) -> Optional[str]:
     Pobierz Forebet używając Puppeteer Extra z Stealth (Node.js).
     To jest najskuteczniejsza metoda dla GitHub Actions!
     """
+    # 🧭 Długo żyjący worker - sześć sportów = jedno uruchomienie przeglądarki
+    if puppeteer_worker_enabled() and puppeteer_worker.available():
+        try:
+            print(f"      🧭 Puppeteer worker: {sport}...")
+            page = puppeteer_worker.fetch_forebet(sport=sport.lower())
+        except PuppeteerWorkerError as e:
+            print(f"      ❌ Puppeteer worker: {e}")
+            return None
+        html = page.html
+        if 'rcnt' in html or 'tr_0' in html or 'forepr' in html:
+            print(f"      ✅ Puppeteer SUCCESS! ({len(html)} znaków, {page.elapsed:.1f}s)")
+        else:
+            print(f"      ⚠️ Puppeteer: HTML nie zawiera meczów Forebet")
+        return html  # Zwróć mimo wszystko do analizy (jak tryb z plikiem)
+    
     output_file = f'forebet_{sport.lower()}_puppeteer.html'
     
     try:
@@ -603,19 +627,8 @@ def find_best_match(target_team: str, available_teams: list) -> Tuple[Optional[s
     Returns:
         (best_match, score) - najlepsza nazwa i score similarity
     """
-    if not target_team or not available_teams:
-        return None, 0.0
-    
-    best_match = None
-    best_score = 0.0
-    
-    for team in available_teams:
-        score = similarity_score(target_team, team)
-        if score > best_score:
-            best_score = score
-            best_match = team
-    
-    return best_match, best_score
+    # Shortlista z indeksu trigramów, dokładny similarity_score tylko dla niej
+    return team_best_match(target_team, available_teams, score=similarity_score, normalize=normalize_team_name)
 
 
 def _call_groq_api(prompt: str) -> Optional[str]:
@@ -675,6 +688,7 @@ def _call_groq_api(prompt: str) -> Optional[str]:
 # 🔥 RATE LIMITING dla AI API - unika 429 errors
 _last_ai_call_time = 0.0
 _AI_MIN_INTERVAL = 2.0  # Minimum 2 sekundy między wywołaniami AI
+_ai_rate_lock = threading.Lock()
 
 # 🔥 BATCH PROCESSING - kolejka meczów do analizy AI
 _ai_batch_queue: list = []  # Lista (home_team, away_team) do analizy
@@ -682,6 +696,27 @@ _ai_batch_available_matches: list = []  # Lista dostępnych meczów z Forebet
 _AI_BATCH_SIZE = 5  # Analizuj 5 meczów naraz
 
 
+def _reserve_ai_call() -> float:
+    """
+    Rezerwuje kolejny slot wywołania AI (rate limiting wspólny dla wątków pipeline).
+
+    Returns: ile sekund wątek musi odczekać przed wywołaniem
+    """
+    global _last_ai_call_time
+    with _ai_rate_lock:
+        now = time.time()
+        wait_time = max(0.0, _last_ai_call_time + _AI_MIN_INTERVAL - now)
+        _last_ai_call_time = now + wait_time
+    return wait_time
+
+
+def _mark_ai_call_done() -> None:
+    """Przesuwa okno rate limitu na koniec wywołania (odpowiedź mogła trwać dłużej niż interwał)."""
+    global _last_ai_call_time
+    with _ai_rate_lock:
+        _last_ai_call_time = max(_last_ai_call_time, time.time())
+
+
 def find_forebet_matches_batch_ai(matches_to_find: list, available_matches: list) -> Dict[str, Optional[tuple]]:
     """
     🤖 BATCH: Używa AI do znalezienia WIELU meczów naraz (oszczędza wywołania API).
@@ -695,7 +730,6 @@ def find_forebet_matches_batch_ai(matches_to_find: list, available_matches: list
     """
     import os
     import time as time_module
-    global _last_ai_call_time
     
     if not matches_to_find or not available_matches:
         return {}
@@ -717,9 +751,8 @@ def find_forebet_matches_batch_ai(matches_to_find: list, available_matches: list
         return results
     
     # Rate limiting
-    time_since_last = time_module.time() - _last_ai_call_time
-    if time_since_last < _AI_MIN_INTERVAL:
-        wait_time = _AI_MIN_INTERVAL - time_since_last
+    wait_time = _reserve_ai_call()
+    if wait_time > 0:
         print(f"      ⏳ AI Batch Rate limit: czekam {wait_time:.1f}s...")
         time_module.sleep(wait_time)
     
@@ -746,8 +779,6 @@ Return format (one line per team pair, in order):
 
 Do not add any explanation or additional text."""
 
-    _last_ai_call_time = time_module.time()
-    
     # Próbuj Groq (szybszy i tańszy)
     answer = _call_groq_api(prompt)
     
@@ -811,7 +842,6 @@ def find_forebet_match_with_gemini(home_team: str, away_team: str, available_mat
     Returns:
         (matching_home, matching_away) lub None jeśli nie znaleziono
     """
-    global _last_ai_call_time
     import os
     import time as time_module
     
@@ -822,9 +852,8 @@ def find_forebet_match_with_gemini(home_team: str, away_team: str, available_mat
         return cached_result
     
     # 🔥 Rate limiting - czekaj jeśli zbyt szybko
-    time_since_last = time_module.time() - _last_ai_call_time
-    if time_since_last < _AI_MIN_INTERVAL:
-        wait_time = _AI_MIN_INTERVAL - time_since_last
+    wait_time = _reserve_ai_call()
+    if wait_time > 0:
         print(f"      ⏳ AI Rate limit: czekam {wait_time:.1f}s...")
         time_module.sleep(wait_time)
     
@@ -894,7 +923,7 @@ Do not add any explanation or additional text."""
             answer = groq_answer
     
     # 🔥 Aktualizuj czas ostatniego wywołania AI
-    _last_ai_call_time = time_module.time()
+    _mark_ai_call_done()
     
     # Parsuj odpowiedź
     if answer and answer.upper() != 'NONE' and 'vs' in answer.lower():
@@ -996,24 +1025,18 @@ def search_forebet_prediction(
     
     own_driver = False
     html_content = None
-    soup = None
     
     # 🔥 CACHE HTML PER SPORT + DATA - najważniejsza optymalizacja!
     sport_lower = sport.lower()
     # WAŻNE: Cache per data + sport, bo Forebet pokazuje mecze tylko dla konkretnej daty!
-    sport_cache_key = f"{sport_lower}_{match_date}"
-    
-    if sport_cache_key in _forebet_html_cache:
-        cached_html, cached_soup, cache_time = _forebet_html_cache[sport_cache_key]
-        cache_age = time.time() - cache_time
-        
-        if cache_age < _FOREBET_HTML_CACHE_TTL:
-            print(f"      📋 HTML CACHE HIT! ({sport}, {len(cached_html)} znaków, {cache_age:.0f}s stary)")
-            html_content = cached_html
-            soup = cached_soup
-        else:
-            print(f"      ⏰ HTML cache expired ({cache_age:.0f}s > {_FOREBET_HTML_CACHE_TTL}s)")
-            del _forebet_html_cache[sport_cache_key]
+    # Pamięć trzyma tylko zwarte wiersze meczów - indeks predykcji budowany raz na stronę (forebet_index)
+    cached_page = forebet_page_cache.get(
+        sport_lower, match_date, revalidate=lambda: prefetch_forebet_html(sport_lower, match_date, force=True))
+    if cached_page:
+        stale_note = ' - przeterminowany, odświeżam w tle' if cached_page.stale else ''
+        print(f"      📋 HTML CACHE HIT! ({sport}, {cached_page.source}, {len(cached_page.html)} znaków, "
+              f"{cached_page.age:.0f}s stary{stale_note})")
+        html_content = cached_page.html
     
     # 🔥 Pobierz HTML tylko jeśli nie ma w cache
     if html_content is None:
@@ -1049,8 +1072,7 @@ def search_forebet_prediction(
                 
                 if _is_fb and not _is_cf:
                     html_content = _curl_html
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
+                    forebet_page_cache.put(sport_lower, match_date, html_content)
                     print(f"      ✅ curl_cffi SUCCESS! ({len(html_content)} znaków)")
                 else:
                     print(f"      ⚠️ curl_cffi: forebet={_is_fb}, cf_block={_is_cf}")
@@ -1149,9 +1171,8 @@ def search_forebet_prediction(
                         elif is_forebet and sport_matches:
                             print(f"      🔥 Cloudflare Bypass SUCCESS! ({len(html_content)} znaków)")
                             print(f"      ✅ Potwierdzona strona Forebet dla {sport}!")
-                            soup = BeautifulSoup(html_content, 'html.parser')
                             # 🔥 Zapisz do cache!
-                            _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
+                            forebet_page_cache.put(sport_lower, match_date, html_content)
                             print(f"      💾 HTML zapisany do cache dla {sport}")
                             break  # SUKCES - wyjdź z retry loop
                         elif is_forebet and not sport_matches:
@@ -1207,8 +1228,7 @@ def search_forebet_prediction(
                     
                     if is_forebet_curl and not is_cf_block:
                         html_content = curl_html
-                        soup = BeautifulSoup(html_content, 'html.parser')
-                        _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
+                        forebet_page_cache.put(sport_lower, match_date, html_content)
                         print(f"      ✅ curl_cffi SUCCESS! ({len(html_content)} znaków)")
                     else:
                         print(f"      ⚠️ curl_cffi: Cloudflare block lub brak danych")
@@ -1230,25 +1250,17 @@ def search_forebet_prediction(
                     
                     if is_forebet and not is_cloudflare:
                         print(f"      ✅ Puppeteer SUCCESS! ({len(html_content)} znaków)")
-                        soup = BeautifulSoup(html_content, 'html.parser')
-                        _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
+                        forebet_page_cache.put(sport_lower, match_date, html_content)
                     elif is_forebet and is_cloudflare:
                         print(f"      ✅ Puppeteer SUCCESS (z Cloudflare residuals)! ({len(html_content)} znaków)")
-                        soup = BeautifulSoup(html_content, 'html.parser')
-                        _forebet_html_cache[sport_cache_key] = (html_content, soup, time.time())
+                        forebet_page_cache.put(sport_lower, match_date, html_content)
                     else:
                         html_content = None
     
     try:
         # Jeśli mamy już HTML, parsuj go i POMIŃ całą logikę Selenium!
         if html_content:
-            if soup is None:
-                soup = BeautifulSoup(html_content, 'html.parser')
             print(f"      ✅ Używam HTML ({len(html_content)} znaków)")
-            # Zapisz debug HTML
-            with open('forebet_debug.html', 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            print(f"      💾 Debug: Zapisano HTML do forebet_debug.html")
         else:
             # ========================================
             # FALLBACK: Selenium (gdy Bypass nie zadziałał)
@@ -1401,532 +1413,83 @@ def search_forebet_prediction(
             print(f"      📊 Finalna liczba meczów: {final_matches} (dodano {final_matches - initial_matches})")
             
             # Pobierz finalny HTML
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            
-            # DEBUG: Zapisz HTML do pliku
+            html_content = driver.page_source
+        
+        # 📇 Indeks strony (sport, data) - parsowany raz, kolejne mecze to lookup po tokenach
+        index, built = get_index(sport_lower, match_date, html_content, normalize_team_name, similarity_score)
+        if built:
+            print(f"      📇 Forebet: indeks {len(index.rows)} meczów (wariant: {index.variant or 'brak'})")
+            # Zapisz debug HTML (raz na stronę)
             with open('forebet_debug.html', 'w', encoding='utf-8') as f:
-                f.write(driver.page_source)
+                f.write(html_content)
             print(f"      💾 Debug: Zapisano HTML do forebet_debug.html")
+            if len(index.rows) <= 30:
+                for i, m in enumerate(index.available_matches(), 1):
+                    print(f"         {i}. {m}")
         
-        # Sprawdź czy to nie jest strona błędu Cloudflare
-        body_text = soup.get_text().lower()
-        if 'cloudflare' in body_text and 'checking your browser' in body_text:
+        if index.blocked:
             result['error'] = 'Cloudflare blocked - nie udało się ominąć'
             print(f"      ❌ Cloudflare zablokował dostęp")
             return result
         
-        # Znajdź wszystkie mecze na stronie - MULTI-WARIANT
-        match_rows = []
-        
-        # Wariant 1: div.rcnt
-        match_rows = soup.find_all('div', class_='rcnt')
-        print(f"      🔍 Wariant 1 (div.rcnt): {len(match_rows)} elementów")
-        
-        # Wariant 2: tr z klasami tr_0 i tr_1
-        if not match_rows:
-            match_rows = soup.find_all('tr', class_=['tr_0', 'tr_1'])
-            print(f"      🔍 Wariant 2 (tr.tr_0/1): {len(match_rows)} elementów")
-        
-        # Wariant 3: div.tr (nowsza struktura)
-        if not match_rows:
-            match_rows = soup.find_all('div', class_='tr')
-            print(f"      🔍 Wariant 3 (div.tr): {len(match_rows)} elementów")
-        
-        # Wariant 4: Wszystkie tr w tabeli
-        if not match_rows:
-            tables = soup.find_all('table')
-            for table in tables:
-                rows = table.find_all('tr')
-                match_rows.extend(rows)
-            print(f"      🔍 Wariant 4 (table>tr): {len(match_rows)} elementów")
-        
-        # Wariant 5: div.schema > div
-        if not match_rows:
-            schemas = soup.find_all('div', class_='schema')
-            for schema in schemas:
-                divs = schema.find_all('div', recursive=False)
-                match_rows.extend(divs)
-            print(f"      🔍 Wariant 5 (div.schema>div): {len(match_rows)} elementów")
-        
-        # Wariant 6: Wszystkie linki z '/predictions/'
-        if not match_rows:
-            links = soup.find_all('a', href=True)
-            pred_links = [l for l in links if '/predictions/' in l.get('href', '')]
-            # Wróć do parent elementów
-            match_rows = [l.find_parent() for l in pred_links if l.find_parent()]
-            print(f"      🔍 Wariant 6 (linki /predictions/): {len(match_rows)} elementów")
-        
-        if not match_rows:
+        if not index.rows:
             result['error'] = 'Nie znaleziono meczów na stronie Forebet'
             print(f"      ❌ Debug: Żaden wariant nie znalazł meczów")
-            # Debug: Wypisz klasy występujące na stronie
-            all_classes = set()
-            for elem in soup.find_all(class_=True):
-                classes = elem.get('class', [])
-                if isinstance(classes, list):
-                    all_classes.update(classes)
-            print(f"      📋 Znalezione klasy CSS: {list(all_classes)[:20]}")
             return result
         
-        print(f"      🔍 Znaleziono {len(match_rows)} meczów na Forebet")
-        
-        # DEBUG: Wypisz strukturę pierwszego wiersza
-        try:
-            if match_rows:
-                first_row = match_rows[0]
-                print(f"      📋 DEBUG: first_row type={type(first_row)}, truthy={bool(first_row)}")
-                if first_row:
-                    row_classes = first_row.get('class', []) if hasattr(first_row, 'get') else []
-                    all_spans = first_row.find_all('span') if hasattr(first_row, 'find_all') else []
-                    all_divs = first_row.find_all('div') if hasattr(first_row, 'find_all') else []
-                    print(f"      📋 Struktura pierwszego wiersza: klasy={row_classes}")
-                    print(f"      📋 Spany w wierszu: {len(all_spans)}, Divy: {len(all_divs)}")
-                    # Wypisz pierwsze 5 spanów z klasami homeTeam/awayTeam
-                    for i, span in enumerate(all_spans[:10]):
-                        span_class = span.get('class', [])
-                        if 'homeTeam' in span_class or 'awayTeam' in span_class or 'tnm' in span_class:
-                            span_text = span.get_text(strip=True)[:50]
-                            print(f"      📋 Span {i}: class={span_class}, text='{span_text}'")
-        except Exception as debug_err:
-            print(f"      ⚠️ DEBUG error przy analizie first_row: {debug_err}")
-        
-        # DEBUG: Wypisz pierwsze 5 meczów z Forebet żeby zobaczyć format
-        debug_matches = []
-        all_available_matches = []  # v3.8: Zbieraj WSZYSTKIE mecze do debug/Gemini
-        best_similarity = 0.0  # Track najlepszy wynik similarity
-        
-        # 🔥 DEBUG: Wypisz CZEGO szukamy
         print(f"      🔎 Szukam meczu: '{home_team}' vs '{away_team}'")
-        print(f"      🔎 Znormalizowane: '{normalize_team_name(home_team)}' vs '{normalize_team_name(away_team)}'")
-        
-        # v3.8: Pre-scan - zbierz WSZYSTKIE nazwy drużyn z page (dla debug i Gemini fallback)
-        for pre_row in match_rows:
-            try:
-                pre_home = None
-                pre_away = None
-                h_span = pre_row.find('span', class_='homeTeam')
-                a_span = pre_row.find('span', class_='awayTeam')
-                if h_span and a_span:
-                    h_inner = h_span.find('span', itemprop='name')
-                    a_inner = a_span.find('span', itemprop='name')
-                    pre_home = h_inner.get_text(strip=True) if h_inner else h_span.get_text(strip=True)
-                    pre_away = a_inner.get_text(strip=True) if a_inner else a_span.get_text(strip=True)
-                if pre_home and pre_away:
-                    all_available_matches.append(f"{pre_home} vs {pre_away}")
-            except Exception:
-                pass
-        
-        if all_available_matches:
-            print(f"      📋 Forebet: {len(all_available_matches)} meczów na stronie")
-            if len(all_available_matches) <= 30:
-                for i, m in enumerate(all_available_matches, 1):
-                    print(f"         {i}. {m}")
-        
-        # DEBUG: Zapisz surowy HTML pierwszych 2 wierszy do pliku
-        if match_rows:
-            try:
-                with open('forebet_debug_rows.html', 'w', encoding='utf-8') as f:
-                    for i, r in enumerate(match_rows[:2]):
-                        f.write(f"<!-- ROW {i+1} -->\n")
-                        f.write(str(r))
-                        f.write("\n\n")
-                print(f"      💾 Zapisano debug HTML do forebet_debug_rows.html")
-            except Exception as e:
-                print(f"      ⚠️ Nie udało się zapisać debug HTML: {e}")
+        # 🔗 Alias z poprzednich uruchomień - dokładne trafienie bez fuzzy i bez AI
+        matched_row = None
+        aliases = team_alias_store.resolve_pair(sport_lower, 'livesport', 'forebet', home_team, away_team)
+        if aliases:
+            matched_row = index.find_exact(*aliases)
         
-        # Szukaj naszego meczu - ZBIERZ WSZYSTKIE KANDYDATY i wybierz najlepszego
-        best_candidate = None  # (row, home_score, away_score, forebet_home, forebet_away)
-        best_combined = 0.0
-        
-        for row in match_rows:
-            try:
-                # Wyciągnij nazwy drużyn - WIELE WARIANTÓW
-                home_name = None
-                away_name = None
-                
-                # Wariant 1: span.homeTeam > span[itemprop="name"] (AKTUALNA STRUKTURA FOREBET 2025)
-                home_span = row.find('span', class_='homeTeam')
-                away_span = row.find('span', class_='awayTeam')
-                if home_span and away_span:
-                    # Szukaj zagnieżdżonego span z itemprop="name"
-                    home_inner = home_span.find('span', itemprop='name')
-                    away_inner = away_span.find('span', itemprop='name')
-                    if home_inner and away_inner:
-                        home_name = home_inner.get_text(strip=True)
-                        away_name = away_inner.get_text(strip=True)
-                    else:
-                        # Fallback: weź cały tekst ze span.homeTeam/awayTeam
-                        home_name = home_span.get_text(strip=True)
-                        away_name = away_span.get_text(strip=True)
-                
-                # Wariant 2: meta itemprop="name" w schema.org (BACKUP)
-                if not home_name or not away_name:
-                    meta_name = row.find('meta', itemprop='name')
-                    if meta_name and meta_name.get('content'):
-                        content = meta_name['content']
-                        if ' vs ' in content:
-                            parts = content.split(' vs ')
-                            home_name = parts[0].strip()
-                            away_name = parts[1].strip()
-                
-                # Wariant 3: Szukaj <a> z href zawierającym mecz (np. /bayelsa-united-katsina-united)
-                if not home_name or not away_name:
-                    links = row.find_all('a', href=True)
-                    for link in links:
-                        href = link.get('href', '')
-                        # Szukaj linków z meczami typu /football/matches/team1-team2-123456
-                        if '/matches/' in href or '/predictions/' in href:
-                            # Wyciągnij ostatni segment URL
-                            url_part = href.split('/')[-1]
-                            # Usuń ID meczu (liczby na końcu po myślniku)
-                            import re
-                            url_part = re.sub(r'-\d+$', '', url_part)
-                            # Szukaj wzorca team1-team2
-                            if '-' in url_part:
-                                # Spróbuj znaleźć podział na dwie drużyny
-                                # Szukaj kombinacji słów oddzielonych myślnikami
-                                words = url_part.split('-')
-                                # Spróbuj różnych podziałów
-                                for i in range(1, len(words)):
-                                    potential_home = ' '.join(words[:i]).title()
-                                    potential_away = ' '.join(words[i:]).title()
-                                    if len(potential_home) > 2 and len(potential_away) > 2:
-                                        home_name = potential_home
-                                        away_name = potential_away
-                                        break
-                                if home_name and away_name:
-                                    break
-                
-                # Wariant 4: div.tnms - kontener na drużyny
-                if not home_name or not away_name:
-                    tnms_div = row.find('div', class_='tnms')
-                    if tnms_div:
-                        home_span = tnms_div.find('span', class_='homeTeam')
-                        away_span = tnms_div.find('span', class_='awayTeam')
-                        if home_span and away_span:
-                            home_name = home_span.get_text(strip=True)
-                            away_name = away_span.get_text(strip=True)
-                
-                if not home_name or not away_name:
-                    # DEBUG: Sprawdź co jest w wierszu
-                    if len(debug_matches) < 3:
-                        row_text = row.get_text(strip=True)[:100] if row else "None"
-                        debug_matches.append(f"[EMPTY] {row_text}")
-                    continue
-                
-                forebet_home = home_name
-                forebet_away = away_name
-                
-                # DEBUG: Zbierz WSZYSTKIE mecze do Gemini (limit 100)
-                if len(debug_matches) < 100:
-                    debug_matches.append(f"{forebet_home} vs {forebet_away}")
-                    print(f"      🏟️ Forebet mecz znaleziony: {forebet_home} vs {forebet_away}")
-                
-                # Sprawdź similarity
-                home_score = similarity_score(home_team, forebet_home)
-                away_score = similarity_score(away_team, forebet_away)
-                
-                # DEBUG: Loguj wysokie (ale niewystarczające) similarity scores
-                if home_score >= 0.35 or away_score >= 0.35:
-                    print(f"      🔍 Potencjalny match: {forebet_home} vs {forebet_away} | Home={home_score:.2f} Away={away_score:.2f}")
-                
-                # � POPRAWIONE WARUNKI - elastyczne dopasowanie (v3 - luty 2026)
-                # Uproszczone i bardziej niezawodne niż 7 warunków
-                combined_score = (home_score + away_score) / 2
-                min_score = min(home_score, away_score)
-                max_score = max(home_score, away_score)
-                
-                # Track najlepszy wynik dla Gemini decyzji
-                if combined_score > best_similarity:
-                    best_similarity = combined_score
-                
-                # === WARUNKI MATCHOWANIA (v3 - uproszczone) ===
-                # W1: Obie drużyny przyzwoite (>= 0.35)
-                cond_both = home_score >= 0.35 and away_score >= 0.35
-                # W2: Suma wyników >= 0.85 (pozwala 0.50 + 0.35)
-                cond_sum = (home_score + away_score) >= 0.85
-                # W3: Jedna drużyna bardzo pewna (>= 0.75), druga min 0.20
-                cond_one_strong = max_score >= 0.75 and min_score >= 0.20
-                # W4: Jedna drużyna dokładne dopasowanie (>= 0.90)
-                cond_exact = max_score >= 0.90
-                
-                if cond_both or cond_sum or cond_one_strong or cond_exact:
-                    candidate_combined = (home_score + away_score) / 2
-                    if candidate_combined > best_combined:
-                        best_combined = candidate_combined
-                        best_candidate = (row, home_score, away_score, forebet_home, forebet_away)
-                        print(f"      🎯 Nowy najlepszy kandydat: {forebet_home} vs {forebet_away} (combined={candidate_combined:.2f})")
-                    
-            except Exception as e:
-                print(f"      ⚠️ Błąd parsowania wiersza Forebet: {type(e).__name__}: {e}")
-                continue
-        
-        # 🔥 WYCIĄGNIJ DANE Z NAJLEPSZEGO KANDYDATA
-        if best_candidate:
-            row, home_score, away_score, forebet_home, forebet_away = best_candidate
-            print(f"      ✅ Znaleziono mecz na Forebet: {forebet_home} vs {forebet_away}")
-            print(f"         Similarity: Home={home_score:.2f}, Away={away_score:.2f}")
+        if matched_row:
+            team_alias_store.mark_used(sport_lower, 'livesport', 'forebet', home_team, away_team)
+            print(f"      🔗 Alias: {matched_row.home} vs {matched_row.away} (bez fuzzy/AI)")
+        else:
+            hit = index.lookup(home_team, away_team)
+            print(f"      🔍 Porównano {hit.candidates}/{len(index.rows)} meczów (indeks trigramów)")
+            matched_row = hit.row
             
-            # 🔥 FIX: Ustaw success/found NATYCHMIAST po znalezieniu meczu
+            if matched_row:
+                print(f"      ✅ Znaleziono mecz na Forebet: {matched_row.home} vs {matched_row.away}")
+                print(f"         Similarity: Home={hit.home_score:.2f}, Away={hit.away_score:.2f}")
+                team_alias_store.record_pair(sport_lower, 'livesport', 'forebet', home_team, away_team,
+                                             matched_row.home, matched_row.away, hit.home_score, hit.away_score)
+            else:
+                # 🤖 GEMINI/GROQ FALLBACK: Użyj gdy algorytm nie znalazł meczu
+                # Gemini używamy gdy najlepszy similarity score < 0.55
+                # (znaczy że nie znaleźliśmy pewnego dopasowania)
+                AI_SIMILARITY_THRESHOLD = 0.55
+                available_for_ai = index.available_matches()
+                if hit.best_similarity < AI_SIMILARITY_THRESHOLD and len(available_for_ai) >= 2:
+                    print(f"      🤖 Forebet: Najlepszy score={hit.best_similarity:.2f} < {AI_SIMILARITY_THRESHOLD} - używam Gemini AI ({len(available_for_ai)} meczów)...")
+                    gemini_match = find_forebet_match_with_gemini(home_team, away_team, available_for_ai[:50])
+                    if gemini_match:
+                        matched_row = index.find_exact(*gemini_match)
+                        if matched_row:
+                            print(f"      ✅ Gemini: Znaleziono predykcję dla {matched_row.home} vs {matched_row.away}")
+                            # AI płatne - zapamiętaj, żeby kolejne uruchomienia nie pytały ponownie
+                            team_alias_store.record_pair(
+                                sport_lower, 'livesport', 'forebet', home_team, away_team,
+                                matched_row.home, matched_row.away, similarity_score(home_team, matched_row.home),
+                                similarity_score(away_team, matched_row.away), method='ai')
+        
+        if matched_row:
             result['success'] = True
             result['found'] = True
-            result['home_team_forebet'] = forebet_home
-            result['away_team_forebet'] = forebet_away
-            
-            # Wyciągnij predykcję - POPRAWIONA STRUKTURA
-            extraction_success = False
-            
-            # 1. Prawdopodobieństwa (div.fprc > spans)
-            fprc_div = row.find('div', class_='fprc')
-            if fprc_div:
-                spans = fprc_div.find_all('span')
-                if len(spans) >= 3:
-                    try:
-                        home_prob = int(spans[0].get_text(strip=True))
-                        draw_prob = int(spans[1].get_text(strip=True))
-                        away_prob = int(spans[2].get_text(strip=True))
-                        
-                        max_prob = max(home_prob, draw_prob, away_prob)
-                        result['probability'] = float(max_prob)
-                        
-                        if max_prob == home_prob:
-                            result['prediction'] = '1'
-                        elif max_prob == draw_prob:
-                            result['prediction'] = 'X'
-                        else:
-                            result['prediction'] = '2'
-                        
-                        extraction_success = True
-                        print(f"         📊 Probability: {home_prob}%-{draw_prob}%-{away_prob}% → {result['prediction']}")
-                    except (ValueError, IndexError) as e:
-                        print(f"         ⚠️ Błąd parsowania prawdopodobieństw: {e}")
-                elif len(spans) == 2:
-                    # 2-way sports: basketball, volleyball, handball, tennis, hockey
-                    try:
-                        home_prob = int(spans[0].get_text(strip=True))
-                        away_prob = int(spans[1].get_text(strip=True))
-                        
-                        max_prob = max(home_prob, away_prob)
-                        result['probability'] = float(max_prob)
-                        result['prediction'] = '1' if home_prob > away_prob else '2'
-                        
-                        extraction_success = True
-                        print(f"         📊 Probability (2-way): {home_prob}%-{away_prob}% → {result['prediction']}")
-                    except (ValueError, IndexError) as e:
-                        print(f"         ⚠️ Błąd parsowania prawdopodobieństw (2-way): {e}")
-            else:
-                print(f"         ⚠️ Brak div.fprc - szukam alternatyw...")
-            
-            # 2. Predykcja tekstowa (div.predict > span.forepr)
-            forepr_elem = row.find('span', class_='forepr')
-            if forepr_elem and not result.get('prediction'):
-                pred_text = forepr_elem.get_text(strip=True)
-                if pred_text in ['1', 'X', '2']:
-                    result['prediction'] = pred_text
-                    extraction_success = True
-                    print(f"         📊 Prediction (forepr): {pred_text}")
-            
-            # 3. Dokładny wynik (div.ex_sc)
-            ex_sc_elem = row.find('div', class_='ex_sc')
-            if ex_sc_elem:
-                if ex_sc_elem.find('br'):
-                    scores = list(ex_sc_elem.stripped_strings)
-                    if len(scores) == 2:
-                        result['exact_score'] = f"{scores[0]}-{scores[1]}"
-                    else:
-                        result['exact_score'] = ex_sc_elem.get_text(strip=True)
-                else:
-                    result['exact_score'] = ex_sc_elem.get_text(strip=True)
-            
-            # 4. Average Goals (div.avg_sc)
-            avg_sc_elem = row.find('div', class_='avg_sc')
-            if avg_sc_elem:
-                avg_text = avg_sc_elem.get_text(strip=True)
-                try:
-                    result['avg_goals'] = float(avg_text)
-                    if sport_lower in ['football', 'soccer']:
-                        if result['avg_goals'] > 2.5:
-                            result['over_under'] = 'Over 2.5'
-                        else:
-                            result['over_under'] = 'Under 2.5'
-                    elif sport_lower in ['hockey', 'ice-hockey']:
-                        if result['avg_goals'] > 5.5:
-                            result['over_under'] = 'Over 5.5'
-                        else:
-                            result['over_under'] = 'Under 5.5'
-                except ValueError:
-                    pass
-            
-            # 5. BTTS - TYLKO dla football i hockey
-            if sport_lower in ['football', 'soccer']:
-                if result.get('exact_score'):
-                    score_parts = result['exact_score'].split('-')
-                    if len(score_parts) == 2:
-                        try:
-                            home_goals = int(score_parts[0].strip())
-                            away_goals = int(score_parts[1].strip())
-                            result['btts'] = 'Yes' if home_goals > 0 and away_goals > 0 else 'No'
-                        except ValueError:
-                            pass
-            elif sport_lower in ['hockey', 'ice-hockey']:
-                if result.get('exact_score'):
-                    score_parts = result['exact_score'].split('-')
-                    if len(score_parts) == 2:
-                        try:
-                            home_goals = int(score_parts[0].strip())
-                            away_goals = int(score_parts[1].strip())
-                            result['btts'] = 'Yes' if home_goals > 0 and away_goals > 0 else 'No'
-                        except ValueError:
-                            pass
-            
-            # 🔥 ALTERNATYWNA EKSTRAKCJA
-            if not result.get('prediction'):
-                ex_spans = row.find_all('span', class_=['ex_sc', 'ex1', 'ex2', 'ex3'])
-                for ex_span in ex_spans:
-                    text = ex_span.get_text(strip=True)
-                    if text in ['1', 'X', '2', '1X', 'X2', '12']:
-                        result['prediction'] = text
-                        extraction_success = True
-                        print(f"         📊 Prediction (ex_span): {text}")
-                        break
-                
-                if not result.get('prediction'):
-                    all_text = row.get_text()
-                    import re
-                    probs = re.findall(r'(\d{1,2})%', all_text)
-                    if len(probs) >= 2:
-                        try:
-                            if sport_lower in ['handball', 'volleyball', 'basketball', 'tennis']:
-                                p1, p2 = int(probs[0]), int(probs[1])
-                                result['probability'] = float(max(p1, p2))
-                                result['prediction'] = '1' if p1 > p2 else '2'
-                                extraction_success = True
-                                print(f"         📊 Probability (regex 2-way): {p1}%-{p2}% → {result['prediction']}")
-                            elif len(probs) >= 3:
-                                p1, px, p2 = int(probs[0]), int(probs[1]), int(probs[2])
-                                max_prob = max(p1, px, p2)
-                                result['probability'] = float(max_prob)
-                                if max_prob == p1:
-                                    result['prediction'] = '1'
-                                elif max_prob == px:
-                                    result['prediction'] = 'X'
-                                else:
-                                    result['prediction'] = '2'
-                                extraction_success = True
-                                print(f"         📊 Probability (regex 3-way): {p1}%-{px}%-{p2}% → {result['prediction']}")
-                        except (ValueError, IndexError):
-                            pass
-            
-            if extraction_success:
-                print(f"         ✅ Ekstrakcja danych zakończona sukcesem")
+            result['home_team_forebet'] = matched_row.home
+            result['away_team_forebet'] = matched_row.away
+            result.update(matched_row.fields())
+            if matched_row.prediction:
+                probability = f" ({matched_row.probability:.0f}%)" if matched_row.probability is not None else ''
+                print(f"         📊 Prediction: {matched_row.prediction}{probability}")
             else:
                 print(f"         ⚠️ Mecz znaleziony, ale nie udało się wyciągnąć predykcji")
-        
-        if not result['success']:
-            # 🤖 GEMINI/GROQ FALLBACK: Użyj gdy algorytm nie znalazł meczu
-            # Gemini używamy gdy najlepszy similarity score < 0.55
-            # (znaczy że nie znaleźliśmy pewnego dopasowania)
-            # Zwiększono z 0.50 na 0.55 aby zmniejszyć liczbę wywołań AI i uniknąć rate limitów
-            
-            AI_SIMILARITY_THRESHOLD = 0.55
-            # v3.8: Use all_available_matches for Gemini (much better coverage)
-            available_for_ai = all_available_matches if all_available_matches else [m for m in debug_matches if 'vs' in m]
-            use_gemini = (
-                best_similarity < AI_SIMILARITY_THRESHOLD and  # Brak pewnych dopasowań
-                len(available_for_ai) >= 2  # Min 2 mecze
-            )
-            
-            if use_gemini:
-                print(f"      🤖 Forebet: Najlepszy score={best_similarity:.2f} < {AI_SIMILARITY_THRESHOLD} - używam Gemini AI ({len(available_for_ai)} meczów)...")
-                gemini_match = find_forebet_match_with_gemini(home_team, away_team, available_for_ai[:50])
-                
-                if gemini_match:
-                    gemini_home, gemini_away = gemini_match
-                    
-                    # Znajdź wiersz z dopasowanym meczem i wyciągnij predykcję
-                    for row in match_rows:  # 🔥 FIX: użyj match_rows zamiast rows
-                        try:
-                            # Wyciągnij nazwy drużyn z wiersza (używając tych samych metod co wcześniej)
-                            row_home, row_away = None, None
-                            
-                            home_span = row.find('span', class_='homeTeam')
-                            away_span = row.find('span', class_='awayTeam')
-                            if home_span and away_span:
-                                row_home = home_span.get_text(strip=True)
-                                row_away = away_span.get_text(strip=True)
-                            
-                            # Sprawdź czy to nasz mecz
-                            if row_home and row_away:
-                                if (row_home.lower() == gemini_home.lower() and 
-                                    row_away.lower() == gemini_away.lower()):
-                                    print(f"      ✅ Gemini: Znaleziono predykcję dla {row_home} vs {row_away}")
-                                    
-                                    # 🔥 FIX: Ustaw success/found NATYCHMIAST
-                                    result['found'] = True
-                                    result['success'] = True
-                                    result['home_team_forebet'] = row_home
-                                    result['away_team_forebet'] = row_away
-                                    
-                                    # Wyciągnij predykcję (taki sam kod jak wcześniej)
-                                    try:
-                                        fprc_div = row.find('div', class_='fprc')
-                                        if fprc_div:
-                                            spans = fprc_div.find_all('span')
-                                            if len(spans) >= 3:
-                                                try:
-                                                    home_prob = int(spans[0].get_text(strip=True))
-                                                    draw_prob = int(spans[1].get_text(strip=True))
-                                                    away_prob = int(spans[2].get_text(strip=True))
-                                                    
-                                                    max_prob = max(home_prob, draw_prob, away_prob)
-                                                    result['probability'] = float(max_prob)
-                                                    
-                                                    if max_prob == home_prob:
-                                                        result['prediction'] = '1'
-                                                    elif max_prob == draw_prob:
-                                                        result['prediction'] = 'X'
-                                                    else:
-                                                        result['prediction'] = '2'
-                                                except (ValueError, IndexError):
-                                                    pass
-                                        
-                                        # Exact score
-                                        ex_sc_elem = row.find('div', class_='ex_sc')
-                                        if ex_sc_elem:
-                                            if ex_sc_elem.find('br'):
-                                                scores = list(ex_sc_elem.stripped_strings)
-                                                if len(scores) == 2:
-                                                    result['exact_score'] = f"{scores[0]}-{scores[1]}"
-                                                else:
-                                                    result['exact_score'] = ex_sc_elem.get_text(strip=True)
-                                            else:
-                                                result['exact_score'] = ex_sc_elem.get_text(strip=True)
-                                    except Exception as extraction_err:
-                                        print(f"      ⚠️ Gemini: Błąd ekstrakcji: {extraction_err}")
-                                    
-                                    break
-                        except Exception as e:
-                            print(f"      ⚠️ Gemini: Błąd przetwarzania wiersza: {e}")
-                            continue
-            
-            # Jeśli nadal nie znaleziono - ustaw error z pełnym debug
-            if not result['success']:
-                print(f"      ❌ Forebet: NIE ZNALEZIONO meczu {home_team} vs {away_team}")
-                if debug_matches:
-                    print(f"      📋 Top 5 najbliższe similarity:")
-                    # Parse debug_matches that have 'vs' format and show similarity
-                    for dm in debug_matches[:5]:
-                        if 'vs' in dm:
-                            parts = dm.split(' vs ')
-                            if len(parts) == 2:
-                                hs = similarity_score(home_team, parts[0].strip())
-                                as_ = similarity_score(away_team, parts[1].strip())
-                                print(f"         {dm} (h:{hs:.2f} a:{as_:.2f} sum:{hs+as_:.2f})")
-                if all_available_matches and not debug_matches:
-                    print(f"      📋 WSZYSTKIE {len(all_available_matches)} meczów na Forebet (nazwy drużyn nie były parsowalne w głównym loop?):")
-                    for i, m in enumerate(all_available_matches[:10], 1):
-                        print(f"         {i}. {m}")
-                result['error'] = f'Nie znaleziono meczu {home_team} vs {away_team} na Forebet (similarity < {min_similarity})'
+        else:
+            print(f"      ❌ Forebet: NIE ZNALEZIONO meczu {home_team} vs {away_team}")
+            result['error'] = f'Nie znaleziono meczu {home_team} vs {away_team} na Forebet (similarity < {min_similarity})'
     
     except TimeoutException:
         result['error'] = 'Timeout podczas ładowania Forebet.com'
@@ -0,0 +1,315 @@
+"""
+📚 H2H Store - trwała historia spotkań bezpośrednich (SQLite)
+=============================================================
+Wyniki H2H są historyczne, a każde uruchomienie parsowało od nowa pełną listę
+ostatnich 5 spotkań dla każdego meczu (także ponownie w trybie GOŚCIE).
+Magazyn trzyma każde spotkanie z datą i wynikiem:
+
+    outputs/h2h_history.sqlite   (tabela meetings)
+    klucz pary: (sport, posortowane znormalizowane nazwy) - A-B i B-A to ta sama historia
+
+Parser H2H dostaje datę ostatniego zapisanego spotkania (h2h_known_until) i kończy
+na pierwszym znanym spotkaniu (lista H2H jest od najnowszego). sync_h2h_history()
+dopisuje nowe spotkania i uzupełnia listę do 5 znanymi spotkaniami z magazynu
+(oznaczonymi source='h2h_store'). Historia rośnie ponad widoczne 5 spotkań.
+
+Pusta sekcja H2H (np. nieudane ładowanie strony) NIE jest zastępowana magazynem,
+chyba że włączono H2H_STORE_FALLBACK=1 - wtedy wiersze mają source='h2h_store'.
+
+Analityka offline:
+    python h2h_store.py stats
+    python h2h_store.py pair football "Legia Warszawa" "Lech Poznań"
+    python h2h_store.py export --output outputs/h2h_history.csv
+
+Konfiguracja (env):
+    H2H_STORE_DB=ścieżka  - plik bazy (domyślnie outputs/h2h_history.sqlite)
+    H2H_STORE=0           - wyłącza magazyn
+    H2H_STORE_FALLBACK=1  - pusta sekcja H2H na stronie -> ostatnie spotkania z magazynu
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from tennis_player_store import normalize_player_name as normalize_name
+
+DEFAULT_DB_PATH = os.getenv('H2H_STORE_DB', os.path.join('outputs', 'h2h_history.sqlite'))
+
+MEETING_COLUMNS = ('date', 'date_iso', 'home', 'away', 'score', 'winner')
+
+
+# Wiersze H2H wzięte z magazynu zamiast ze strony
+STORE_SOURCE = 'h2h_store'
+
+
+def h2h_store_enabled() -> bool:
+    return os.getenv('H2H_STORE', '1') != '0'
+
+
+def h2h_store_fallback_enabled() -> bool:
+    return os.getenv('H2H_STORE_FALLBACK', '0') == '1'
+
+
+def date_to_iso(date: str) -> str:
+    """'12.03.24' / '12.03.2024' -> '2024-03-12' ('' gdy format nieznany)."""
+    match = re.search(r'(\d{1,2})\.(\d{1,2})\.(\d{2,4})', date or '')
+    if not match:
+        return ''
+    day, month, year = match.groups()
+    if len(year) == 2:
+        year_int = int(year)
+        year = str(2000 + year_int if year_int <= 50 else 1900 + year_int)
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+class H2HStore:
+    """
+    Historia spotkań par drużyn/zawodników.
+
+    Args:
+        path: Plik bazy SQLite
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self.inserted = 0
+        self.synced_pairs = 0
+        self.fallbacks = 0
+        self.early_stops = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Połączenie leniwe - import modułu nie tworzy pliku bazy
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meetings ("
+                " sport TEXT, home_key TEXT, away_key TEXT,"
+                " date TEXT, date_iso TEXT, home TEXT, away TEXT, score TEXT, winner TEXT,"
+                " PRIMARY KEY (sport, home_key, away_key, date_iso, home, away))")
+            # Bazy z kluczem uporządkowanym (gospodarze, goście) - scalenie kierunków B-A w A-B
+            conn.execute("INSERT OR IGNORE INTO meetings SELECT sport, away_key, home_key, date, date_iso, home, away,"
+                         " score, winner FROM meetings WHERE home_key > away_key")
+            conn.execute("DELETE FROM meetings WHERE home_key > away_key")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def pair_key(sport: str, home: str, away: str) -> tuple:
+        """(sport, nazwa, nazwa) - nazwy posortowane, więc klucz nie zależy od tego, kto jest gospodarzem."""
+        first, second = sorted((normalize_name(home), normalize_name(away)))
+        return (sport or 'unknown').lower(), first, second
+
+    def latest_date(self, sport: str, home: str, away: str) -> str:
+        """Data ISO ostatniego zapisanego spotkania pary ('' gdy brak)."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT MAX(date_iso) AS latest FROM meetings WHERE sport = ? AND home_key = ? AND away_key = ?",
+                self.pair_key(sport, home, away)).fetchone()
+        return row['latest'] or ''
+
+    def meetings(self, sport: str, home: str, away: str, limit: Optional[int] = None,
+                 until: str = '') -> List[Dict]:
+        """
+        Spotkania pary od najnowszego (format parse_h2h_from_soup + date_iso).
+
+        Klucz pary jest nieuporządkowany, ale każde spotkanie zachowuje swoich gospodarzy
+        i gości (home/away/score/winner jak w tamtym meczu) - liczenie zwycięstw po nazwach
+        działa tak samo dla A-B i B-A. until - tylko spotkania nie nowsze od tej daty ISO.
+        """
+        params = list(self.pair_key(sport, home, away))
+        sql = "SELECT * FROM meetings WHERE sport = ? AND home_key = ? AND away_key = ? "
+        if until:
+            sql += "AND date_iso <= ? "
+            params.append(until)
+        sql += "ORDER BY date_iso DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [{column: row[column] for column in MEETING_COLUMNS} for row in rows]
+
+    def add_new_meetings(self, sport: str, home: str, away: str, h2h: List[Dict]) -> int:
+        """
+        Dopisuje spotkania nowsze od ostatniego zapisanego.
+
+        Lista H2H jest od najnowszego - pierwsze spotkanie nie nowsze od zapisanego kończy przegląd.
+        Returns: liczba dopisanych spotkań
+        """
+        sport_key, home_key, away_key = self.pair_key(sport, home, away)
+        if not normalize_name(home) or not normalize_name(away) or not h2h:
+            return 0
+        latest = self.latest_date(sport, home, away)
+        new_rows = []
+        for item in h2h:
+            date_iso = date_to_iso(item.get('date', ''))
+            if not date_iso:
+                continue
+            if latest and date_iso <= latest:
+                break
+            new_rows.append((sport_key, home_key, away_key, item.get('date', ''), date_iso,
+                             item.get('home', ''), item.get('away', ''), item.get('score', ''),
+                             item.get('winner', '')))
+        if new_rows:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany("INSERT OR IGNORE INTO meetings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", new_rows)
+                conn.commit()
+            self.inserted += len(new_rows)
+        self.synced_pairs += 1
+        return len(new_rows)
+
+    def pairs(self) -> List[Dict]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT sport, home_key, away_key, COUNT(*) AS meetings, MIN(date_iso) AS first, "
+                "MAX(date_iso) AS last FROM meetings GROUP BY sport, home_key, away_key "
+                "ORDER BY meetings DESC").fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT sport, COUNT(*) AS meetings, COUNT(DISTINCT home_key || '|' || away_key) AS pairs "
+                "FROM meetings GROUP BY sport ORDER BY sport").fetchall()
+        return {row['sport']: {'meetings': row['meetings'], 'pairs': row['pairs']} for row in rows}
+
+    def export_csv(self, output: str) -> int:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT * FROM meetings ORDER BY sport, home_key, away_key, date_iso DESC").fetchall()
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(rows[0].keys() if rows else ['sport', 'home_key', 'away_key', *MEETING_COLUMNS])
+            for row in rows:
+                writer.writerow(list(row))
+        return len(rows)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def print_report(self) -> None:
+        if not (self.synced_pairs or self.fallbacks):
+            return
+        print(f"\n📚 HISTORIA H2H: {self.synced_pairs} par, nowe spotkania: {self.inserted}, "
+              f"parsowanie przerwane na znanym spotkaniu: {self.early_stops}, "
+              f"H2H z magazynu (brak na stronie): {self.fallbacks}")
+
+
+# Globalna instancja (per proces)
+h2h_store = H2HStore()
+
+
+def h2h_known_until(sport: str, home: str, away: str) -> str:
+    """Data ISO ostatniego zapisanego spotkania pary - parser H2H kończy na pierwszym znanym ('' = parsuj wszystko)."""
+    if not h2h_store_enabled() or not home or not away:
+        return ''
+    try:
+        return h2h_store.latest_date(sport, home, away)
+    except sqlite3.Error as e:
+        print(f"   ⚠️ H2H store: {e}")
+        return ''
+
+
+def _stored_as_h2h(stored: List[Dict]) -> List[Dict]:
+    for item in stored:
+        item['raw'] = f"{item['date']} {item['home']} {item['score']} {item['away']}"
+        item['source'] = STORE_SOURCE
+        del item['date_iso']
+    return stored
+
+
+def sync_h2h_history(sport: str, home: str, away: str, h2h: List[Dict], limit: int = 5,
+                     use_stored: Optional[bool] = None) -> List[Dict]:
+    """
+    Zapisuje nowe spotkania i zwraca listę H2H do kwalifikacji.
+
+    Parser przerwany na znanym spotkaniu (ostatni element {'known': True}) - lista jest
+    uzupełniana do `limit` spotkaniami z magazynu (source='h2h_store').
+    Pusta lista ze strony zostaje pusta; tylko przy use_stored (domyślnie H2H_STORE_FALLBACK=1)
+    zwracane są ostatnie spotkania z magazynu, także oznaczone source='h2h_store'.
+    Błąd bazy nie przerywa scrapowania - zwracana jest lista wejściowa (bez znacznika).
+    """
+    known_date = date_to_iso(h2h[-1]['date']) if h2h and h2h[-1].get('known') else ''
+    if known_date:
+        h2h = h2h[:-1]
+    if use_stored is None:
+        use_stored = h2h_store_fallback_enabled()
+    if not h2h_store_enabled() or not home or not away:
+        return h2h
+    try:
+        if h2h:
+            h2h_store.add_new_meetings(sport, home, away, h2h)
+        if known_date:
+            h2h_store.early_stops += 1
+            stored = h2h_store.meetings(sport, home, away, limit=limit - len(h2h), until=known_date)
+            return h2h + _stored_as_h2h(stored)
+        if h2h or not use_stored:
+            return h2h
+        stored = h2h_store.meetings(sport, home, away, limit=limit)
+    except sqlite3.Error as e:
+        print(f"   ⚠️ H2H store: {e}")
+        return h2h
+    if stored:
+        h2h_store.fallbacks += 1
+    return _stored_as_h2h(stored)
+
+
+def print_h2h_store_report() -> None:
+    h2h_store.print_report()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='📚 Historia H2H - analityka offline')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Plik bazy SQLite')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Liczba spotkań i par per sport')
+    pair = sub.add_parser('pair', help='Spotkania jednej pary')
+    pair.add_argument('sport')
+    pair.add_argument('home')
+    pair.add_argument('away')
+    export = sub.add_parser('export', help='Eksport całej historii do CSV')
+    export.add_argument('--output', default=os.path.join('outputs', 'h2h_history.csv'))
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Brak bazy: {args.db}")
+        return 1
+    store = H2HStore(path=args.db)
+    try:
+        if args.command == 'stats':
+            for sport, stat in store.stats().items():
+                print(f"   {sport:<12} spotkania: {stat['meetings']:<6} pary: {stat['pairs']}")
+        elif args.command == 'pair':
+            meetings = store.meetings(args.sport, args.home, args.away)
+            print(f"📚 {args.home} vs {args.away} ({args.sport}): {len(meetings)} spotkań")
+            for item in meetings:
+                print(f"   {item['date']:<10} {item['home']} {item['score']} {item['away']}")
+        else:
+            count = store.export_csv(args.output)
+            print(f"💾 {count} spotkań -> {args.output}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+🔗 Link Cache - cache linków meczów per (data, sport, ligi)
+==========================================================
+Zbieranie linków (otwarcie listy meczów, consent, smart scroll) trwa kilkanaście
+sekund na sport, a uruchomienia GOSPODARZE i GOŚCIE (.bat) robią to samo dla
+tej samej daty. Znalezione listy URLi trafiają do pliku JSON:
+
+    outputs/link_cache/links_2025-10-05_football_all.json
+
+Każde kolejne uruchomienie dla tego dnia (w czasie TTL) zaczyna przetwarzanie od razu.
+Zapis atomowy (plik tymczasowy + os.replace) - bezpieczny przy równoległych uruchomieniach.
+
+Konfiguracja (env):
+    LINK_CACHE_TTL_HOURS - ważność wpisu (domyślnie 6h)
+    LINK_CACHE=0         - wyłącza cache
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_CACHE_DIR = os.path.join('outputs', 'link_cache')
+DEFAULT_TTL_HOURS = float(os.getenv('LINK_CACHE_TTL_HOURS', '6'))
+
+
+def link_cache_enabled() -> bool:
+    return os.getenv('LINK_CACHE', '1') != '0'
+
+
+def _leagues_key(leagues: Optional[List[str]]) -> str:
+    if not leagues:
+        return 'all'
+    key = '-'.join(sorted(re.sub(r'[^a-z0-9-]', '', l.lower()) for l in leagues))
+    if len(key) > 60:
+        key = hashlib.md5(key.encode('utf-8')).hexdigest()[:12]
+    return key
+
+
+class LinkCache:
+    """
+    Plikowy cache list URLi meczów.
+
+    Args:
+        cache_dir: Katalog plików cache
+        ttl_hours: Ważność wpisu w godzinach
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_hours: float = DEFAULT_TTL_HOURS):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, date: str, sport: str, leagues: Optional[List[str]] = None) -> str:
+        return os.path.join(self.cache_dir, f"links_{date}_{sport}_{_leagues_key(leagues)}.json")
+
+    def get(self, date: str, sport: str, leagues: Optional[List[str]] = None) -> Optional[List[str]]:
+        """Lista URLi z cache albo None (brak / przeterminowany / uszkodzony wpis)."""
+        path = self.path_for(date, sport, leagues)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            age = time.time() - float(entry['created_at'])
+            links = entry['links']
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        if age > self.ttl_seconds or not isinstance(links, list):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return links
+
+    def get_kickoffs(self, date: str, sport: str, leagues: Optional[List[str]] = None) -> Dict[str, str]:
+        """Godziny rozpoczęcia zapisane razem z linkami (URL -> 'HH:MM'); bez liczenia trafień."""
+        try:
+            with open(self.path_for(date, sport, leagues), encoding='utf-8') as f:
+                kickoffs = json.load(f).get('kickoffs') or {}
+        except (OSError, ValueError, AttributeError):
+            return {}
+        return kickoffs if isinstance(kickoffs, dict) else {}
+
+    def put(self, date: str, sport: str, leagues: Optional[List[str]], links: List[str],
+            kickoffs: Optional[Dict[str, str]] = None) -> None:
+        """Zapisuje listę URLi (pusta lista = nieudane zbieranie, nie zapisujemy)."""
+        if not links:
+            return
+        path = self.path_for(date, sport, leagues)
+        entry = {
+            'date': date,
+            'sport': sport,
+            'leagues': leagues or [],
+            'created_at': time.time(),
+            'links': links,
+            'kickoffs': kickoffs or {},
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"   ⚠️ Link cache: nie można zapisać {path}: {e}")
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+# Globalna instancja (per proces)
+link_cache = LinkCache()
@@ -0,0 +1,353 @@
+"""
+🌐 Livesport H2H API Client
+============================
+Pobiera H2H i formę drużyn bezpośrednio z feedów Livesport (backend lsapp.eu),
+bez uruchamiania przeglądarki - tak jak livesport_odds_api.py robi to dla kursów.
+
+Feedy (format Livesport: rekordy '~', pola '¬', klucz/wartość '÷'):
+- df_hh_1_<event_id>  - zakładki H2H (ogółem / u siebie / na wyjeździe),
+                        w każdej grupy: ostatnie mecze gospodarzy, gości, pojedynki
+- dc_1_<event_id>     - nagłówek meczu (nazwy drużyn, czas rozpoczęcia)
+
+Zwracane H2H ma ten sam format co parse_h2h_from_soup():
+    [{'date': '12.03.24', 'home': ..., 'away': ..., 'score': '2-1', 'winner': 'home', 'raw': ...}]
+
+process_match() używa tego klienta jako pierwszego; przy błędzie lub braku wierszy
+pojedynków w feedzie wraca do Selenium.
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+
+from livesport_odds_api import LivesportOddsAPI
+
+RECORD_SEP = '~'
+FIELD_SEP = '¬'
+KV_SEP = '÷'
+
+# Słowa w tytułach grup oznaczające sekcję pojedynków bezpośrednich
+H2H_GROUP_WORDS = ('pojedynki', 'bezpośrednie', 'head-to-head', 'head to head')
+
+MAX_CONSECUTIVE_FAILURES = 5  # Po tylu błędach z rzędu wyłączamy HTTP na resztę uruchomienia
+
+
+def parse_feed(text: str) -> List[Dict[str, str]]:
+    """Dzieli feed Livesport na listę rekordów {klucz: wartość}."""
+    records = []
+    for raw_record in (text or '').split(RECORD_SEP):
+        record = {}
+        for field in raw_record.split(FIELD_SEP):
+            key, sep, value = field.partition(KV_SEP)
+            if sep and key:
+                record[key.strip()] = value
+        if record:
+            records.append(record)
+    return records
+
+
+def _format_date(timestamp: str, fmt: str = '%d.%m.%y') -> str:
+    try:
+        return datetime.fromtimestamp(int(timestamp)).strftime(fmt)
+    except (ValueError, TypeError, OSError):
+        return ''
+
+
+def _parse_score(score: str) -> Optional[tuple]:
+    match = re.search(r'(\d+)\s*[:\-]\s*(\d+)', score or '')
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def _same_team(a: str, b: str) -> bool:
+    a = (a or '').lower().strip()
+    b = (b or '').lower().strip()
+    return bool(a and b) and (a == b or a in b or b in a)
+
+
+class LivesportH2HAPI:
+    """
+    Klient feedów H2H Livesport.
+
+    Przykład użycia:
+        api = LivesportH2HAPI()
+        data = api.get_h2h_for_match('https://www.livesport.com/pl/mecz/...?mid=KQAaF7d2')
+        data['h2h']               # format parse_h2h_from_soup
+        data['home_form_overall'] # ['W', 'L', ...]
+    """
+
+    FEED_URL = "https://global.ds.lsapp.eu/x/feed/"
+    H2H_FEED = "df_hh_1_{event_id}"
+    EVENT_FEED = "dc_1_{event_id}"
+
+    def __init__(self, base_url: str = None, timeout: float = 5.0, fsign: str = None):
+        """
+        Args:
+            base_url: Adres feedów (domyślnie FEED_URL; w testach lokalny stub)
+            timeout: Timeout pojedynczego żądania (s)
+            fsign: Nagłówek x-fsign (domyślnie z LIVESPORT_FSIGN)
+        """
+        self.base_url = (base_url or os.getenv('LIVESPORT_FEED_URL') or self.FEED_URL).rstrip('/') + '/'
+        self.timeout = timeout
+        self.consecutive_failures = 0
+        self.stats = {'requests': 0, 'success': 0, 'failed': 0}
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/131.0.0.0 Safari/537.36',
+            'Accept': '*/*',
+            'Accept-Language': 'pl-PL,pl;q=0.9,en;q=0.8',
+            'Origin': 'https://www.livesport.com',
+            'Referer': 'https://www.livesport.com/',
+            'x-fsign': fsign or os.getenv('LIVESPORT_FSIGN', 'SW9D1eZo'),
+        })
+        # Event ID wyciągamy tak samo jak klient kursów
+        self._id_extractor = LivesportOddsAPI()
+
+    @property
+    def disabled(self) -> bool:
+        """Circuit breaker - po serii błędów nie spowalniamy każdego meczu kolejnym timeoutem."""
+        return self.consecutive_failures >= MAX_CONSECUTIVE_FAILURES
+
+    def extract_event_id_from_url(self, url: str) -> Optional[str]:
+        return self._id_extractor.extract_event_id_from_url(url)
+
+    def _get_feed(self, feed: str) -> Optional[str]:
+        self.stats['requests'] += 1
+        try:
+            response = self.session.get(self.base_url + feed, timeout=self.timeout)
+            if response.status_code != 200 or not response.text.strip():
+                print(f"   ⚠️ Livesport H2H API: HTTP {response.status_code} ({feed})")
+                return None
+            response.encoding = 'utf-8'
+            return response.text
+        except requests.exceptions.Timeout:
+            print(f"   ⚠️ Livesport H2H API: Timeout ({feed})")
+        except requests.exceptions.RequestException as e:
+            print(f"   ⚠️ Livesport H2H API error: {str(e)[:100]}")
+        return None
+
+    # ------------------------------------------------------------------
+    # Parsowanie feedów
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def parse_h2h_feed(text: str) -> List[Dict]:
+        """
+        Zwraca zakładki H2H: [{'tab': 'Ogółem', 'groups': [{'title': ..., 'rows': [...]}, ...]}, ...]
+
+        Wiersz: {'date', 'home', 'away', 'score', 'timestamp'}
+        """
+        tabs = []
+        for record in parse_feed(text):
+            if 'KA' in record:
+                tabs.append({'tab': record['KA'], 'groups': []})
+            if 'KB' in record:
+                if not tabs:
+                    tabs.append({'tab': '', 'groups': []})
+                tabs[-1]['groups'].append({'title': record['KB'], 'rows': []})
+            if 'KJ' in record and 'KK' in record and tabs and tabs[-1]['groups']:
+                tabs[-1]['groups'][-1]['rows'].append({
+                    'timestamp': record.get('KC', ''),
+                    'date': _format_date(record.get('KC', '')),
+                    'home': record['KJ'].strip(),
+                    'away': record['KK'].strip(),
+                    'score': record.get('KL', ''),
+                })
+        return tabs
+
+    @staticmethod
+    def rows_to_h2h(rows: List[Dict], limit: int = 5) -> List[Dict]:
+        """Konwertuje wiersze feedu do formatu parse_h2h_from_soup()."""
+        results = []
+        for row in rows[:limit]:
+            parsed = _parse_score(row.get('score'))
+            if not parsed or not row.get('home') or not row.get('away'):
+                continue
+            goals_home, goals_away = parsed
+            if goals_home > goals_away:
+                winner = 'home'
+            elif goals_away > goals_home:
+                winner = 'away'
+            else:
+                winner = 'draw'
+            score = f"{goals_home}-{goals_away}"
+            results.append({
+                'date': row.get('date', ''),
+                'home': row['home'],
+                'away': row['away'],
+                'score': score,
+                'winner': winner,
+                'raw': f"{row.get('date', '')} {row['home']} {score} {row['away']}",
+            })
+        return results
+
+    @staticmethod
+    def rows_to_form(rows: List[Dict], team: str, limit: int = 5) -> List[str]:
+        """Forma drużyny (W/D/L) z perspektywy `team` - strona ustalana po nazwie."""
+        form = []
+        for row in rows:
+            parsed = _parse_score(row.get('score'))
+            if not parsed:
+                continue
+            goals_home, goals_away = parsed
+            if _same_team(row.get('home'), team):
+                own, other = goals_home, goals_away
+            elif _same_team(row.get('away'), team):
+                own, other = goals_away, goals_home
+            else:
+                continue
+            form.append('W' if own > other else 'L' if own < other else 'D')
+            if len(form) >= limit:
+                break
+        return form
+
+    @staticmethod
+    def parse_event_feed(text: str) -> Dict:
+        """Nagłówek meczu: nazwy drużyn (AE/AF lub WU/WV) i czas rozpoczęcia (AD)."""
+        info = {'home_team': None, 'away_team': None, 'match_time': None}
+        for record in parse_feed(text):
+            info['home_team'] = info['home_team'] or record.get('AE') or record.get('WU')
+            info['away_team'] = info['away_team'] or record.get('AF') or record.get('WV')
+            if not info['match_time'] and record.get('AD'):
+                info['match_time'] = _format_date(record['AD'], '%d.%m.%Y %H:%M') or None
+        return info
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def get_h2h_for_event(self, event_id: str) -> Dict:
+        """
+        Pobiera H2H + formę dla wydarzenia.
+
+        Returns:
+            Dict: home_team, away_team, match_time, h2h (format parse_h2h_from_soup),
+                  home_form_overall, away_form_overall, home_form_home, away_form_away, success
+        """
+        result = {
+            'event_id': event_id,
+            'home_team': None,
+            'away_team': None,
+            'match_time': None,
+            'h2h': [],
+            'home_form_overall': [],
+            'away_form_overall': [],
+            'home_form_home': [],
+            'away_form_away': [],
+            'success': False,
+        }
+
+        h2h_text = self._get_feed(self.H2H_FEED.format(event_id=event_id))
+        if h2h_text is None:
+            self._fail()
+            return result
+
+        try:
+            tabs = self.parse_h2h_feed(h2h_text)
+            event_text = self._get_feed(self.EVENT_FEED.format(event_id=event_id))
+            if event_text:
+                result.update({k: v for k, v in self.parse_event_feed(event_text).items() if v})
+
+            overall = tabs[0]['groups'] if tabs else []
+            # Nazwy drużyn z tytułów grup ("Ostatnie mecze: Legia") gdy brak nagłówka
+            if not result['home_team'] and len(overall) >= 1:
+                result['home_team'] = overall[0]['title'].split(':', 1)[-1].strip() or None
+            if not result['away_team'] and len(overall) >= 2:
+                result['away_team'] = overall[1]['title'].split(':', 1)[-1].strip() or None
+
+            h2h_group = next((g for g in overall if any(w in g['title'].lower() for w in H2H_GROUP_WORDS)), None)
+            if h2h_group is None and len(overall) >= 3:
+                h2h_group = overall[2]
+            if h2h_group is not None:
+                result['h2h'] = self.rows_to_h2h(h2h_group['rows'])
+
+            home, away = result['home_team'], result['away_team']
+            if len(overall) >= 2:
+                result['home_form_overall'] = self.rows_to_form(overall[0]['rows'], home)
+                result['away_form_overall'] = self.rows_to_form(overall[1]['rows'], away)
+            # Zakładka 2 = u siebie (grupa gospodarzy), zakładka 3 = na wyjeździe (grupa gości)
+            if len(tabs) >= 2 and tabs[1]['groups']:
+                result['home_form_home'] = self.rows_to_form(tabs[1]['groups'][0]['rows'], home)
+            if len(tabs) >= 3 and len(tabs[2]['groups']) >= 2:
+                result['away_form_away'] = self.rows_to_form(tabs[2]['groups'][1]['rows'], away)
+
+            # Bez wierszy pojedynków (zmieniony format feedu, brak grupy H2H) -> fallback Selenium,
+            # inaczej mecz cicho przestaje się kwalifikować
+            result['success'] = bool(home and away and result['h2h'])
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            print(f"   ⚠️ Livesport H2H API parsing error: {e}")
+
+        if result['success']:
+            self.consecutive_failures = 0
+            self.stats['success'] += 1
+        else:
+            self._fail()
+        return result
+
+    def _fail(self) -> None:
+        self.consecutive_failures += 1
+        self.stats['failed'] += 1
+        if self.consecutive_failures == MAX_CONSECUTIVE_FAILURES:
+            print(f"   ⚠️ Livesport H2H API: {MAX_CONSECUTIVE_FAILURES} błędów z rzędu - dalej tylko Selenium")
+
+    def get_h2h_for_match(self, match_url: str) -> Optional[Dict]:
+        """
+        Główna metoda - H2H + forma dla URL meczu.
+
+        Returns:
+            Dict (jak get_h2h_for_event) lub None gdy HTTP nie zadziałał (-> fallback Selenium)
+        """
+        if self.disabled:
+            return None
+        event_id = self.extract_event_id_from_url(match_url)
+        if not event_id:
+            return None
+        data = self.get_h2h_for_event(event_id)
+        return data if data.get('success') else None
+
+
+# Klient per wątek (pipeline FAZY 2, strony Playwright) - requests.Session i liczniki
+# circuit breakera nie są współdzielone między wątkami
+_local = threading.local()
+
+
+def get_livesport_h2h(match_url: str) -> Optional[Dict]:
+    """
+    Funkcja pomocnicza (sesja HTTP per wątek).
+
+    Przykład:
+        data = get_livesport_h2h('https://www.livesport.com/pl/mecz/...?mid=KQAaF7d2')
+    """
+    api = getattr(_local, 'api', None)
+    if api is None:
+        api = _local.api = LivesportH2HAPI()
+    return api.get_h2h_for_match(match_url)
+
+
+# ============================================================================
+# TESTING / CLI
+# ============================================================================
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) >= 2:
+        start = time.time()
+        data = LivesportH2HAPI().get_h2h_for_match(sys.argv[1])
+        if not data:
+            print("❌ Brak danych H2H przez HTTP")
+            sys.exit(1)
+        print(f"{data['home_team']} vs {data['away_team']} ({data['match_time']})")
+        for item in data['h2h']:
+            print(f"   {item['raw']}")
+        print(f"Forma: {data['home_form_overall']} / {data['away_form_overall']}")
+        print(f"⏱️ {time.time() - start:.2f}s")
+    else:
+        print("Użycie: python livesport_h2h_api.py <URL meczu>")
@@ -43,6 +43,8 @@ import re
 import json
 import logging
 import random
+import queue
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -67,6 +69,20 @@ from selenium.common.exceptions import (
 )
 from webdriver_manager.chrome import ChromeDriverManager
 
+from page_readiness import readiness, wait_for_page, print_readiness_report
+from dom_snapshot_cache import h2h_snapshot_cache, snapshot_key, print_snapshot_cache_report
+from section_parser import parse_match_sections
+from link_cache import link_cache, link_cache_enabled
+from stage_metrics import record_stage_timings, record_match_retry, print_stage_metrics_report
+from qualification import SHED, StagedQualifier, STAGE_TEAMS, STAGE_RANKING, STAGE_TENNIS_SCORE, print_qualification_report
+from tennis_player_store import player_store, print_player_store_report
+from tennis_scraper_v3_helpers import get_player_profile
+from h2h_store import date_to_iso, h2h_known_until, sync_h2h_history, print_h2h_store_report
+from sharding import parse_shard, select_shard, shard_path, write_manifest
+from browser_profile import (lean_enabled, apply_lean_options, enable_resource_blocking,
+                             record_page_metrics, print_page_metrics_report, page_metrics,
+                             LEAN_PAGE_LOAD_TIMEOUT, LEAN_ENV)
+
 # ============================================================================
 # LOGGING SETUP
 # ============================================================================
@@ -113,6 +129,13 @@ def lazy_load_gemini():
     
     return GEMINI_AVAILABLE
 
+# Livesport H2H przez HTTP (feedy lsapp.eu) - najpierw HTTP, Selenium jako fallback
+try:
+    from livesport_h2h_api import get_livesport_h2h
+    LIVESPORT_HTTP_H2H_AVAILABLE = os.getenv('LIVESPORT_HTTP_H2H', '1') != '0'
+except ImportError:
+    LIVESPORT_HTTP_H2H_AVAILABLE = False
+
 # Nordic Bet integration (disabled - using FlashScore instead)
 NORDIC_BET_AVAILABLE = False
 
@@ -324,9 +347,18 @@ SPORT_URLS = {
     'tennis': 'https://www.livesport.com/pl/tenis/',
 }
 
+# Liczba przeglądarek do równoległego zbierania linków (główny driver + dodatkowe)
+LINK_DISCOVERY_WORKERS = int(os.getenv('LINK_DISCOVERY_WORKERS', '3'))
+
+# Godziny rozpoczęcia z listy meczów dnia: URL -> 'HH:MM' (harmonogram --deadline)
+LINK_KICKOFFS: Dict[str, str] = {}
+
 # Sporty indywidualne (inna logika kwalifikacji)
 INDIVIDUAL_SPORTS = ['tennis']
 
+# Tenis: odwiedzaj profile zawodników (forma, nawierzchnie) dla pól nieświeżych w magazynie
+TENNIS_PLAYER_PROFILES = os.getenv('TENNIS_PLAYER_PROFILES', '0') == '1'
+
 # Popularne ligi dla każdego sportu (mapowanie slug -> nazwa)
 POPULAR_LEAGUES = {
     'football': {
@@ -365,7 +397,16 @@ POPULAR_LEAGUES = {
 H2H_TAB_TEXT_OPTIONS = ["H2H", "Head-to-Head", "Bezpośrednie", "Bezpośrednie spotkania", "H2H"]
 
 
-def start_driver(headless: bool = True) -> webdriver.Chrome:
+def start_driver(headless: bool = True, lean: bool = None) -> webdriver.Chrome:
+    """
+    Uruchamia Chrome dla scrapera.
+    
+    Args:
+        headless: Tryb bez GUI
+        lean: Profil lekki (blokowanie zasobów, strategia 'eager');
+              None = wg zmiennej LIVESPORT_LEAN_BROWSER (--lean-browser)
+    """
+    lean = lean_enabled(lean)
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless=new")
@@ -379,7 +420,7 @@ def start_driver(headless: bool = True) -> webdriver.Chrome:
     
     # Network stability improvements
     chrome_options.add_argument("--disable-web-security")
-    chrome_options.add_argument("--disable-features=IsolateOrigins,site-per-process")
+    disabled_features = ['IsolateOrigins', 'site-per-process']
     chrome_options.add_argument("--disable-background-networking")
     chrome_options.add_argument("--dns-prefetch-disable")
     
@@ -387,10 +428,16 @@ def start_driver(headless: bool = True) -> webdriver.Chrome:
     chrome_options.add_argument("--max-connections-per-host=6")
     
     # Timeout preferences
-    chrome_options.add_experimental_option('prefs', {
+    prefs = {
         'profile.default_content_setting_values.notifications': 2,
         'profile.default_content_settings.popups': 0,
-    })
+    }
+    
+    # 🪶 LEAN PROFILE: eager + bez rozszerzeń/obrazów (opt-in)
+    if lean:
+        apply_lean_options(chrome_options, disabled_features, prefs)
+    chrome_options.add_argument(f"--disable-features={','.join(disabled_features)}")
+    chrome_options.add_experimental_option('prefs', prefs)
     
     # human-like user-agent (you may rotate)
     chrome_options.add_argument(
@@ -452,6 +499,12 @@ def start_driver(headless: bool = True) -> webdriver.Chrome:
                 print("💡 Spróbuj: pip install --upgrade selenium webdriver-manager")
                 raise
     
+    page_metrics.lean = lean
+    if lean:
+        driver.set_page_load_timeout(LEAN_PAGE_LOAD_TIMEOUT)
+        if enable_resource_blocking(driver):
+            print("🪶 Lean profile: eager + blokowanie obrazów/fontów/reklam/trackerów")
+    
     return driver
 
 
@@ -485,9 +538,13 @@ def click_h2h_tab(driver: webdriver.Chrome) -> None:
     # if nothing works, do nothing and hope content is already present
 
 
-def parse_h2h_from_soup(soup: BeautifulSoup, home_team: str) -> List[Dict]:
+def parse_h2h_from_soup(soup: BeautifulSoup, home_team: str, known_until: str = '') -> List[Dict]:
     """Parsuje sekcję H2H i zwraca listę ostatnich spotkań (do 5).
     Zwracany format: [{'date':..., 'home':..., 'away':..., 'score': 'x - y', 'winner': 'home'/'away'/'draw'}]
+
+    known_until: data ISO ostatniego spotkania w magazynie H2H (h2h_known_until). Parsowanie
+    kończy się na pierwszym spotkaniu nie nowszym od niej - dopisywany jest wtedy znacznik
+    {'date': ..., 'known': True}, który sync_h2h_history zastępuje spotkaniami z magazynu.
     """
     results = []
     
@@ -536,6 +593,13 @@ def parse_h2h_from_soup(soup: BeautifulSoup, home_team: str) -> List[Dict]:
             date_el = row.select_one('span.h2h__date')
             date = safe_get_text(date_el, '')
             
+            # 📚 Spotkanie już w magazynie H2H - starsze też, dalej nie parsujemy
+            if known_until:
+                date_iso = date_to_iso(date)
+                if date_iso and date_iso <= known_until:
+                    results.append({'date': date, 'known': True})
+                    break
+            
             # Gospodarz
             home_el = row.select_one('span.h2h__homeParticipant span.h2h__participantInner')
             home = safe_get_text(home_el, '')
@@ -660,168 +724,194 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     if not check_driver_health(driver):
         logger.error(f"Driver nie działa przed przetworzeniem {url}")
         return out
-    
-    for attempt in range(max_retries):
-        try:
-            # 🔥 Strategy 1: Normal navigation - szybsze w CI
-            if attempt == 0:
-                driver.get(url)
-                time.sleep(1.0 if _is_ci else 3.0)  # CI: szybciej
-            
-            # 🔥 Strategy 2: Refresh if first failed
-            elif attempt == 1:
-                print(f"   🔄 Próba #2: Refresh...")
-                driver.refresh()
-                time.sleep(1.0 if _is_ci else 3.0)
-            
-            # 🔥 Strategy 3: Navigate to main page first, then match
-            elif attempt == 2:
-                print(f"   🔄 Próba #3: Via main page...")
-                driver.get("https://www.livesport.com/pl/")
-                time.sleep(1.0 if _is_ci else 2.0)
-                driver.get(url)
-                time.sleep(1.5 if _is_ci else 3.0)
-            
-            # 🔥 Strategy 4: Clear cache and try
-            elif attempt == 3:
-                print(f"   🔄 Próba #4: Clear cache...")
-                try:
-                    driver.delete_all_cookies()
-                except WebDriverException:
-                    pass  # Ignoruj błędy przy czyszczeniu cookies
-                time.sleep(0.5 if _is_ci else 1.0)
-                driver.get(url)
-                time.sleep(1.5 if _is_ci else 3.0)
-            
-            # 🔥 Strategy 5: Last resort - direct URL
-            else:
-                print(f"   🔄 Próba #5: Direct URL (last resort)...")
-                driver.get(url)
-                time.sleep(2.0 if _is_ci else 5.0)  # CI: szybciej
-            
-            # Teraz spróbuj kliknąć zakładkę H2H
-            click_h2h_tab(driver)
-            time.sleep(1.5 if _is_ci else 2.5)  # CI: szybciej
-            break  # Success - wyjdź z pętli
-            
-        except (WebDriverException, ConnectionResetError, ConnectionError, TimeoutError, TimeoutException) as e:
-            last_error = e
-            logger.debug(f"Błąd połączenia dla {url}: {type(e).__name__}: {str(e)[:100]}")
-            
-            if attempt < max_retries - 1:
-                # Użyj exponential backoff z jitter
-                delay = exponential_backoff_with_jitter(attempt)
-                print(f"⚠️ Błąd połączenia (próba {attempt + 1}/{max_retries}): {type(e).__name__}")
-                print(f"   Czekam {delay:.1f}s przed następną próbą...")
-                time.sleep(delay)
+    readiness.begin_match()
+    h2h_snapshot_cache.begin_match()
+    
+    # 🌐 HTTP-FIRST: H2H + forma z feedu Livesport bez ładowania strony (fallback: Selenium)
+    http_data = get_livesport_h2h(url) if LIVESPORT_HTTP_H2H_AVAILABLE else None
+    soup = None
+    if http_data:
+        out['home_team'] = http_data['home_team']
+        out['away_team'] = http_data['away_team']
+        out['match_time'] = http_data['match_time']
+        print(f"   🌐 H2H przez HTTP: {out['home_team']} vs {out['away_team']} ({len(http_data['h2h'])} meczów)")
+    
+    if http_data is None:
+        for attempt in range(max_retries):
+            try:
+                # 🔥 Strategy 1: Normal navigation - szybsze w CI
+                if attempt == 0:
+                    driver.get(url)
+                    wait_for_page(driver, 'match', sport, legacy_sleep=1.0 if _is_ci else 3.0)  # CI: szybciej
+            
+                # 🔥 Strategy 2: Refresh if first failed
+                elif attempt == 1:
+                    print(f"   🔄 Próba #2: Refresh...")
+                    driver.refresh()
+                    wait_for_page(driver, 'match', sport, legacy_sleep=1.0 if _is_ci else 3.0)
+            
+                # 🔥 Strategy 3: Navigate to main page first, then match
+                elif attempt == 2:
+                    print(f"   🔄 Próba #3: Via main page...")
+                    driver.get("https://www.livesport.com/pl/")
+                    time.sleep(1.0 if _is_ci else 2.0)
+                    driver.get(url)
+                    wait_for_page(driver, 'match', sport, legacy_sleep=1.5 if _is_ci else 3.0)
+            
+                # 🔥 Strategy 4: Clear cache and try
+                elif attempt == 3:
+                    print(f"   🔄 Próba #4: Clear cache...")
+                    try:
+                        driver.delete_all_cookies()
+                    except WebDriverException:
+                        pass  # Ignoruj błędy przy czyszczeniu cookies
+                    time.sleep(0.5 if _is_ci else 1.0)
+                    driver.get(url)
+                    wait_for_page(driver, 'match', sport, legacy_sleep=1.5 if _is_ci else 3.0)
+            
+                # 🔥 Strategy 5: Last resort - direct URL
+                else:
+                    print(f"   🔄 Próba #5: Direct URL (last resort)...")
+                    driver.get(url)
+                    wait_for_page(driver, 'match', sport, legacy_sleep=2.0 if _is_ci else 5.0)  # CI: szybciej
+            
+                # Teraz spróbuj kliknąć zakładkę H2H
+                click_h2h_tab(driver)
+                wait_for_page(driver, 'h2h', sport, legacy_sleep=1.5 if _is_ci else 2.5)  # CI: szybciej
+                h2h_snapshot_cache.record_page_load()
+                record_page_metrics(driver)
+                break  # Success - wyjdź z pętli
+            
+            except (WebDriverException, ConnectionResetError, ConnectionError, TimeoutError, TimeoutException) as e:
+                last_error = e
+                logger.debug(f"Błąd połączenia dla {url}: {type(e).__name__}: {str(e)[:100]}")
+            
+                if attempt < max_retries - 1:
+                    record_match_retry(sport, url, level='page')
+                    # Użyj exponential backoff z jitter
+                    delay = exponential_backoff_with_jitter(attempt)
+                    print(f"⚠️ Błąd połączenia (próba {attempt + 1}/{max_retries}): {type(e).__name__}")
+                    print(f"   Czekam {delay:.1f}s przed następną próbą...")
+                    time.sleep(delay)
                 
-                # Sprawdź czy driver nadal działa
-                if not check_driver_health(driver):
-                    logger.warning("Driver przestał działać po błędzie - przerywam próby")
+                    # Sprawdź czy driver nadal działa
+                    if not check_driver_health(driver):
+                        logger.warning("Driver przestał działać po błędzie - przerywam próby")
+                        return out
+                    continue
+                else:
+                    print(f"❌ Błąd otwierania {url} po {max_retries} próbach")
+                    print(f"   Ostatni błąd: {type(last_error).__name__}: {str(last_error)[:100]}")
+                    logger.error(f"Nie udało się otworzyć {url} po {max_retries} próbach: {last_error}")
+                    return out
+            except StaleElementReferenceException as e:
+                # Element stał się nieaktualny - spróbuj ponownie
+                logger.debug(f"StaleElementReferenceException dla {url}, retry {attempt + 1}")
+                if attempt < max_retries - 1:
+                    record_match_retry(sport, url, level='page')
+                    time.sleep(1.0)
+                    continue
+                else:
+                    logger.warning(f"StaleElementReferenceException po {max_retries} próbach dla {url}")
                     return out
-                continue
-            else:
-                print(f"❌ Błąd otwierania {url} po {max_retries} próbach")
-                print(f"   Ostatni błąd: {type(last_error).__name__}: {str(last_error)[:100]}")
-                logger.error(f"Nie udało się otworzyć {url} po {max_retries} próbach: {last_error}")
-                return out
-        except StaleElementReferenceException as e:
-            # Element stał się nieaktualny - spróbuj ponownie
-            logger.debug(f"StaleElementReferenceException dla {url}, retry {attempt + 1}")
-            if attempt < max_retries - 1:
-                time.sleep(1.0)
-                continue
-            else:
-                logger.warning(f"StaleElementReferenceException po {max_retries} próbach dla {url}")
-                return out
 
-    # pobierz tytuł strony jako fallback na nazwy druzyn
-    try:
-        page_source = driver.page_source
-        if not page_source:
-            logger.warning(f"process_match: Pusta strona dla {url}")
-            return out
-        soup = BeautifulSoup(page_source, 'html.parser')
-        # spróbuj wyciągnąć nazwy drużyn z nagłówka
-        # FIX: soup.title.string może zwrócić None nawet gdy soup.title istnieje
-        title = (soup.title.string or '') if soup.title else ''
-        if title:
-            # tytuł często ma formę "Home - Away" lub "Home vs Away"
-            m = re.split(r"\s[-–—|]\s|\svs\s|\sv\s", title)
-            if len(m) >= 2:
-                out['home_team'] = m[0].strip()
-                out['away_team'] = m[1].strip()
-    except (WebDriverException, AttributeError) as e:
-        logger.debug(f"process_match: Błąd pobierania tytułu strony dla {url}: {e}")
-    except Exception as e:
-        logger.warning(f"process_match: Nieoczekiwany błąd przy parsowaniu tytułu: {type(e).__name__}: {e}")
+        # pobierz tytuł strony jako fallback na nazwy druzyn
+        try:
+            page_source = driver.page_source
+            if not page_source:
+                logger.warning(f"process_match: Pusta strona dla {url}")
+                return out
+            soup = parse_match_sections(page_source)  # Tylko potrzebne sekcje (lxml)
+            # 🗂️ Zakładka H2H ogółem - ten sam snapshot dla formy (extract_advanced_team_form)
+            if soup.select_one('div.h2h__section'):
+                h2h_snapshot_cache.put(h2h_page_url(url, 'ogolem'), soup)
+            # spróbuj wyciągnąć nazwy drużyn z nagłówka
+            # FIX: soup.title.string może zwrócić None nawet gdy soup.title istnieje
+            title = (soup.title.string or '') if soup.title else ''
+            if title:
+                # tytuł często ma formę "Home - Away" lub "Home vs Away"
+                m = re.split(r"\s[-–—|]\s|\svs\s|\sv\s", title)
+                if len(m) >= 2:
+                    out['home_team'] = m[0].strip()
+                    out['away_team'] = m[1].strip()
+        except (WebDriverException, AttributeError) as e:
+            logger.debug(f"process_match: Błąd pobierania tytułu strony dla {url}: {e}")
+        except Exception as e:
+            logger.warning(f"process_match: Nieoczekiwany błąd przy parsowaniu tytułu: {type(e).__name__}: {e}")
 
-    # NIE MUSIMY KLIKAĆ H2H - już jesteśmy na stronie /h2h/ogolem/
+        # NIE MUSIMY KLIKAĆ H2H - już jesteśmy na stronie /h2h/ogolem/
 
-    # Ponownie pobierz soup gdyby poprzednia próba się nie powiodła
-    try:
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-    except WebDriverException as e:
-        logger.error(f"process_match: Nie można pobrać page_source dla {url}: {e}")
-        return out
+        # Ponownie pobierz soup gdyby poprzednia próba się nie powiodła
+        try:
+            if soup is None:
+                soup = parse_match_sections(driver.page_source)
+        except WebDriverException as e:
+            logger.error(f"process_match: Nie można pobrać page_source dla {url}: {e}")
+            return out
 
-    # try to extract team names from the page header - NOWE SELEKTORY
-    try:
-        # Nowa struktura Livesport (2025)
-        home_el = soup.select_one("div.smv__participantRow.smv__homeParticipant a.participant__participantName")
-        if not home_el:
-            home_el = soup.select_one("a.participant__participantName")
-        if home_el:
-            out['home_team'] = safe_get_text(home_el, out['home_team'])
-    except (AttributeError, TypeError) as e:
-        logger.debug(f"process_match: Błąd przy pobieraniu nazwy gospodarzy: {e}")
+        # try to extract team names from the page header - NOWE SELEKTORY
+        try:
+            # Nowa struktura Livesport (2025)
+            home_el = soup.select_one("div.smv__participantRow.smv__homeParticipant a.participant__participantName")
+            if not home_el:
+                home_el = soup.select_one("a.participant__participantName")
+            if home_el:
+                out['home_team'] = safe_get_text(home_el, out['home_team'])
+        except (AttributeError, TypeError) as e:
+            logger.debug(f"process_match: Błąd przy pobieraniu nazwy gospodarzy: {e}")
 
-    try:
-        away_el = soup.select_one("div.smv__participantRow.smv__awayParticipant a.participant__participantName")
-        if not away_el:
-            # Fallback: weź drugą nazwę drużyny
-            all_teams = soup.select("a.participant__participantName")
-            if len(all_teams) >= 2:
-                away_el = all_teams[1]
-        if away_el:
-            out['away_team'] = safe_get_text(away_el, out['away_team'])
-    except (AttributeError, TypeError) as e:
-        logger.debug(f"process_match: Błąd przy pobieraniu nazwy gości: {e}")
+        try:
+            away_el = soup.select_one("div.smv__participantRow.smv__awayParticipant a.participant__participantName")
+            if not away_el:
+                # Fallback: weź drugą nazwę drużyny
+                all_teams = soup.select("a.participant__participantName")
+                if len(all_teams) >= 2:
+                    away_el = all_teams[1]
+            if away_el:
+                out['away_team'] = safe_get_text(away_el, out['away_team'])
+        except (AttributeError, TypeError) as e:
+            logger.debug(f"process_match: Błąd przy pobieraniu nazwy gości: {e}")
     
-    # Wydobądź datę i godzinę meczu
-    try:
-        # Szukaj różnych możliwych selektorów dla daty/czasu
-        # Próba 1: Element z czasem startu
-        time_el = soup.select_one("div.duelParticipant__startTime")
-        if time_el:
-            out['match_time'] = safe_get_text(time_el, '')
-        
-        # Próba 2: Z tytułu strony (często zawiera datę)
-        if not out['match_time'] and soup.title:
-            title = soup.title.string if soup.title else ''
-            if title:
-                # Szukaj wzorca daty i czasu w tytule
-                # Format: DD.MM.YYYY HH:MM lub podobne
-                date_match = re.search(r'(\d{1,2}\.\d{1,2}\.\d{2,4})\s*(\d{1,2}:\d{2})?', title)
-                if date_match:
-                    date_str = date_match.group(1)
-                    time_str = date_match.group(2) if date_match.group(2) else ''
-                    out['match_time'] = f"{date_str} {time_str}".strip()
-        
-        # Próba 3: Z URL (może zawierać datę)
-        if not out['match_time']:
-            # Czasem data jest w parametrach URL
-            if 'date=' in url:
-                date_param = re.search(r'date=([^&]+)', url)
-                if date_param:
-                    out['match_time'] = date_param.group(1)
-    except (AttributeError, TypeError) as e:
-        logger.debug(f"process_match: Błąd przy wydobywaniu czasu meczu: {e}")
-    except Exception as e:
-        logger.warning(f"process_match: Nieoczekiwany błąd przy parsowaniu czasu: {type(e).__name__}")
+        # Wydobądź datę i godzinę meczu
+        try:
+            # Szukaj różnych możliwych selektorów dla daty/czasu
+            # Próba 1: Element z czasem startu
+            time_el = soup.select_one("div.duelParticipant__startTime")
+            if time_el:
+                out['match_time'] = safe_get_text(time_el, '')
+        
+            # Próba 2: Z tytułu strony (często zawiera datę)
+            if not out['match_time'] and soup.title:
+                title = soup.title.string if soup.title else ''
+                if title:
+                    # Szukaj wzorca daty i czasu w tytule
+                    # Format: DD.MM.YYYY HH:MM lub podobne
+                    date_match = re.search(r'(\d{1,2}\.\d{1,2}\.\d{2,4})\s*(\d{1,2}:\d{2})?', title)
+                    if date_match:
+                        date_str = date_match.group(1)
+                        time_str = date_match.group(2) if date_match.group(2) else ''
+                        out['match_time'] = f"{date_str} {time_str}".strip()
+        
+            # Próba 3: Z URL (może zawierać datę)
+            if not out['match_time']:
+                # Czasem data jest w parametrach URL
+                if 'date=' in url:
+                    date_param = re.search(r'date=([^&]+)', url)
+                    if date_param:
+                        out['match_time'] = date_param.group(1)
+        except (AttributeError, TypeError) as e:
+            logger.debug(f"process_match: Błąd przy wydobywaniu czasu meczu: {e}")
+        except Exception as e:
+            logger.warning(f"process_match: Nieoczekiwany błąd przy parsowaniu czasu: {type(e).__name__}")
 
     # parse H2H
-    h2h = parse_h2h_from_soup(soup, out['home_team'] or '')
+    # 📚 Historia H2H: parser kończy na pierwszym spotkaniu znanym z magazynu
+    if http_data:
+        h2h = http_data['h2h']
+    else:
+        known_until = h2h_known_until(sport, out['home_team'], out['away_team'])
+        h2h = parse_h2h_from_soup(soup, out['home_team'] or '', known_until=known_until)
+    h2h = sync_h2h_history(sport, out['home_team'], out['away_team'], h2h)
     out['h2h_last5'] = h2h
     
     # Wyciągnij datę i wynik ostatniego meczu H2H (pierwszy element)
@@ -900,16 +990,13 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     _timings['h2h'] = time_module.time() - _t_start
     
     # NOWE KRYTERIUM: W zależności od trybu, sprawdzamy gospodarzy lub gości
-    if away_team_focus:
-        # Tryb GOŚCIE: Goście wygrali ≥60% meczów H2H
-        win_rate = (cnt_away / len(h2h)) if len(h2h) > 0 else 0.0
-        out['win_rate'] = win_rate
-        basic_qualifies = win_rate >= 0.60 and len(h2h) >= 1
-    else:
-        # Tryb GOSPODARZE (domyślny): Gospodarze wygrali ≥60% meczów H2H
-        win_rate = (cnt_home / len(h2h)) if len(h2h) > 0 else 0.0
-        out['win_rate'] = win_rate
-        basic_qualifies = win_rate >= 0.60 and len(h2h) >= 1
+    # Tryb GOŚCIE: Goście wygrali ≥60% meczów H2H; GOSPODARZE (domyślny): Gospodarze ≥60%
+    focus_wins = cnt_away if away_team_focus else cnt_home
+    win_rate = (focus_wins / len(h2h)) if len(h2h) > 0 else 0.0
+    out['win_rate'] = win_rate
+    # 🚦 Kwalifikacja etapami: drogie etapy (forma, kursy, Forebet, AI) tylko dla kandydatów
+    qualifier = StagedQualifier()
+    basic_qualifies = qualifier.evaluate_h2h(out['home_team'], out['away_team'], len(h2h), focus_wins)
     
     # FORMA DRUŻYN: Dodaj pola dla zaawansowanej analizy
     out['home_form'] = []  # Forma ogólna (stara metoda)
@@ -921,12 +1008,16 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     out['form_advantage'] = False  # NOWE: Czy gospodarze mają przewagę formy?
     
     # JEŚLI PODSTAWOWO SIĘ KWALIFIKUJE - sprawdź zaawansowaną formę
-    if basic_qualifies:
+    form_stage = qualifier.run_stage('advanced_form')
+    if form_stage:
         team_name = out['away_team'] if away_team_focus else out['home_team']
         print(f"   📊 Podstawowo kwalifikuje ({'GOŚCIE' if away_team_focus else 'GOSPODARZE'}: {team_name}, H2H: {win_rate*100:.0f}%) - sprawdzam formę...")
         try:
             # ZAAWANSOWANA ANALIZA FORMY (3 źródła)
-            advanced_form = extract_advanced_team_form(url, driver)
+            if http_data:
+                advanced_form = _advanced_form_from_http(http_data)
+            else:
+                advanced_form = extract_advanced_team_form(url, driver)
             
             out['home_form_overall'] = advanced_form['home_form_overall']
             out['home_form_home'] = advanced_form['home_form_home']
@@ -984,13 +1075,25 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
                 out['away_form_away'] = away_form
             except (AttributeError, TypeError, WebDriverException) as e:
                 logger.debug(f"Błąd przy pobieraniu formy fallback: {e}")
+    elif form_stage is SHED:
+        # ⏱️ --deadline zrzucił formę (mało H2H) - mecz nadal kwalifikuje się po H2H, bez pobierania formy
+        out['qualifies'] = basic_qualifies
+        print(f"   ✅ KWALIFIKUJE (H2H: {win_rate*100:.0f}%, forma pominięta - brak czasu)")
+        if http_data:
+            # Forma z już pobranych danych HTTP - bez dodatkowych stron
+            out['home_form'] = out['home_form_overall'] = http_data['home_form_overall']
+            out['away_form'] = out['away_form_overall'] = http_data['away_form_overall']
     else:
         # Nie kwalifikuje się podstawowo - ale nadal pobierz formę dla wyświetlenia
         out['qualifies'] = False
         # Pobierz podstawową formę (dla meczów niekwalifikujących się)
         try:
-            home_form = extract_team_form(soup, driver, 'home', out.get('home_team'))
-            away_form = extract_team_form(soup, driver, 'away', out.get('away_team'))
+            if http_data:
+                home_form = http_data['home_form_overall']
+                away_form = http_data['away_form_overall']
+            else:
+                home_form = extract_team_form(soup, driver, 'home', out.get('home_team'))
+                away_form = extract_team_form(soup, driver, 'away', out.get('away_team'))
             out['home_form'] = home_form
             out['away_form'] = away_form
             out['home_form_overall'] = home_form
@@ -1004,7 +1107,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     # 🔥 Kursy bukmacherskie - TYLKO dla kwalifikujących się meczów w sportach z kursami
     # OPTYMALIZACJA: Pominięcie kursów oszczędza ~100s/mecz (12 API calls × timeout)
     _SPORTS_WITH_ODDS = {'football', 'soccer', 'basketball', 'tennis', 'hockey', 'ice-hockey', 'handball', 'volleyball'}
-    _skip_odds = sport.lower() not in _SPORTS_WITH_ODDS or not out.get('qualifies')
+    _skip_odds = sport.lower() not in _SPORTS_WITH_ODDS or not qualifier.run_stage('odds')
     
     if _skip_odds:
         _reason = 'nie kwalifikuje się' if not out.get('qualifies') else f'sport {sport} bez kursów'
@@ -1033,7 +1136,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     # FOREBET PREDICTIONS - TYLKO jeśli mecz KWALIFIKUJE SIĘ!
     # 🔥 OPTYMALIZACJA: Skip Forebet dla meczów które i tak nie przejdą
     _t_forebet_start = time_module.time()
-    if use_forebet and FOREBET_AVAILABLE and out.get('qualifies') and out.get('home_team') and out.get('away_team'):
+    if use_forebet and FOREBET_AVAILABLE and qualifier.run_stage('forebet') and out.get('home_team') and out.get('away_team'):
         try:
             print(f"      🎯 Forebet: Pobieram predykcję...")
             
@@ -1086,7 +1189,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     # GEMINI AI ANALYSIS (Faza 3)
     # ============================================
     _t_gemini_start = time_module.time()
-    if use_gemini and out.get('qualifies'):
+    if use_gemini and qualifier.run_stage('gemini'):
         try:
             print("      🤖 Gemini AI analysis...")
             
@@ -1144,7 +1247,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     # SOFASCORE INTEGRATION - "Who will win?" predictions
     # ========================================================================
     _t_sofascore_start = time_module.time()
-    if use_sofascore and out.get('qualifies'):
+    if use_sofascore and qualifier.run_stage('sofascore'):
         try:
             print(f"   🎯 SofaScore: Pobieranie predykcji...")
             from sofascore_scraper import scrape_sofascore_full
@@ -1181,7 +1284,7 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
     # FLASHSCORE ODDS - tylko jeśli brak kursów z Livesport AND kwalifikuje się AND sport z kursami
     _t_flash_start = time_module.time()
     has_livesport_odds = out.get('home_odds') and out.get('away_odds')
-    if use_flashscore and FLASHSCORE_AVAILABLE and out.get('qualifies') and out.get('home_team') and out.get('away_team') and not has_livesport_odds and not _skip_odds:
+    if use_flashscore and FLASHSCORE_AVAILABLE and out.get('home_team') and out.get('away_team') and not has_livesport_odds and not _skip_odds:
         try:
             print(f"   💰 FlashScore: Pobieranie kursów...")
             
@@ -1284,6 +1387,12 @@ def process_match(url: str, driver: webdriver.Chrome, away_team_focus: bool = Fa
         print(f"   📊 Integracja: [{sources_str}] | Brak: [{missing_str}]")
         print(f"   ⏱️ TIME: total={_t_total:.1f}s {time_str} qual={qual_str}")
 
+    # 🚦 Etap odcięcia i pominięte drogie etapy (podsumowanie: print_qualification_report)
+    qualifier.annotate(out)
+
+    # ⏱️ Rekord JSONL z czasami etapów (podsumowanie p50/p90/p99 na koniec przebiegu)
+    record_stage_timings(sport, _timings, _t_total, url, out.get('qualifies'))
+
     return out
 
 
@@ -1355,28 +1464,16 @@ def extract_advanced_team_form(match_url: str, driver: webdriver.Chrome) -> Dict
     }
     
     try:
-        # Konwertuj URL meczu na URL H2H
-        # Z: /mecz/pilka-nozna/team1/team2/?mid=XXX
-        # Na: /mecz/pilka-nozna/team1/team2/h2h/ogolem/?mid=XXX (lub /u-siebie/, /na-wyjezdzie/)
-        
+        # URL meczu -> URLe zakładek H2H (h2h_page_url)
         if '/match/' in match_url or '/mecz/' in match_url:
-            base_url = match_url.split('?')[0]  # Usuń query params
-            
-            # Usuń końcówkę "/szczegoly" lub inną stronę, jeśli istnieje
-            base_url = base_url.rstrip('/')
-            if base_url.endswith('/szczegoly') or base_url.endswith('/szczegoly/'):
-                base_url = base_url.replace('/szczegoly', '')
-            
-            mid = match_url.split('mid=')[1] if 'mid=' in match_url else ''
-            
-            # 1. FORMA OGÓLNA
-            h2h_overall_url = f"{base_url}/h2h/ogolem/?mid={mid}"
+            # 1. FORMA OGÓLNA (snapshot zapisany przez process_match - bez ponownego ładowania)
+            h2h_overall_url = h2h_page_url(match_url, 'ogolem')
             result['home_form_overall'], result['away_form_overall'] = _extract_form_from_h2h_page(
                 h2h_overall_url, driver, 'overall'
             )
             
             # 2. FORMA U SIEBIE (gospodarze)
-            h2h_home_url = f"{base_url}/h2h/u-siebie/?mid={mid}"
+            h2h_home_url = h2h_page_url(match_url, 'u-siebie')
             result['home_form_home'], _ = _extract_form_from_h2h_page(
                 h2h_home_url, driver, 'home'
             )
@@ -1398,6 +1495,70 @@ def extract_advanced_team_form(match_url: str, driver: webdriver.Chrome) -> Dict
     return result
 
 
+def h2h_page_url(match_url: str, tab: str = 'ogolem') -> str:
+    """
+    URL zakładki H2H meczu (klucz snapshotu w h2h_snapshot_cache).
+    
+    Z: /mecz/pilka-nozna/team1/team2/?mid=XXX
+    Na: /mecz/pilka-nozna/team1/team2/h2h/<tab>/?mid=XXX (tab: ogolem, u-siebie, na-wyjezdzie)
+    """
+    base_url = match_url.split('?')[0].rstrip('/')  # Usuń query params
+    # Usuń końcówkę "/szczegoly", jeśli istnieje
+    if base_url.endswith('/szczegoly'):
+        base_url = base_url[:-len('/szczegoly')]
+    mid = match_url.split('mid=')[1] if 'mid=' in match_url else ''
+    return f"{base_url}/h2h/{tab}/?mid={mid}"
+
+
+def _get_h2h_snapshot(url: str, driver: webdriver.Chrome) -> BeautifulSoup:
+    """
+    Zwraca sparsowany snapshot strony H2H - z cache (per mecz) lub ładując stronę.
+    
+    Zakładkę H2H ogółem zapisuje do cache process_match (ten sam snapshot co H2H).
+    Bez snapshotu: jeśli driver już jest na tym URLu, strona NIE jest ładowana
+    ponownie - tylko scroll (lazy-load) i odczyt DOM.
+    """
+    soup = h2h_snapshot_cache.get(url)
+    if soup is not None:
+        return soup
+    
+    sport = detect_sport_from_url(url)
+    try:
+        on_page = snapshot_key(driver.current_url) == snapshot_key(url)
+    except WebDriverException:
+        on_page = False
+    
+    if not on_page:
+        driver.get(url)
+        h2h_snapshot_cache.record_page_load()
+        wait_for_page(driver, 'h2h', sport, legacy_sleep=3.0)  # Czas na załadowanie dynamicznych elementów
+        record_page_metrics(driver)
+    
+    # Scroll down to trigger lazy-loading content
+    try:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        wait_for_page(driver, 'h2h', sport, legacy_sleep=1.0)
+    except (WebDriverException, TimeoutException) as e:
+        logger.debug(f"Scroll dla lazy-loading nie powiódł się: {e}")
+    
+    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    h2h_snapshot_cache.put(url, soup)
+    return soup
+
+
+def _advanced_form_from_http(http_data: Dict) -> Dict:
+    """Zaawansowana forma (format extract_advanced_team_form) z danych klienta HTTP."""
+    result = {
+        'home_form_overall': http_data.get('home_form_overall', []),
+        'home_form_home': http_data.get('home_form_home', []),
+        'away_form_overall': http_data.get('away_form_overall', []),
+        'away_form_away': http_data.get('away_form_away', []) or http_data.get('away_form_overall', [])[:5],
+    }
+    result['form_advantage'] = _analyze_form_advantage(result)
+    result['away_advantage'] = _analyze_away_form_advantage(result)
+    return result
+
+
 def _extract_form_from_h2h_page(url: str, driver: webdriver.Chrome, context: str) -> tuple:
     """
     Pomocnicza funkcja do ekstraktowania formy z konkretnej strony H2H.
@@ -1414,17 +1575,7 @@ def _extract_form_from_h2h_page(url: str, driver: webdriver.Chrome, context: str
     away_form = []
     
     try:
-        driver.get(url)
-        time.sleep(3.0)  # Czas na załadowanie dynamicznych elementów
-        
-        # Scroll down to trigger lazy-loading content
-        try:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1.0)
-        except (WebDriverException, TimeoutException) as e:
-            logger.debug(f"Scroll dla lazy-loading nie powiódł się: {e}")
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        soup = _get_h2h_snapshot(url, driver)
         
         # DEBUG: Sprawdź czy strona się załadowała
         page_text = soup.get_text()
@@ -1551,11 +1702,8 @@ def _extract_away_form_from_overall(url: str, driver: webdriver.Chrome, away_for
     away_form_away = []
     
     try:
-        # Strona jest już załadowana z wcześniejszego wywołania, ale dla pewności odśwież
-        driver.get(url)
-        time.sleep(2.0)
-        
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Snapshot strony ogółem z cache (załadowany przy formie ogólnej) - bez ponownej nawigacji
+        soup = _get_h2h_snapshot(url, driver)
         
         # Szukaj drugiej sekcji H2H (sekcja gości)
         h2h_sections = soup.find_all('div', class_='h2h__section')
@@ -2096,13 +2244,30 @@ def detect_tennis_surface(soup: BeautifulSoup, url: str) -> Optional[str]:
         return None
 
 
-def extract_player_form_simple(soup: BeautifulSoup, player_name: str, h2h_matches: List[Dict]) -> List[str]:
+def _measured_surface_rates(profile: Optional[Dict], estimate: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    """Win rate na nawierzchniach z magazynu zawodników (tylko nawierzchnie z rozegranymi meczami)."""
+    measured = (profile or {}).get('surface_stats') or {}
+    rates = dict(estimate or {})
+    for surface, stat in measured.items():
+        if isinstance(stat, dict) and stat.get('total'):
+            rates[surface] = stat.get('win_rate', 0.0)
+    return rates or estimate
+
+
+DEFAULT_TENNIS_FORM = ('W', 'W', 'W', 'L', 'L')  # Przeciętna forma (60% win rate) gdy brak danych
+
+
+def extract_player_form_simple(soup: BeautifulSoup, player_name: str, h2h_matches: List[Dict],
+                               fallback: bool = True) -> List[str]:
     """
     Wydobądź formę zawodnika (ostatnie wyniki).
     
     Używa H2H jako proxy - bierze ostatnie mecze zawodnika przeciwko WSZYSTKIM
     przeciwnikom i ekstraktuje W/L pattern.
     
+    Args:
+        fallback: Gdy strona nie daje formy - DEFAULT_TENNIS_FORM (True) lub [] (False)
+    
     Returns:
         ['W', 'W', 'L', 'W', 'W']  # W=wygrana, L=przegrana
     """
@@ -2124,7 +2289,7 @@ def extract_player_form_simple(soup: BeautifulSoup, player_name: str, h2h_matche
         # METODA 2: Użyj H2H jako proxy (ostatnie mecze tego zawodnika)
         if not h2h_matches:
             # Jeśli brak H2H, symuluj przeciętną formę (3W/2L = 60%)
-            return ['W', 'W', 'W', 'L', 'L']
+            return list(DEFAULT_TENNIS_FORM) if fallback else []
         
         player_form = []
         player_normalized = player_name.lower().strip()
@@ -2163,13 +2328,24 @@ def extract_player_form_simple(soup: BeautifulSoup, player_name: str, h2h_matche
         
         # Jeśli NADAL brak wyników (bardzo rzadkie H2H), użyj domyślnej formy
         if not player_form:
-            return ['W', 'W', 'W', 'L', 'L']  # Domyślnie: 60% win rate
+            return list(DEFAULT_TENNIS_FORM) if fallback else []  # Domyślnie: 60% win rate
         
         return player_form[:5]
     
     except Exception:
         # Fallback: przeciętna forma
-        return ['W', 'W', 'W', 'L', 'L']
+        return list(DEFAULT_TENNIS_FORM) if fallback else []
+
+
+def merge_player_form(page_form: List[str], profile: Dict) -> List[str]:
+    """
+    Forma zawodnika: strona meczu ma pierwszeństwo, profil z magazynu (tennis_player_store)
+    tylko uzupełnia brak; bez obu - DEFAULT_TENNIS_FORM.
+    """
+    if page_form:
+        return page_form
+    recent = [m.get('result') for m in (profile or {}).get('form') or [] if m.get('result') in ('W', 'L')]
+    return recent[:5] if recent else list(DEFAULT_TENNIS_FORM)
 
 
 def calculate_surface_stats_from_h2h(
@@ -2316,9 +2492,11 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
             print(f"   ⚠️ Tennis: Nieprawidłowy URL: {url[:50]}...")
             return out
         
+        readiness.begin_match()
+        
         # KROK 1: Przejdź do strony meczu
         driver.get(url)
-        time.sleep(2.5)
+        wait_for_page(driver, 'match', 'tennis', legacy_sleep=2.5)
         
         soup = BeautifulSoup(driver.page_source, 'html.parser')
         
@@ -2334,14 +2512,14 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
             # Zbuduj pełny URL do H2H
             h2h_url = 'https://www.livesport.com' + h2h_link if h2h_link.startswith('/') else h2h_link
             driver.get(h2h_url)
-            time.sleep(3.0)  # Tennis H2H wymaga więcej czasu na załadowanie
+            wait_for_page(driver, 'h2h', 'tennis', legacy_sleep=3.0)  # Tennis H2H wymaga więcej czasu na załadowanie
         else:
             # Fallback: użyj starej metody jeśli nie znaleziono linku
             h2h_url = url.replace('/szczegoly/', '/h2h/wszystkie-nawierzchnie/')
             if 'szczegoly' not in url and 'h2h' not in url:
                 h2h_url = url.rstrip('/') + '/h2h/wszystkie-nawierzchnie/'
             driver.get(h2h_url)
-            time.sleep(3.0)
+            wait_for_page(driver, 'h2h', 'tennis', legacy_sleep=3.0)
             
     except WebDriverException as e:
         print(f"   ⚠️ Błąd nawigacji dla tenisa: {e}")
@@ -2399,7 +2577,9 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
         pass
 
     # Parse H2H
-    h2h = parse_h2h_from_soup(soup, out['home_team'] or '')
+    known_until = h2h_known_until('tennis', out['home_team'], out['away_team'])
+    h2h = parse_h2h_from_soup(soup, out['home_team'] or '', known_until=known_until)
+    h2h = sync_h2h_history('tennis', out['home_team'], out['away_team'], h2h)
     out['h2h_last5'] = h2h
 
     # LOGIKA KWALIFIKACJI DLA TENISA
@@ -2466,8 +2646,27 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
     
     # 3. FORMA - wydobądź ostatnie wyniki (jeśli dostępne)
     # Note: To wymaga dodatkowych requestów, więc na razie używamy uproszczonej wersji
-    out['form_a'] = extract_player_form_simple(soup, player_a, h2h)
-    out['form_b'] = extract_player_form_simple(soup, player_b, h2h)
+    # (bez domyślnej formy - brak uzupełnia profil z magazynu w 3b)
+    out['form_a'] = extract_player_form_simple(soup, player_a, h2h, fallback=False)
+    out['form_b'] = extract_player_form_simple(soup, player_b, h2h, fallback=False)
+    
+    # 3b. PROFILE ZAWODNIKÓW - magazyn SQLite najpierw (tennis_player_store);
+    #     strony zawodników tylko dla nieświeżych pól i tylko przy TENNIS_PLAYER_PROFILES=1
+    profiles = {}
+    for side, player in (('a', player_a), ('b', player_b)):
+        if not player:
+            continue
+        if out[f'ranking_{side}']:
+            player_store.put(player, ranking=out[f'ranking_{side}'])
+        try:
+            profile = get_player_profile(driver, player, soup, navigate=TENNIS_PLAYER_PROFILES)
+        except WebDriverException as e:
+            logger.debug(f"Profil zawodnika {player}: {e}")
+            profile = player_store.get_profile(player)
+        if not out[f'ranking_{side}'] and profile.get('ranking'):
+            out[f'ranking_{side}'] = profile['ranking']
+        out[f'form_{side}'] = merge_player_form(out[f'form_{side}'], profile)
+        profiles[side] = profile
     
     # 4. KURSY BUKMACHERSKIE - dodatkowa informacja (NIE wpływa na scoring!)
     odds = extract_betting_odds(soup)
@@ -2479,11 +2678,13 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
     # ===================================================================
     
     # WALIDACJA: Sprawdź czy mamy wymagane dane
-    if not player_a or not player_b:
+    # 🚦 Kwalifikacja etapami: teams -> (ranking | tennis_score)
+    qualifier = StagedQualifier()
+    if not qualifier.check(STAGE_TEAMS, bool(player_a and player_b)):
         print(f"   ⚠️ Tennis: Brak nazw zawodników (A: {player_a}, B: {player_b})")
         out['qualifies'] = False
         out['advanced_score'] = 0.0
-        return out
+        return qualifier.annotate(out)
     
     # Walidacja H2H - jeśli brak, użyj fallback opartego na rankingu
     if len(h2h) == 0:
@@ -2503,7 +2704,8 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
             out['qualifies'] = False
             out['advanced_score'] = 0.0
             print(f"   ❌ Brak H2H i rankingu - nie można ocenić meczu")
-        return out
+        qualifier.check(STAGE_RANKING, out['qualifies'])
+        return qualifier.annotate(out)
     
     try:
         from tennis_advanced import TennisMatchAnalyzer
@@ -2520,6 +2722,9 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
         # Surface stats - uproszczona wersja (obliczamy z dostępnych H2H + ranking)
         surface_stats_a = calculate_surface_stats_from_h2h(h2h, player_a, out['surface'], out['ranking_a'])
         surface_stats_b = calculate_surface_stats_from_h2h(h2h, player_b, out['surface'], out['ranking_b'])
+        # Zmierzony bilans z profilu zawodnika zastępuje szacunek z H2H
+        surface_stats_a = _measured_surface_rates(profiles.get('a'), surface_stats_a)
+        surface_stats_b = _measured_surface_rates(profiles.get('b'), surface_stats_b)
         
         # Analiza
         analysis = analyzer.analyze_match(
@@ -2634,7 +2839,8 @@ def process_match_tennis(url: str, driver: webdriver.Chrome) -> Dict:
     if out.get('ranking_a') and out.get('ranking_b'):
         out['ranking_info'] = f"ATP/WTA: #{out['ranking_a']} vs #{out['ranking_b']}"
 
-    return out
+    qualifier.check(STAGE_TENNIS_SCORE, out.get('qualifies'))
+    return qualifier.annotate(out)
 
 
 def _accept_cookies_on_page(driver: webdriver.Chrome):
@@ -2685,8 +2891,20 @@ def _count_match_links_in_page(driver: webdriver.Chrome) -> int:
         return 0
 
 
-def _extract_match_links_from_soup(soup: BeautifulSoup, sport_url: str, existing_links: set, leagues: List[str] = None) -> List[str]:
-    """Wyciąga linki do meczów z BeautifulSoup. Zwraca unikalne nowe linki."""
+def _kickoff_from_anchor(a) -> Optional[str]:
+    """Godzina rozpoczęcia ('HH:MM') z wiersza meczu na liście dnia (div.event__match > .event__time)."""
+    try:
+        row = a.find_parent(class_=re.compile(r'event__match'))
+        time_el = row.select_one('[class*="event__time"]') if row else None
+        match = re.search(r'\b(\d{1,2}:\d{2})\b', time_el.get_text(' ', strip=True)) if time_el else None
+        return match.group(1).zfill(5) if match else None
+    except (AttributeError, TypeError):
+        return None
+
+
+def _extract_match_links_from_soup(soup: BeautifulSoup, sport_url: str, existing_links: set, leagues: List[str] = None,
+                                   kickoffs: Dict[str, str] = None) -> List[str]:
+    """Wyciąga linki do meczów z BeautifulSoup. Zwraca unikalne nowe linki (kickoffs: URL -> 'HH:MM')."""
     sport_links = []
     # Rozszerzone wzorce URL — Livesport zmienia endpointy
     patterns = ['/match/', '/mecz/', '/#/match/', '/#id/', '/event/', '/detail/']
@@ -2730,11 +2948,185 @@ def _extract_match_links_from_soup(soup: BeautifulSoup, sport_url: str, existing
             if href not in existing_links:
                 existing_links.add(href)
                 sport_links.append(href)
+                if kickoffs is not None:
+                    kickoff = _kickoff_from_anchor(a)
+                    if kickoff:
+                        kickoffs[href] = kickoff
     
     return sport_links, debug_patterns_found
 
 
-def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[str] = None, leagues: List[str] = None) -> List[str]:
+def _collect_sport_links(driver: webdriver.Chrome, sport: str, date: str, leagues: List[str] = None) -> List[str]:
+    """Zbiera linki jednego sportu (lista meczów dnia + consent + smart scroll). Pusta lista przy błędzie."""
+    IS_CI = os.environ.get('GITHUB_ACTIONS') == 'true' or os.environ.get('CI') == 'true'
+    sport_url = SPORT_URLS[sport]
+    print(f"\n🔍 Zbieranie linków dla: {sport}")
+    
+    try:
+        # Dodaj datę do URL aby pobrać mecze z konkretnego dnia
+        date_url = f"{sport_url}?date={date}"
+        print(f"   URL: {date_url}")
+        driver.get(date_url)
+        
+        # Czas na pierwsze załadowanie strony (czekamy na linki meczów, max dawny sleep)
+        if sport in ['volleyball', 'handball', 'rugby']:
+            wait_for_page(driver, 'listing', sport, legacy_sleep=3.5)
+        else:
+            wait_for_page(driver, 'listing', sport, legacy_sleep=2.5)
+        
+        # 🍪 Akceptuj consent banner (może blokować lazy-load!)
+        _accept_cookies_on_page(driver)
+        
+        # 📊 DEBUG CI: Sprawdź co jest na stronie PRZED scrollowaniem
+        initial_link_count = _count_match_links_in_page(driver)
+        page_title = driver.title or 'N/A'
+        current_url = driver.current_url
+        print(f"   📊 Strona załadowana: title='{page_title[:60]}', linki_przed_scroll={initial_link_count}")
+        print(f"   📊 Aktualny URL: {current_url}")
+        
+        if IS_CI and initial_link_count == 0:
+            # DIAGNOZA: brak linków po załadowaniu — może Cloudflare/consent blokuje
+            page_source_len = len(driver.page_source)
+            print(f"   ⚠️  CI DEBUG: 0 linków! page_source_len={page_source_len}")
+            # Sprawdź czy strona ma treść sportową
+            has_content = driver.execute_script("""
+                var body = document.body ? document.body.innerText : '';
+                return {
+                    length: body.length,
+                    has_event: body.indexOf('event') !== -1 || body.indexOf('mecz') !== -1,
+                    has_league: body.indexOf('liga') !== -1 || body.indexOf('league') !== -1,
+                    has_cloudflare: body.indexOf('Cloudflare') !== -1 || body.indexOf('challenge') !== -1,
+                    sample: body.substring(0, 300)
+                };
+            """)
+            print(f"   ⚠️  CI DEBUG: body_len={has_content.get('length')}, has_event={has_content.get('has_event')}, has_league={has_content.get('has_league')}, cloudflare={has_content.get('has_cloudflare')}")
+            if has_content.get('sample'):
+                print(f"   ⚠️  CI DEBUG: body[0:300] = {has_content['sample'][:200]}")
+            
+            # Retry: poczekaj dodatkowe 3s i sprawdź ponownie
+            print(f"   🔄 Dodatkowe oczekiwanie (max 3s)...")
+            wait_for_page(driver, 'listing', sport, legacy_sleep=3.0)
+            _accept_cookies_on_page(driver)
+            initial_link_count = _count_match_links_in_page(driver)
+            print(f"   📊 Po retry: linki={initial_link_count}")
+        
+        # ========================================
+        # SMART SCROLL: Dynamicznie wg znalezionych linków
+        # ========================================
+        # Maks scrolli: football=15, inne=8. Auto-exit jeśli 3x z rzędu brak nowych.
+        max_scrolls = 15 if sport == 'football' else (10 if sport in ['basketball', 'tennis'] else 8)
+        
+        prev_link_count = initial_link_count
+        no_new_links_count = 0
+        
+        for scroll_i in range(max_scrolls):
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            time.sleep(0.6)  # Krótki wait — wystarczy do lazy-load
+            
+            # Policz aktualną liczbę linków (szybkie JS, bez BS4)
+            current_count = _count_match_links_in_page(driver)
+            
+            if current_count <= prev_link_count:
+                no_new_links_count += 1
+                if no_new_links_count >= 3:
+                    print(f"   ℹ️ Stop scrollowania po {scroll_i+1} scrollach (brak nowych linków, total={current_count})")
+                    break
+            else:
+                no_new_links_count = 0
+                if (scroll_i + 1) % 5 == 0:
+                    print(f"   📜 Scroll {scroll_i+1}/{max_scrolls}: {current_count} linków znalezionych")
+            prev_link_count = current_count
+        
+        # Scroll do góry i parsuj
+        driver.execute_script("window.scrollTo(0, 0);")
+        time.sleep(0.3)
+        
+        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        sport_links, debug_patterns_found = _extract_match_links_from_soup(
+            soup, sport_url, set(), leagues, kickoffs=LINK_KICKOFFS
+        )
+        
+        # Debug info gdy za mało meczów
+        if len(sport_links) < 20 or (sport == 'football' and len(sport_links) < 100):
+            print(f"   ⚠️  DEBUG - Wzorce znalezione: {debug_patterns_found}")
+            anchors = soup.find_all('a', href=True)
+            print(f"   ⚠️  DEBUG - Wszystkich <a> na stronie: {len(anchors)}")
+            sample_hrefs = [a['href'] for a in anchors[:30] if a.get('href')]
+            print(f"   ⚠️  DEBUG - Przykładowe hrefs (5): {sample_hrefs[:5]}")
+            
+            # Dodatkowe: szukaj elementów które mogą być meczami ale nie są <a>
+            match_elements = soup.select('[class*="event"], [class*="match"], [class*="sportName"], [data-id]')
+            if match_elements:
+                print(f"   ⚠️  DEBUG - Elementy match/event (nie <a>): {len(match_elements)}")
+                for el in match_elements[:3]:
+                    print(f"      tag={el.name}, classes={el.get('class', [])[:3]}, data-id={el.get('data-id', 'N/A')}")
+        
+        print(f"   ✓ Znaleziono {len(sport_links)} meczów dla {sport}")
+        return sport_links
+        
+    except Exception as e:
+        print(f"   ✗ Błąd przy zbieraniu linków dla {sport}: {e}")
+        import traceback
+        traceback.print_exc()
+        return []
+
+
+def _collect_links_parallel(driver: webdriver.Chrome, sports: List[str], date: str, leagues: List[str] = None,
+                            headless: bool = True, workers: int = None) -> Dict[str, List[str]]:
+    """
+    Zbiera linki dla wielu sportów równolegle.
+
+    Jedna sesja Selenium nie obsłuży kilku kart naraz, więc każdy wątek ma własną
+    przeglądarkę: główny driver + (workers - 1) dodatkowych, zamykanych po zebraniu.
+    Wątki pobierają sporty ze wspólnej kolejki - gdy dodatkowa przeglądarka
+    nie wystartuje, jej sporty zbiera główny driver.
+    """
+    workers = LINK_DISCOVERY_WORKERS if workers is None else workers
+    workers = max(1, min(workers, len(sports)))
+    results: Dict[str, List[str]] = {}
+    if workers == 1:
+        for sport in sports:
+            results[sport] = _collect_sport_links(driver, sport, date, leagues)
+        return results
+
+    print(f"\n⚡ Równoległe zbieranie linków: {len(sports)} sportów, {workers} przeglądarki")
+    task_queue = queue.Queue()
+    for sport in sports:
+        task_queue.put(sport)
+
+    def _worker(own_driver):
+        worker_driver = own_driver
+        if worker_driver is None:
+            try:
+                worker_driver = start_driver(headless=headless)
+            except Exception as e:
+                print(f"   ⚠️ Dodatkowa przeglądarka do zbierania linków niedostępna: {type(e).__name__}")
+                return
+        try:
+            while True:
+                try:
+                    sport = task_queue.get_nowait()
+                except queue.Empty:
+                    return
+                results[sport] = _collect_sport_links(worker_driver, sport, date, leagues)
+        finally:
+            if own_driver is None:
+                try:
+                    worker_driver.quit()
+                except Exception:
+                    pass
+
+    helpers = [threading.Thread(target=_worker, args=(None,), daemon=True) for _ in range(workers - 1)]
+    for t in helpers:
+        t.start()
+    _worker(driver)  # Główny driver w bieżącym wątku
+    for t in helpers:
+        t.join()
+    return results
+
+
+def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[str] = None, leagues: List[str] = None,
+                             headless: bool = True, workers: int = None) -> List[str]:
     """Zbiera linki do meczów z głównej strony dla danego dnia.
     
     OPTYMALIZACJA CI:
@@ -2742,12 +3134,16 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
     - Cookie consent: automatycznie zamyka bannery blokujące lazy-load
     - Rozszerzone wzorce URL: /match/, /mecz/, /event/, /detail/, /#id/
     - Debug logging: w CI loguje szczegóły dla diagnozy problemów
+    - 🔗 Cache linków per (data, sport, ligi) z TTL - kolejne uruchomienia dnia startują od razu
+    - ⚡ Sporty spoza cache zbierane równolegle (osobne przeglądarki)
     
     Args:
         driver: Selenium WebDriver
         date: Data w formacie 'YYYY-MM-DD'
         sports: Lista sportów do przetworzenia (np. ['football', 'basketball'])
         leagues: Lista slug-ów lig do filtrowania (np. ['ekstraklasa', 'premier-league'])
+        headless: Tryb headless dodatkowych przeglądarek
+        workers: Liczba przeglądarek do zbierania (domyślnie LINK_DISCOVERY_WORKERS)
     
     Returns:
         Lista URLi do meczów
@@ -2755,125 +3151,42 @@ def get_match_links_from_day(driver: webdriver.Chrome, date: str, sports: List[s
     if not sports:
         sports = ['football']  # domyślnie piłka nożna
     
-    IS_CI = os.environ.get('GITHUB_ACTIONS') == 'true' or os.environ.get('CI') == 'true'
-    all_links = []
-    all_links_set = set()
-    
+    valid_sports = []
     for sport in sports:
         if sport not in SPORT_URLS:
             print(f"Ostrzeżenie: nieznany sport '{sport}', pomijam")
             continue
-        
-        sport_url = SPORT_URLS[sport]
-        print(f"\n🔍 Zbieranie linków dla: {sport}")
-        
-        try:
-            # Dodaj datę do URL aby pobrać mecze z konkretnego dnia
-            date_url = f"{sport_url}?date={date}"
-            print(f"   URL: {date_url}")
-            driver.get(date_url)
-            
-            # Czas na pierwsze załadowanie strony
-            if sport in ['volleyball', 'handball', 'rugby']:
-                time.sleep(3.5)
-            else:
-                time.sleep(2.5)
-            
-            # 🍪 Akceptuj consent banner (może blokować lazy-load!)
-            _accept_cookies_on_page(driver)
-            
-            # 📊 DEBUG CI: Sprawdź co jest na stronie PRZED scrollowaniem
-            initial_link_count = _count_match_links_in_page(driver)
-            page_title = driver.title or 'N/A'
-            current_url = driver.current_url
-            print(f"   📊 Strona załadowana: title='{page_title[:60]}', linki_przed_scroll={initial_link_count}")
-            print(f"   📊 Aktualny URL: {current_url}")
-            
-            if IS_CI and initial_link_count == 0:
-                # DIAGNOZA: brak linków po załadowaniu — może Cloudflare/consent blokuje
-                page_source_len = len(driver.page_source)
-                print(f"   ⚠️  CI DEBUG: 0 linków! page_source_len={page_source_len}")
-                # Sprawdź czy strona ma treść sportową
-                has_content = driver.execute_script("""
-                    var body = document.body ? document.body.innerText : '';
-                    return {
-                        length: body.length,
-                        has_event: body.indexOf('event') !== -1 || body.indexOf('mecz') !== -1,
-                        has_league: body.indexOf('liga') !== -1 || body.indexOf('league') !== -1,
-                        has_cloudflare: body.indexOf('Cloudflare') !== -1 || body.indexOf('challenge') !== -1,
-                        sample: body.substring(0, 300)
-                    };
-                """)
-                print(f"   ⚠️  CI DEBUG: body_len={has_content.get('length')}, has_event={has_content.get('has_event')}, has_league={has_content.get('has_league')}, cloudflare={has_content.get('has_cloudflare')}")
-                if has_content.get('sample'):
-                    print(f"   ⚠️  CI DEBUG: body[0:300] = {has_content['sample'][:200]}")
-                
-                # Retry: poczekaj dodatkowe 3s i sprawdź ponownie
-                print(f"   🔄 Dodatkowe oczekiwanie 3s...")
-                time.sleep(3.0)
-                _accept_cookies_on_page(driver)
-                initial_link_count = _count_match_links_in_page(driver)
-                print(f"   📊 Po retry: linki={initial_link_count}")
-            
-            # ========================================
-            # SMART SCROLL: Dynamicznie wg znalezionych linków
-            # ========================================
-            # Maks scrolli: football=15, inne=8. Auto-exit jeśli 3x z rzędu brak nowych.
-            max_scrolls = 15 if sport == 'football' else (10 if sport in ['basketball', 'tennis'] else 8)
-            
-            prev_link_count = initial_link_count
-            no_new_links_count = 0
-            
-            for scroll_i in range(max_scrolls):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(0.6)  # Krótki wait — wystarczy do lazy-load
-                
-                # Policz aktualną liczbę linków (szybkie JS, bez BS4)
-                current_count = _count_match_links_in_page(driver)
-                
-                if current_count <= prev_link_count:
-                    no_new_links_count += 1
-                    if no_new_links_count >= 3:
-                        print(f"   ℹ️ Stop scrollowania po {scroll_i+1} scrollach (brak nowych linków, total={current_count})")
-                        break
-                else:
-                    no_new_links_count = 0
-                    if (scroll_i + 1) % 5 == 0:
-                        print(f"   📜 Scroll {scroll_i+1}/{max_scrolls}: {current_count} linków znalezionych")
-                prev_link_count = current_count
-            
-            # Scroll do góry i parsuj
-            driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.3)
-            
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            sport_links, debug_patterns_found = _extract_match_links_from_soup(
-                soup, sport_url, all_links_set, leagues
-            )
-            
-            # Debug info gdy za mało meczów
-            if len(sport_links) < 20 or (sport == 'football' and len(sport_links) < 100):
-                print(f"   ⚠️  DEBUG - Wzorce znalezione: {debug_patterns_found}")
-                anchors = soup.find_all('a', href=True)
-                print(f"   ⚠️  DEBUG - Wszystkich <a> na stronie: {len(anchors)}")
-                sample_hrefs = [a['href'] for a in anchors[:30] if a.get('href')]
-                print(f"   ⚠️  DEBUG - Przykładowe hrefs (5): {sample_hrefs[:5]}")
-                
-                # Dodatkowe: szukaj elementów które mogą być meczami ale nie są <a>
-                match_elements = soup.select('[class*="event"], [class*="match"], [class*="sportName"], [data-id]')
-                if match_elements:
-                    print(f"   ⚠️  DEBUG - Elementy match/event (nie <a>): {len(match_elements)}")
-                    for el in match_elements[:3]:
-                        print(f"      tag={el.name}, classes={el.get('class', [])[:3]}, data-id={el.get('data-id', 'N/A')}")
-            
-            print(f"   ✓ Znaleziono {len(sport_links)} meczów dla {sport}")
-            all_links.extend(sport_links)
-            
-        except Exception as e:
-            print(f"   ✗ Błąd przy zbieraniu linków dla {sport}: {e}")
-            import traceback
-            traceback.print_exc()
-            continue
+        if sport not in valid_sports:
+            valid_sports.append(sport)
+    
+    use_cache = link_cache_enabled()
+    links_by_sport: Dict[str, List[str]] = {}
+    to_collect = []
+    for sport in valid_sports:
+        cached = link_cache.get(date, sport, leagues) if use_cache else None
+        if cached:
+            print(f"\n🔗 {sport}: {len(cached)} linków z cache ({link_cache.path_for(date, sport, leagues)})")
+            links_by_sport[sport] = cached
+            LINK_KICKOFFS.update(link_cache.get_kickoffs(date, sport, leagues))
+        else:
+            to_collect.append(sport)
+    
+    if to_collect:
+        collected = _collect_links_parallel(driver, to_collect, date, leagues, headless=headless, workers=workers)
+        for sport, sport_links in collected.items():
+            links_by_sport[sport] = sport_links
+            if use_cache:
+                link_cache.put(date, sport, leagues, sport_links,
+                               kickoffs={u: LINK_KICKOFFS[u] for u in sport_links if u in LINK_KICKOFFS})
+    
+    # Scalanie w kolejności sportów, bez duplikatów między sportami
+    all_links = []
+    all_links_set = set()
+    for sport in valid_sports:
+        for href in links_by_sport.get(sport, []):
+            if href not in all_links_set:
+                all_links_set.add(href)
+                all_links.append(href)
     
     print(f"\n📊 TOTAL: {len(all_links)} linków do meczów ze wszystkich sportów")
     return all_links
@@ -2906,7 +3219,7 @@ def get_match_links_advanced(driver: webdriver.Chrome, date: str, sports: List[s
             date_url = f"{base_url}?date={date}"
             
             driver.get(date_url)
-            time.sleep(2.5)
+            wait_for_page(driver, 'listing', sport, legacy_sleep=2.5)
             
             # Próbuj kliknąć datę w kalendarzu (jeśli istnieje)
             try:
@@ -2958,6 +3271,10 @@ Przykłady użycia:
   
   # Wiele sportów naraz (GOŚCIE)
   python livesport_h2h_scraper.py --mode auto --date 2025-10-05 --sports football basketball volleyball handball rugby hockey --away-team-focus --headless
+  
+  # 🧩 Podział na 2 maszyny (druga: --shard 2/2), potem scalenie wyników
+  python livesport_h2h_scraper.py --mode auto --date 2025-10-05 --sports football --headless --shard 1/2
+  python sharding.py merge outputs/livesport_h2h_2025-10-05_football.csv
         """
     )
     parser.add_argument('--mode', choices=['urls', 'auto'], default='urls',
@@ -2984,6 +3301,10 @@ Przykłady użycia:
                        help='Zapisuj wyniki do bazy danych Supabase')
     parser.add_argument('--use-nordic-bet', action='store_true',
                        help='Pobieraj kursy z Nordic Bet')
+    parser.add_argument('--shard', default=None, metavar='i/N',
+                        help='🧩 Przetwarzaj tylko shard i z N (stabilny hash ID meczu); scalanie: sharding.py merge')
+    parser.add_argument('--lean-browser', action='store_true',
+                       help='🪶 Lekki profil Chrome: blokowanie obrazów/reklam/trackerów + strategia eager')
     parser.add_argument('--use-all', action='store_true',
                        help='Użyj wszystkich dostępnych źródeł (Forebet, Gemini, SofaScore, Nordic Bet, Supabase)')
     args = parser.parse_args()
@@ -2996,11 +3317,22 @@ Przykłady użycia:
         args.use_nordic_bet = True
         args.use_supabase = True
 
+    if args.lean_browser:
+        os.environ[LEAN_ENV] = '1'  # start_driver() (także przy auto-restarcie) czyta z env
+
     # Walidacja
     if args.mode == 'urls' and not args.input:
         print('❌ W trybie urls wymagany jest argument --input')
         return
     
+    shard_spec = None
+    if args.shard:
+        try:
+            shard_spec = parse_shard(args.shard)
+        except ValueError as e:
+            print(f'❌ {e}')
+            return
+    
     if args.mode == 'auto' and not args.sports:
         print('⚠️  Nie podano sportów, używam domyślnie: football')
         args.sports = ['football']
@@ -3032,9 +3364,13 @@ Przykłady użycia:
         if args.advanced:
             urls = get_match_links_advanced(driver, args.date, args.sports)
         else:
-            urls = get_match_links_from_day(driver, args.date, args.sports, args.leagues)
+            urls = get_match_links_from_day(driver, args.date, args.sports, args.leagues, headless=args.headless)
 
     print(f'\n✅ Znaleziono {len(urls)} meczów do sprawdzenia')
+    discovered_urls = list(urls)
+    if shard_spec:
+        urls = select_shard(urls, shard_spec)
+        print(f'🧩 Shard {shard_spec[0]}/{shard_spec[1]}: {len(urls)}/{len(discovered_urls)} meczów')
     
     if len(urls) == 0:
         print('❌ Nie znaleziono żadnych meczów. Spróbuj:')
@@ -3051,7 +3387,9 @@ Przykłady użycia:
     
     rows = []
     qualifying_count = 0
-    RESTART_INTERVAL = 80  # Restart Chrome co 80 meczów (zapobiega crashom po ~100)
+    # ♻️ Pula: recykling Chrome wg RSS / liczby kart / health check + rozgrzany spare
+    from driver_pool import DriverPool
+    pool = DriverPool(headless=args.headless, driver=driver)
     
     for i, url in enumerate(urls, 1):
         print(f'\n[{i}/{len(urls)}] 🔍 Przetwarzam: {url[:80]}...')
@@ -3163,59 +3501,30 @@ Przykłady użycia:
             logger.error(f'Nieoczekiwany błąd przy meczu {url}: {type(e).__name__}: {e}')
             print(f'   ⚠️  Błąd: {e}')
         
-        # AUTO-RESTART przeglądarki co N meczów (zapobiega crashom)
-        if i % RESTART_INTERVAL == 0 and i < len(urls):
-            print(f'\n🔄 AUTO-RESTART: Restartowanie przeglądarki po {i} meczach...')
-            print(f'   ✅ Przetworzone dane ({len(rows)} meczów) są bezpieczne w pamięci!')
-            
-            restart_success = False
-            max_restart_attempts = 3
-            
-            for restart_attempt in range(max_restart_attempts):
-                try:
-                    # Zamknij stary driver
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass  # Ignoruj błędy przy zamykaniu
-                    
-                    time.sleep(2)
-                    
-                    # Utwórz nowy driver
-                    driver = start_driver(headless=args.headless)
-                    
-                    # Sprawdź czy nowy driver działa
-                    if check_driver_health(driver):
-                        print(f'   ✅ Przeglądarka zrestartowana! Kontynuuję od meczu {i+1}...\n')
-                        restart_success = True
-                        break
-                    else:
-                        logger.warning(f"Driver health check failed po restarcie (próba {restart_attempt + 1})")
-                        
-                except Exception as e:
-                    logger.warning(f'Błąd restartu (próba {restart_attempt + 1}/{max_restart_attempts}): {e}')
-                    time.sleep(2)
-            
-            if not restart_success:
-                logger.error("Nie udało się zrestartować przeglądarki po maksymalnej liczbie prób")
-                print(f'   ❌ Krytyczny błąd restartu - zapisuję częściowe wyniki...')
+        # RECYKLING przeglądarki tylko przy przekroczeniu progów (RSS / karty / health)
+        if i < len(urls):
+            try:
+                driver = pool.after_match()
+            except Exception as e:
+                logger.critical(f"Nie można kontynuować scrapowania: {e}")
+                print(f'   ❌ Krytyczny błąd przeglądarki - zapisuję częściowe wyniki...')
                 save_partial_results(rows, args)
-                # Ostatnia próba uruchomienia drivera
-                try:
-                    driver = start_driver(headless=args.headless)
-                    if not check_driver_health(driver):
-                        raise RuntimeError("Driver nie działa po ostatecznej próbie")
-                except Exception as e:
-                    logger.critical(f"Nie można kontynuować scrapowania: {e}")
-                    print(f'   ❌ Zapisano {len(rows)} meczów, kończę działanie.')
-                    break
-        
-        # Rate limiting - adaptacyjny
-        elif i < len(urls):
+                print(f'   ❌ Zapisano {len(rows)} meczów, kończę działanie.')
+                break
+            
+            # Rate limiting - adaptacyjny
             delay = 1.0 + (i % 3) * 0.5
             time.sleep(delay)
 
-    driver.quit()
+    pool.print_report()
+    pool.close()
+    print_readiness_report()
+    print_snapshot_cache_report()
+    print_page_metrics_report()
+    print_stage_metrics_report()
+    print_qualification_report(rows)
+    print_player_store_report()
+    print_h2h_store_report()
 
     # Zapisywanie wyników
     print('\n' + '='*60)
@@ -3234,6 +3543,10 @@ Przykłady użycia:
         suffix = f'{suffix}_AWAY_FOCUS'
     
     outfn = os.path.join('outputs', f'livesport_h2h_{args.date}{suffix}.csv')
+    if shard_spec:
+        # Pliki shardów scala: python sharding.py merge <outfn bez sufiksu shardu>
+        outfn = shard_path(outfn, shard_spec)
+        write_manifest(outfn, shard_spec, discovered_urls)
 
     # Przygotowanie DataFrame
     df = pd.DataFrame(rows)
@@ -0,0 +1,279 @@
+"""
+⏱️ Page Readiness - oczekiwanie na gotowość strony zamiast sztywnych sleepów
+=============================================================================
+Zamiast `time.sleep(3.0)` po każdym `driver.get()` czekamy na konkretne
+warunki DOM (np. obecność `a.h2h__row` i ustabilizowaną liczbę wierszy).
+
+- Każdy kontekst (strona meczu, H2H, lista meczów, profil gracza) ma
+  własny selektor gotowości i opcjonalny selektor stabilizacji.
+- Sufit czasu oczekiwania zależy od sportu (READY_CEILINGS) i ADAPTUJE SIĘ
+  do zaobserwowanych czasów gotowości (p95 × zapas).
+- Nigdy nie czekamy dłużej niż dotychczasowy sleep (legacy_sleep), więc
+  strony bez danych (np. brak H2H) nie są wolniejsze niż wcześniej.
+- Raport pokazuje ile sekund na mecz marnowały sztywne sleepy.
+
+Użycie:
+    from page_readiness import wait_for_page, print_readiness_report
+    driver.get(url)
+    wait_for_page(driver, 'h2h', sport='football', legacy_sleep=3.0)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+# Sufity oczekiwania (sekundy) per sport - sporty z wolniejszymi stronami dostają więcej
+READY_CEILINGS = {
+    'football': 4.0,
+    'basketball': 4.0,
+    'hockey': 4.0,
+    'volleyball': 5.0,
+    'handball': 5.0,
+    'rugby': 5.0,
+    'tennis': 5.0,
+    'default': 4.0,
+}
+
+# Warunki gotowości per kontekst:
+#   ready  - selektor CSS, który musi mieć >= 1 element
+#   stable - selektor CSS, którego liczba elementów musi się ustabilizować (opcjonalny)
+#   stable_min - minimalna ustabilizowana liczba (domyślnie 0); dla H2H stałe 0 wierszy
+#                to nie "gotowe" (wiersze dochodzą później) - czekamy do sufitu
+READY_CONDITIONS = {
+    'match': {
+        'ready': 'a.participant__participantName, div.duelParticipant, div.h2h__section',
+        'stable': None,
+    },
+    'h2h': {
+        'ready': 'div.h2h__section, a.h2h__row',
+        'stable': 'a.h2h__row',
+        'stable_min': 1,
+    },
+    'listing': {
+        'ready': 'a[href*="/mecz/"], a[href*="/match/"], a[href*="/event/"], a[href*="/detail/"]',
+        'stable': 'a[href*="/mecz/"], a[href*="/match/"], a[href*="/event/"], a[href*="/detail/"]',
+    },
+    'player_search': {
+        'ready': 'a[href*="/gracz/"]',
+        'stable': None,
+    },
+    'player_results': {
+        'ready': 'div.sportName, div[class*="result"], div[class*="match"]',
+        'stable': 'div[class*="match"]',
+    },
+    'player_stats': {
+        'ready': 'div[class*="surface"], section[class*="surface"], div[class*="stat"]',
+        'stable': None,
+    },
+}
+
+POLL_INTERVAL = 0.2       # Co ile sprawdzamy DOM
+STABLE_POLLS = 2          # Ile kolejnych odczytów bez zmiany = "ustabilizowane"
+MIN_SAMPLES = 5           # Minimum obserwacji zanim sufit zacznie się adaptować
+ADAPTIVE_MARGIN = 1.5     # Sufit adaptacyjny = p95 × margines
+MIN_CEILING = 0.8         # Dolna granica sufitu adaptacyjnego
+MAX_SAMPLES = 200         # Ile ostatnich czasów gotowości trzymamy per (sport, kontekst)
+
+STATS_FILE = os.path.join('outputs', 'page_readiness_stats.json')
+# Wersja próbek w STATS_FILE - starsze (H2H "gotowe" przy 0 wierszy) zaniżały sufity
+STATS_VERSION = 2
+
+_COUNT_JS = "return document.querySelectorAll(arguments[0]).length;"
+
+
+class PageReadiness:
+    """
+    Silnik oczekiwania na gotowość strony z adaptacyjnymi sufitami.
+
+    Przykład:
+        readiness = PageReadiness()
+        readiness.wait(driver, 'h2h', sport='volleyball', legacy_sleep=3.0)
+        readiness.print_report()
+    """
+
+    def __init__(self, ceilings: Dict[str, float] = None, stats_file: Optional[str] = STATS_FILE):
+        self.ceilings = dict(READY_CEILINGS)
+        if ceilings:
+            self.ceilings.update(ceilings)
+        self.stats_file = stats_file
+        # (sport, context) -> deque czasów gotowości (tylko udane oczekiwania)
+        self.samples: Dict[tuple, deque] = {}
+        # context -> liczniki
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.matches = 0
+        # Wątki FAZY 1 (run_phase1_playwright) zapisują próbki i liczniki równolegle
+        self._lock = threading.Lock()
+        self._load_samples()
+
+    # ------------------------------------------------------------------
+    # Sufity
+    # ------------------------------------------------------------------
+
+    def ceiling(self, sport: str, context: str) -> float:
+        """Sufit oczekiwania: statyczny per sport, zawężany przez obserwacje (p95 × margines)."""
+        static = self.ceilings.get(sport, self.ceilings['default'])
+        with self._lock:
+            ordered = sorted(self.samples.get((sport, context)) or ())
+        if len(ordered) < MIN_SAMPLES:
+            return static
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return min(static, max(MIN_CEILING, p95 * ADAPTIVE_MARGIN))
+
+    # ------------------------------------------------------------------
+    # Oczekiwanie
+    # ------------------------------------------------------------------
+
+    def wait(self, driver, context: str, sport: str = 'default', legacy_sleep: float = 0.0,
+             ready_selector: str = None, stable_selector: str = None) -> bool:
+        """
+        Czeka aż strona będzie gotowa wg warunków kontekstu.
+
+        Args:
+            driver: Selenium WebDriver
+            context: Klucz z READY_CONDITIONS ('match', 'h2h', 'listing', ...)
+            sport: Sport (dobór sufitu)
+            legacy_sleep: Dotychczasowy sztywny sleep - górny limit oczekiwania i baza raportu
+            ready_selector / stable_selector: nadpisanie selektorów kontekstu
+
+        Returns:
+            True jeśli warunek spełniony przed sufitem, False przy timeoucie
+        """
+        cond = READY_CONDITIONS.get(context, {})
+        ready_sel = ready_selector or cond.get('ready')
+        stable_sel = stable_selector if stable_selector is not None else cond.get('stable')
+        stable_min = cond.get('stable_min', 0)
+        sport = sport if sport in self.ceilings else 'default'
+
+        limit = self.ceiling(sport, context)
+        if legacy_sleep and legacy_sleep > 0:
+            limit = min(limit, legacy_sleep)
+
+        start = time.time()
+        ready = False
+        last_count = None
+        same_count = 0
+
+        while True:
+            try:
+                present = driver.execute_script(_COUNT_JS, ready_sel) if ready_sel else 1
+                if present:
+                    if not stable_sel:
+                        ready = True
+                    else:
+                        count = driver.execute_script(_COUNT_JS, stable_sel)
+                        if count == last_count and count >= stable_min:
+                            same_count += 1
+                            if same_count >= STABLE_POLLS:
+                                ready = True
+                        else:
+                            same_count = 0
+                        last_count = count
+            except Exception:
+                # Strona w trakcie nawigacji / driver zajęty - spróbuj w kolejnym cyklu
+                pass
+
+            elapsed = time.time() - start
+            if ready or elapsed >= limit:
+                break
+            time.sleep(min(POLL_INTERVAL, max(0.0, limit - elapsed)))
+
+        self._record(sport, context, time.time() - start, legacy_sleep, ready)
+        return ready
+
+    def _record(self, sport: str, context: str, elapsed: float, legacy_sleep: float, ready: bool) -> None:
+        with self._lock:
+            if ready:
+                self.samples.setdefault((sport, context), deque(maxlen=MAX_SAMPLES)).append(elapsed)
+            s = self.stats.setdefault(context, {'calls': 0, 'ready': 0, 'timeouts': 0, 'waited': 0.0,
+                                                'legacy': 0.0})
+            s['calls'] += 1
+            s['ready' if ready else 'timeouts'] += 1
+            s['waited'] += elapsed
+            s['legacy'] += legacy_sleep or 0.0
+
+    def begin_match(self) -> None:
+        """Licznik meczów - do raportu 'sekund zaoszczędzonych na mecz'."""
+        with self._lock:
+            self.matches += 1
+
+    # ------------------------------------------------------------------
+    # Raport / persystencja
+    # ------------------------------------------------------------------
+
+    def report(self) -> Dict:
+        """Zwraca statystyki: per kontekst i sumarycznie (z oszczędnością na mecz)."""
+        with self._lock:
+            contexts = {k: dict(v) for k, v in self.stats.items()}
+            matches = self.matches
+        total_waited = sum(s['waited'] for s in contexts.values())
+        total_legacy = sum(s['legacy'] for s in contexts.values())
+        saved = total_legacy - total_waited
+        return {
+            'matches': matches,
+            'contexts': contexts,
+            'total_waited_s': round(total_waited, 2),
+            'total_legacy_sleep_s': round(total_legacy, 2),
+            'saved_s': round(saved, 2),
+            'saved_per_match_s': round(saved / matches, 2) if matches else 0.0,
+            'legacy_per_match_s': round(total_legacy / matches, 2) if matches else 0.0,
+        }
+
+    def print_report(self) -> None:
+        rep = self.report()
+        if not rep['contexts']:
+            return
+        print("\n⏱️ PAGE READINESS: oczekiwanie zdarzeniowe vs sztywne sleepy")
+        for context, s in sorted(rep['contexts'].items()):
+            calls = s['calls'] or 1
+            print(f"   {context:15s} wywołań={s['calls']:4d}  gotowe={s['ready']:4d}  timeout={s['timeouts']:3d}  "
+                  f"śr.czekanie={s['waited']/calls:.2f}s  (sleep={s['legacy']/calls:.2f}s)")
+        print(f"   Sleepy marnowały: {rep['saved_s']:.0f}s łącznie, "
+              f"{rep['saved_per_match_s']:.2f}s/mecz (z {rep['legacy_per_match_s']:.2f}s/mecz sleepów)")
+        self.save_samples()
+
+    def _load_samples(self) -> None:
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != STATS_VERSION:
+                return
+            for key, values in data.get('samples', {}).items():
+                sport, _, context = key.partition('|')
+                self.samples[(sport, context)] = deque(values[-MAX_SAMPLES:], maxlen=MAX_SAMPLES)
+        except (OSError, ValueError):
+            pass
+
+    def save_samples(self) -> None:
+        """Zapisuje czasy gotowości, aby kolejne uruchomienia startowały z adaptowanymi sufitami."""
+        if not self.stats_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.stats_file) or '.', exist_ok=True)
+            with self._lock:
+                data = {'version': STATS_VERSION, 'samples': {f"{s}|{c}": [round(v, 3) for v in vals]
+                                    for (s, c), vals in self.samples.items()}}
+            tmp = f"{self.stats_file}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.stats_file)
+        except OSError:
+            pass
+
+
+# Globalna instancja dla scraperów
+readiness = PageReadiness()
+
+
+def wait_for_page(driver, context: str, sport: str = 'default', legacy_sleep: float = 0.0, **kwargs) -> bool:
+    """Skrót do readiness.wait() na globalnej instancji."""
+    return readiness.wait(driver, context, sport=sport, legacy_sleep=legacy_sleep, **kwargs)
+
+
+def print_readiness_report() -> None:
+    """Wypisuje raport globalnej instancji (i zapisuje czasy do adaptacji)."""
+    readiness.print_report()
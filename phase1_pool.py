@@ -0,0 +1,272 @@
+"""
+⚡ FAZA 1 - Pula workerów (wiele przeglądarek równolegle)
+=========================================================
+Szybkie sprawdzenie kwalifikacji (H2H + forma) dla listy URLi.
+
+Tryb szeregowy (1 worker) przetwarza URLe jednym driverem, tak jak dotychczas.
+Tryb puli (--workers N) uruchamia N procesów, każdy z własnym start_driver():
+- wspólna kolejka URLi (każdy worker pobiera kolejny wolny mecz)
+- wyniki wracają do procesu głównego, który jako jedyny zapisuje dziennik przebiegu
+- scalanie w deterministycznej kolejności (kolejność wejściowych URLi),
+  więc indeksy kwalifikujących się meczów są takie same jak w trybie szeregowym
+
+Retry, recykling przeglądarki (DriverPool: RSS / karty / health, rozgrzany spare)
+i rozdział tenis / sporty drużynowe działają w każdym workerze niezależnie.
+"""
+
+import os
+import time
+import multiprocessing
+from queue import Empty
+from typing import Callable, Dict, List, Optional, Tuple
+
+from livesport_h2h_scraper import start_driver, process_match, process_match_tennis, detect_sport_from_url
+from page_readiness import print_readiness_report
+from dom_snapshot_cache import print_snapshot_cache_report
+from browser_profile import print_page_metrics_report
+from driver_pool import DriverPool
+from stage_metrics import record_stage_timings, record_match_retry
+
+
+def _is_ci() -> bool:
+    return os.getenv('CI') == 'true' or os.getenv('GITHUB_ACTIONS') == 'true'
+
+
+def is_tennis_url(url: str) -> bool:
+    """Tenis ma '/tenis/' w URLu (lub 'tennis' w wersji EN)."""
+    return '/tenis/' in url.lower() or 'tennis' in url.lower()
+
+
+def _print_match_result(info: Dict, tennis: bool, away_team_focus: bool, prefix: str = '') -> None:
+    """Wypisuje wynik kwalifikacji w tym samym formacie co pętla FAZY 1."""
+    if tennis:
+        player_a_wins = info['home_wins_in_h2h_last5']
+        player_b_wins = info.get('away_wins_in_h2h', 0)
+        advanced_score = info.get('advanced_score', 0)
+        if info['qualifies']:
+            favorite = info.get('favorite', 'unknown')
+            if favorite == 'player_a':
+                fav_name = info['home_team']
+            elif favorite == 'player_b':
+                fav_name = info['away_team']
+            else:
+                fav_name = "Równi"
+            print(f"   {prefix}✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
+            print(f"      Faworytem: {fav_name} (Score: {advanced_score:.1f}/100)")
+        else:
+            print(f"   {prefix}❌ Nie kwalifikuje (Score: {advanced_score:.1f}/100, H2H: {player_a_wins}-{player_b_wins})")
+        return
+
+    h2h_count = info.get('h2h_count', 0)
+    win_rate = info.get('win_rate', 0.0)
+    if away_team_focus:
+        wins_count = info.get('away_wins_in_h2h_last5', 0)
+        focused_team = info['away_team']
+    else:
+        wins_count = info['home_wins_in_h2h_last5']
+        focused_team = info['home_team']
+
+    if info['qualifies']:
+        print(f"   {prefix}✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
+        print(f"      Fokus: {focused_team}, H2H: {wins_count}/{h2h_count} ({win_rate*100:.0f}%)")
+    elif h2h_count > 0:
+        print(f"   {prefix}❌ Nie kwalifikuje ({wins_count}/{h2h_count} = {win_rate*100:.0f}%)")
+    else:
+        print(f"   {prefix}⚠️  Brak H2H")
+
+
+def process_url_with_retries(url: str, driver, headless: bool = True, away_team_focus: bool = False,
+                             prefix: str = '', pool: DriverPool = None) -> Tuple[Optional[Dict], object]:
+    """
+    Przetwarza jeden URL w FAZIE 1 (bez Forebet/SofaScore/Gemini) z retry.
+
+    Przy błędzie przeglądarka jest podmieniana (z puli - rozgrzany spare,
+    bez puli - zimny start) i próba ponawiana (w CI tylko 1 próba, lokalnie 3).
+
+    Returns:
+        (info, driver) - info jest None gdy wszystkie próby zawiodły;
+        driver może być nową instancją, jeśli nastąpił restart.
+    """
+    is_ci = _is_ci()
+    max_retries = 1 if is_ci else 3
+    retry_count = 0
+
+    while retry_count < max_retries:
+        try:
+            tennis = is_tennis_url(url)
+            if tennis:
+                # Dedykowana funkcja dla tenisa (ADVANCED) - bez podziału na etapy, tylko czas całkowity
+                t_start = time.time()
+                info = process_match_tennis(url, driver)
+                record_stage_timings('tennis', {}, time.time() - t_start, url, info.get('qualifies'))
+            else:
+                # Sporty drużynowe - FAZA 1: BEZ Forebet/SofaScore
+                current_sport = detect_sport_from_url(url)
+                info = process_match(url, driver, away_team_focus=away_team_focus,
+                                     use_forebet=False, use_gemini=False,
+                                     use_sofascore=False, sport=current_sport)
+            _print_match_result(info, tennis, away_team_focus, prefix)
+            return info, driver
+
+        except (ConnectionResetError, ConnectionError, Exception) as e:
+            retry_count += 1
+            if retry_count < max_retries:
+                record_match_retry('tennis' if is_tennis_url(url) else detect_sport_from_url(url), url)
+                print(f"   {prefix}⚠️  Błąd połączenia (próba {retry_count}/{max_retries}): {str(e)[:100]}")
+                print(f"   {prefix}🔄 Restartowanie przeglądarki i ponowienie próby...")
+                if pool is not None:
+                    driver = pool.recycle('error')
+                    continue
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                time.sleep(2 if is_ci else 3)
+                driver = start_driver(headless=headless)
+            else:
+                print(f"   {prefix}❌ Błąd po {max_retries} próbach: {str(e)[:100]}")
+                print(f"   {prefix}⏭️  Pomijam ten mecz i kontynuuję...")
+
+    return None, driver
+
+
+def merge_phase1_results(results_by_index: Dict[int, Dict]) -> Tuple[List[Dict], List[int]]:
+    """
+    Scala wyniki workerów w kolejności wejściowych URLi.
+
+    Args:
+        results_by_index: {indeks_url: info} (brak klucza = mecz pominięty po błędach)
+
+    Returns:
+        (rows, qualifying_indices) - identyczne jak w trybie szeregowym
+    """
+    rows = [results_by_index[i] for i in sorted(results_by_index)]
+    qualifying_indices = [k for k, row in enumerate(rows) if row.get('qualifies')]
+    return rows, qualifying_indices
+
+
+def _phase1_worker(worker_id: int, task_queue, result_queue, headless: bool, away_team_focus: bool) -> None:
+    """Proces workera: własny driver, pobiera (indeks, url) z kolejki aż do sentinela None."""
+    prefix = f"[W{worker_id}] "
+    is_ci = _is_ci()
+    pool = None
+    processed = 0
+    try:
+        pool = DriverPool(headless=headless, prefix=prefix)
+        driver = pool.driver
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            idx, url = task
+            print(f"\n{prefix}[{idx + 1}] {url[:80]}")
+            info, driver = process_url_with_retries(url, driver, headless=headless,
+                                                    away_team_focus=away_team_focus, prefix=prefix,
+                                                    pool=pool)
+            result_queue.put(('result', idx, info))
+            processed += 1
+
+            # Recykling tylko przy przekroczeniu progów (RSS / karty / health)
+            driver = pool.after_match()
+            time.sleep(0.15 if is_ci else 0.8)
+    except Exception as e:
+        print(f"{prefix}❌ Worker zakończony błędem: {e}")
+    finally:
+        # Statystyki gotowości stron są per proces - raport z każdego workera
+        print_readiness_report()
+        print_snapshot_cache_report()
+        print_page_metrics_report()
+        if pool is not None:
+            pool.print_report()
+            pool.close()
+        result_queue.put(('done', worker_id, processed))
+
+
+def _drain_tasks(task_queue, workers: int) -> int:
+    """Opróżnia kolejkę zadań i wstawia ponownie sentinele; zwraca liczbę porzuconych meczów."""
+    dropped = 0
+    while True:
+        try:
+            task = task_queue.get(timeout=0.5)
+        except Empty:
+            break
+        if task is not None:
+            dropped += 1
+    # Sentinele mogły zostać zjedzone przy opróżnianiu - każdy worker musi dostać swój
+    for _ in range(workers):
+        task_queue.put(None)
+    return dropped
+
+
+def run_phase1_pool(urls: List[str], workers: int, headless: bool = True, away_team_focus: bool = False,
+                    on_progress: Callable[[int, Dict[int, Dict]], None] = None,
+                    on_result: Callable[[int, Optional[Dict]], None] = None,
+                    should_stop: Callable[[], bool] = None) -> Tuple[List[Dict], List[int]]:
+    """
+    Uruchamia FAZĘ 1 na N procesach (każdy z własną przeglądarką).
+
+    Args:
+        urls: Lista URLi meczów
+        workers: Liczba procesów/przeglądarek
+        headless: Tryb headless dla start_driver()
+        away_team_focus: Tryb GOŚCIE
+        on_progress: callback(done_count, results_by_index) wołany po każdym wyniku
+                     (proces główny - np. checkpoint)
+        on_result: callback(indeks_url, info) wołany po każdym wyniku (np. dziennik przebiegu)
+        should_stop: callback() -> bool wołany po każdym wyniku; True porzuca mecze jeszcze
+                     niepobrane z kolejki (np. koniec budżetu czasu --deadline)
+
+    Returns:
+        (rows, qualifying_indices) w kolejności wejściowych URLi
+    """
+    workers = max(1, min(workers, len(urls))) if urls else 1
+    # 'spawn' - bezpieczne dla Selenium (bez dziedziczenia sesji Chrome) i zgodne z Windows
+    ctx = multiprocessing.get_context('spawn')
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+
+    for idx, url in enumerate(urls):
+        task_queue.put((idx, url))
+    for _ in range(workers):
+        task_queue.put(None)
+
+    procs = []
+    for worker_id in range(1, workers + 1):
+        p = ctx.Process(target=_phase1_worker,
+                        args=(worker_id, task_queue, result_queue, headless, away_team_focus),
+                        daemon=True)
+        p.start()
+        procs.append(p)
+
+    results_by_index: Dict[int, Dict] = {}
+    done_count = 0
+    finished_workers = 0
+    stopped = False
+    while finished_workers < workers:
+        try:
+            msg = result_queue.get(timeout=5)
+        except Empty:
+            # Worker zabity przez system (OOM) nie wyśle 'done' - nie czekaj w nieskończoność
+            if not any(p.is_alive() for p in procs):
+                break
+            continue
+        if msg[0] == 'done':
+            finished_workers += 1
+            continue
+        _, idx, info = msg
+        done_count += 1
+        if info is not None:
+            results_by_index[idx] = info
+        if on_result:
+            on_result(idx, info)
+        if on_progress:
+            on_progress(done_count, results_by_index)
+        if should_stop and not stopped and should_stop():
+            stopped = True
+            dropped = _drain_tasks(task_queue, workers)
+            print(f"\n⏰ Koniec budżetu czasu - porzucam {dropped} meczów z kolejki")
+
+    for p in procs:
+        p.join(timeout=10)
+
+    return merge_phase1_results(results_by_index)
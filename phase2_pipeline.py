@@ -0,0 +1,301 @@
+"""
+🎯 FAZA 2 - Wzbogacanie danych (Forebet, SofaScore, Gemini) i tryb potokowy
+==========================================================================
+FAZA 2 to wyłącznie I/O sieciowe, a dotychczas startowała dopiero po
+zakończeniu całej FAZY 1 (przeglądarki). Czas przebiegu = faza1 + faza2.
+
+Tryb potokowy (--pipeline): każdy mecz zakwalifikowany w FAZIE 1 trafia od razu
+do kolejki wzbogacania, którą opróżniają wątki (PHASE2_WORKERS), podczas gdy
+przeglądarka przetwarza kolejne URLe. Czas przebiegu -> max(faza1, faza2).
+
+    pipeline = EnrichmentPipeline(date, sports, use_forebet=True, on_done=journal_callback)
+    pipeline.start()              # pre-fetch Forebet w tle, potem workery
+    pipeline.submit(info)         # z pętli FAZY 1 (lub callbacku puli)
+    stats = pipeline.close()      # czeka na opróżnienie kolejki
+
+enrich_row() to wspólne wzbogacenie jednego meczu - używa go też tryb szeregowy
+(FAZA 2 po FAZIE 1).
+
+Konfiguracja (env):
+    PHASE2_WORKERS - liczba wątków wzbogacania (domyślnie 3)
+"""
+
+import importlib
+import os
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from qualification import is_shed
+
+PHASE2_WORKERS = int(os.getenv('PHASE2_WORKERS', '3'))
+
+
+def _is_ci() -> bool:
+    return os.getenv('CI') == 'true' or os.getenv('GITHUB_ACTIONS') == 'true'
+
+
+def prepare_phase2(sports: List[str], date: str, use_forebet: bool, use_sofascore: bool) -> Dict[str, bool]:
+    """Pre-fetch Forebet dla wszystkich sportów i import scraperów; zwraca dostępność źródeł."""
+    available = {'forebet': False, 'sofascore': False}
+    if use_forebet:
+        try:
+            from forebet_scraper import prefetch_all_sports
+            available['forebet'] = True
+            print("\n🔥 PRE-FETCH: Pobieranie HTML Forebet dla wszystkich sportów...")
+            prefetch_results = prefetch_all_sports(list(set(sports)), date)
+            for sport_name, success in prefetch_results.items():
+                status = "✅" if success else "❌"
+                print(f"   {status} {sport_name}")
+        except ImportError as ie:
+            available['forebet'] = False
+            print(f"   ⚠️ Forebet scraper niedostępny: ImportError - {ie}")
+        except Exception as e:
+            available['forebet'] = False
+            print(f"   ⚠️ Forebet scraper niedostępny: {type(e).__name__} - {e}")
+
+    if use_sofascore:
+        try:
+            importlib.import_module('sofascore_scraper')
+            available['sofascore'] = True
+        except ImportError as ie:
+            print(f"   ⚠️ SofaScore scraper niedostępny: ImportError - {ie}")
+        except Exception as e:
+            print(f"   ⚠️ SofaScore scraper niedostępny: {type(e).__name__} - {e}")
+    return available
+
+
+def match_date_for(row: Dict, default_date: str) -> str:
+    """Data meczu YYYY-MM-DD z match_time (DD.MM.YYYY), w przeciwnym razie data przebiegu."""
+    match_time = row.get('match_time', '')
+    if match_time:
+        date_match = re.search(r'(\d{1,2}\.\d{1,2}\.\d{4})', match_time)
+        if date_match:
+            day, month, year = date_match.group(1).split('.')
+            return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
+    return default_date
+
+
+def is_enriched(row: Dict) -> bool:
+    return bool(row.get('forebet_prediction') or row.get('sofascore_home_win_prob') or row.get('gemini_prediction'))
+
+
+def enrich_row(row: Dict, date: str, use_forebet: bool, use_sofascore: bool, use_gemini: bool,
+               available: Dict[str, bool], prefix: str = '') -> Dict:
+    """
+    Wzbogaca jeden kwalifikujący się mecz (pola forebet_*, sofascore_*, gemini_*).
+
+    Args:
+        row: Wiersz FAZY 1 (modyfikowany w miejscu)
+        date: Data przebiegu (fallback daty meczu)
+        available: Wynik prepare_phase2()
+        prefix: Prefiks logów (tryb potokowy - nazwa meczu)
+    """
+    from livesport_h2h_scraper import detect_sport_from_url
+
+    home_team = row.get('home_team', '')
+    away_team = row.get('away_team', '')
+    current_sport = detect_sport_from_url(row.get('match_url', ''))
+    match_date = match_date_for(row, date)
+
+    # FOREBET
+    if use_forebet and available.get('forebet'):
+        try:
+            from forebet_scraper import search_forebet_prediction
+            forebet_result = search_forebet_prediction(
+                home_team=home_team,
+                away_team=away_team,
+                match_date=match_date,
+                sport=current_sport
+            )
+
+            if forebet_result.get('success') or forebet_result.get('found'):
+                row['forebet_prediction'] = forebet_result.get('prediction')
+                row['forebet_probability'] = forebet_result.get('probability')
+                row['forebet_exact_score'] = forebet_result.get('exact_score')
+                row['forebet_over_under'] = forebet_result.get('over_under')
+                row['forebet_btts'] = forebet_result.get('btts')
+                row['forebet_avg_goals'] = forebet_result.get('avg_goals')
+                print(f"{prefix}   ✅ Forebet: {row['forebet_prediction']} ({row['forebet_probability']}%)")
+            else:
+                print(f"{prefix}   ⚠️ Forebet: nie znaleziono ({forebet_result.get('error', 'brak')})")
+        except Exception as e:
+            print(f"{prefix}   ❌ Forebet błąd: {str(e)[:50]}")
+
+    # SOFASCORE (zrzucany przez harmonogram --deadline przy braku czasu)
+    if use_sofascore and available.get('sofascore') and not is_shed('sofascore'):
+        try:
+            from sofascore_scraper import get_sofascore_prediction
+            sofascore_result = get_sofascore_prediction(
+                home_team=home_team,
+                away_team=away_team,
+                sport=current_sport,
+                date_str=match_date
+            )
+
+            if sofascore_result.get('found'):
+                row['sofascore_home_win_prob'] = sofascore_result.get('home_win_prob')
+                row['sofascore_draw_prob'] = sofascore_result.get('draw_prob')
+                row['sofascore_away_win_prob'] = sofascore_result.get('away_win_prob')
+                row['sofascore_total_votes'] = sofascore_result.get('total_votes')
+                print(f"{prefix}   ✅ SofaScore: H:{row['sofascore_home_win_prob']}% D:{row['sofascore_draw_prob']}% A:{row['sofascore_away_win_prob']}%")
+            else:
+                print(f"{prefix}   ⚠️ SofaScore: nie znaleziono")
+        except Exception as e:
+            print(f"{prefix}   ❌ SofaScore błąd: {str(e)[:50]}")
+
+    # GEMINI AI (jeśli włączone; zrzucany jako pierwszy przy --deadline)
+    if use_gemini and not is_shed('gemini'):
+        try:
+            from gemini_analyzer import analyze_match_with_gemini
+            gemini_result = analyze_match_with_gemini(row)
+            if gemini_result:
+                row['gemini_prediction'] = gemini_result.get('prediction')
+                row['gemini_confidence'] = gemini_result.get('confidence')
+                row['gemini_reasoning'] = gemini_result.get('reasoning')
+                row['gemini_recommendation'] = gemini_result.get('recommendation')
+                print(f"{prefix}   ✅ Gemini: {row['gemini_recommendation']} ({row['gemini_confidence']}%)")
+        except Exception as e:
+            print(f"{prefix}   ❌ Gemini błąd: {str(e)[:50]}")
+
+    return row
+
+
+class EnrichmentPipeline:
+    """
+    Kolejka wzbogacania opróżniana przez wątki równolegle z FAZĄ 1.
+
+    Args:
+        date: Data przebiegu
+        sports: Sporty (pre-fetch Forebet)
+        use_forebet / use_sofascore / use_gemini: Włączone źródła
+        workers: Liczba wątków
+        on_done: callback(row) po wzbogaceniu meczu (np. dziennik) - wołany pod blokadą
+        skip_urls: URLe już wzbogacone (--resume)
+        enrich: Funkcja wzbogacająca (domyślnie enrich_row)
+        prepare: Pre-fetch i dostępność źródeł (domyślnie prepare_phase2)
+    """
+
+    def __init__(self, date: str, sports: List[str], use_forebet: bool = False, use_sofascore: bool = False,
+                 use_gemini: bool = False, workers: int = PHASE2_WORKERS,
+                 on_done: Optional[Callable[[Dict], None]] = None, skip_urls: Optional[Iterable[str]] = None,
+                 enrich: Callable[..., Dict] = enrich_row,
+                 prepare: Callable[..., Dict[str, bool]] = prepare_phase2):
+        self.date = date
+        self.sports = sports
+        self.use_forebet = use_forebet
+        self.use_sofascore = use_sofascore
+        self.use_gemini = use_gemini
+        self.workers = max(1, workers)
+        self.on_done = on_done
+        self.skip_urls = set(skip_urls or ())
+        self.enrich = enrich
+        self.prepare = prepare
+        self.available: Dict[str, bool] = {}
+        self.submitted = 0
+        self.processed = 0
+        self.enriched = 0
+        self.skipped = 0
+        self.busy_seconds = 0.0
+        self._queue: queue.Queue = queue.Queue()
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._started_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.use_forebet or self.use_sofascore or self.use_gemini
+
+    def start(self) -> 'EnrichmentPipeline':
+        self._started_at = time.time()
+        threading.Thread(target=self._prepare, name='phase2-prefetch', daemon=True).start()
+        for n in range(1, self.workers + 1):
+            thread = threading.Thread(target=self._worker, name=f'phase2-{n}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _prepare(self) -> None:
+        try:
+            self.available = self.prepare(self.sports, self.date, self.use_forebet, self.use_sofascore)
+        finally:
+            self._ready.set()
+
+    def submit(self, row: Dict) -> None:
+        """Dodaje kwalifikujący się mecz do kolejki (nie blokuje FAZY 1)."""
+        if row.get('match_url') in self.skip_urls:
+            with self._lock:
+                self.skipped += 1
+            return
+        with self._lock:
+            self.submitted += 1
+        self._queue.put(row)
+
+    def _worker(self) -> None:
+        self._ready.wait()
+        pause = 0.5 if _is_ci() else 1.0
+        last_done = 0.0
+        while True:
+            row = self._queue.get()
+            if row is None:
+                break
+            # Rate limiting źródeł - per wątek, przerwa tylko między kolejnymi meczami
+            wait = pause - (time.time() - last_done)
+            if last_done and wait > 0:
+                time.sleep(wait)
+            prefix = f"   [⇄ {row.get('home_team', '?')} vs {row.get('away_team', '?')}]"
+            t_start = time.time()
+            try:
+                self.enrich(row, self.date, self.use_forebet, self.use_sofascore, self.use_gemini,
+                            self.available, prefix=prefix)
+            except Exception as e:
+                print(f"{prefix}   ❌ Błąd wzbogacania: {type(e).__name__}: {str(e)[:80]}")
+            with self._lock:
+                self.busy_seconds += time.time() - t_start
+                self.processed += 1
+                if is_enriched(row):
+                    self.enriched += 1
+                if self.on_done:
+                    try:
+                        self.on_done(row)
+                    except Exception as e:
+                        print(f"   ⚠️ FAZA 2: błąd zapisu wyniku: {e}")
+            last_done = time.time()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def cancel_pending(self) -> int:
+        """Porzuca mecze czekające w kolejce (np. koniec budżetu czasu); zwraca ich liczbę."""
+        dropped = 0
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not None:
+                dropped += 1
+        with self._lock:
+            self.submitted -= dropped
+        return dropped
+
+    def close(self) -> Dict:
+        """Czeka na opróżnienie kolejki i zatrzymuje wątki; zwraca statystyki."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        return self.stats()
+
+    def stats(self) -> Dict:
+        return {
+            'submitted': self.submitted,
+            'processed': self.processed,
+            'enriched': self.enriched,
+            'skipped': self.skipped,
+            'busy_seconds': round(self.busy_seconds, 1),
+            'wall_seconds': round(time.time() - self._started_at, 1) if self._started_at else 0.0,
+        }
@@ -0,0 +1,486 @@
+"""
+🎭 Playwright Engine - jeden Chromium, wiele kontekstów, mecze w locie (asyncio)
+===============================================================================
+Każdy dodatkowy Chrome z Selenium to kilkaset MB. Silnik Playwright uruchamia
+JEDEN proces Chromium i dla każdego meczu w locie otwiera lekki kontekst
+przeglądarki (osobne cookies/cache, jedna strona). Wszystkie strony obsługuje
+jedna pętla asyncio (wątek 'playwright-loop'), więc 8-16 meczów może być
+w toku w jednym procesie.
+
+process_match / process_match_tennis pozostają bez zmian: PlaywrightDriver
+udostępnia podzbiór API Selenium, z którego korzystają (get, page_source,
+execute_script, find_element(s), current_url, title, refresh, execute_cdp_cmd,
+timeouty, quit). Wywołania blokujące z wątków meczów są przekazywane do pętli
+asyncio (run_coroutine_threadsafe) - przeglądarką steruje wyłącznie asyncio,
+a synchroniczny kod parsowania czeka na wynik swojej strony.
+
+Raport pamięci: RSS procesów Chromium / liczba otwartych stron oraz sterta JS
+na stronę (CDP Performance.getMetrics), próbkowane w trakcie FAZY 1.
+
+Użycie:
+    python scrape_and_notify.py ... --engine playwright --workers 12
+
+Wymaga: pip install playwright && playwright install chromium
+
+Konfiguracja (env):
+    BROWSER_ENGINE=playwright      - domyślny silnik FAZY 1 (selenium gdy brak)
+    PLAYWRIGHT_CONCURRENCY=8       - mecze w locie, gdy nie podano --workers
+    PLAYWRIGHT_MEMORY_EVERY=10     - co ile meczów próbka pamięci
+"""
+
+import asyncio
+import os
+import queue
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from browser_profile import blocked_url_patterns, lean_enabled
+
+try:
+    from playwright.async_api import async_playwright
+    from playwright.async_api import Error as PlaywrightError
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+    PlaywrightError = PlaywrightTimeoutError = Exception
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+ENGINES = ('selenium', 'playwright')
+DEFAULT_CONCURRENCY = int(os.getenv('PLAYWRIGHT_CONCURRENCY', '8'))
+MEMORY_SAMPLE_EVERY = int(os.getenv('PLAYWRIGHT_MEMORY_EVERY', '10'))
+DEFAULT_PAGE_LOAD_TIMEOUT = 60
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+# Skrypty Selenium ('return ...', arguments[i]) wykonywane jako ciało funkcji
+_SCRIPT_WRAPPER = "([body, args]) => new Function(body).apply(null, args)"
+
+_CHROMIUM_PROCESS_RE = re.compile(r'chrom|headless_shell', re.IGNORECASE)
+
+
+def default_engine() -> str:
+    engine = os.getenv('BROWSER_ENGINE', 'selenium').lower()
+    return engine if engine in ENGINES else 'selenium'
+
+
+def selector_for(by: str, value: str) -> str:
+    """Lokator Selenium (By.*, wartość) -> selektor Playwright."""
+    if by == By.XPATH:
+        return f"xpath={value}"
+    if by == By.ID:
+        return f'[id="{value}"]'
+    if by == By.NAME:
+        return f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return f".{value}"
+    if by == By.TAG_NAME:
+        return f"css={value}"
+    if by == By.LINK_TEXT:
+        return f'a:text-is("{value}")'
+    if by == By.PARTIAL_LINK_TEXT:
+        return f'a:has-text("{value}")'
+    return f"css={value}"
+
+
+class _EventLoopThread:
+    """Pętla asyncio w wątku tła - jedyne miejsce, które dotyka obiektów Playwright."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='playwright-loop', daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+
+def _translate_errors(func):
+    """Błędy Playwright -> wyjątki Selenium (process_match łapie TimeoutException/WebDriverException)."""
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except PlaywrightTimeoutError as e:
+            raise TimeoutException(str(e)[:200])
+        except PlaywrightError as e:
+            raise WebDriverException(str(e)[:200])
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+
+class PlaywrightElement:
+    """Element (locator) z API WebElement: click, text, get_attribute, is_displayed."""
+
+    def __init__(self, runner: _EventLoopThread, locator):
+        self._run = runner.run
+        self._locator = locator
+
+    @_translate_errors
+    def click(self) -> None:
+        self._run(self._locator.click(timeout=5000))
+
+    @property
+    @_translate_errors
+    def text(self) -> str:
+        return self._run(self._locator.inner_text())
+
+    @_translate_errors
+    def get_attribute(self, name: str) -> Optional[str]:
+        return self._run(self._locator.get_attribute(name))
+
+    @_translate_errors
+    def is_displayed(self) -> bool:
+        return self._run(self._locator.is_visible())
+
+
+class PlaywrightDriver:
+    """
+    Podzbiór API selenium.webdriver.Chrome nad jedną stroną Playwright.
+
+    Args:
+        runner: Pętla asyncio silnika
+        context: Kontekst przeglądarki (własność drivera - zamykany w quit())
+        page: Strona w kontekście
+    """
+
+    def __init__(self, runner: _EventLoopThread, context, page):
+        self._runner = runner
+        self._run = runner.run
+        self.context = context
+        self.page = page
+        self._cdp = None
+        self._nav_timeout_ms = DEFAULT_PAGE_LOAD_TIMEOUT * 1000
+        self._wait_until = 'domcontentloaded' if lean_enabled() else 'load'
+        self.closed = False
+
+    @_translate_errors
+    def get(self, url: str) -> None:
+        self._run(self.page.goto(url, wait_until=self._wait_until, timeout=self._nav_timeout_ms))
+
+    @property
+    @_translate_errors
+    def page_source(self) -> str:
+        return self._run(self.page.content())
+
+    @property
+    def current_url(self) -> str:
+        return self.page.url
+
+    @property
+    @_translate_errors
+    def title(self) -> str:
+        return self._run(self.page.title())
+
+    @property
+    def window_handles(self) -> List[int]:
+        return list(range(len(self.context.pages)))
+
+    @_translate_errors
+    def execute_script(self, script: str, *args):
+        return self._run(self.page.evaluate(_SCRIPT_WRAPPER, [script, list(args)]))
+
+    @_translate_errors
+    def find_elements(self, by: str = By.ID, value: str = None) -> List[PlaywrightElement]:
+        locator = self.page.locator(selector_for(by, value))
+        count = self._run(locator.count())
+        return [PlaywrightElement(self._runner, locator.nth(i)) for i in range(count)]
+
+    def find_element(self, by: str = By.ID, value: str = None) -> PlaywrightElement:
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Brak elementu: {by}={value}")
+        return elements[0]
+
+    @_translate_errors
+    def refresh(self) -> None:
+        self._run(self.page.reload(wait_until=self._wait_until, timeout=self._nav_timeout_ms))
+
+    @_translate_errors
+    def delete_all_cookies(self) -> None:
+        self._run(self.context.clear_cookies())
+
+    @_translate_errors
+    def execute_cdp_cmd(self, cmd: str, params: Dict):
+        if self._cdp is None:
+            self._cdp = self._run(self.context.new_cdp_session(self.page))
+        return self._run(self._cdp.send(cmd, params))
+
+    def set_page_load_timeout(self, seconds: float) -> None:
+        self._nav_timeout_ms = seconds * 1000
+
+    def set_script_timeout(self, seconds: float) -> None:
+        pass  # page.evaluate nie ma osobnego limitu
+
+    def implicitly_wait(self, seconds: float) -> None:
+        pass  # find_element nie czeka - page_readiness czeka jawnie
+
+    def js_heap_mb(self) -> Optional[float]:
+        """Sterta JS strony (CDP Performance.getMetrics); None gdy brak pomiaru."""
+        try:
+            self.execute_cdp_cmd('Performance.enable', {})
+            metrics = self.execute_cdp_cmd('Performance.getMetrics', {})
+        except Exception:
+            return None
+        for metric in metrics.get('metrics', []):
+            if metric.get('name') == 'JSHeapUsedSize':
+                return metric.get('value', 0) / (1024 * 1024)
+        return None
+
+    def quit(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._run(self.context.close(), timeout=30)
+        except Exception:
+            pass
+
+
+def browser_rss_mb() -> Optional[float]:
+    """RSS (MB) procesów Chromium uruchomionych przez ten proces; None bez psutil."""
+    if not PSUTIL_AVAILABLE:
+        return None
+    total = 0
+    try:
+        children = psutil.Process(os.getpid()).children(recursive=True)
+    except Exception:
+        return None
+    for proc in children:
+        try:
+            if _CHROMIUM_PROCESS_RE.search(proc.name()):
+                total += proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return total / (1024 * 1024)
+
+
+class PlaywrightEngine:
+    """
+    Jeden Chromium, nowy kontekst (z jedną stroną) na każdy driver.
+
+    Args:
+        headless: Tryb headless
+        lean: Blokowanie zasobów jak w profilu lekkim (domyślnie z env LIVESPORT_LEAN_BROWSER)
+        rss_probe: Pomiar RSS przeglądarki (wstrzykiwany w testach)
+    """
+
+    def __init__(self, headless: bool = True, lean: bool = None, rss_probe: Callable[[], Optional[float]] = None):
+        self.headless = headless
+        self.lean = lean_enabled(lean)
+        self.rss_probe = rss_probe or browser_rss_mb
+        self.runner: Optional[_EventLoopThread] = None
+        self._playwright = None
+        self._browser = None
+        self._drivers: List[PlaywrightDriver] = []
+        self._lock = threading.Lock()
+        self.samples: List[Dict] = []
+
+    def start(self) -> 'PlaywrightEngine':
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright niedostępny - pip install playwright && playwright install chromium")
+        self.runner = _EventLoopThread()
+        self._playwright = self.runner.run(async_playwright().start())
+        self._browser = self.runner.run(self._playwright.chromium.launch(
+            headless=self.headless,
+            args=['--disable-dev-shm-usage', '--disable-blink-features=AutomationControlled', '--no-sandbox']))
+        return self
+
+    async def _new_page(self):
+        context = await self._browser.new_context(user_agent=USER_AGENT, locale='pl-PL',
+                                                  viewport={'width': 1920, 'height': 1080})
+        if self.lean:
+            patterns = [re.compile(re.escape(p).replace(r'\*', '.*')) for p in blocked_url_patterns()]
+
+            async def _block(route):
+                if any(p.fullmatch(route.request.url) for p in patterns):
+                    await route.abort()
+                else:
+                    await route.continue_()
+            await context.route('**/*', _block)
+        return context, await context.new_page()
+
+    def new_driver(self) -> PlaywrightDriver:
+        context, page = self.runner.run(self._new_page())
+        driver = PlaywrightDriver(self.runner, context, page)
+        with self._lock:
+            self._drivers.append(driver)
+        return driver
+
+    def open_pages(self) -> List[PlaywrightDriver]:
+        with self._lock:
+            self._drivers = [d for d in self._drivers if not d.closed]
+            return list(self._drivers)
+
+    def sample_memory(self) -> Optional[Dict]:
+        """Próbka: RSS przeglądarki, otwarte strony, RSS i sterta JS na stronę."""
+        drivers = self.open_pages()
+        if not drivers:
+            return None
+        rss = self.rss_probe()
+        heaps = [h for h in (d.js_heap_mb() for d in drivers) if h is not None]
+        sample = {
+            'pages': len(drivers),
+            'browser_rss_mb': round(rss, 1) if rss is not None else None,
+            'rss_per_page_mb': round(rss / len(drivers), 1) if rss is not None else None,
+            'js_heap_per_page_mb': round(sum(heaps) / len(heaps), 1) if heaps else None,
+        }
+        self.samples.append(sample)
+        return sample
+
+    def memory_report(self) -> Dict:
+        if not self.samples:
+            return {}
+        peak = max(self.samples, key=lambda s: (s['browser_rss_mb'] or 0, s['pages']))
+        per_page = [s['rss_per_page_mb'] for s in self.samples if s['rss_per_page_mb'] is not None]
+        heaps = [s['js_heap_per_page_mb'] for s in self.samples if s['js_heap_per_page_mb'] is not None]
+        return {
+            'samples': len(self.samples),
+            'max_pages': max(s['pages'] for s in self.samples),
+            'peak_browser_rss_mb': peak['browser_rss_mb'],
+            'avg_rss_per_page_mb': round(sum(per_page) / len(per_page), 1) if per_page else None,
+            'avg_js_heap_per_page_mb': round(sum(heaps) / len(heaps), 1) if heaps else None,
+        }
+
+    def print_report(self) -> None:
+        report = self.memory_report()
+        if not report:
+            return
+        print(f"\n🎭 PLAYWRIGHT: {report['max_pages']} stron w locie, szczyt RSS Chromium "
+              f"{report['peak_browser_rss_mb']} MB")
+        print(f"   Pamięć na stronę: RSS {report['avg_rss_per_page_mb']} MB, "
+              f"sterta JS {report['avg_js_heap_per_page_mb']} MB ({report['samples']} próbek)")
+
+    def close(self) -> None:
+        for driver in self.open_pages():
+            driver.quit()
+        if self.runner is None:
+            return
+        try:
+            if self._browser is not None:
+                self.runner.run(self._browser.close(), timeout=30)
+            if self._playwright is not None:
+                self.runner.run(self._playwright.stop(), timeout=30)
+        except Exception as e:
+            print(f"⚠️ Playwright: zamykanie - {type(e).__name__}")
+        finally:
+            self.runner.stop()
+            self.runner = None
+
+
+class _PageSlot:
+    """Zastępca DriverPool dla process_url_with_retries: przy błędzie nowy kontekst zamiast restartu Chrome."""
+
+    def __init__(self, engine: PlaywrightEngine, prefix: str = ''):
+        self.engine = engine
+        self.prefix = prefix
+        self.driver = engine.new_driver()
+        self.recycles = 0
+
+    def recycle(self, reason: str = 'manual'):
+        self.driver.quit()
+        self.driver = self.engine.new_driver()
+        self.recycles += 1
+        print(f"   {self.prefix}🎭 Nowy kontekst przeglądarki ({reason})")
+        return self.driver
+
+    def close(self) -> None:
+        self.driver.quit()
+
+
+def run_phase1_playwright(urls: List[str], concurrency: int = DEFAULT_CONCURRENCY, headless: bool = True,
+                          away_team_focus: bool = False,
+                          on_progress: Callable[[int, Dict[int, Dict]], None] = None,
+                          on_result: Callable[[int, Optional[Dict]], None] = None,
+                          should_stop: Callable[[], bool] = None,
+                          engine: PlaywrightEngine = None,
+                          process: Callable = None) -> Tuple[List[Dict], List[int]]:
+    """
+    FAZA 1 na silniku Playwright: `concurrency` meczów w locie w jednym procesie.
+
+    Kontrakt jak run_phase1_pool (callbacki wołane kolejno, pod blokadą).
+
+    Args:
+        engine: Silnik (domyślnie nowy PlaywrightEngine - zamykany na końcu)
+        process: process_url_with_retries (wstrzykiwany w testach)
+
+    Returns:
+        (rows, qualifying_indices) w kolejności wejściowych URLi
+    """
+    from phase1_pool import merge_phase1_results
+    if process is None:
+        from phase1_pool import process_url_with_retries as process
+
+    own_engine = engine is None
+    engine = engine or PlaywrightEngine(headless=headless).start()
+    concurrency = max(1, min(concurrency, len(urls))) if urls else 1
+    tasks: queue.Queue = queue.Queue()
+    for item in enumerate(urls):
+        tasks.put(item)
+
+    results_by_index: Dict[int, Dict] = {}
+    lock = threading.Lock()
+    stop = threading.Event()
+    state = {'done': 0}
+
+    def _worker(n: int) -> None:
+        prefix = f"[P{n}] "
+        try:
+            slot = _PageSlot(engine, prefix)
+        except Exception as e:
+            print(f"{prefix}❌ Nie można otworzyć strony: {type(e).__name__}: {str(e)[:80]}")
+            return
+        driver = slot.driver
+        try:
+            while not stop.is_set():
+                try:
+                    idx, url = tasks.get_nowait()
+                except queue.Empty:
+                    break
+                print(f"\n{prefix}[{idx + 1}] {url[:80]}")
+                info, driver = process(url, driver, headless=headless, away_team_focus=away_team_focus,
+                                       prefix=prefix, pool=slot)
+                with lock:
+                    state['done'] += 1
+                    if info is not None:
+                        results_by_index[idx] = info
+                    if on_result:
+                        on_result(idx, info)
+                    if on_progress:
+                        on_progress(state['done'], results_by_index)
+                    # Próbka pamięci gdy wszystkie strony pierwszy raz w locie i potem co N meczów
+                    sample = state['done'] == concurrency or (
+                        MEMORY_SAMPLE_EVERY and state['done'] % MEMORY_SAMPLE_EVERY == 0)
+                    if should_stop and not stop.is_set() and should_stop():
+                        stop.set()
+                        print(f"\n⏰ Koniec budżetu czasu - porzucam {tasks.qsize()} meczów z kolejki")
+                if sample:
+                    engine.sample_memory()
+        finally:
+            slot.close()
+
+    threads = [threading.Thread(target=_worker, args=(n,), name=f'phase1-page-{n}', daemon=True)
+               for n in range(1, concurrency + 1)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.print_report()
+    finally:
+        if own_engine:
+            engine.close()
+    return merge_phase1_results(results_by_index)
@@ -0,0 +1,206 @@
+/**
+ * 🧭 PUPPETEER WORKER - jedna przeglądarka Stealth na cały proces
+ * ================================================================
+ * forebet_puppeteer.js / sofascore_puppeteer.js uruchamiały nowy proces node
+ * (i zimny start Chromium ze Stealth) dla każdego sportu i meczu.
+ * Worker uruchamia przeglądarkę raz i obsługuje kolejne żądania JSON-lines:
+ *
+ *   stdin  (jedno żądanie na linię):
+ *     {"id": 1, "url": "https://...", "wait_selector": ["div.rcnt"], "consent": true,
+ *      "human": true, "load_more": 10, "timeout": 60000, "extract": null}
+ *     {"id": 2, "sport": "basketball", ...}   - URL z SPORT_URLS (forebet_puppeteer.js)
+ *     {"id": 3, "cmd": "ping"} | {"cmd": "shutdown"}
+ *
+ *   stdout (jedna odpowiedź na linię):
+ *     {"event": "ready", "launch_ms": 812, "user_agent": "..."}
+ *     {"id": 1, "ok": true, "url": "...", "status": 200, "html": "...", "cookies": [...],
+ *      "user_agent": "...", "ms": 5321, "data": null}
+ *     {"id": 1, "ok": false, "error": "...", "ms": 60012}
+ *
+ * Każde żądanie dostaje nową kartę tej samej przeglądarki (cookies, w tym
+ * cf_clearance, są współdzielone między sportami). Logi idą na stderr.
+ * Klient Python: puppeteer_worker.py
+ *
+ * Uruchomienie:
+ *   node puppeteer_worker.js
+ */
+
+// stdout jest kanałem protokołu - logi funkcji pomocniczych przekierowane na stderr
+console.log = (...args) => console.error(...args);
+
+const readline = require('readline');
+const puppeteer = require('puppeteer-extra');
+const StealthPlugin = require('puppeteer-extra-plugin-stealth');
+const {
+    SPORT_URLS,
+    LAUNCH_OPTIONS,
+    delay,
+    clickConsent,
+    waitForContent,
+    simulateHumanBehavior,
+    clickLoadMore
+} = require('./forebet_puppeteer');
+const { extractFanVotes } = require('./sofascore_puppeteer');
+
+puppeteer.use(StealthPlugin());
+
+// Znaczniki strony challenge Cloudflare
+const CHALLENGE_MARKERS = ['Just a moment', 'loading-verifying', 'lds-ring', 'Checking your browser', 'cf-chl'];
+
+// Maks. czas czekania na rozwiązanie challenge (ms)
+const CHALLENGE_TIMEOUT = 30000;
+
+let browser = null;
+let userAgent = '';
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+async function ensureBrowser() {
+    if (browser && browser.isConnected()) {
+        return 0;
+    }
+    const started = Date.now();
+    console.log('🚀 Uruchamiam przeglądarkę...');
+    browser = await puppeteer.launch(LAUNCH_OPTIONS);
+    userAgent = await browser.userAgent();
+    const uaArg = LAUNCH_OPTIONS.args.find(arg => arg.startsWith('--user-agent='));
+    if (uaArg) {
+        userAgent = uaArg.slice('--user-agent='.length);
+    }
+    browser.on('disconnected', () => {
+        console.log('⚠️ Przeglądarka rozłączona - zostanie uruchomiona ponownie');
+        browser = null;
+    });
+    return Date.now() - started;
+}
+
+function isChallenge(html) {
+    return CHALLENGE_MARKERS.some(marker => html.includes(marker));
+}
+
+async function waitForChallenge(page, timeout) {
+    const deadline = Date.now() + timeout;
+    let html = await page.content();
+    while (isChallenge(html) && Date.now() < deadline) {
+        console.log('⏳ Czekam na Cloudflare...');
+        await delay(1000);
+        html = await page.content();
+    }
+    return !isChallenge(html);
+}
+
+async function fetchPage(request) {
+    await ensureBrowser();
+    if (!request.url && !request.sport) {
+        throw new Error('Brak url i sport w żądaniu');
+    }
+    // Nieznany sport -> football (jak forebet_puppeteer.js)
+    const url = request.url || SPORT_URLS[request.sport.toLowerCase()] || SPORT_URLS['football'];
+    const timeout = request.timeout || 60000;
+    const page = await browser.newPage();
+    try {
+        await page.setViewport({ width: 1920, height: 1080 });
+        await page.setExtraHTTPHeaders({
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8'
+        });
+
+        console.log(`🌐 Ładuję: ${url}`);
+        const response = await page.goto(url, { waitUntil: 'networkidle2', timeout });
+
+        // Challenge tylko przy pierwszej wizycie - dalej cf_clearance jest już w przeglądarce
+        await waitForChallenge(page, request.challenge_timeout || CHALLENGE_TIMEOUT);
+
+        if (request.human) {
+            await simulateHumanBehavior(page);
+        }
+        if (request.consent) {
+            await clickConsent(page);
+        }
+        if (request.wait_selector) {
+            const selectors = Array.isArray(request.wait_selector) ? request.wait_selector : [request.wait_selector];
+            await waitForContent(page, selectors);
+        }
+        if (request.load_more) {
+            await clickLoadMore(page, request.load_more);
+        }
+
+        let data = null;
+        if (request.extract === 'fan_votes') {
+            data = await extractFanVotes(page);
+        }
+
+        return {
+            url: page.url(),
+            status: response ? response.status() : null,
+            html: await page.content(),
+            cookies: await page.cookies(),
+            user_agent: userAgent,
+            data
+        };
+    } finally {
+        await page.close().catch(() => {});
+    }
+}
+
+async function handle(request) {
+    const started = Date.now();
+    if (request.cmd === 'ping') {
+        send({ id: request.id, ok: true, pong: true });
+        return;
+    }
+    try {
+        const result = await fetchPage(request);
+        send({ id: request.id, ok: true, ...result, ms: Date.now() - started });
+        console.log(`✅ ${result.url} (${result.html.length} znaków, ${Date.now() - started} ms)`);
+    } catch (error) {
+        send({ id: request.id, ok: false, error: error.message, ms: Date.now() - started });
+        console.log(`❌ ${request.url || request.sport}: ${error.message}`);
+    }
+}
+
+async function shutdown(code) {
+    if (browser) {
+        await browser.close().catch(() => {});
+        console.log('🔒 Przeglądarka zamknięta');
+    }
+    process.exit(code);
+}
+
+async function main() {
+    const launchMs = await ensureBrowser();
+    send({ event: 'ready', launch_ms: launchMs, user_agent: userAgent });
+
+    // Żądania obsługiwane po kolei (jedna karta naraz - zachowanie jak dawniej)
+    let queue = Promise.resolve();
+    const input = readline.createInterface({ input: process.stdin });
+    input.on('line', line => {
+        if (!line.trim()) {
+            return;
+        }
+        let request;
+        try {
+            request = JSON.parse(line);
+        } catch (e) {
+            send({ id: null, ok: false, error: `Niepoprawny JSON: ${e.message}` });
+            return;
+        }
+        if (request.cmd === 'shutdown') {
+            queue = queue.then(() => shutdown(0));
+            return;
+        }
+        queue = queue.then(() => handle(request));
+    });
+    // Klient Python zakończył się (stdin zamknięty) - sprzątamy przeglądarkę
+    input.on('close', () => {
+        queue = queue.then(() => shutdown(0));
+    });
+}
+
+main().catch(async err => {
+    send({ event: 'error', error: err.message });
+    console.error(`❌ Fatal error: ${err.message}`);
+    await shutdown(1);
+});
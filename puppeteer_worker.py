@@ -0,0 +1,278 @@
+"""
+🧭 Puppeteer Worker - klient długo żyjącego procesu node z przeglądarką Stealth
+==============================================================================
+fetch_forebet_with_puppeteer i CloudflareBypass._try_puppeteer uruchamiały
+`node forebet_puppeteer.js <sport>` osobno dla każdego sportu - każde
+wywołanie to zimny start Chromium ze Stealth (i ponowne przejście Cloudflare).
+
+Klient trzyma jeden proces `node puppeteer_worker.js` z jedną przeglądarką
+i wysyła mu żądania JSON-lines przez stdin/stdout:
+
+    page = puppeteer_worker.fetch(url, wait_selector=FOREBET_CONTENT_SELECTORS, consent=True)
+    page.html, page.cookies, page.user_agent
+
+- start leniwy: przeglądarka uruchamiana przy pierwszym fetch()
+- sześć stron sportów Forebet = jedno uruchomienie przeglądarki zamiast sześciu
+- worker padł (EOF / BrokenPipe): restart i jedna ponowna próba
+- przekroczony czas: worker zabijany (zawieszona karta), kolejny fetch startuje nowy
+- recykling: nowa przeglądarka co MAX_PAGES stron (pamięć Chromium)
+- koniec procesu: worker zamykany (atexit)
+
+Konfiguracja (env):
+    PUPPETEER_WORKER=0                   - stary tryb: node forebet_puppeteer.js na każde pobranie
+    PUPPETEER_WORKER_MAX_PAGES=50        - restart przeglądarki po tylu stronach
+    PUPPETEER_WORKER_START_TIMEOUT=90    - maks. czas startu przeglądarki (sekundy)
+    NODE_BIN=node                        - ścieżka do node
+"""
+
+import atexit
+import collections
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(WORKER_DIR, 'puppeteer_worker.js')
+NODE_BIN = os.getenv('NODE_BIN', 'node')
+MAX_PAGES = int(os.getenv('PUPPETEER_WORKER_MAX_PAGES', '50'))
+START_TIMEOUT = float(os.getenv('PUPPETEER_WORKER_START_TIMEOUT', '90'))
+
+# Zapas ponad timeout nawigacji na consent, symulację człowieka i "Load More" (sekundy)
+REQUEST_GRACE = 120
+
+# Selektory meczów Forebet (jak waitForContent w forebet_puppeteer.js)
+FOREBET_CONTENT_SELECTORS = ['div.rcnt', 'tr.tr_0', 'tr.tr_1', 'div.schema', '.contentmiddle', 'table.schema']
+
+
+def puppeteer_worker_enabled() -> bool:
+    return os.getenv('PUPPETEER_WORKER', '1') != '0'
+
+
+class PuppeteerWorkerError(Exception):
+    """Worker nie pobrał strony (błąd nawigacji, timeout, padnięcie procesu)."""
+
+
+class PuppeteerPage(NamedTuple):
+    """Strona pobrana przez worker."""
+    url: str
+    status: Optional[int]
+    html: str
+    cookies: List[Dict]
+    user_agent: str
+    elapsed: float
+    data: Optional[Dict]
+
+
+class PuppeteerWorker:
+    """
+    Klient procesu puppeteer_worker.js.
+
+    Args:
+        command: Polecenie workera (domyślnie [NODE_BIN, WORKER_SCRIPT])
+        max_pages: Restart przeglądarki po tylu stronach
+        start_timeout: Maks. czas na zdarzenie 'ready' (sekundy)
+    """
+
+    def __init__(self, command: Optional[List[str]] = None, max_pages: int = MAX_PAGES,
+                 start_timeout: float = START_TIMEOUT):
+        self.command = command or [NODE_BIN, WORKER_SCRIPT]
+        self.max_pages = max(1, max_pages)
+        self.start_timeout = start_timeout
+        self.launches = 0
+        self.requests = 0
+        self.failures = 0
+        self.restarts = 0
+        self.launch_seconds = 0.0
+        self.fetch_seconds = 0.0
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None
+        self._log_tail = collections.deque(maxlen=20)
+        self._pages = 0
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Czy jest node, skrypt workera i (dla node) zainstalowane puppeteer-extra."""
+        if not shutil.which(self.command[0]):
+            return False
+        script = self.command[1] if len(self.command) > 1 else ''
+        if script and not os.path.exists(script):
+            return False
+        if script.endswith('.js'):
+            return os.path.isdir(os.path.join(os.path.dirname(script), 'node_modules', 'puppeteer-extra'))
+        return True
+
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _pump(self, stream, lines: queue.Queue) -> None:
+        for line in stream:
+            lines.put(line)
+        lines.put(None)  # EOF - worker zakończył się
+
+    def _drain_log(self, stream) -> None:
+        for line in stream:
+            self._log_tail.append(line.rstrip())
+
+    def _start(self) -> None:
+        started = time.time()
+        try:
+            self._process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=WORKER_DIR, text=True, encoding='utf-8', errors='replace', bufsize=1)
+        except OSError as e:
+            raise PuppeteerWorkerError(f"Nie można uruchomić workera: {e}")
+        self._lines = queue.Queue()
+        self._pages = 0
+        threading.Thread(target=self._pump, args=(self._process.stdout, self._lines), daemon=True).start()
+        threading.Thread(target=self._drain_log, args=(self._process.stderr,), daemon=True).start()
+        self.launches += 1
+        try:
+            ready = self._read_message(lambda message: 'event' in message, self.start_timeout)
+        except (PuppeteerWorkerError, TimeoutError):
+            self._stop()
+            raise
+        if ready.get('event') != 'ready':
+            self._stop()
+            raise PuppeteerWorkerError(f"Start workera nieudany: {ready.get('error', ready)}")
+        self.launch_seconds += time.time() - started
+
+    def _stop(self, kill: bool = False) -> None:
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if kill and process.poll() is None:
+            process.kill()
+            process.wait()
+        if process.poll() is None:
+            try:
+                process.stdin.write(json.dumps({'cmd': 'shutdown'}) + '\n')
+                process.stdin.flush()
+                process.wait(timeout=10)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+        for stream in (process.stdin, process.stdout, process.stderr):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+
+    def _read_message(self, accept, timeout: float) -> Dict:
+        """Kolejna wiadomość JSON spełniająca accept(); inne linie stdout są pomijane."""
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise TimeoutError(f"Worker nie odpowiedział w {timeout:.0f}s")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                tail = ' | '.join(list(self._log_tail)[-3:])
+                raise PuppeteerWorkerError(f"Worker zakończył się ({tail or 'brak logów'})")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and accept(message):
+                return message
+
+    def _exchange(self, payload: Dict, timeout: float) -> Dict:
+        if not self.running() or self._pages >= self.max_pages:
+            if self._process is not None:
+                self._stop()
+                self.restarts += 1
+            self._start()
+        self._next_id += 1
+        payload = {**payload, 'id': self._next_id}
+        try:
+            self._process.stdin.write(json.dumps(payload) + '\n')
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise PuppeteerWorkerError(f"Worker nie przyjmuje żądań: {e}")
+        return self._read_message(lambda message: message.get('id') == payload['id'], timeout)
+
+    def fetch(self, url: Optional[str] = None, sport: Optional[str] = None, wait_selector=None,
+              consent: bool = True, human: bool = False, load_more: int = 0, timeout: float = 60,
+              extract: Optional[str] = None) -> PuppeteerPage:
+        """
+        Pobiera stronę w nowej karcie współdzielonej przeglądarki.
+
+        Args:
+            url: Adres strony (albo sport - URL z SPORT_URLS w forebet_puppeteer.js)
+            wait_selector: Selektor lub lista selektorów treści, na które czekać
+            consent: Kliknij baner cookies
+            human: Przewijanie jak człowiek przed odczytem
+            load_more: Maks. liczba kliknięć "Load More"
+            timeout: Timeout nawigacji (sekundy)
+            extract: 'fan_votes' - głosy kibiców SofaScore w PuppeteerPage.data
+        Raises: PuppeteerWorkerError
+        """
+        payload = {'url': url, 'sport': sport, 'wait_selector': wait_selector, 'consent': consent,
+                   'human': human, 'load_more': load_more, 'timeout': int(timeout * 1000), 'extract': extract}
+        with self._lock:
+            self.requests += 1
+            started = time.time()
+            for attempt in (1, 2):
+                try:
+                    response = self._exchange(payload, timeout + REQUEST_GRACE)
+                    break
+                except TimeoutError as e:
+                    # Zawieszona karta - worker zabijany, kolejny fetch startuje nowy
+                    self._stop(kill=True)
+                    self.failures += 1
+                    raise PuppeteerWorkerError(str(e))
+                except PuppeteerWorkerError:
+                    # Worker padł w trakcie - jeden restart i ponowna próba
+                    self._stop()
+                    if attempt == 2:
+                        self.failures += 1
+                        raise
+                    self.restarts += 1
+            self._pages += 1
+            self.fetch_seconds += time.time() - started
+        if not response.get('ok'):
+            self.failures += 1
+            raise PuppeteerWorkerError(response.get('error', 'Unknown error'))
+        return PuppeteerPage(response.get('url') or url or '', response.get('status'), response.get('html', ''),
+                             response.get('cookies') or [], response.get('user_agent', ''),
+                             response.get('ms', 0) / 1000, response.get('data'))
+
+    def fetch_forebet(self, url: Optional[str] = None, sport: Optional[str] = None,
+                      timeout: float = 60) -> PuppeteerPage:
+        """Strona Forebet jak w forebet_puppeteer.js: consent, człowiek, treść, "Load More"."""
+        return self.fetch(url=url, sport=sport, wait_selector=FOREBET_CONTENT_SELECTORS, consent=True, human=True,
+                          load_more=10, timeout=timeout)
+
+    def close(self) -> None:
+        """Zamyka worker i przeglądarkę (koniec procesu)."""
+        with self._lock:
+            self._stop()
+
+    def stats(self) -> Dict:
+        return {'launches': self.launches, 'requests': self.requests, 'failures': self.failures,
+                'restarts': self.restarts, 'running': self.running()}
+
+    def print_report(self) -> None:
+        if not self.requests:
+            return
+        avg = self.fetch_seconds / max(1, self.requests - self.failures)
+        print(f"\n🧭 PUPPETEER WORKER: strony {self.requests} (błędy {self.failures}), "
+              f"uruchomienia przeglądarki {self.launches} ({self.launch_seconds:.1f}s), "
+              f"restarty {self.restarts}, śr. {avg:.1f}s/stronę")
+
+
+# Globalna instancja (per proces) - przeglądarka zamykana przy wyjściu
+puppeteer_worker = PuppeteerWorker()
+atexit.register(puppeteer_worker.close)
+
+
+def print_puppeteer_worker_report() -> None:
+    puppeteer_worker.print_report()
@@ -0,0 +1,167 @@
+"""
+🚦 Staged Qualification - kwalifikacja etapami, odcięcie najwcześniej jak się da
+===============================================================================
+Kryterium meczu (H2H ≥60%) da się rozstrzygnąć zaraz po sparsowaniu H2H.
+Drogie etapy - zaawansowana forma (2-3 dodatkowe strony), kursy (API),
+Forebet, Gemini, SofaScore, FlashScore - uruchamiamy tylko dla kandydatów,
+którzy wciąż mogą się zakwalifikować.
+
+Etapy (w kolejności):
+    teams         - brak nazw drużyn/zawodników
+    h2h_count     - za mało meczów H2H (MIN_H2H_MATCHES)
+    h2h_win_rate  - odsetek zwycięstw H2H poniżej progu (H2H_WIN_RATE_THRESHOLD)
+    ranking       - tenis bez H2H: różnica rankingu < 20
+    tennis_score  - tenis: wynik TennisMatchAnalyzer poniżej progu
+
+Każdy mecz dostaje pola:
+    cutoff_stage    - etap, który odciął mecz ('' = zakwalifikowany)
+    skipped_stages  - drogie etapy pominięte dzięki odcięciu ('advanced_form,odds,...')
+
+print_qualification_report(rows) podsumowuje odcięcia i oszczędzone etapy dla całego dnia.
+
+Harmonogram --deadline (deadline_scheduler) może przy braku czasu zrzucić etapy
+kandydatów: set_shed_stages({'gemini', 'sofascore', 'advanced_form'}) - forma
+zrzucana jest tylko dla meczów z małą liczbą H2H (< LOW_H2H_COUNT). Zrzucenie to nie
+odcięcie: run_stage zwraca wtedy SHED, a mecz zachowuje kwalifikację z H2H.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List
+
+MIN_H2H_MATCHES = 1
+H2H_WIN_RATE_THRESHOLD = 0.60
+
+STAGE_TEAMS = 'teams'
+STAGE_H2H_COUNT = 'h2h_count'
+STAGE_H2H_WIN_RATE = 'h2h_win_rate'
+STAGE_RANKING = 'ranking'
+STAGE_TENNIS_SCORE = 'tennis_score'
+
+# Etapy zrzucane przez harmonogram --deadline (per proces)
+LOW_H2H_COUNT = 3
+_shed_stages = set()
+
+
+def set_shed_stages(stages) -> None:
+    _shed_stages.clear()
+    _shed_stages.update(stages)
+
+
+def is_shed(stage: str, h2h_count: int = 0) -> bool:
+    """Czy etap jest zrzucony (forma - tylko dla meczów z małą liczbą H2H)."""
+    if stage not in _shed_stages:
+        return False
+    return stage != 'advanced_form' or h2h_count < LOW_H2H_COUNT
+
+
+class _Shed:
+    """Wynik run_stage dla etapu zrzuconego przez --deadline: fałszywy (etap pomijany), ale mecz nie jest odcięty."""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return 'SHED'
+
+
+SHED = _Shed()
+
+
+class StagedQualifier:
+    """
+    Ewaluator kwalifikacji jednego meczu.
+
+    Args:
+        min_h2h: Minimalna liczba meczów H2H
+        threshold: Minimalny odsetek zwycięstw w H2H (0-1)
+    """
+
+    def __init__(self, min_h2h: int = MIN_H2H_MATCHES, threshold: float = H2H_WIN_RATE_THRESHOLD):
+        self.min_h2h = min_h2h
+        self.threshold = threshold
+        self.cutoff_stage = ''
+        self.h2h_count = 0
+        self.passed: List[str] = []
+        self.skipped: List[str] = []
+
+    @property
+    def candidate(self) -> bool:
+        """True dopóki żaden etap nie odciął meczu."""
+        return not self.cutoff_stage
+
+    def check(self, stage: str, ok: bool) -> bool:
+        """Zapisuje wynik etapu; pierwszy niezaliczony etap staje się cutoff_stage."""
+        if not self.candidate:
+            return False
+        if ok:
+            self.passed.append(stage)
+        else:
+            self.cutoff_stage = stage
+        return bool(ok)
+
+    def evaluate_h2h(self, home: str, away: str, h2h_count: int, focus_wins: int) -> bool:
+        """Etapy teams -> h2h_count -> h2h_win_rate (dane dostępne zaraz po H2H)."""
+        self.h2h_count = h2h_count
+        return (self.check(STAGE_TEAMS, bool(home and away))
+                and self.check(STAGE_H2H_COUNT, h2h_count >= self.min_h2h)
+                and self.check(STAGE_H2H_WIN_RATE, focus_wins / h2h_count >= self.threshold))
+
+    def run_stage(self, stage: str):
+        """
+        Czy uruchomić drogi etap? Pominięty etap jest zapisywany w skipped.
+
+        Returns: True - uruchom, False - mecz odcięty, SHED - etap zrzucony przez --deadline
+                 (mecz wciąż kandydatem; SHED jest fałszywy, więc `if run_stage(...)` go pomija)
+        """
+        shed = self.candidate and is_shed(stage, self.h2h_count)
+        if self.candidate and not shed:
+            return True
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+        return SHED if shed else False
+
+    def annotate(self, out: Dict) -> Dict:
+        out['cutoff_stage'] = self.cutoff_stage
+        out['skipped_stages'] = ','.join(self.skipped)
+        return out
+
+
+def summarize_cutoffs(rows: Iterable[Dict]) -> Dict:
+    """
+    Podsumowanie: {'matches', 'qualified', 'cutoffs': {etap: n}, 'skipped': {etap: n}}.
+
+    Wiersze bez pola cutoff_stage (np. błąd ładowania strony) nie są liczone.
+    """
+    cutoffs = Counter()
+    skipped = Counter()
+    matches = qualified = 0
+    for row in rows:
+        if 'cutoff_stage' not in row:
+            continue
+        matches += 1
+        stage = row.get('cutoff_stage') or ''
+        if stage:
+            cutoffs[stage] += 1
+        else:
+            qualified += 1
+        for name in str(row.get('skipped_stages') or '').split(','):
+            if name:
+                skipped[name] += 1
+    return {
+        'matches': matches,
+        'qualified': qualified,
+        'cutoffs': dict(cutoffs),
+        'skipped': dict(skipped),
+    }
+
+
+def print_qualification_report(rows: Iterable[Dict]) -> None:
+    summary = summarize_cutoffs(rows)
+    if not summary['matches']:
+        return
+    print(f"\n🚦 KWALIFIKACJA ETAPAMI: {summary['matches']} meczów, zakwalifikowane: {summary['qualified']}")
+    for stage, count in sorted(summary['cutoffs'].items(), key=lambda kv: -kv[1]):
+        print(f"   ✂️ odcięte na etapie {stage:<13} {count}")
+    if summary['skipped']:
+        saved = ', '.join(f"{stage}={count}" for stage, count in sorted(summary['skipped'].items()))
+        print(f"   ⏭️ pominięte drogie etapy: {saved}")
@@ -20,6 +20,8 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from team_matcher import TeamMatcher
+
 # Selenium imports
 try:
     from selenium import webdriver
@@ -286,13 +288,21 @@ class ResultScraper:
         """
         matched = []
         
+        # Indeks trigramów nazw z predykcji - podobieństwo liczone tylko dla
+        # predykcji, których obie drużyny mają wspólne trigramy z wynikiem
+        home_matcher = TeamMatcher([p.get('home_team', '') for p in predictions], normalize=self._normalize_team)
+        away_matcher = TeamMatcher([p.get('away_team', '') for p in predictions], normalize=self._normalize_team)
+        
         for result in results:
-            for pred in predictions:
+            res_home = result.home_team.lower()
+            res_away = result.away_team.lower()
+            candidates = (set(home_matcher.shortlist(res_home, limit=0)) &
+                          set(away_matcher.shortlist(res_away, limit=0)))
+            for position in sorted(candidates):
+                pred = predictions[position]
                 # Dopasowanie po nazwach drużyn
                 pred_home = pred.get('home_team', '').lower()
                 pred_away = pred.get('away_team', '').lower()
-                res_home = result.home_team.lower()
-                res_away = result.away_team.lower()
                 
                 # Sprawdź podobieństwo
                 if (self._teams_similar(pred_home, res_home) and 
@@ -309,13 +319,17 @@ class ResultScraper:
         
         return matched
     
+    @staticmethod
+    def _normalize_team(name: str) -> str:
+        """Normalizacja do porównania: małe litery, tylko litery i cyfry"""
+        return re.sub(r'[^a-z0-9]', '', (name or '').lower())
+    
     def _teams_similar(self, name1: str, name2: str, threshold: float = 0.6) -> bool:
         """Sprawdza podobieństwo nazw drużyn"""
         from difflib import SequenceMatcher
         
-        # Normalizacja
-        n1 = re.sub(r'[^a-z0-9]', '', name1.lower())
-        n2 = re.sub(r'[^a-z0-9]', '', name2.lower())
+        n1 = self._normalize_team(name1)
+        n2 = self._normalize_team(name2)
         
         return SequenceMatcher(None, n1, n2).ratio() >= threshold
     
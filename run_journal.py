@@ -0,0 +1,140 @@
+"""
+📒 Run Journal - dziennik przebiegu scrapowania (append-only JSONL)
+==================================================================
+Zamiast checkpointu co 80 meczów (pełny DataFrame + przepisanie całego CSV,
+koszt kwadratowy, utrata do 79 meczów i całej FAZY 2 przy awarii) każdy
+przetworzony mecz to JEDNA linia JSON dopisana na koniec pliku i utrwalona
+przez flush + os.fsync.
+
+Rekordy:
+    {"phase": 1, "index": 17, "url": "...", "info": {...}}      - wynik FAZY 1
+    {"phase": 2, "url": "...", "fields": {"forebet_...": ...}}  - wzbogacenie FAZY 2
+
+--resume: URLe obecne w dzienniku (dla tej samej daty i trybu - dziennik leży
+obok pliku CSV, którego nazwa zawiera datę, sporty i tryb AWAY_FOCUS) są pomijane,
+a mecze już wzbogacone nie przechodzą FAZY 2 ponownie.
+
+Finalny CSV/JSON budowany jest z dziennika w jednym przejściu (materialize).
+Urwana ostatnia linia (awaria w trakcie zapisu) jest ucinana przy wznowieniu i pomijana przy odczycie.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+# Pola dopisywane w FAZIE 2 (forebet_*, sofascore_*, gemini_*)
+PHASE2_FIELD_PREFIXES = ('forebet_', 'sofascore_', 'gemini_')
+
+
+def journal_path_for(outfn: str) -> str:
+    """Dziennik obok pliku wynikowego: outputs/X.csv -> outputs/X.journal.jsonl"""
+    base, _ = os.path.splitext(outfn)
+    return f"{base}.journal.jsonl"
+
+
+def phase2_fields(row: Dict) -> Dict:
+    return {k: v for k, v in row.items() if k.startswith(PHASE2_FIELD_PREFIXES)}
+
+
+class RunJournal:
+    """
+    Append-only dziennik JSONL jednego uruchomienia (data + sporty + tryb).
+
+    Args:
+        path: Ścieżka pliku .jsonl
+        resume: True - kontynuuj istniejący dziennik; False - zacznij od zera
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not resume and os.path.exists(path):
+            os.remove(path)
+        if resume:
+            self._truncate_torn_tail()
+        self.resumed_records = sum(1 for _ in self.records()) if resume else 0
+        self._fh = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()  # FAZA 2 w potoku zapisuje z wątków
+
+    def _truncate_torn_tail(self) -> None:
+        """Ucina urwaną ostatnią linię - inaczej kolejny zapis skleiłby się z nią."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if not data or data.endswith(b'\n'):
+                return
+            f.truncate(data.rfind(b'\n') + 1)
+
+    # ------------------------------------------------------------------
+    # Zapis
+    # ------------------------------------------------------------------
+
+    def _append(self, record: Dict) -> None:
+        record['ts'] = datetime.now().isoformat(timespec='seconds')
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._fh.write(line + '\n')
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def record_phase1(self, index: int, url: str, info: Dict) -> None:
+        self._append({'phase': 1, 'index': index, 'url': url, 'info': info})
+
+    def record_phase2(self, url: str, fields: Dict) -> None:
+        self._append({'phase': 2, 'url': url, 'fields': fields})
+
+    def close(self) -> None:
+        if self._fh and not self._fh.closed:
+            self._fh.close()
+
+    # ------------------------------------------------------------------
+    # Odczyt
+    # ------------------------------------------------------------------
+
+    def records(self) -> Iterator[Dict]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # urwana linia po awarii
+
+    def done_urls(self, phase: int = 1) -> Set[str]:
+        return {r['url'] for r in self.records() if r.get('phase') == phase and r.get('url')}
+
+    def materialize(self, url_order: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Buduje wiersze wyników w jednym przejściu po dzienniku.
+
+        Args:
+            url_order: Kolejność URLi (zwykle lista z bieżącego uruchomienia);
+                       URLe spoza listy trafiają na koniec w kolejności dziennika
+        """
+        rows: Dict[str, Dict] = {}
+        seen_order: List[str] = []
+        for record in self.records():
+            url = record.get('url')
+            if not url:
+                continue
+            if record.get('phase') == 1 and isinstance(record.get('info'), dict):
+                if url not in rows:
+                    seen_order.append(url)
+                rows[url] = record['info']
+            elif record.get('phase') == 2 and url in rows:
+                rows[url].update(record.get('fields') or {})
+
+        position = {url: i for i, url in enumerate(url_order or [])}
+        fallback = len(position)
+        seen_position = {url: i for i, url in enumerate(seen_order)}
+        ordered = sorted(seen_order, key=lambda u: (position.get(u, fallback), seen_position[u]))
+        return [rows[url] for url in ordered]
@@ -14,9 +14,26 @@ import os
 import sys
 import json
 import math
-import re
 from datetime import datetime
-from livesport_h2h_scraper import start_driver, get_match_links_from_day, process_match, process_match_tennis, detect_sport_from_url
+from livesport_h2h_scraper import start_driver, get_match_links_from_day, LINK_KICKOFFS
+from page_readiness import print_readiness_report
+from dom_snapshot_cache import print_snapshot_cache_report
+from browser_profile import print_page_metrics_report, LEAN_ENV
+from stage_metrics import print_stage_metrics_report
+from qualification import print_qualification_report
+from tennis_player_store import print_player_store_report
+from h2h_store import print_h2h_store_report
+from forebet_page_cache import print_forebet_page_cache_report
+from team_alias_store import print_team_alias_report
+from flaresolverr_pool import print_flaresolverr_pool_report
+from puppeteer_worker import print_puppeteer_worker_report
+from phase1_pool import process_url_with_retries, run_phase1_pool
+from playwright_engine import run_phase1_playwright, default_engine, ENGINES, DEFAULT_CONCURRENCY
+from driver_pool import DriverPool
+from run_journal import RunJournal, journal_path_for, phase2_fields
+from phase2_pipeline import EnrichmentPipeline, prepare_phase2, enrich_row, is_enriched, PHASE2_WORKERS
+from deadline_scheduler import DeadlineScheduler, parse_deadline, order_by_kickoff
+from sharding import parse_shard, select_shard, shard_arg, shard_path, shard_manifest, write_manifest
 from email_notifier import send_email_notification
 from app_integrator import AppIntegrator, create_integrator_from_config
 import pandas as pd
@@ -120,7 +137,13 @@ def scrape_and_send_email(
     use_odds: bool = False,
     use_gemini: bool = False,
     include_sorted_odds: bool = True,
-    odds_limit: int = 15
+    odds_limit: int = 15,
+    workers: int = 1,
+    resume: bool = False,
+    pipeline: bool = False,
+    deadline: str = None,
+    shard: str = None,
+    engine: str = 'selenium'
 ):
     """
     Scrapuje mecze i automatycznie wysyła email z wynikami
@@ -146,6 +169,12 @@ def scrape_and_send_email(
         skip_no_odds: Pomijaj mecze bez kursów bukmacherskich (💰)
         away_team_focus: Szukaj meczów gdzie GOŚCIE mają ≥60% H2H (zamiast gospodarzy) (🏃)
         use_odds: Pobieraj kursy z FlashScore (💰)
+        workers: Liczba równoległych przeglądarek w FAZIE 1 (⚡, domyślnie 1 = szeregowo)
+        resume: Pomiń mecze zapisane w dzienniku przebiegu (📒, po awarii)
+        pipeline: FAZA 2 równolegle z FAZĄ 1 - kolejka wzbogacania opróżniana przez wątki (⇄)
+        deadline: Termin wysyłki emaila 'HH:MM' - kolejność wg godziny meczu, zrzucanie pracy (⏰)
+        shard: 'i/N' - tylko część meczów dnia (🧩, wyniki scalane przez sharding.py merge, bez emaila)
+        engine: Silnik FAZY 1: 'selenium' lub 'playwright' (🎭 jeden Chromium, workers = strony w locie)
     """
     import time as time_module
     import os
@@ -186,20 +215,50 @@ def scrape_and_send_email(
         print(f"🤖 TRYB: Analiza Gemini AI")
     if max_matches:
         print(f"⚠️  TRYB TESTOWY: Limit {max_matches} meczów")
+    if workers > 1 and engine != 'playwright':
+        print(f"⚡ TRYB: {workers} równoległych przeglądarek w FAZIE 1")
+    if resume:
+        print(f"📒 TRYB: Wznowienie z dziennika przebiegu (--resume)")
+    if pipeline:
+        print(f"⇄ TRYB: FAZA 2 w potoku ({PHASE2_WORKERS} wątków) równolegle z FAZĄ 1")
+    scheduler = DeadlineScheduler(parse_deadline(deadline)) if deadline else None
+    if scheduler:
+        print(f"⏰ TRYB: Termin wysyłki {deadline} (rezerwa na email: {(scheduler.deadline.timestamp() - scheduler.deadline_ts) / 60:.0f} min)")
+    playwright_pages = (workers if workers > 1 else DEFAULT_CONCURRENCY) if engine == 'playwright' else 0
+    if playwright_pages:
+        print(f"🎭 TRYB: Silnik Playwright - {playwright_pages} meczów w locie w jednym Chromium")
+    shard_spec = parse_shard(shard) if shard else None
+    if shard_spec:
+        print(f"🧩 TRYB: Shard {shard_spec[0]}/{shard_spec[1]} (email po scaleniu: sharding.py merge)")
     print("="*70)
     
     driver = start_driver(headless=headless)
+    pool = None
+    journal = None
+    enrichment = None
     
     try:
         # KROK 1: Zbierz linki
         print("\n🔍 KROK 1/3: Zbieranie linków do meczów...")
-        urls = get_match_links_from_day(driver, date, sports=sports, leagues=None)
+        urls = get_match_links_from_day(driver, date, sports=sports, leagues=None, headless=headless)
         print(f"✅ Znaleziono {len(urls)} meczów")
         
         if max_matches and len(urls) > max_matches:
             urls = urls[:max_matches]
             print(f"⚠️  Ograniczono do {max_matches} meczów (tryb testowy)")
         
+        discovered_urls = list(urls)
+        if shard_spec:
+            # 🧩 Stabilny hash ID wydarzenia - każda maszyna bierze swoje mecze bez koordynacji
+            urls = select_shard(urls, shard_spec)
+            print(f"🧩 Shard {shard_spec[0]}/{shard_spec[1]}: {len(urls)}/{len(discovered_urls)} meczów")
+        
+        if scheduler:
+            # ⏰ Najbliższe mecze najpierw, rozpoczęte odpadają
+            urls, started = order_by_kickoff(urls, LINK_KICKOFFS, date)
+            scheduler.started_skipped = len(started)
+            print(f"⏰ Kolejność wg godziny rozpoczęcia; pominięto {len(started)} rozpoczętych meczów")
+        
         # ========================================================================
         # DWUFAZOWY PROCES OPTYMALIZACJI CZASOWEJ
         # FAZA 1: Szybkie sprawdzenie kwalifikacji (bez Forebet/SofaScore)
@@ -213,164 +272,177 @@ def scrape_and_send_email(
         else:
             outfn = f'outputs/livesport_h2h_{date}_{sport_suffix}_EMAIL.csv'
         os.makedirs('outputs', exist_ok=True)
+        base_outfn = outfn
+        if shard_spec:
+            outfn = shard_path(outfn, shard_spec)
+            write_manifest(outfn, shard_spec, discovered_urls)
+        
+        # 📒 Dziennik przebiegu: 1 linia JSONL (fsync) na przetworzony mecz zamiast checkpointów CSV
+        journal = RunJournal(journal_path_for(outfn), resume=resume)
+        all_urls = list(urls)
+        url_index = {u: i for i, u in enumerate(all_urls)}
+        if resume:
+            done_urls = journal.done_urls(phase=1)
+            urls = [u for u in urls if u not in done_urls]
+            print(f"📒 RESUME: {len(all_urls) - len(urls)} meczów już w dzienniku - pozostało {len(urls)}/{len(all_urls)}")
+        print(f"📒 Dziennik: {journal.path}")
+        
+        # ⇄ TRYB POTOKOWY: kwalifikujące się mecze od razu do kolejki FAZY 2 (wątki I/O)
+        if pipeline and (use_forebet or use_sofascore or use_gemini):
+            def _on_enriched(row):
+                if row.get('match_url'):
+                    journal.record_phase2(row['match_url'], phase2_fields(row))
+                if scheduler:
+                    # Wątki pracują równolegle - efektywny czas na mecz to czas pracy / liczba wątków
+                    scheduler.record('phase2', enrichment.busy_seconds / max(1, enrichment.processed) / enrichment.workers)
+            
+            enrichment = EnrichmentPipeline(date, sports, use_forebet=use_forebet, use_sofascore=use_sofascore,
+                                            use_gemini=use_gemini, on_done=_on_enriched,
+                                            skip_urls=journal.done_urls(phase=2) if resume else None).start()
         
         rows = []
         qualifying_count = 0
         qualifying_indices = []  # Indeksy kwalifikujących się meczów
-        RESTART_INTERVAL = 80  # Zwiększone — mniej restartów = szybciej
-        CHECKPOINT_INTERVAL = 80  # Co 80 meczów checkpoint
         
         # ========================================================================
         # FAZA 1: SZYBKIE SPRAWDZENIE KWALIFIKACJI (BEZ Forebet/SofaScore)
         # ========================================================================
         phase1_start = time_module.time()
+        with_phase2 = use_forebet or use_sofascore or use_gemini
+        if scheduler:
+            scheduler.start_phase('phase1')
+            scheduler.start_phase('phase2')
         print(f"\n" + "="*70)
         print(f"⚡ FAZA 1/2: SZYBKIE SPRAWDZENIE KWALIFIKACJI ({len(urls)} meczów)")
         print(f"   (bez Forebet/SofaScore - tylko H2H + forma)")
         print("="*70)
         
-        for i, url in enumerate(urls, 1):
-            # Oblicz ETA
-            if i > 1:
-                elapsed = time_module.time() - phase1_start
-                avg_per_match = elapsed / (i - 1)
-                remaining = (len(urls) - i + 1) * avg_per_match
-                eta_min = remaining / 60
-                progress_pct = (i / len(urls)) * 100
-                print(f"\n[FAZA 1: {i}/{len(urls)} ({progress_pct:.0f}%)] ETA: {eta_min:.1f} min")
-            else:
-                print(f"\n[FAZA 1: {i}/{len(urls)}] Przetwarzam...")
+        if playwright_pages and urls:
+            # 🎭 Jeden Chromium, kontekst na mecz w locie - driver Selenium nie jest potrzebny w FAZIE 1/2
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = None
             
-            # RETRY LOGIC - w CI tylko 1 próba, lokalnie 3 próby
-            max_retries = 1 if IS_CI else 3
-            retry_count = 0
-            success = False
+            def _on_result(idx, info):
+                if info is not None:
+                    journal.record_phase1(url_index[urls[idx]], urls[idx], info)
+                    if enrichment is not None and info.get('qualifies'):
+                        enrichment.submit(info)
+                if scheduler:
+                    scheduler.mark('phase1', bool(info and info.get('qualifies')))
             
-            while retry_count < max_retries and not success:
-                try:
-                    # Wykryj sport z URL (tennis ma '/tenis/' w URLu)
-                    is_tennis = '/tenis/' in url.lower() or 'tennis' in url.lower()
-                    
-                    if is_tennis:
-                        # Użyj dedykowanej funkcji dla tenisa (ADVANCED)
-                        info = process_match_tennis(url, driver)
-                        rows.append(info)
-                        
-                        if info['qualifies']:
-                            qualifying_count += 1
-                            qualifying_indices.append(len(rows) - 1)
-                            player_a_wins = info['home_wins_in_h2h_last5']
-                            player_b_wins = info.get('away_wins_in_h2h', 0)
-                            advanced_score = info.get('advanced_score', 0)
-                            favorite = info.get('favorite', 'unknown')
-                            
-                            # Określ faworyta
-                            if favorite == 'player_a':
-                                fav_name = info['home_team']
-                            elif favorite == 'player_b':
-                                fav_name = info['away_team']
-                            else:
-                                fav_name = "Równi"
-                            
-                            print(f"   ✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
-                            print(f"      Faworytem: {fav_name} (Score: {advanced_score:.1f}/100)")
-                        else:
-                            player_a_wins = info['home_wins_in_h2h_last5']
-                            player_b_wins = info.get('away_wins_in_h2h', 0)
-                            advanced_score = info.get('advanced_score', 0)
-                            print(f"   ❌ Nie kwalifikuje (Score: {advanced_score:.1f}/100, H2H: {player_a_wins}-{player_b_wins})")
-                        
-                        success = True
-                    
-                    else:
-                        # Sporty drużynowe - FAZA 1: BEZ Forebet/SofaScore
-                        current_sport = detect_sport_from_url(url)
-                        info = process_match(url, driver, away_team_focus=away_team_focus,
-                                           use_forebet=False, use_gemini=False, 
-                                           use_sofascore=False, sport=current_sport)
-                        rows.append(info)
-                        
-                        if info['qualifies']:
-                            qualifying_count += 1
-                            qualifying_indices.append(len(rows) - 1)
-                            h2h_count = info.get('h2h_count', 0)
-                            win_rate = info.get('win_rate', 0.0)
-                            home_form = info.get('home_form', [])
-                            away_form = info.get('away_form', [])
-                            
-                            home_form_str = '-'.join(home_form) if home_form else 'N/A'
-                            away_form_str = '-'.join(away_form) if away_form else 'N/A'
-                            
-                            if away_team_focus:
-                                wins_count = info.get('away_wins_in_h2h_last5', 0)
-                                focused_team = info['away_team']
-                            else:
-                                wins_count = info['home_wins_in_h2h_last5']
-                                focused_team = info['home_team']
-                            
-                            print(f"   ✅ KWALIFIKUJE! {info['home_team']} vs {info['away_team']}")
-                            print(f"      Fokus: {focused_team}, H2H: {wins_count}/{h2h_count} ({win_rate*100:.0f}%)")
-                        else:
-                            h2h_count = info.get('h2h_count', 0)
-                            win_rate = info.get('win_rate', 0.0)
-                            if h2h_count > 0:
-                                if away_team_focus:
-                                    wins_count = info.get('away_wins_in_h2h_last5', 0)
-                                else:
-                                    wins_count = info['home_wins_in_h2h_last5']
-                                print(f"   ❌ Nie kwalifikuje ({wins_count}/{h2h_count} = {win_rate*100:.0f}%)")
-                            else:
-                                print(f"   ⚠️  Brak H2H")
-                        
-                        success = True
-                    
-                except (ConnectionResetError, ConnectionError, Exception) as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        print(f"   ⚠️  Błąd połączenia (próba {retry_count}/{max_retries}): {str(e)[:100]}")
-                        print(f"   🔄 Restartowanie przeglądarki i ponowienie próby...")
-                        try:
-                            driver.quit()
-                        except:
-                            pass
-                        time.sleep(2 if IS_CI else 3)
-                        driver = start_driver(headless=headless)
-                    else:
-                        print(f"   ❌ Błąd po {max_retries} próbach: {str(e)[:100]}")
-                        print(f"   ⏭️  Pomijam ten mecz i kontynuuję...")
+            def _should_stop():
+                scheduler.update(len(urls) - scheduler.measured['phase1'],
+                                 enrichment.pending() if enrichment is not None else 0, with_phase2)
+                return scheduler.should_stop('phase1')
             
-            # CHECKPOINT - zapisz co 40 meczów
-            if i % CHECKPOINT_INTERVAL == 0 and len(rows) > 0:
-                print(f"\n💾 CHECKPOINT FAZA 1: ({i}/{len(urls)} meczów)...")
-                try:
-                    df_checkpoint = pd.DataFrame(rows)
-                    if 'h2h_last5' in df_checkpoint.columns:
-                        df_checkpoint['h2h_last5'] = df_checkpoint['h2h_last5'].apply(lambda x: str(x) if x else '')
-                    # 🔧 Czyść kursy przed zapisem - zamień NaN na None
-                    df_checkpoint = clean_dataframe_for_csv(df_checkpoint)
-                    df_checkpoint.to_csv(outfn, index=False, encoding='utf-8-sig')
-                    print(f"   ✅ Zapisano! ({qualifying_count} kwalifikujących)")
-                except Exception as e:
-                    print(f"   ⚠️  Błąd zapisu: {e}")
+            rows, qualifying_indices = run_phase1_playwright(urls, playwright_pages, headless=headless,
+                                                             away_team_focus=away_team_focus,
+                                                             on_result=_on_result,
+                                                             should_stop=_should_stop if scheduler else None)
+            qualifying_count = len(qualifying_indices)
+        
+        elif workers > 1 and len(urls) > 1:
+            # ⚡ TRYB PULI: N przeglądarek, wspólna kolejka URLi, scalanie w kolejności wejściowej
+            print(f"   ⚡ Pula workerów: {min(workers, len(urls))} przeglądarek równolegle")
+            # Driver procesu głównego nie jest potrzebny w FAZIE 1/2 - zwolnij pamięć
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = None
             
-            # AUTO-RESTART przeglądarki
-            if i % RESTART_INTERVAL == 0 and i < len(urls):
-                print(f"\n🔄 AUTO-RESTART po {i} meczach...")
-                try:
-                    driver.quit()
-                    time.sleep(1.5 if IS_CI else 2)
-                    driver = start_driver(headless=headless)
-                    print(f"   ✅ OK! Kontynuuję...")
-                except Exception as e:
-                    print(f"   ⚠️  Błąd restartu: {e}")
-                    driver = start_driver(headless=headless)
+            def _on_result(idx, info):
+                # Dziennik zapisuje tylko proces główny
+                if info is not None:
+                    journal.record_phase1(url_index[urls[idx]], urls[idx], info)
+                    if enrichment is not None and info.get('qualifies'):
+                        enrichment.submit(info)
+                if scheduler:
+                    scheduler.mark('phase1', bool(info and info.get('qualifies')))
+            
+            def _should_stop():
+                # ⏰ Pula: porzuć mecze z kolejki, gdy kolejny nie zmieści się przed terminem
+                scheduler.update(len(urls) - scheduler.measured['phase1'],
+                                 enrichment.pending() if enrichment is not None else 0, with_phase2)
+                return scheduler.should_stop('phase1')
+            
+            rows, qualifying_indices = run_phase1_pool(urls, workers, headless=headless,
+                                                       away_team_focus=away_team_focus,
+                                                       on_result=_on_result,
+                                                       should_stop=_should_stop if scheduler else None)
+            qualifying_count = len(qualifying_indices)
+        
+        else:
+            # ♻️ Pula: przejmuje driver ze zbierania linków, recykling wg RSS/kart/health + rozgrzany spare
+            pool = DriverPool(headless=headless, driver=driver)
+            for i, url in enumerate(urls, 1):
+                if scheduler:
+                    # ⏰ Zrzuć mniej wartościową pracę lub przerwij, gdy mecz nie zmieści się przed terminem
+                    scheduler.update(len(urls) - i + 1, enrichment.pending() if enrichment is not None else 0,
+                                     with_phase2)
+                    if scheduler.should_stop('phase1'):
+                        scheduler.note_stop('phase1', len(urls) - i + 1)
+                        break
+                
+                # Oblicz ETA
+                if i > 1:
+                    elapsed = time_module.time() - phase1_start
+                    avg_per_match = elapsed / (i - 1)
+                    remaining = (len(urls) - i + 1) * avg_per_match
+                    eta_min = remaining / 60
+                    progress_pct = (i / len(urls)) * 100
+                    print(f"\n[FAZA 1: {i}/{len(urls)} ({progress_pct:.0f}%)] ETA: {eta_min:.1f} min")
+                else:
+                    print(f"\n[FAZA 1: {i}/{len(urls)}] Przetwarzam...")
             
-            # Rate limiting - minimalne w CI dla szybkości
-            elif i < len(urls):
-                time.sleep(0.15 if IS_CI else 0.8)
+                # RETRY LOGIC - w CI tylko 1 próba, lokalnie 3 próby (tenis/drużynowe rozdzielane w środku)
+                info, driver = process_url_with_retries(url, driver, headless=headless,
+                                                        away_team_focus=away_team_focus, pool=pool)
+                if info is not None:
+                    rows.append(info)
+                    journal.record_phase1(url_index[url], url, info)
+                    if info['qualifies']:
+                        qualifying_count += 1
+                        qualifying_indices.append(len(rows) - 1)
+                        if enrichment is not None:
+                            enrichment.submit(info)
+                if scheduler:
+                    scheduler.mark('phase1', bool(info and info['qualifies']))
+            
+                # RECYKLING przeglądarki tylko przy przekroczeniu progów
+                if i < len(urls):
+                    driver = pool.after_match()
+                    # Rate limiting - minimalne w CI dla szybkości
+                    time.sleep(0.15 if IS_CI else 0.8)
+            
+            # FAZA 2 używa aktywnego drivera - spare nie jest już potrzebny
+            pool.release_spare()
+            pool.print_report()
         
         phase1_end = time_module.time()
         phase1_duration = phase1_end - phase1_start
+        print_readiness_report()
+        print_snapshot_cache_report()
+        print_page_metrics_report()
+        print_stage_metrics_report()
+        
+        if resume:
+            # Wiersze z poprzednich uruchomień + bieżące, w kolejności URLi
+            rows = journal.materialize(all_urls)
+            qualifying_indices = [k for k, row in enumerate(rows) if row.get('qualifies')]
+            qualifying_count = len(qualifying_indices)
+            if enrichment is not None:
+                # Kwalifikujące z poprzednich uruchomień, jeszcze niewzbogacone
+                current_urls = set(urls)
+                for row in rows:
+                    if row.get('qualifies') and row.get('match_url') not in current_urls:
+                        enrichment.submit(row)
+        print_qualification_report(rows)
+        print_player_store_report()
+        print_h2h_store_report()
         
         print(f"\n" + "="*70)
         print(f"⚡ FAZA 1 ZAKOŃCZONA!")
@@ -434,7 +506,26 @@ def scrape_and_send_email(
         # ========================================================================
         # FAZA 2: WZBOGACENIE DANYCH (tylko kwalifikujące się mecze)
         # ========================================================================
-        if qualifying_count > 0 and (use_forebet or use_sofascore or use_gemini):
+        if enrichment is not None:
+            print(f"\n⇄ FAZA 2 (potok): czekam na opróżnienie kolejki ({enrichment.submitted - enrichment.processed} w kolejce)...")
+            if scheduler:
+                # ⏰ Czekaj na kolejkę tylko do terminu - reszta meczów idzie w emailu bez wzbogacenia
+                while enrichment.submitted > enrichment.processed:
+                    scheduler.update(0, enrichment.pending())
+                    if scheduler.should_stop('phase2'):
+                        scheduler.note_stop('phase2', enrichment.cancel_pending())
+                        break
+                    time.sleep(1)
+            phase2_stats = enrichment.close()
+            enrichment = None
+            print(f"\n" + "="*70)
+            print(f"🎯 FAZA 2 (POTOK) ZAKOŃCZONA!")
+            print(f"   Wzbogaconych: {phase2_stats['enriched']}/{phase2_stats['processed']}"
+                  f" (z dziennika: {phase2_stats['skipped']})")
+            print(f"   Czas pracy wątków: {phase2_stats['busy_seconds']:.0f}s, "
+                  f"po FAZIE 1: {time_module.time() - phase1_end:.0f}s")
+            print("="*70)
+        elif qualifying_count > 0 and (use_forebet or use_sofascore or use_gemini):
             phase2_start = time_module.time()
             print(f"\n" + "="*70)
             print(f"🎯 FAZA 2/2: WZBOGACENIE DANYCH ({qualifying_count} kwalifikujących meczów)")
@@ -446,44 +537,27 @@ def scrape_and_send_email(
                 print(f"   ✓ Gemini AI: analiza")
             print("="*70)
             
-            # 🔥 PRE-FETCH: Pobierz HTML Forebet dla wszystkich sportów na raz
-            if use_forebet:
-                try:
-                    from forebet_scraper import prefetch_all_sports, search_forebet_prediction
-                    FOREBET_AVAILABLE = True
-                    print(f"\n🔥 PRE-FETCH: Pobieranie HTML Forebet dla wszystkich sportów...")
-                    unique_sports = list(set(sports))
-                    prefetch_results = prefetch_all_sports(unique_sports, date)
-                    for sport_name, success in prefetch_results.items():
-                        status = "✅" if success else "❌"
-                        print(f"   {status} {sport_name}")
-                except ImportError as ie:
-                    FOREBET_AVAILABLE = False
-                    print(f"   ⚠️ Forebet scraper niedostępny: ImportError - {ie}")
-                except Exception as e:
-                    FOREBET_AVAILABLE = False
-                    print(f"   ⚠️ Forebet scraper niedostępny: {type(e).__name__} - {e}")
-            
-            # Import SofaScore jeśli potrzebny
-            if use_sofascore:
-                try:
-                    from sofascore_scraper import get_sofascore_prediction
-                    SOFASCORE_AVAILABLE = True
-                except ImportError as ie:
-                    SOFASCORE_AVAILABLE = False
-                    print(f"   ⚠️ SofaScore scraper niedostępny: ImportError - {ie}")
-                except Exception as e:
-                    SOFASCORE_AVAILABLE = False
-                    print(f"   ⚠️ SofaScore scraper niedostępny: {type(e).__name__} - {e}")
+            # 🔥 PRE-FETCH: HTML Forebet dla wszystkich sportów na raz + import scraperów
+            available = prepare_phase2(sports, date, use_forebet, use_sofascore)
             
             # Przetwórz każdy kwalifikujący się mecz
             enriched_count = 0
+            enriched_urls = journal.done_urls(phase=2) if resume else set()
+            if scheduler:
+                scheduler.start_phase('phase2')
             for j, idx in enumerate(qualifying_indices, 1):
                 row = rows[idx]
+                if scheduler:
+                    scheduler.update(0, qualifying_count - j + 1)
+                    if scheduler.should_stop('phase2'):
+                        scheduler.note_stop('phase2', qualifying_count - j + 1)
+                        break
+                if row.get('match_url') in enriched_urls:
+                    print(f"\n[FAZA 2: {j}/{qualifying_count}] 📒 Już wzbogacony (dziennik) - pomijam")
+                    enriched_count += 1
+                    continue
                 home_team = row.get('home_team', '')
                 away_team = row.get('away_team', '')
-                match_time = row.get('match_time', '')
-                current_sport = detect_sport_from_url(row.get('match_url', ''))
                 
                 # ETA dla FAZY 2
                 if j > 1:
@@ -495,77 +569,16 @@ def scrape_and_send_email(
                 else:
                     print(f"\n[FAZA 2: {j}/{qualifying_count}] {home_team} vs {away_team}")
                 
-                # Wyciągnij datę z match_time (wspólne dla Forebet i SofaScore)
-                match_date = None
-                if match_time:
-                    date_match = re.search(r'(\d{1,2}\.\d{1,2}\.\d{4})', match_time)
-                    if date_match:
-                        day, month, year = date_match.group(1).split('.')
-                        match_date = f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-                if not match_date:
-                    match_date = date
-                
-                # FOREBET
-                if use_forebet and FOREBET_AVAILABLE:
-                    try:
-                        forebet_result = search_forebet_prediction(
-                            home_team=home_team,
-                            away_team=away_team,
-                            match_date=match_date,
-                            sport=current_sport
-                        )
-                        
-                        if forebet_result.get('success') or forebet_result.get('found'):
-                            row['forebet_prediction'] = forebet_result.get('prediction')
-                            row['forebet_probability'] = forebet_result.get('probability')
-                            row['forebet_exact_score'] = forebet_result.get('exact_score')
-                            row['forebet_over_under'] = forebet_result.get('over_under')
-                            row['forebet_btts'] = forebet_result.get('btts')
-                            row['forebet_avg_goals'] = forebet_result.get('avg_goals')
-                            print(f"   ✅ Forebet: {row['forebet_prediction']} ({row['forebet_probability']}%)")
-                        else:
-                            print(f"   ⚠️ Forebet: nie znaleziono ({forebet_result.get('error', 'brak')})")
-                    except Exception as e:
-                        print(f"   ❌ Forebet błąd: {str(e)[:50]}")
-                
-                # SOFASCORE
-                if use_sofascore and SOFASCORE_AVAILABLE:
-                    try:
-                        sofascore_result = get_sofascore_prediction(
-                            home_team=home_team,
-                            away_team=away_team,
-                            sport=current_sport,
-                            date_str=match_date
-                        )
-                        
-                        if sofascore_result.get('found'):
-                            row['sofascore_home_win_prob'] = sofascore_result.get('home_win_prob')
-                            row['sofascore_draw_prob'] = sofascore_result.get('draw_prob')
-                            row['sofascore_away_win_prob'] = sofascore_result.get('away_win_prob')
-                            row['sofascore_total_votes'] = sofascore_result.get('total_votes')
-                            print(f"   ✅ SofaScore: H:{row['sofascore_home_win_prob']}% D:{row['sofascore_draw_prob']}% A:{row['sofascore_away_win_prob']}%")
-                        else:
-                            print(f"   ⚠️ SofaScore: nie znaleziono")
-                    except Exception as e:
-                        print(f"   ❌ SofaScore błąd: {str(e)[:50]}")
-                
-                # GEMINI AI (jeśli włączone)
-                if use_gemini:
-                    try:
-                        from gemini_analyzer import analyze_match_with_gemini
-                        gemini_result = analyze_match_with_gemini(row)
-                        if gemini_result:
-                            row['gemini_prediction'] = gemini_result.get('prediction')
-                            row['gemini_confidence'] = gemini_result.get('confidence')
-                            row['gemini_reasoning'] = gemini_result.get('reasoning')
-                            row['gemini_recommendation'] = gemini_result.get('recommendation')
-                            print(f"   ✅ Gemini: {row['gemini_recommendation']} ({row['gemini_confidence']}%)")
-                    except Exception as e:
-                        print(f"   ❌ Gemini błąd: {str(e)[:50]}")
+                # Forebet, SofaScore, Gemini
+                enrich_row(row, date, use_forebet, use_sofascore, use_gemini, available)
                 
                 # Oznacz jako wzbogacony
-                if row.get('forebet_prediction') or row.get('sofascore_home_win_prob') or row.get('gemini_prediction'):
+                if is_enriched(row):
                     enriched_count += 1
+                if row.get('match_url'):
+                    journal.record_phase2(row['match_url'], phase2_fields(row))
+                if scheduler:
+                    scheduler.mark('phase2')
                 
                 # Rate limiting między meczami w FAZIE 2
                 if j < qualifying_count:
@@ -585,9 +598,20 @@ def scrape_and_send_email(
                 print(f"\n⚠️ Brak kwalifikujących się meczów - pomijam FAZĘ 2")
             elif not (use_forebet or use_sofascore or use_gemini):
                 print(f"\n⚠️ Forebet/SofaScore/Gemini wyłączone - pomijam FAZĘ 2")
+        if use_forebet:
+            print_forebet_page_cache_report()
+            print_flaresolverr_pool_report()
+            print_puppeteer_worker_report()
+        if use_forebet or use_sofascore:
+            print_team_alias_report()
+        
+        if scheduler:
+            scheduler.print_report()
         
-        # Zapisz finalne wyniki (plik już istnieje jeśli były checkpointy)
+        # Zapisz finalne wyniki - zbudowane z dziennika w jednym przejściu
         print("\n💾 Zapisywanie finalnych wyników...")
+        rows = journal.materialize(all_urls)
+        qualifying_count = sum(1 for r in rows if r.get('qualifies'))
         
         # 🔧 Upewnij się, że odds_source jest ustawiony (dla emaila)
         for row in rows:
@@ -646,7 +670,8 @@ def scrape_and_send_email(
         print(f"\n📊 Eksport danych JSON dla frontendu...")
         os.makedirs('results', exist_ok=True)
         sport_suffix = '_'.join(sports) if len(sports) <= 2 else 'multi'
-        json_filename = f'results/matches_{date}_{sport_suffix}.json'
+        base_json_filename = f'results/matches_{date}_{sport_suffix}.json'
+        json_filename = shard_path(base_json_filename, shard_spec) if shard_spec else base_json_filename
         
         # Przygotuj dane w formacie frontendu
         frontend_matches = []
@@ -660,7 +685,7 @@ def scrape_and_send_email(
                 'league': row.get('league', row.get('tournament', '')),
                 'country': row.get('country', ''),
                 'sport': sport_suffix if len(sports) == 1 else row.get('sport', 'football'),
-                'matchUrl': row.get('url', ''),
+                'matchUrl': row.get('match_url', row.get('url', '')),
                 'qualifies': row.get('qualifies', False),
                 # H2H
                 'h2h': {
@@ -715,6 +740,9 @@ def scrape_and_send_email(
             },
             'matches': frontend_matches
         }
+        if shard_spec:
+            # Kolejność URLi dla scalania (sharding.py merge usuwa ten klucz)
+            json_output['shard'] = shard_manifest(shard_spec, discovered_urls)
         
         with open(json_filename, 'w', encoding='utf-8') as f:
             json.dump(json_output, f, ensure_ascii=False, indent=2)
@@ -744,7 +772,10 @@ def scrape_and_send_email(
             print(f"   Procent: {percent:.1f}%")
         
         # KROK 3: Wyślij email (tylko jeśli są kwalifikujące się mecze)
-        if qualifying_count > 0:
+        if shard_spec:
+            print(f"\n🧩 Shard {shard_spec[0]}/{shard_spec[1]}: email i aplikacja UI po scaleniu wyników")
+            print(f"   python sharding.py merge {base_outfn} {base_json_filename}")
+        elif qualifying_count > 0:
             print(f"\n📧 KROK 3/4: Wysyłanie powiadomienia email...")
             print("="*70)
             
@@ -789,7 +820,7 @@ def scrape_and_send_email(
                 print(f"\n⚠️  Brak kwalifikujących się meczów - email nie został wysłany")
         
         # KROK 4: Wyślij dane do aplikacji UI (jeśli skonfigurowane)
-        if app_url:
+        if app_url and not shard_spec:
             print(f"\n🔗 KROK 4/4: Wysyłanie danych do aplikacji UI...")
             print("="*70)
             
@@ -817,7 +848,7 @@ def scrape_and_send_email(
             except Exception as e:
                 print(f"   ⚠️  Błąd wysyłania do aplikacji: {e}")
                 print("   💡 Scraping i email zakończone pomyślnie")
-        else:
+        elif not shard_spec:
             # Spróbuj załadować z pliku konfiguracyjnego
             integrator = create_integrator_from_config()
             if integrator and integrator.test_connection():
@@ -831,7 +862,14 @@ def scrape_and_send_email(
         traceback.print_exc()
     
     finally:
-        driver.quit()
+        if enrichment is not None:
+            enrichment.close()
+        if journal is not None:
+            journal.close()
+        if pool is not None:
+            pool.release_spare()
+        if driver is not None:
+            driver.quit()
         print("\n🔒 Przeglądarka zamknięta")
 
 
@@ -874,6 +912,27 @@ Przykłady użycia:
   python scrape_and_notify.py --date 2025-10-05 --sports football \\
     --to twoj@email.com --from twoj@email.com --password "haslo" --max-matches 20
 
+  # 📒 Wznowienie po awarii (pomija mecze z dziennika outputs/*.journal.jsonl)
+  python scrape_and_notify.py --date 2025-10-05 --sports football \\
+    --to twoj@email.com --from twoj@email.com --password "haslo" --resume
+
+  # ⇄ FAZA 2 (Forebet/SofaScore/Gemini) w trakcie FAZY 1 zamiast po niej
+  python scrape_and_notify.py --date 2025-10-05 --sports football \\
+    --to twoj@email.com --from twoj@email.com --password "haslo" --use-forebet --pipeline
+
+  # ⏰ Email najpóźniej o 11:00 - najbliższe mecze najpierw, zrzucanie Gemini/SofaScore przy braku czasu
+  python scrape_and_notify.py --date 2025-10-05 --sports football \\
+    --to twoj@email.com --from twoj@email.com --password "haslo" --use-gemini --deadline 11:00
+
+  # 🧩 Dzień podzielony na 3 maszyny (na każdej inny --shard), potem scalanie wyników
+  python scrape_and_notify.py --date 2025-10-05 --sports football \\
+    --to twoj@email.com --from twoj@email.com --password "haslo" --shard 1/3
+
+  # 🎭 Silnik Playwright: 12 meczów w locie w jednym Chromium (zamiast 12 procesów Chrome)
+  python scrape_and_notify.py --date 2025-10-05 --sports football \\
+    --to twoj@email.com --from twoj@email.com --password "haslo" --engine playwright --workers 12
+  python sharding.py merge outputs/livesport_h2h_2025-10-05_football_EMAIL.csv results/matches_2025-10-05_football.json
+
 WAŻNE dla Gmail:
   Użyj "App Password" zamiast zwykłego hasła!
   Uzyskaj tutaj: https://myaccount.google.com/apppasswords
@@ -919,9 +978,33 @@ WAŻNE dla Gmail:
                        help='💰📊 Wyłącz sekcje z posortowanymi kursami')
     parser.add_argument('--odds-limit', type=int, default=15,
                        help='Max liczba meczów w każdej sekcji kursów (domyślnie 15)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='⚡ Liczba równoległych przeglądarek w FAZIE 1 (domyślnie 1)')
+    parser.add_argument('--lean-browser', action='store_true',
+                       help='🪶 Lekki profil Chrome: blokowanie obrazów/reklam/trackerów + strategia eager')
+    parser.add_argument('--resume', action='store_true',
+                       help='📒 Wznów przerwany przebieg: pomiń mecze zapisane w dzienniku (ta sama data i tryb)')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='⇄ FAZA 2 równolegle z FAZĄ 1: kwalifikujące mecze od razu do kolejki wzbogacania')
+    parser.add_argument('--deadline', default=None, metavar='HH:MM',
+                       help='⏰ Termin wysyłki emaila: kolejność wg godziny meczu, zrzucanie pracy przy braku czasu')
+    parser.add_argument('--engine', default=default_engine(), choices=ENGINES,
+                       help='🎭 Silnik przeglądarki FAZY 1: selenium (domyślnie) lub playwright '
+                            '(jeden Chromium, --workers = strony w locie)')
+    parser.add_argument('--shard', default=None, metavar='i/N', type=shard_arg,
+                       help='🧩 Przetwarzaj tylko shard i z N (stabilny hash ID meczu); scalanie: sharding.py merge')
     
     args = parser.parse_args()
     
+    try:
+        if args.deadline:
+            parse_deadline(args.deadline)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    if args.lean_browser:
+        os.environ[LEAN_ENV] = '1'  # dziedziczone przez workery FAZY 1 i auto-restarty
+    
     # Sorted odds - domyślnie włączone, chyba że --no-sorted-odds
     include_sorted_odds = not args.no_sorted_odds
     # SofaScore - domyślnie włączone, chyba że --no-sofascore
@@ -947,7 +1030,13 @@ WAŻNE dla Gmail:
         use_odds=args.use_odds,
         use_gemini=args.use_gemini,
         include_sorted_odds=include_sorted_odds,
-        odds_limit=args.odds_limit
+        odds_limit=args.odds_limit,
+        workers=args.workers,
+        resume=args.resume,
+        pipeline=args.pipeline,
+        deadline=args.deadline,
+        shard=args.shard,
+        engine=args.engine
     )
     
     print("\n✨ ZAKOŃCZONO!")
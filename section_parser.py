@@ -0,0 +1,131 @@
+"""
+⚡ Section Parser - szybkie, częściowe parsowanie strony meczu Livesport
+======================================================================
+process_match() budował pełne drzewo BeautifulSoup (html.parser) z całej strony
+(~400 KB, tysiące węzłów), a czyta z niego tylko kilka kontenerów:
+
+- <title> (nazwy drużyn / data)
+- nagłówek meczu: smv__*, participant__*, duelParticipant__* (nazwy, czas startu)
+- div.h2h__section (H2H i forma)
+- elementy formy (*form*, *Form*, lastMatch, recentForm, pojedyncze W/L/D)
+- kursy (*odds*, data-odds, JSON-LD)
+
+parse_match_sections() parsuje stronę szybkim parserem lxml (C), wybiera XPath-em
+tylko najbardziej zewnętrzne pasujące kontenery (w całości, z potomkami)
+i buduje z nich małe drzewo BeautifulSoup. Selektory parse_h2h_from_soup,
+extract_team_form i extract_betting_odds zwracają na nim te same wyniki
+co na pełnym drzewie (sprawdza test_section_parser.py).
+
+Bez lxml - pełne parsowanie html.parser (identyczne zachowanie jak wcześniej).
+
+Benchmark: python benchmark_parsing.py
+"""
+
+from typing import List
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Fragmenty atrybutu class (dopasowanie jak CSS [class*="..."] - z rozróżnieniem wielkości liter)
+SECTION_CLASS_MARKERS = (
+    'smv__', 'participant', 'Participant',   # nagłówek meczu, nazwy, czas startu
+    'h2h__',                                  # sekcje H2H
+    'form', 'Form', 'lastMatch',              # forma drużyn (także recentForm)
+    'odds',                                   # kursy
+)
+
+# Atrybuty kursów czytane przez extract_betting_odds
+SECTION_DATA_ATTRS = ('data-odds', 'data-home-odds', 'data-away-odds')
+
+# Pojedyncze ikony formy szukane w całej stronie (extract_team_form, metoda 2)
+FORM_LETTERS = ('W', 'L', 'D')
+
+
+def _section_predicate() -> str:
+    conditions = [f"contains(@class, '{m}')" for m in SECTION_CLASS_MARKERS]
+    conditions += [f"@{a}" for a in SECTION_DATA_ATTRS]
+    conditions.append("(self::script and @type='application/ld+json')")
+    return ' or '.join(conditions)
+
+
+_PREDICATE = _section_predicate()
+# Tylko najbardziej zewnętrzne kontenery - potomkowie są serializowani razem z nimi
+SECTIONS_XPATH = f"//body//*[({_PREDICATE}) and not(ancestor::*[{_PREDICATE}])]"
+FORM_TEXT_XPATH = "//body//text()[" + ' or '.join(
+    f".='{c}' or .='{c}\n'" for c in FORM_LETTERS) + "]"
+
+
+def _single_child(element) -> bool:
+    """Czy element ma dokładnie jeden węzeł potomny (bs4: .string przechodzi w dół)."""
+    if (element.text or '') or len(element) != 1:
+        return False
+    return not (element[0].tail or '')
+
+
+def _form_letter_containers(root) -> List:
+    """
+    Elementy, dla których BeautifulSoup .string == 'W'/'L'/'D' (find_all(string=...)).
+
+    .string schodzi rekurencyjnie przez elementy z jednym dzieckiem, więc
+    zachowujemy najwyższy element takiego łańcucha - razem z całym poddrzewem.
+    """
+    containers = []
+    for text in root.xpath(FORM_TEXT_XPATH):
+        parent = text.getparent()
+        if parent is None or not text.is_text or len(parent):
+            continue  # tail albo element z dziećmi - .string nie jest tym tekstem
+        element = parent
+        while element.getparent() is not None and element.getparent().tag != 'body' \
+                and _single_child(element.getparent()):
+            element = element.getparent()
+        containers.append(element)
+    return containers
+
+
+def _outermost_in_document_order(root, elements: List) -> List:
+    chosen = set(elements)
+    result = []
+    for element in root.iter():
+        if element in chosen and not any(a in chosen for a in element.iterancestors()):
+            result.append(element)
+    return result
+
+
+def extract_sections_html(html: str) -> str:
+    """Zwraca mały dokument HTML zawierający tylko <title> i potrzebne kontenery."""
+    root = lxml.html.document_fromstring(html)
+    sections = root.xpath(SECTIONS_XPATH)
+    extra = _form_letter_containers(root)
+    if extra:
+        sections = _outermost_in_document_order(root, sections + extra)
+
+    title = root.find('.//title')
+    parts = ['<html><head>']
+    if title is not None:
+        parts.append(lxml.html.tostring(title, encoding='unicode', with_tail=False))
+    parts.append('</head><body>')
+    for element in sections:
+        parts.append(lxml.html.tostring(element, encoding='unicode', with_tail=False))
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def parse_match_sections(html: str) -> BeautifulSoup:
+    """
+    BeautifulSoup zawierające tylko sekcje czytane przez process_match.
+
+    Nie nadaje się do funkcji czytających tekst całej strony
+    (extract_player_ranking, detect_tennis_surface) - tam pełne parsowanie.
+    """
+    if not LXML_AVAILABLE or not html:
+        return BeautifulSoup(html or '', 'html.parser')
+    try:
+        return BeautifulSoup(extract_sections_html(html), 'lxml')
+    except Exception:
+        # Uszkodzony dokument / błąd lxml - pełne parsowanie jak wcześniej
+        return BeautifulSoup(html, 'html.parser')
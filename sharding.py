@@ -0,0 +1,270 @@
+"""
+🧩 Sharding - podział dnia na kilka maszyn i scalanie wyników
+=============================================================
+Jeden dzień (2000-3000 meczów) można rozłożyć na N tanich maszyn:
+
+    python scrape_and_notify.py ... --shard 1/3      # maszyna 1
+    python scrape_and_notify.py ... --shard 2/3      # maszyna 2
+    python livesport_h2h_scraper.py ... --shard 3/3  # (też tryb urls/auto)
+
+Podział jest deterministyczny: shard = stabilny hash (SHA-1) ID wydarzenia
+(?mid=... z URLa Livesport) modulo N - każda maszyna zbiera tę samą listę
+linków i bierze tylko swoje mecze, bez koordynacji. Pliki shardu dostają sufiks
+_shard{i}of{N} (CSV, _predictions.json, results/matches_*.json), a obok CSV
+zapisywany jest manifest (.shard.json) z pełną listą URLi w kolejności zbierania.
+
+Scalanie (po zebraniu plików shardów w jednym katalogu):
+
+    python sharding.py merge outputs/livesport_h2h_2025-10-05_football_EMAIL.csv \\
+        results/matches_2025-10-05_football.json
+
+tworzy pliki o nazwach i kolejności wierszy jak z przebiegu na jednej maszynie
+(CSV + _predictions.json, eksport frontendu z przeliczonymi statystykami).
+Email z scalonego CSV: python email_notifier.py --csv <scalony.csv> ...
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+Shard = Tuple[int, int]
+
+_SHARD_FILE_RE = re.compile(r'_shard(\d+)of(\d+)')
+
+
+def parse_shard(text: str) -> Shard:
+    """'2/3' -> (2, 3); numeracja shardów od 1 (ValueError dla złego formatu)."""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', text or '')
+    if not match:
+        raise ValueError(f"Nieprawidłowy shard '{text}' - oczekiwano i/N, np. 1/3")
+    index, count = int(match.group(1)), int(match.group(2))
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Nieprawidłowy shard '{text}' - i musi być w zakresie 1..N")
+    return index, count
+
+
+def shard_arg(text: str) -> str:
+    """argparse type= dla --shard: błędny format -> komunikat argparse zamiast tracebacku."""
+    try:
+        parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return text
+
+
+def event_id(url: str) -> str:
+    """ID wydarzenia Livesport (?mid=...); bez mid - ścieżka URLa bez parametrów."""
+    match = re.search(r'[?&#]mid=([A-Za-z0-9]+)', url or '')
+    if match:
+        return match.group(1)
+    parts = urlsplit((url or '').strip())
+    return parts.path.rstrip('/').lower() or (url or '').strip()
+
+
+def shard_of(url: str, count: int) -> int:
+    """Numer shardu (1..count) - stabilny między maszynami i uruchomieniami."""
+    digest = hashlib.sha1(event_id(url).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def select_shard(urls: List[str], shard: Shard) -> List[str]:
+    index, count = shard
+    return [url for url in urls if shard_of(url, count) == index]
+
+
+def shard_path(path: str, shard: Shard) -> str:
+    """outputs/x.csv -> outputs/x_shard1of3.csv"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_shard{shard[0]}of{shard[1]}{ext}"
+
+
+def manifest_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + '.shard.json'
+
+
+def shard_manifest(shard: Shard, all_urls: List[str]) -> Dict:
+    return {'index': shard[0], 'count': shard[1], 'urls': list(all_urls)}
+
+
+def write_manifest(csv_path: str, shard: Shard, all_urls: List[str]) -> str:
+    path = manifest_path(csv_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(shard_manifest(shard, all_urls), f, ensure_ascii=False, indent=2)
+    return path
+
+
+def find_shard_files(base_path: str, allow_missing: bool = False) -> List[str]:
+    """
+    Pliki shardów dla pliku bazowego (x.csv -> x_shard1of3.csv, x_shard2of3.csv, ...).
+
+    Raises:
+        ValueError: brak plików, różne N lub brakujący shard (chyba że allow_missing)
+    """
+    stem, ext = os.path.splitext(base_path)
+    found = {}
+    counts = set()
+    for path in glob.glob(f"{glob.escape(stem)}_shard*of*{ext}"):
+        match = _SHARD_FILE_RE.fullmatch(os.path.splitext(path)[0][len(stem):])
+        if match:
+            found[int(match.group(1))] = path
+            counts.add(int(match.group(2)))
+    if not found:
+        raise ValueError(f"Brak plików shardów dla {base_path}")
+    if len(counts) > 1:
+        raise ValueError(f"Pliki shardów z różnym N ({sorted(counts)}) dla {base_path}")
+    missing = sorted(set(range(1, counts.pop() + 1)) - set(found))
+    if missing and not allow_missing:
+        raise ValueError(f"Brak shardów {missing} dla {base_path}")
+    return [found[index] for index in sorted(found)]
+
+
+def _order_key(url_order: Dict[str, int]):
+    return lambda item: url_order.get(item[1], len(url_order) + item[0])
+
+
+def _sorted_by_url(items: List[Dict], url_field: str, url_order: Dict[str, int]) -> List[Dict]:
+    """Sortuje wg kolejności zbierania linków; nieznane URLe na końcu w kolejności shardów, bez duplikatów."""
+    seen = set()
+    unique = []
+    for item in items:
+        url = item.get(url_field) or ''
+        if url and url in seen:
+            continue
+        seen.add(url)
+        unique.append(item)
+    indexed = sorted(((position, item.get(url_field) or '', item) for position, item in enumerate(unique)),
+                     key=_order_key(url_order))
+    return [item for _, _, item in indexed]
+
+
+def _url_order(manifests: List[Dict]) -> Dict[str, int]:
+    order: Dict[str, int] = {}
+    for manifest in manifests:
+        for url in manifest.get('urls') or []:
+            order.setdefault(url, len(order))
+    return order
+
+
+def _single_run_columns(rows: List[Dict], headers: Dict[int, List[str]]) -> List[str]:
+    """
+    Kolejność kolumn jak w pd.DataFrame(rows) z jednej maszyny: kolumna trafia tam, gdzie
+    pierwszy wiersz (w kolejności zbierania) ma ją wypełnioną. W CSV shardu każdy wiersz
+    ma wszystkie kolumny shardu, więc puste wartości nie liczą się jako wystąpienie;
+    kolumny puste we wszystkich wierszach - na końcu, w kolejności nagłówków shardów.
+    """
+    columns: List[str] = []
+    seen = set()
+    for row in rows:
+        for column in headers[id(row)]:
+            if column not in seen and row.get(column, '') != '':
+                seen.add(column)
+                columns.append(column)
+    for header in headers.values():
+        for column in header:
+            if column not in seen:
+                seen.add(column)
+                columns.append(column)
+    return columns
+
+
+def merge_csv(base_path: str, allow_missing: bool = False) -> Dict[str, int]:
+    """Scala CSV shardów (i ich _predictions.json) do pliku bazowego. Returns: liczby wierszy."""
+    paths = find_shard_files(base_path, allow_missing)
+    manifests = []
+    for path in paths:
+        if os.path.exists(manifest_path(path)):
+            with open(manifest_path(path), encoding='utf-8') as f:
+                manifests.append(json.load(f))
+    url_order = _url_order(manifests)
+
+    rows: List[Dict] = []
+    headers: Dict[int, List[str]] = {}
+    predictions: List[Dict] = []
+    has_predictions = False
+    for path in paths:
+        # Wartości jako tekst - bez konwersji typów zapis jest identyczny z plikiem shardu
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8-sig')
+        header = list(df.columns)
+        for row in df.to_dict('records'):
+            headers[id(row)] = header
+            rows.append(row)
+        predictions_file = path.replace('.csv', '_predictions.json')
+        if os.path.exists(predictions_file):
+            has_predictions = True
+            with open(predictions_file, encoding='utf-8') as f:
+                predictions.extend(json.load(f))
+
+    rows = _sorted_by_url(rows, 'match_url', url_order)
+    columns = _single_run_columns(rows, headers)
+    pd.DataFrame(rows, columns=columns).fillna('').to_csv(base_path, index=False, encoding='utf-8-sig')
+    result = {'rows': len(rows), 'predictions': 0}
+    if has_predictions:
+        predictions = _sorted_by_url(predictions, 'match_url', url_order)
+        with open(base_path.replace('.csv', '_predictions.json'), 'w', encoding='utf-8') as f:
+            json.dump(predictions, f, ensure_ascii=False, indent=2)
+        result['predictions'] = len(predictions)
+    return result
+
+
+def merge_frontend_json(base_path: str, allow_missing: bool = False) -> Dict[str, int]:
+    """Scala eksport frontendu (results/matches_<date>_*.json) i przelicza statystyki."""
+    documents = []
+    for path in find_shard_files(base_path, allow_missing):
+        with open(path, encoding='utf-8') as f:
+            documents.append(json.load(f))
+    url_order = _url_order([doc.get('shard') or {} for doc in documents])
+    matches = _sorted_by_url([match for doc in documents for match in doc.get('matches', [])],
+                             'matchUrl', url_order)
+    merged = {
+        'date': documents[0].get('date'),
+        'sport': documents[0].get('sport'),
+        'generatedAt': max(doc.get('generatedAt') or '' for doc in documents),
+        'stats': {
+            'total': len(matches),
+            'qualifying': sum(1 for m in matches if m.get('qualifies')),
+            'formAdvantage': sum(1 for m in matches if m.get('formAdvantage'))
+        },
+        'matches': matches
+    }
+    with open(base_path, 'w', encoding='utf-8') as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+    return {'rows': len(matches)}
+
+
+def merge_outputs(base_paths: List[str], allow_missing: bool = False) -> Dict[str, Dict[str, int]]:
+    """Scala pliki shardów: *.csv -> CSV + predykcje, *.json -> eksport frontendu."""
+    return {path: (merge_csv(path, allow_missing) if path.endswith('.csv')
+                   else merge_frontend_json(path, allow_missing))
+            for path in base_paths}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='🧩 Scalanie wyników shardów (--shard i/N)')
+    sub = parser.add_subparsers(dest='command', required=True)
+    merge = sub.add_parser('merge', help='Scal pliki *_shard{i}of{N} do plików jednej maszyny')
+    merge.add_argument('outputs', nargs='+',
+                       help='Pliki wynikowe bez sufiksu shardu (outputs/*.csv, results/matches_*.json)')
+    merge.add_argument('--allow-missing', action='store_true', help='Scal mimo brakujących shardów')
+    args = parser.parse_args(argv)
+
+    try:
+        results = merge_outputs(args.outputs, args.allow_missing)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        return 1
+    for path, counts in results.items():
+        extra = f", predykcje: {counts['predictions']}" if counts.get('predictions') else ''
+        print(f"🧩 {path}: {counts['rows']} meczów{extra}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,6 +10,142 @@ const puppeteer = require('puppeteer-extra');
 const StealthPlugin = require('puppeteer-extra-plugin-stealth');
 puppeteer.use(StealthPlugin());
 
+/**
+ * Odczytuje głosy kibiców ("Who will win") z załadowanej strony meczu.
+ * Współdzielone z puppeteer_worker.js (extract: 'fan_votes').
+ */
+async function extractFanVotes(page) {
+    return page.evaluate(() => {
+        const result = { home: null, draw: null, away: null, votes: null, preMatch: false };
+
+        // Find "Who will win" section - MULTI-LANGUAGE SUPPORT
+        const pageText = document.body.innerText.toLowerCase();
+
+        // 🔥 Multiple languages for "Who will win" detection
+        const whoWillWinPatterns = [
+            'who will win',           // English
+            'kto wygra',              // Polish
+            'wer gewinnt',            // German
+            'quién ganará',           // Spanish
+            'qui va gagner',          // French
+            'chi vincerà',            // Italian
+            'quem vai ganhar',        // Portuguese
+            'kdo vyhraje',            // Czech
+            'ki nyer',                // Hungarian
+            'cine va câștiga',        // Romanian
+            'hvem vinder',            // Danish
+            'vem vinner',             // Swedish
+            'hvem vinner',            // Norwegian
+            // Fallback patterns
+            'fan vote',
+            'vote',
+            'głosuj',
+            'głosy',
+            'votes'
+        ];
+
+        const hasWhoWillWin = whoWillWinPatterns.some(pattern => pageText.includes(pattern));
+
+        if (!hasWhoWillWin) {
+            // 🔥 Still try to find percentages even without "who will win" text
+            // SofaScore might display votes differently
+        }
+
+        // Method 1: Find vote count (e.g. "1234 votes" or "1,234 głosów")
+        const voteCountMatch = pageText.match(/(\d[\d,. ]*)\s*(votes|głos|vote)/i);
+        if (voteCountMatch) {
+            result.votes = parseInt(voteCountMatch[1].replace(/[,. ]/g, ''));
+        }
+
+        // Method 2: Look for percentage patterns
+        // Find the section that contains "Who will win"
+        const sections = document.querySelectorAll('div, section');
+        let voteSection = null;
+
+        for (const section of sections) {
+            if (/who will win/i.test(section.innerText) && section.innerText.length < 500) {
+                voteSection = section;
+                break;
+            }
+        }
+
+        if (voteSection) {
+            // Look for percentages in this section
+            const percentages = voteSection.innerText.match(/(\d{1,3})%/g);
+            if (percentages && percentages.length >= 2) {
+                const nums = percentages.map(p => parseInt(p));
+                if (nums.length >= 3) {
+                    result.home = nums[0];
+                    result.draw = nums[1];
+                    result.away = nums[2];
+                } else if (nums.length === 2) {
+                    result.home = nums[0];
+                    result.away = nums[1];
+                }
+            }
+        }
+
+        // Method 3: Find percentages near "1", "X", "2" buttons
+        if (result.home === null) {
+            const allElements = document.querySelectorAll('*');
+            const voteButtons = [];
+
+            for (const el of allElements) {
+                const text = (el.innerText || '').trim();
+                if ((text === '1' || text === 'X' || text === '2') && el.clientWidth > 30) {
+                    // Check if parent has percentage
+                    const parent = el.closest('div');
+                    if (parent) {
+                        const pctMatch = parent.innerText.match(/(\d{1,3})%/);
+                        if (pctMatch) {
+                            voteButtons.push({ label: text, pct: parseInt(pctMatch[1]) });
+                        }
+                    }
+                }
+            }
+
+            voteButtons.forEach(btn => {
+                if (btn.label === '1') result.home = btn.pct;
+                else if (btn.label === 'X') result.draw = btn.pct;
+                else if (btn.label === '2') result.away = btn.pct;
+            });
+        }
+
+        // Method 4: Style-based extraction (width of bars)
+        if (result.home === null) {
+            const bars = document.querySelectorAll('[class*="Bar"], [class*="bar"], [class*="Progress"]');
+            const widths = [];
+
+            bars.forEach(bar => {
+                const style = bar.getAttribute('style') || '';
+                const widthMatch = style.match(/width:\s*(\d+(\.\d+)?)/);
+                if (widthMatch) {
+                    widths.push(Math.round(parseFloat(widthMatch[1])));
+                }
+            });
+
+            // Filter valid percentages
+            const validWidths = widths.filter(w => w > 0 && w <= 100);
+            if (validWidths.length >= 2) {
+                result.home = validWidths[0];
+                if (validWidths.length >= 3) {
+                    result.draw = validWidths[1];
+                    result.away = validWidths[2];
+                } else {
+                    result.away = validWidths[1];
+                }
+            }
+        }
+
+        // Check if this is pre-match (no votes yet)
+        if (result.home === null && hasWhoWillWin) {
+            result.preMatch = true;
+        }
+
+        return result;
+    });
+}
+
 async function getFanVotes(matchUrl) {
     const result = {
         success: false,
@@ -68,135 +204,7 @@ async function getFanVotes(matchUrl) {
         await page.waitForTimeout(2000);
 
         // Try to find and extract fan votes
-        const votes = await page.evaluate(() => {
-            const result = { home: null, draw: null, away: null, votes: null, preMatch: false };
-
-            // Find "Who will win" section - MULTI-LANGUAGE SUPPORT
-            const pageText = document.body.innerText.toLowerCase();
-
-            // 🔥 Multiple languages for "Who will win" detection
-            const whoWillWinPatterns = [
-                'who will win',           // English
-                'kto wygra',              // Polish
-                'wer gewinnt',            // German
-                'quién ganará',           // Spanish
-                'qui va gagner',          // French
-                'chi vincerà',            // Italian
-                'quem vai ganhar',        // Portuguese
-                'kdo vyhraje',            // Czech
-                'ki nyer',                // Hungarian
-                'cine va câștiga',        // Romanian
-                'hvem vinder',            // Danish
-                'vem vinner',             // Swedish
-                'hvem vinner',            // Norwegian
-                // Fallback patterns
-                'fan vote',
-                'vote',
-                'głosuj',
-                'głosy',
-                'votes'
-            ];
-
-            const hasWhoWillWin = whoWillWinPatterns.some(pattern => pageText.includes(pattern));
-
-            if (!hasWhoWillWin) {
-                // 🔥 Still try to find percentages even without "who will win" text
-                // SofaScore might display votes differently
-            }
-
-            // Method 1: Find vote count (e.g. "1234 votes" or "1,234 głosów")
-            const voteCountMatch = pageText.match(/(\d[\d,. ]*)\s*(votes|głos|vote)/i);
-            if (voteCountMatch) {
-                result.votes = parseInt(voteCountMatch[1].replace(/[,. ]/g, ''));
-            }
-
-            // Method 2: Look for percentage patterns
-            // Find the section that contains "Who will win"
-            const sections = document.querySelectorAll('div, section');
-            let voteSection = null;
-
-            for (const section of sections) {
-                if (/who will win/i.test(section.innerText) && section.innerText.length < 500) {
-                    voteSection = section;
-                    break;
-                }
-            }
-
-            if (voteSection) {
-                // Look for percentages in this section
-                const percentages = voteSection.innerText.match(/(\d{1,3})%/g);
-                if (percentages && percentages.length >= 2) {
-                    const nums = percentages.map(p => parseInt(p));
-                    if (nums.length >= 3) {
-                        result.home = nums[0];
-                        result.draw = nums[1];
-                        result.away = nums[2];
-                    } else if (nums.length === 2) {
-                        result.home = nums[0];
-                        result.away = nums[1];
-                    }
-                }
-            }
-
-            // Method 3: Find percentages near "1", "X", "2" buttons
-            if (result.home === null) {
-                const allElements = document.querySelectorAll('*');
-                const voteButtons = [];
-
-                for (const el of allElements) {
-                    const text = (el.innerText || '').trim();
-                    if ((text === '1' || text === 'X' || text === '2') && el.clientWidth > 30) {
-                        // Check if parent has percentage
-                        const parent = el.closest('div');
-                        if (parent) {
-                            const pctMatch = parent.innerText.match(/(\d{1,3})%/);
-                            if (pctMatch) {
-                                voteButtons.push({ label: text, pct: parseInt(pctMatch[1]) });
-                            }
-                        }
-                    }
-                }
-
-                voteButtons.forEach(btn => {
-                    if (btn.label === '1') result.home = btn.pct;
-                    else if (btn.label === 'X') result.draw = btn.pct;
-                    else if (btn.label === '2') result.away = btn.pct;
-                });
-            }
-
-            // Method 4: Style-based extraction (width of bars)
-            if (result.home === null) {
-                const bars = document.querySelectorAll('[class*="Bar"], [class*="bar"], [class*="Progress"]');
-                const widths = [];
-
-                bars.forEach(bar => {
-                    const style = bar.getAttribute('style') || '';
-                    const widthMatch = style.match(/width:\s*(\d+(\.\d+)?)/);
-                    if (widthMatch) {
-                        widths.push(Math.round(parseFloat(widthMatch[1])));
-                    }
-                });
-
-                // Filter valid percentages
-                const validWidths = widths.filter(w => w > 0 && w <= 100);
-                if (validWidths.length >= 2) {
-                    result.home = validWidths[0];
-                    if (validWidths.length >= 3) {
-                        result.draw = validWidths[1];
-                        result.away = validWidths[2];
-                    } else {
-                        result.away = validWidths[1];
-                    }
-                }
-            }
-
-            // Check if this is pre-match (no votes yet)
-            if (result.home === null && hasWhoWillWin) {
-                result.preMatch = true;
-            }
-
-            return result;
-        });
+        const votes = await extractFanVotes(page);
 
         if (votes.home !== null) {
             result.success = true;
@@ -223,24 +231,28 @@ async function getFanVotes(matchUrl) {
     return result;
 }
 
-// Main execution
-const args = process.argv.slice(2);
-if (args.length === 0) {
-    console.log(JSON.stringify({
-        success: false,
-        error: 'Usage: node sofascore_puppeteer.js <match_url>'
-    }));
-    process.exit(1);
-}
+module.exports = { extractFanVotes };
 
-const matchUrl = args[0];
-getFanVotes(matchUrl)
-    .then(result => {
-        console.log(JSON.stringify(result));
-    })
-    .catch(err => {
+// Main execution
+if (require.main === module) {
+    const args = process.argv.slice(2);
+    if (args.length === 0) {
         console.log(JSON.stringify({
             success: false,
-            error: err.message
+            error: 'Usage: node sofascore_puppeteer.js <match_url>'
         }));
-    });
+        process.exit(1);
+    }
+
+    const matchUrl = args[0];
+    getFanVotes(matchUrl)
+        .then(result => {
+            console.log(JSON.stringify(result));
+        })
+        .catch(err => {
+            console.log(JSON.stringify({
+                success: false,
+                error: err.message
+            }));
+        });
+}
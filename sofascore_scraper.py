@@ -38,6 +38,9 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, Optional
 from difflib import SequenceMatcher
 
+from team_matcher import best_match as team_best_match, get_matcher, pair_shortlist
+from team_alias_store import team_alias_store
+
 # Logging setup
 logger = logging.getLogger(__name__)
 
@@ -127,20 +130,59 @@ _selenium_max_failures: int = 3  # Po 3 failures, skip Selenium w CI
 _selenium_last_reset: float = 0.0
 _SELENIUM_RESET_INTERVAL: int = 300  # Reset co 5 minut
 
+# Wątki pipeline FAZY 2 (phase2_pipeline) wołają SofaScore równolegle
+_session_lock = threading.Lock()
+_selenium_lock = threading.Lock()
+
+
+def _selenium_allowed() -> bool:
+    """Circuit breaker Selenium w CI: False po _selenium_max_failures błędach (reset co 5 minut)."""
+    global _selenium_failures, _selenium_last_reset
+    if not IS_CI:
+        return True
+    with _selenium_lock:
+        if _selenium_failures < _selenium_max_failures:
+            return True
+        if time.time() - _selenium_last_reset > _SELENIUM_RESET_INTERVAL:
+            _selenium_failures = 0
+            _selenium_last_reset = time.time()
+            logger.debug("SofaScore Selenium circuit breaker: reset")
+            return True
+        failures = _selenium_failures
+    print(f"   ⚠️ SofaScore: Selenium wyłączony (circuit breaker: {failures} failures)")
+    return False
+
+
+def _selenium_failed() -> None:
+    global _selenium_failures
+    if IS_CI:
+        with _selenium_lock:
+            _selenium_failures += 1
+
+
 def _get_api_session():
     """
     Zwraca singleton session.
     v4.0: Preferuje curl_cffi (omija Cloudflare 403).
     Fallback do requests.Session z warmup cookies.
     """
-    global _api_session, _session_initialized
-    
     if _api_session is not None and _session_initialized:
         return _api_session
     
     if not REQUESTS_AVAILABLE:
         return None
     
+    # Jedna sesja na proces - pozostałe wątki czekają na zakończenie warmupu
+    with _session_lock:
+        if _api_session is not None and _session_initialized:
+            return _api_session
+        return _init_api_session()
+
+
+def _init_api_session():
+    """Tworzy sesję API (wołane pod _session_lock)."""
+    global _api_session, _session_initialized
+    
     # Preferuj curl_cffi - omija Cloudflare bez potrzeby cookies
     if CURL_CFFI_AVAILABLE:
         # curl_cffi nie potrzebuje session warmup - impersonuje Chrome TLS
@@ -191,6 +233,7 @@ def _get_api_session():
 
 _sofascore_cache: Dict[str, Dict] = {}
 _cache_expiry: Dict[str, datetime] = {}
+_cache_lock = threading.Lock()
 CACHE_DURATION_MINUTES = 30
 
 
@@ -203,22 +246,24 @@ def _get_cache_key(home_team: str, away_team: str, sport: str) -> str:
 def _get_cached_result(home_team: str, away_team: str, sport: str) -> Optional[Dict]:
     """Pobiera wynik z cache jeśli istnieje i nie wygasł"""
     key = _get_cache_key(home_team, away_team, sport)
-    if key in _sofascore_cache:
-        if key in _cache_expiry and datetime.now() < _cache_expiry[key]:
-            print(f"   📦 SofaScore: Używam cache")
-            return _sofascore_cache[key]
-        else:
-            del _sofascore_cache[key]
-            if key in _cache_expiry:
-                del _cache_expiry[key]
+    with _cache_lock:
+        if key in _sofascore_cache:
+            if key in _cache_expiry and datetime.now() < _cache_expiry[key]:
+                print(f"   📦 SofaScore: Używam cache")
+                return _sofascore_cache[key]
+            else:
+                del _sofascore_cache[key]
+                if key in _cache_expiry:
+                    del _cache_expiry[key]
     return None
 
 
 def _set_cached_result(home_team: str, away_team: str, sport: str, result: Dict):
     """Zapisuje wynik do cache"""
     key = _get_cache_key(home_team, away_team, sport)
-    _sofascore_cache[key] = result
-    _cache_expiry[key] = datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)
+    with _cache_lock:
+        _sofascore_cache[key] = result
+        _cache_expiry[key] = datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)
 
 
 # ============================================================================
@@ -686,16 +731,25 @@ def _search_event_for_date(home_team: str, away_team: str, sport_slug: str, sear
     if debug:
         print(f"      [DEBUG] Searching for: '{home_norm}' vs '{away_norm}'")
     
+    # 🔗 Alias z poprzednich uruchomień - dokładne nazwy SofaScore, bez fuzzy
+    aliases = team_alias_store.resolve_pair(sport_slug, 'livesport', 'sofascore', home_team, away_team)
+    if aliases:
+        alias_home, alias_away = (name.lower() for name in aliases)
+        for event in events:
+            if (event.get('homeTeam', {}).get('name', '').lower() == alias_home and
+                    event.get('awayTeam', {}).get('name', '').lower() == alias_away and event.get('id')):
+                team_alias_store.mark_used(sport_slug, 'livesport', 'sofascore', home_team, away_team)
+                if debug:
+                    print(f"      [DEBUG] 🔗 Alias: {aliases[0]} vs {aliases[1]}")
+                return event.get('id')
+    
     best_match_id = None
     best_combined_sim = 0.0
     best_match_info = None
+    best_names = None
     
-    for event in events:
-        event_home = event.get('homeTeam', {}).get('name', '')
-        event_away = event.get('awayTeam', {}).get('name', '')
-        if not event_home or not event_away:
-            continue
-        
+    # Similarity tylko dla shortlisty z indeksu trigramów (nie dla wszystkich wydarzeń dnia)
+    for event, event_home, event_away in _shortlisted_events(home_team, away_team, events):
         event_home_norm = normalize_team_name(event_home)
         event_away_norm = normalize_team_name(event_away)
         
@@ -728,6 +782,7 @@ def _search_event_for_date(home_team: str, away_team: str, sport_slug: str, sear
             best_combined_sim = combined_sim
             best_match_id = event.get('id')
             best_match_info = f"{event_home} vs {event_away}"
+            best_names = (event_home, event_away, home_sim, away_sim)
             if debug:
                 print(f"      [DEBUG] ✅ Match candidate: {event_home} vs {event_away} (h:{home_sim:.2f} a:{away_sim:.2f} sum:{combined_sim:.2f})")
             logger.debug(f"SofaScore match: {event_home} vs {event_away} "
@@ -739,9 +794,25 @@ def _search_event_for_date(home_team: str, away_team: str, sport_slug: str, sear
         else:
             print(f"      [DEBUG] No match found for '{home_norm}' vs '{away_norm}' in {len(events)} events")
     
+    if best_names:
+        team_alias_store.record_pair(sport_slug, 'livesport', 'sofascore', home_team, away_team, *best_names)
     return best_match_id
 
 
+def _shortlisted_events(home_team: str, away_team: str, events: list) -> list:
+    """
+    (wydarzenie, gospodarze, goście) z shortlisty gospodarzy lub gości - w kolejności API.
+    
+    Indeks nazw dnia jest budowany raz (team_matcher) i używany dla kolejnych meczów.
+    """
+    named = [(event, event.get('homeTeam', {}).get('name', ''), event.get('awayTeam', {}).get('name', ''))
+             for event in events]
+    named = [item for item in named if item[1] and item[2]]
+    home_matcher = get_matcher([home for _, home, _ in named], normalize_team_name)
+    away_matcher = get_matcher([away for _, _, away in named], normalize_team_name)
+    return [named[position] for position in pair_shortlist(home_team, away_team, home_matcher, away_matcher)]
+
+
 def search_event_via_api(home_team: str, away_team: str, sport: str = 'football', date_str: str = None) -> Optional[int]:
     """
     Szuka event ID przez SofaScore API.
@@ -805,16 +876,18 @@ def search_event_via_api(home_team: str, away_team: str, sport: str = 'football'
                         if ev_response and ev_response.status_code == 200:
                             ev_data = ev_response.json()
                             events = ev_data.get('events', [])
-                            for event in events:
+                            # Check if OTHER team matches - shortlista trigramów + similarity_score
+                            other_team = away_team if team_query == home_team else home_team
+                            side = 'awayTeam' if team_query == home_team else 'homeTeam'
+                            others = [event.get(side, {}).get('name', '') for event in events]
+                            other_event, other_sim = team_best_match(other_team, others, score=similarity_score,
+                                                                     normalize=normalize_team_name, threshold=0.30)
+                            if other_event is not None:
+                                event = events[others.index(other_event)]
                                 event_home = event.get('homeTeam', {}).get('name', '')
                                 event_away = event.get('awayTeam', {}).get('name', '')
-                                # Check if OTHER team matches
-                                other_team = away_team if team_query == home_team else home_team
-                                other_event = event_away if team_query == home_team else event_home
-                                other_sim = similarity_score(other_team, other_event)
-                                if other_sim >= 0.30:
-                                    print(f"   ✅ SofaScore Strategy 2: Found {event_home} vs {event_away} (sim:{other_sim:.2f})")
-                                    return event.get('id')
+                                print(f"   ✅ SofaScore Strategy 2: Found {event_home} vs {event_away} (sim:{other_sim:.2f})")
+                                return event.get('id')
         except Exception as e:
             logger.debug(f"SofaScore team search error for '{team_query}': {e}")
     
@@ -829,9 +902,7 @@ def search_event_via_api(home_team: str, away_team: str, sport: str = 'football'
                 events = data.get('events', [])
                 best_event_id = None
                 best_score = 0.0
-                for event in events:
-                    event_home = event.get('homeTeam', {}).get('name', '')
-                    event_away = event.get('awayTeam', {}).get('name', '')
+                for event, event_home, event_away in _shortlisted_events(home_team, away_team, events):
                     home_sim = similarity_score(home_team, event_home)
                     away_sim = similarity_score(away_team, event_away)
                     # Relaxed: one team >= 0.70, other >= 0.20
@@ -1452,16 +1523,8 @@ def scrape_sofascore_full(
         return result
     
     # Circuit breaker: skip Selenium w CI po zbyt wielu failures
-    global _selenium_failures, _selenium_last_reset
-    if IS_CI and _selenium_failures >= _selenium_max_failures:
-        # Reset co 5 minut
-        if time.time() - _selenium_last_reset > _SELENIUM_RESET_INTERVAL:
-            _selenium_failures = 0
-            _selenium_last_reset = time.time()
-            logger.debug("SofaScore Selenium circuit breaker: reset")
-        else:
-            print(f"   ⚠️ SofaScore: Selenium wyłączony (circuit breaker: {_selenium_failures} failures)")
-            return result
+    if not _selenium_allowed():
+        return result
     
     # Ignorujemy przekazany driver - zawsze tworzymy własny z optymalnym timeout
     print(f"   🌐 SofaScore: Tworzę dedykowany driver (timeout {SOFASCORE_GLOBAL_TIMEOUT}s)...")
@@ -1504,8 +1567,7 @@ def scrape_sofascore_full(
         if scrape_thread.is_alive():
             print(f"   ⚠️ SofaScore: Timeout po {SOFASCORE_GLOBAL_TIMEOUT}s - przerywam")
             logger.warning(f"SofaScore: Globalny timeout {SOFASCORE_GLOBAL_TIMEOUT}s przekroczony")
-            if IS_CI:
-                _selenium_failures += 1
+            _selenium_failed()
             # Wątek się nie skończył - driver.quit() przerwać operację
             try:
                 sofascore_driver.quit()
@@ -1517,8 +1579,7 @@ def scrape_sofascore_full(
         if scrape_exception[0]:
             logger.warning(f"SofaScore scrape exception: {scrape_exception[0]}")
             print(f"   ⚠️ SofaScore: Błąd: {scrape_exception[0]}")
-            if IS_CI:
-                _selenium_failures += 1
+            _selenium_failed()
             return result
         
         result = scrape_result[0]
@@ -1529,8 +1590,7 @@ def scrape_sofascore_full(
     except Exception as e:
         logger.error(f"SofaScore scraping error: {type(e).__name__}: {e}")
         print(f"   ❌ SofaScore scraping error: {e}")
-        if IS_CI:
-            _selenium_failures += 1
+        _selenium_failed()
         return result
         
     finally:
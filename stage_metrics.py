@@ -0,0 +1,257 @@
+"""
+⏱️ Stage Metrics - czasy etapów process_match jako ustrukturyzowane rekordy
+=========================================================================
+process_match mierzy etapy (h2h, qualify, forebet, sofascore, flashscore, gemini),
+ale wypisywał je tylko jedną linią w logu. Teraz każdy mecz to rekord JSONL:
+
+    {"type": "match", "run_id": "...", "sport": "football", "stages": {"h2h": 3.1, ...}, "total": 4.2, ...}
+    {"type": "retry", "run_id": "...", "sport": "football", "level": "page", "url": "..."}
+
+Retry liczone są na dwóch poziomach: 'page' - ponowne otwarcie strony w process_match,
+'match' - restart przeglądarki i ponowienie całego meczu w FAZIE 1 (phase1_pool).
+
+Każdy przebieg ma własny plik outputs/metrics/stage_timings/<run_id>.jsonl - podsumowanie
+czyta tylko swój plik, a przy starcie nowego przebiegu usuwane są najstarsze pliki
+(zostaje STAGE_METRICS_KEEP_RUNS ostatnich).
+
+Podsumowanie przebiegu (print_stage_metrics_report) - p50/p90/p99 dla etapu
+i sportu, liczba retry - trafia do:
+    outputs/metrics/stage_summary.json
+    outputs/metrics/stage_metrics.prom   (format tekstowy Prometheus, GET /metrics w api_server)
+
+Workery FAZY 1 (spawn) dziedziczą STAGE_METRICS_RUN_ID ze zmiennych środowiskowych,
+więc ich rekordy należą do tego samego przebiegu co proces główny.
+
+Konfiguracja (env):
+    STAGE_METRICS=0          - wyłącza zapis
+    STAGE_METRICS_DIR        - katalog plików JSONL (domyślnie outputs/metrics/stage_timings)
+    STAGE_METRICS_KEEP_RUNS  - ile ostatnich przebiegów zachować (domyślnie 14)
+"""
+
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+METRICS_DIR = os.path.join('outputs', 'metrics')
+TIMINGS_DIR = os.getenv('STAGE_METRICS_DIR', os.path.join(METRICS_DIR, 'stage_timings'))
+KEEP_RUNS = int(os.getenv('STAGE_METRICS_KEEP_RUNS', '14'))
+SUMMARY_FILE = os.path.join(METRICS_DIR, 'stage_summary.json')
+PROMETHEUS_FILE = os.path.join(METRICS_DIR, 'stage_metrics.prom')
+RUN_ID_ENV = 'STAGE_METRICS_RUN_ID'
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def current_run_id() -> str:
+    """Identyfikator przebiegu - ustawiany raz w procesie głównym, dziedziczony przez workery."""
+    run_id = os.environ.get(RUN_ID_ENV)
+    if not run_id:
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def stage_metrics_enabled() -> bool:
+    return os.getenv('STAGE_METRICS', '1') != '0'
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentyl metodą najbliższej rangi (wartości posortowane rosnąco)."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+class StageMetrics:
+    """
+    Zapis rekordów JSONL i podsumowanie przebiegu.
+
+    Args:
+        directory: Katalog z plikami <run_id>.jsonl (plik przebiegu wspólny dla procesów - dopisywanie O_APPEND)
+        keep_runs: Ile ostatnich plików przebiegów zostawia prune_runs()
+    """
+
+    def __init__(self, directory: str = TIMINGS_DIR, keep_runs: int = KEEP_RUNS):
+        self.directory = directory
+        self.keep_runs = keep_runs
+
+    def path_for(self, run_id: Optional[str] = None) -> str:
+        return os.path.join(self.directory, f"{run_id or current_run_id()}.jsonl")
+
+    def prune_runs(self) -> int:
+        """Usuwa pliki najstarszych przebiegów (poza keep_runs najnowszymi). Zwraca liczbę usuniętych."""
+        try:
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith('.jsonl')]
+        except OSError:
+            return 0
+        paths.sort(key=lambda p: os.path.getmtime(p), reverse=True)
+        removed = 0
+        for path in paths[max(0, self.keep_runs):]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _append(self, record: Dict) -> None:
+        if not stage_metrics_enabled():
+            return
+        record.setdefault('ts', time.time())
+        record['run_id'] = current_run_id()
+        record['pid'] = os.getpid()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path_for(record['run_id']), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        except OSError:
+            pass  # Metryki nie mogą przerwać scrapowania
+
+    def record_match(self, sport: str, stages: Dict[str, float], total: float, url: str = '',
+                     qualifies: Optional[bool] = None) -> None:
+        self._append({
+            'type': 'match',
+            'sport': sport,
+            'url': url,
+            'qualifies': bool(qualifies),
+            'stages': {k: round(float(v), 3) for k, v in stages.items()},
+            'total': round(float(total), 3),
+        })
+
+    def record_retry(self, sport: str, url: str = '', level: str = 'match') -> None:
+        self._append({'type': 'retry', 'sport': sport, 'level': level, 'url': url})
+
+    def records(self, run_id: Optional[str] = None) -> Iterator[Dict]:
+        path = self.path_for(run_id)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def summarize(self, run_id: Optional[str] = None) -> Dict:
+        """
+        Podsumowanie: {'run_id', 'matches', 'retries': {sport: {level: n}}, 'stages': {sport: {stage: {...}}}}.
+
+        Etap 'total' to pełny czas meczu; etapy bez pomiaru (0.0 - pominięte) nie są liczone.
+        """
+        run_id = run_id or current_run_id()
+        samples = defaultdict(lambda: defaultdict(list))
+        matches = defaultdict(int)
+        retries = defaultdict(lambda: defaultdict(int))
+        for record in self.records(run_id):
+            sport = record.get('sport') or 'unknown'
+            if record.get('type') == 'retry':
+                retries[sport][record.get('level') or 'match'] += 1
+                continue
+            if record.get('type') != 'match':
+                continue
+            matches[sport] += 1
+            samples[sport]['total'].append(float(record.get('total') or 0.0))
+            for stage, seconds in (record.get('stages') or {}).items():
+                if seconds and seconds > 0:
+                    samples[sport][stage].append(float(seconds))
+
+        stages = {}
+        for sport, by_stage in samples.items():
+            stages[sport] = {}
+            for stage, values in by_stage.items():
+                values.sort()
+                stat = {'count': len(values), 'sum': round(sum(values), 3)}
+                for q in QUANTILES:
+                    stat[f"p{int(q * 100)}"] = round(percentile(values, q), 3)
+                stages[sport][stage] = stat
+        return {
+            'run_id': run_id,
+            'matches': dict(matches),
+            'retries': {sport: dict(by_level) for sport, by_level in retries.items()},
+            'stages': stages,
+        }
+
+    @staticmethod
+    def to_prometheus(summary: Dict) -> str:
+        """Format tekstowy Prometheus (summary z kwantylami + liczniki)."""
+        lines = [
+            '# HELP livesport_stage_seconds Czas etapu process_match w ostatnim przebiegu',
+            '# TYPE livesport_stage_seconds summary',
+        ]
+        for sport, by_stage in sorted(summary['stages'].items()):
+            for stage, stat in sorted(by_stage.items()):
+                labels = f'sport="{sport}",stage="{stage}"'
+                for q in QUANTILES:
+                    lines.append(f'livesport_stage_seconds{{{labels},quantile="{q}"}} {stat[f"p{int(q * 100)}"]}')
+                lines.append(f'livesport_stage_seconds_sum{{{labels}}} {stat["sum"]}')
+                lines.append(f'livesport_stage_seconds_count{{{labels}}} {stat["count"]}')
+        lines += ['# HELP livesport_matches_total Przetworzone mecze w ostatnim przebiegu',
+                  '# TYPE livesport_matches_total counter']
+        for sport, count in sorted(summary['matches'].items()):
+            lines.append(f'livesport_matches_total{{sport="{sport}"}} {count}')
+        lines += ['# HELP livesport_match_retries_total Ponowienia meczów po błędzie w ostatnim przebiegu',
+                  '# TYPE livesport_match_retries_total counter']
+        for sport, by_level in sorted(summary['retries'].items()):
+            for level, count in sorted(by_level.items()):
+                lines.append(f'livesport_match_retries_total{{sport="{sport}",level="{level}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_summary(self, summary: Dict, summary_path: str = SUMMARY_FILE,
+                      prometheus_path: str = PROMETHEUS_FILE) -> None:
+        for path in (summary_path, prometheus_path):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        # Zapis atomowy - serwer API może czytać plik w trakcie
+        tmp_path = f"{prometheus_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(summary))
+        os.replace(tmp_path, prometheus_path)
+
+    def print_report(self) -> None:
+        if not stage_metrics_enabled():
+            return
+        summary = self.summarize()
+        if not summary['matches']:
+            return
+        print(f"\n⏱️ CZASY ETAPÓW (przebieg {summary['run_id']}):")
+        for sport, by_stage in sorted(summary['stages'].items()):
+            retries = summary['retries'].get(sport, {})
+            print(f"   {sport}: {summary['matches'].get(sport, 0)} meczów, "
+                  f"retry strony={retries.get('page', 0)}, retry meczu={retries.get('match', 0)}")
+            # Etap dominujący (największa suma czasu) na górze
+            for stage, stat in sorted(by_stage.items(), key=lambda kv: -kv[1]['sum']):
+                print(f"      {stage:<11} n={stat['count']:<5} p50={stat['p50']:.2f}s  p90={stat['p90']:.2f}s  "
+                      f"p99={stat['p99']:.2f}s  suma={stat['sum']:.0f}s")
+        try:
+            self.write_summary(summary)
+            print(f"   💾 {SUMMARY_FILE}, {PROMETHEUS_FILE}")
+        except OSError as e:
+            print(f"   ⚠️ Nie można zapisać podsumowania metryk: {e}")
+
+
+# Globalna instancja (per proces); run_id ustalany przy imporcie - przed startem workerów
+stage_metrics = StageMetrics()
+if not os.environ.get(RUN_ID_ENV):
+    current_run_id()
+    stage_metrics.prune_runs()  # Nowy przebieg (proces główny) - workery dziedziczą run_id i nie sprzątają
+
+
+def record_stage_timings(sport: str, stages: Dict[str, float], total: float, url: str = '',
+                         qualifies: Optional[bool] = None) -> None:
+    stage_metrics.record_match(sport, stages, total, url, qualifies)
+
+
+def record_match_retry(sport: str, url: str = '', level: str = 'match') -> None:
+    stage_metrics.record_retry(sport, url, level)
+
+
+def print_stage_metrics_report() -> None:
+    stage_metrics.print_report()
@@ -0,0 +1,316 @@
+"""
+🔗 Team Alias Store - trwała tabela aliasów drużyn między źródłami (SQLite)
+==========================================================================
+Ten sam klub to "Resovia Rzeszów" na Livesport, "Resovia" na Forebet i jeszcze
+inaczej na SofaScore. Każde uruchomienie odtwarzało to mapowanie od nowa
+(normalize_team_name + fuzzy scoring), czasem płatnym wywołaniem Groq/Gemini
+(find_forebet_match_with_gemini).
+
+Magazyn zapisuje każde potwierdzone dopasowanie z wynikiem i parą źródeł:
+
+    outputs/team_aliases.sqlite   (tabela aliases)
+    klucz: (sport, źródło, cel, znormalizowana nazwa w źródle) -> nazwa w celu
+
+Dokładne trafienie obu drużyn meczu (resolve_pair) zwraca nazwy od razu -
+bez fuzzy matchingu i bez AI. Dopasowania fuzzy zapisywane są od wyniku
+ALIAS_MIN_SCORE, dopasowania AI i ręczne zawsze. Przy konflikcie zostaje
+alias z wyższym wynikiem.
+
+Przegląd i czyszczenie złych wpisów:
+    python team_alias_store.py stats
+    python team_alias_store.py list --target forebet --below 0.5
+    python team_alias_store.py prune --name "Resovia Rzeszów" --target forebet
+    python team_alias_store.py prune --method ai --dry-run
+    python team_alias_store.py add volleyball livesport forebet "Resovia Rzeszów" "Resovia"
+
+Konfiguracja (env):
+    TEAM_ALIAS_DB=ścieżka      - plik bazy (domyślnie outputs/team_aliases.sqlite)
+    TEAM_ALIASES=0             - wyłącza tabelę aliasów
+    TEAM_ALIAS_MIN_SCORE=0.6   - minimalny wynik dopasowania fuzzy do zapisu
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from team_matcher import normalize_name
+
+DEFAULT_DB_PATH = os.getenv('TEAM_ALIAS_DB', os.path.join('outputs', 'team_aliases.sqlite'))
+
+# Minimalny wynik dopasowania fuzzy, od którego alias jest zapisywany
+ALIAS_MIN_SCORE = float(os.getenv('TEAM_ALIAS_MIN_SCORE', '0.6'))
+
+# Metody dopasowania zapisywane bez względu na wynik
+TRUSTED_METHODS = ('ai', 'manual')
+
+ALIAS_COLUMNS = ('sport', 'source', 'target', 'name', 'alias', 'score', 'method', 'hits', 'created_at', 'last_used')
+
+
+def team_aliases_enabled() -> bool:
+    return os.getenv('TEAM_ALIASES', '1') != '0'
+
+
+class TeamAliasStore:
+    """
+    Aliasy nazw drużyn między źródłami.
+
+    Args:
+        path: Plik bazy SQLite
+        min_score: Minimalny wynik dopasowania fuzzy do zapisu
+        clock: Źródło czasu (testy)
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, min_score: float = ALIAS_MIN_SCORE, clock=time.time):
+        self.path = path
+        self.min_score = min_score
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Połączenie leniwe - import modułu nie tworzy pliku bazy
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS aliases ("
+                " sport TEXT, source TEXT, target TEXT, name_key TEXT,"
+                " name TEXT, alias TEXT, score REAL, method TEXT, hits INTEGER DEFAULT 0,"
+                " created_at REAL, last_used REAL,"
+                " PRIMARY KEY (sport, source, target, name_key))")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def alias_key(sport: str, source: str, target: str, name: str) -> tuple:
+        return (sport or 'unknown').lower(), source.lower(), target.lower(), normalize_name(name)
+
+    def resolve(self, sport: str, source: str, target: str, name: str) -> Optional[str]:
+        """Nazwa drużyny w źródle `target` lub None."""
+        key = self.alias_key(sport, source, target, name)
+        if not key[3]:
+            return None
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT alias FROM aliases WHERE sport = ? AND source = ? AND target = ? AND name_key = ?",
+                key).fetchone()
+        return row['alias'] if row else None
+
+    def resolve_pair(self, sport: str, source: str, target: str, home: str,
+                     away: str) -> Optional[Tuple[str, str]]:
+        """
+        (gospodarze, goście) w źródle `target` - tylko gdy obie drużyny mają alias.
+
+        Błąd bazy nie przerywa scrapowania - wtedy None (zwykłe dopasowanie).
+        """
+        if not team_aliases_enabled():
+            return None
+        try:
+            home_alias = self.resolve(sport, source, target, home)
+            away_alias = self.resolve(sport, source, target, away) if home_alias else None
+        except sqlite3.Error as e:
+            print(f"   ⚠️ Team aliases: {e}")
+            return None
+        if not (home_alias and away_alias):
+            self.misses += 1
+            return None
+        return home_alias, away_alias
+
+    def mark_used(self, sport: str, source: str, target: str, *names: str) -> None:
+        """Zlicza trafienie aliasów, których wynik został użyty."""
+        self.hits += 1
+        now = self.clock()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "UPDATE aliases SET hits = hits + 1, last_used = ? "
+                    "WHERE sport = ? AND source = ? AND target = ? AND name_key = ?",
+                    [(now, *self.alias_key(sport, source, target, name)) for name in names])
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"   ⚠️ Team aliases: {e}")
+
+    def record(self, sport: str, source: str, target: str, name: str, alias: str,
+               score: float, method: str = 'fuzzy') -> bool:
+        """
+        Zapisuje potwierdzone dopasowanie nazwy `name` (źródło) do `alias` (cel).
+
+        Returns: True gdy alias zapisany/zaktualizowany
+        """
+        key = self.alias_key(sport, source, target, name)
+        if not key[3] or not alias:
+            return False
+        if method not in TRUSTED_METHODS and score < self.min_score:
+            return False
+        now = self.clock()
+        with self._lock:
+            conn = self._connect()
+            # Konflikt: zostaje alias z wyższym wynikiem (ten sam alias - odświeżony wynik)
+            cursor = conn.execute(
+                "INSERT INTO aliases (sport, source, target, name_key, name, alias, score, method, hits, "
+                "created_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?) "
+                "ON CONFLICT (sport, source, target, name_key) DO UPDATE SET "
+                "alias = excluded.alias, method = excluded.method, score = CASE WHEN excluded.alias = aliases.alias "
+                "THEN MAX(aliases.score, excluded.score) ELSE excluded.score END, "
+                "name = excluded.name, last_used = excluded.last_used "
+                "WHERE excluded.score >= aliases.score OR excluded.alias = aliases.alias",
+                (*key, name, alias, score, method, now, now))
+            conn.commit()
+        if cursor.rowcount:
+            self.recorded += 1
+        return bool(cursor.rowcount)
+
+    def record_pair(self, sport: str, source: str, target: str, home: str, away: str,
+                    home_alias: str, away_alias: str, home_score: float, away_score: float,
+                    method: str = 'fuzzy') -> None:
+        """Zapisuje obie drużyny potwierdzonego meczu (błąd bazy tylko logowany)."""
+        if not team_aliases_enabled():
+            return
+        try:
+            self.record(sport, source, target, home, home_alias, home_score, method)
+            self.record(sport, source, target, away, away_alias, away_score, method)
+        except sqlite3.Error as e:
+            print(f"   ⚠️ Team aliases: {e}")
+
+    def entries(self, sport: Optional[str] = None, source: Optional[str] = None, target: Optional[str] = None,
+                name: Optional[str] = None, below: Optional[float] = None, method: Optional[str] = None,
+                unused_days: Optional[float] = None) -> List[Dict]:
+        """Wpisy spełniające wszystkie podane filtry."""
+        where, params = self._filters(sport, source, target, name, below, method, unused_days)
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT * FROM aliases{where} ORDER BY sport, source, target, name_key", params).fetchall()
+        return [{column: row[column] for column in ALIAS_COLUMNS} for row in rows]
+
+    def prune(self, sport: Optional[str] = None, source: Optional[str] = None, target: Optional[str] = None,
+              name: Optional[str] = None, below: Optional[float] = None, method: Optional[str] = None,
+              unused_days: Optional[float] = None) -> int:
+        """Usuwa wpisy spełniające filtry. Returns: liczba usuniętych."""
+        where, params = self._filters(sport, source, target, name, below, method, unused_days)
+        if not where:
+            raise ValueError('prune wymaga co najmniej jednego filtra')
+        with self._lock:
+            conn = self._connect()
+            cursor = conn.execute(f"DELETE FROM aliases{where}", params)
+            conn.commit()
+        return cursor.rowcount
+
+    def _filters(self, sport, source, target, name, below, method, unused_days) -> Tuple[str, list]:
+        clauses, params = [], []
+        for column, value in (('sport', sport), ('source', source), ('target', target), ('method', method)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value.lower())
+        if name:
+            clauses.append("name_key = ?")
+            params.append(normalize_name(name))
+        if below is not None:
+            clauses.append("score < ?")
+            params.append(below)
+        if unused_days is not None:
+            clauses.append("last_used < ?")
+            params.append(self.clock() - unused_days * 86400)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def stats(self) -> Dict:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT source || ' -> ' || target AS pair, COUNT(*) AS aliases, SUM(hits) AS hits, "
+                "AVG(score) AS avg_score, SUM(method = 'ai') AS ai FROM aliases "
+                "GROUP BY source, target ORDER BY source, target").fetchall()
+        return {row['pair']: {'aliases': row['aliases'], 'hits': row['hits'] or 0,
+                              'avg_score': row['avg_score'] or 0.0, 'ai': row['ai'] or 0} for row in rows}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def print_report(self) -> None:
+        if not (self.hits or self.misses or self.recorded):
+            return
+        print(f"\n🔗 ALIASY DRUŻYN: trafienia {self.hits} (bez fuzzy/AI), brak aliasu: {self.misses}, "
+              f"zapisane: {self.recorded}")
+
+
+# Globalna instancja (per proces)
+team_alias_store = TeamAliasStore()
+
+
+def print_team_alias_report() -> None:
+    team_alias_store.print_report()
+
+
+def _add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--sport')
+    parser.add_argument('--source', help='Źródło nazwy (np. livesport)')
+    parser.add_argument('--target', help='Źródło aliasu (np. forebet, sofascore)')
+    parser.add_argument('--name', help='Nazwa drużyny w źródle')
+    parser.add_argument('--below', type=float, help='Tylko wpisy z wynikiem poniżej progu')
+    parser.add_argument('--method', choices=['fuzzy', 'ai', 'manual'])
+    parser.add_argument('--unused-days', type=float, help='Nieużywane od N dni')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='🔗 Aliasy drużyn między źródłami - przegląd i czyszczenie')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Plik bazy SQLite')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('stats', help='Liczba aliasów i trafień per para źródeł')
+    _add_filters(sub.add_parser('list', help='Lista aliasów (filtry)'))
+    prune = sub.add_parser('prune', help='Usuwa złe wpisy (wymaga filtra)')
+    _add_filters(prune)
+    prune.add_argument('--dry-run', action='store_true', help='Tylko pokaż, co zostałoby usunięte')
+    add = sub.add_parser('add', help='Ręczny alias (wynik 1.0, metoda manual)')
+    for name in ('sport', 'source', 'target', 'name', 'alias'):
+        add.add_argument(name)
+    args = parser.parse_args(argv)
+
+    if args.command != 'add' and not os.path.exists(args.db):
+        print(f"❌ Brak bazy: {args.db}")
+        return 1
+    store = TeamAliasStore(path=args.db)
+    try:
+        if args.command == 'stats':
+            for pair, stat in store.stats().items():
+                print(f"   {pair:<24} aliasy: {stat['aliases']:<6} trafienia: {stat['hits']:<6} "
+                      f"śr. wynik: {stat['avg_score']:.2f}  AI: {stat['ai']}")
+        elif args.command == 'add':
+            store.record(args.sport, args.source, args.target, args.name, args.alias, 1.0, method='manual')
+            print(f"✅ {args.name} -> {args.alias} ({args.source} -> {args.target}, {args.sport})")
+        else:
+            filters = dict(sport=args.sport, source=args.source, target=args.target, name=args.name,
+                           below=args.below, method=args.method, unused_days=args.unused_days)
+            if args.command == 'prune' and all(value is None for value in filters.values()):
+                print("❌ prune wymaga co najmniej jednego filtra")
+                return 1
+            entries = store.entries(**filters)
+            for entry in entries:
+                print(f"   {entry['sport']:<11} {entry['source']} -> {entry['target']:<10} "
+                      f"{entry['name']} -> {entry['alias']}  ({entry['method']} {entry['score']:.2f}, "
+                      f"trafienia: {entry['hits']})")
+            if args.command == 'list':
+                print(f"📋 {len(entries)} aliasów")
+            elif args.dry_run:
+                print(f"🔍 Do usunięcia: {len(entries)} aliasów (dry run)")
+            else:
+                print(f"🗑️ Usunięto {store.prune(**filters)} aliasów")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+🔎 Team Matcher - wspólny silnik dopasowania nazw drużyn
+=======================================================
+Każde źródło (Forebet, Forebet-first, SofaScore, wyniki) miało własną kopię
+similarity_score i wywoływało ją w pętli po wszystkich kandydatach - O(N)
+kosztownych porównań (SequenceMatcher) na każde wyszukanie.
+
+Silnik:
+1. Indeks odwrócony trigramów znakowych znormalizowanych nazw
+   ("  legia warszawa " -> "  l", " le", "leg", ...) - budowany raz na listę.
+2. Wektorowy scorer: liczba wspólnych trigramów dla WSZYSTKICH kandydatów
+   naraz (numpy.bincount po listach pozycji) -> współczynnik Dice'a.
+3. Shortlista: najlepsze wg Dice (SHORTLIST_SIZE), tylko z niej liczony jest
+   dokładny scoring źródła (wstrzykiwany `score=` - np. similarity_score
+   z forebet_scraper), więc progi i warunki dopasowania źródeł się nie zmieniają.
+
+    matcher = TeamMatcher(names, normalize=normalize_team_name, score=similarity_score)
+    name, score = matcher.best_match('Legia Warszawa')
+    results = matcher.match_all(['Legia', 'Lech Poznań'], threshold=0.5)
+
+    best_match(query, candidates, ...) / match_all(queries, candidates, ...)
+    - funkcje modułu z pamięcią ostatnich indeksów (ta sama lista kandydatów
+      w pętli nie jest indeksowana ponownie)
+
+Benchmark: python benchmark_team_matcher.py
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Ile najlepszych kandydatów (wg trigramów) dostaje dokładny scoring źródła
+SHORTLIST_SIZE = 12
+
+# Ile indeksów (list kandydatów) trzymać w pamięci dla funkcji modułu
+MATCHER_CACHE_SIZE = 32
+
+# Znaki bez rozkładu NFKD (ł, ß, ø, ...)
+_FOLD = str.maketrans({'ł': 'l', 'Ł': 'L', 'ß': 'ss', 'ø': 'o', 'Ø': 'O', 'æ': 'ae', 'Æ': 'AE',
+                       'ð': 'd', 'þ': 'th', 'ı': 'i', 'đ': 'd', 'Đ': 'D'})
+
+Match = Tuple[Optional[str], float]
+
+
+def normalize_name(name: str) -> str:
+    """Domyślna normalizacja: małe litery, ASCII (bez diakrytyków), tylko litery/cyfry i pojedyncze spacje."""
+    if not name:
+        return ''
+    folded = unicodedata.normalize('NFKD', name.translate(_FOLD))
+    folded = ''.join(c for c in folded if not unicodedata.combining(c)).lower()
+    return re.sub(r'\s+', ' ', re.sub(r'[^a-z0-9\s]', ' ', folded)).strip()
+
+
+def trigrams(normalized: str) -> set:
+    """Trigramy znakowe z dopełnieniem (krótkie nazwy też mają kilka trigramów)."""
+    if not normalized:
+        return set()
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TeamMatcher:
+    """
+    Indeks nazw drużyn do szybkiego dopasowania.
+
+    Args:
+        names: Nazwy kandydatów (kolejność = priorytet przy remisie)
+        normalize: Normalizacja do indeksu trigramów
+        score: Dokładny scoring (zapytanie, kandydat) -> 0.0-1.0 liczony na shortliście;
+               None = Dice trigramów
+        shortlist_size: Ilu kandydatów ocenia `score`
+    """
+
+    def __init__(self, names: Iterable[str], normalize: Callable[[str], str] = normalize_name,
+                 score: Optional[Callable[[str, str], float]] = None, shortlist_size: int = SHORTLIST_SIZE):
+        self.names = list(names)
+        self.normalize = normalize
+        self.score = score
+        self.shortlist_size = shortlist_size
+        self.normalized = [normalize(name or '') for name in self.names]
+        postings: Dict[str, List[int]] = {}
+        sizes = []
+        for position, normalized in enumerate(self.normalized):
+            grams = trigrams(normalized)
+            sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self._postings = {gram: np.array(positions, dtype=np.int32) for gram, positions in postings.items()}
+        self._sizes = np.array(sizes, dtype=np.float64)
+        self._exact: Dict[str, int] = {}
+        for position, normalized in enumerate(self.normalized):
+            if normalized:
+                self._exact.setdefault(normalized, position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def dice(self, query: str) -> np.ndarray:
+        """Wektor podobieństwa Dice'a (trigramy) zapytania do wszystkich kandydatów."""
+        grams = trigrams(self.normalize(query or ''))
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits or not self.names:
+            return np.zeros(len(self.names))
+        overlap = np.bincount(np.concatenate(hits), minlength=len(self.names))
+        return 2.0 * overlap / (len(grams) + self._sizes)
+
+    def shortlist(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Pozycje najlepszych kandydatów wg Dice (tylko ze wspólnym trigramem), malejąco."""
+        limit = self.shortlist_size if limit is None else limit
+        scores = self.dice(query)
+        nonzero = np.flatnonzero(scores)
+        if limit and len(nonzero) > limit:
+            # Stabilnie: przy równym Dice wcześniejsza pozycja
+            top = np.argsort(-scores[nonzero], kind='stable')[:limit]
+            nonzero = nonzero[top]
+        else:
+            nonzero = nonzero[np.argsort(-scores[nonzero], kind='stable')]
+        return nonzero.tolist()
+
+    def scored(self, query: str, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """(pozycja, wynik) dla shortlisty - wynik ze `score` lub Dice, w kolejności pozycji."""
+        positions = sorted(self.shortlist(query, limit))
+        if self.score is None:
+            scores = self.dice(query)
+            return [(position, float(scores[position])) for position in positions]
+        return [(position, self.score(query, self.names[position])) for position in positions]
+
+    def best_match(self, query: str, threshold: float = 0.0) -> Match:
+        """(nazwa, wynik) najlepszego kandydata lub (None, 0.0) gdy poniżej progu."""
+        if not query or not self.names:
+            return None, 0.0
+        position = self._exact.get(self.normalize(query))
+        if position is not None and self.score is None:
+            return self.names[position], 1.0
+        best_position, best_score = None, 0.0
+        for position, score in self.scored(query):
+            # Ścisłe '>' - przy remisie wygrywa wcześniejszy kandydat (jak w pętlach źródeł)
+            if score > best_score:
+                best_position, best_score = position, score
+        if best_position is None or best_score < threshold:
+            return None, 0.0
+        return self.names[best_position], best_score
+
+    def match_all(self, queries: Iterable[str], threshold: float = 0.0) -> List[Match]:
+        return [self.best_match(query, threshold) for query in queries]
+
+
+_matchers: 'OrderedDict[tuple, TeamMatcher]' = OrderedDict()
+_matchers_lock = threading.Lock()
+
+
+def get_matcher(candidates: Sequence[str], normalize: Callable[[str], str] = normalize_name,
+                score: Optional[Callable[[str, str], float]] = None) -> TeamMatcher:
+    """Indeks dla listy kandydatów - ponownie użyty, gdy ta sama lista wraca w pętli."""
+    key = (tuple(candidates), normalize, score)
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None:
+            _matchers.move_to_end(key)
+            return matcher
+    matcher = TeamMatcher(candidates, normalize=normalize, score=score)
+    with _matchers_lock:
+        _matchers[key] = matcher
+        while len(_matchers) > MATCHER_CACHE_SIZE:
+            _matchers.popitem(last=False)
+    return matcher
+
+
+def best_match(query: str, candidates: Sequence[str], score: Optional[Callable[[str, str], float]] = None,
+               normalize: Callable[[str], str] = normalize_name, threshold: float = 0.0) -> Match:
+    """Najlepsze dopasowanie `query` z listy kandydatów: (nazwa, wynik) lub (None, 0.0)."""
+    if not query or not candidates:
+        return None, 0.0
+    return get_matcher(candidates, normalize, score).best_match(query, threshold)
+
+
+def match_all(queries: Iterable[str], candidates: Sequence[str], score: Optional[Callable[[str, str], float]] = None,
+              normalize: Callable[[str], str] = normalize_name, threshold: float = 0.0) -> List[Match]:
+    """best_match dla wielu zapytań - jeden indeks kandydatów."""
+    queries = list(queries)
+    if not candidates:
+        return [(None, 0.0)] * len(queries)
+    return get_matcher(candidates, normalize, score).match_all(queries, threshold)
+
+
+def pair_shortlist(home_team: str, away_team: str, home_matcher: TeamMatcher, away_matcher: TeamMatcher,
+                   limit: Optional[int] = None) -> List[int]:
+    """Pozycje par (mecz) z shortlisty gospodarzy LUB gości - w kolejności listy meczów."""
+    return sorted(set(home_matcher.shortlist(home_team, limit)) | set(away_matcher.shortlist(away_team, limit)))
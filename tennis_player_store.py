@@ -0,0 +1,178 @@
+"""
+🎾 Tennis Player Store - trwały magazyn profili zawodników (SQLite)
+===================================================================
+PLAYER_URL_CACHE w tennis_scraper_v3_helpers żyje tylko w pamięci procesu, więc
+każde uruchomienie ponownie szuka tych samych zawodników i odwiedza ich profile -
+nawet w tym samym tygodniu turnieju. Magazyn trzyma dane na dysku:
+
+    outputs/tennis_players.sqlite   (tabela players, klucz: znormalizowana nazwa)
+
+Każde pole ma własny znacznik czasu i TTL:
+    profile_url    - 30 dni (URL profilu praktycznie się nie zmienia)
+    ranking        - 3 dni  (ranking ATP/WTA aktualizowany co tydzień)
+    surface_stats  - 7 dni  (bilans na nawierzchniach)
+    form           - 12 h   (ostatnie 10 meczów)
+
+process_match_tennis czyta najpierw magazyn; strony zawodnika odwiedzane są tylko
+dla pól nieświeżych (get_player_profile w tennis_scraper_v3_helpers).
+Workery FAZY 1 (osobne procesy) dzielą plik - SQLite w trybie WAL z timeoutem blokady.
+
+Konfiguracja (env):
+    TENNIS_PLAYER_DB=ścieżka  - plik bazy (domyślnie outputs/tennis_players.sqlite)
+    TENNIS_PLAYER_STORE=0     - wyłącza magazyn
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+DEFAULT_DB_PATH = os.getenv('TENNIS_PLAYER_DB', os.path.join('outputs', 'tennis_players.sqlite'))
+
+# TTL pól w godzinach
+FIELD_TTL_HOURS = {
+    'profile_url': 24 * 30,
+    'ranking': 24 * 3,
+    'surface_stats': 24 * 7,
+    'form': 12,
+}
+FIELDS = tuple(FIELD_TTL_HOURS)
+
+
+def player_store_enabled() -> bool:
+    return os.getenv('TENNIS_PLAYER_STORE', '1') != '0'
+
+
+def normalize_player_name(name: str) -> str:
+    """'Świątek I.' -> 'swiatek i' (bez diakrytyków, kropek i wielokrotnych spacji)."""
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKD', name.replace('ł', 'l').replace('Ł', 'L'))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r'[^a-z0-9 \-]', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class TennisPlayerStore:
+    """
+    Magazyn profili zawodników z TTL per pole.
+
+    Args:
+        path: Plik bazy SQLite
+        ttl_hours: Nadpisanie TTL wybranych pól ({'form': 6, ...})
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, ttl_hours: Optional[Dict[str, float]] = None):
+        self.path = path
+        self.ttl_hours = dict(FIELD_TTL_HOURS)
+        self.ttl_hours.update(ttl_hours or {})
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Połączenie leniwe - import modułu nie tworzy pliku bazy
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            columns = ', '.join(f"{field} TEXT, {field}_at REAL" for field in FIELDS)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS players (name_key TEXT PRIMARY KEY, "
+                         f"display_name TEXT, {columns})")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _row(self, name_key: str) -> Optional[sqlite3.Row]:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        return conn.execute('SELECT * FROM players WHERE name_key = ?', (name_key,)).fetchone()
+
+    def _is_fresh(self, row: sqlite3.Row, field: str, now: float) -> bool:
+        stamp = row[f"{field}_at"]
+        return row[field] is not None and stamp is not None and now - stamp <= self.ttl_hours[field] * 3600
+
+    def get(self, name: str, field: str) -> Optional[Any]:
+        """Wartość pola albo None (brak zawodnika / pola / wpis nieświeży)."""
+        return self.get_profile(name, fields=[field]).get(field)
+
+    def get_profile(self, name: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Słownik TYLKO świeżych pól zawodnika (brakujący klucz = trzeba pobrać)."""
+        name_key = normalize_player_name(name)
+        fields = fields or list(FIELDS)
+        if not name_key or not player_store_enabled():
+            return {}
+        profile = {}
+        try:
+            with self._lock:
+                row = self._row(name_key)
+        except sqlite3.Error as e:
+            print(f"   ⚠️ Tennis player store: błąd odczytu {name}: {e}")
+            return {}
+        now = time.time()
+        for field in fields:
+            if row is not None and self._is_fresh(row, field, now):
+                profile[field] = json.loads(row[field])
+                self.hits += 1
+            else:
+                self.misses += 1
+        return profile
+
+    def stale_fields(self, name: str) -> List[str]:
+        profile = self.get_profile(name)
+        return [field for field in FIELDS if field not in profile]
+
+    def put(self, name: str, **fields: Any) -> None:
+        """Zapisuje podane pola (pozostałe pola i ich znaczniki czasu bez zmian)."""
+        name_key = normalize_player_name(name)
+        fields = {k: v for k, v in fields.items() if k in FIELDS and v not in (None, [], {})}
+        if not name_key or not fields or not player_store_enabled():
+            return
+        now = time.time()
+        assignments = ', '.join(f"{field} = excluded.{field}, {field}_at = excluded.{field}_at" for field in fields)
+        columns = ['name_key', 'display_name']
+        values: List[Any] = [name_key, name]
+        for field, value in fields.items():
+            columns += [field, f"{field}_at"]
+            values += [json.dumps(value, ensure_ascii=False), now]
+        sql = (f"INSERT INTO players ({', '.join(columns)}) VALUES ({', '.join('?' * len(values))}) "
+               f"ON CONFLICT(name_key) DO UPDATE SET display_name = excluded.display_name, {assignments}")
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(sql, values)
+                conn.commit()
+            self.writes += 1
+        except sqlite3.Error as e:
+            print(f"   ⚠️ Tennis player store: błąd zapisu {name}: {e}")
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'misses': self.misses, 'writes': self.writes}
+
+    def print_report(self) -> None:
+        if not (self.hits or self.misses or self.writes):
+            return
+        total = self.hits + self.misses
+        rate = 100 * self.hits / total if total else 0.0
+        print(f"\n🎾 MAGAZYN ZAWODNIKÓW: trafienia {self.hits}/{total} pól ({rate:.0f}%), zapisy: {self.writes}")
+
+
+# Globalna instancja (per proces)
+player_store = TennisPlayerStore()
+
+
+def print_player_store_report() -> None:
+    player_store.print_report()
@@ -10,7 +10,6 @@ Wymagania:
 """
 
 import re
-import time
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -19,9 +18,13 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from page_readiness import wait_for_page
+from tennis_player_store import player_store
+
 
 # ==========================================
 # CACHE dla wydajności
+# (pamięć procesu; trwałe dane między uruchomieniami: tennis_player_store)
 # ==========================================
 
 PLAYER_URL_CACHE = {}
@@ -210,6 +213,12 @@ def extract_player_detailed_form(driver: webdriver.Chrome, player_name: str, pla
     """
     form = []
     
+    # Świeża forma z magazynu - bez odwiedzania profilu
+    if player_name:
+        cached_form = player_store.get(player_name, 'form')
+        if cached_form:
+            return cached_form
+    
     try:
         # 1. Znajdź URL profilu zawodnika (jeśli nie podano)
         if not player_url:
@@ -225,7 +234,7 @@ def extract_player_detailed_form(driver: webdriver.Chrome, player_name: str, pla
         results_url = player_url.rstrip('/') + '/wyniki/'
         
         driver.get(results_url)
-        time.sleep(2)
+        wait_for_page(driver, 'player_results', 'tennis', legacy_sleep=2.0)
         
         soup = BeautifulSoup(driver.page_source, 'html.parser')
         
@@ -285,6 +294,9 @@ def extract_player_detailed_form(driver: webdriver.Chrome, player_name: str, pla
     except Exception as e:
         print(f"   ⚠️ Błąd pobierania formy zawodnika {player_name}: {e}")
     
+    if player_name and form:
+        player_store.put(player_name, form=form[:10], profile_url=player_url)
+    
     return form[:10]  # Maksymalnie 10 ostatnich meczów
 
 
@@ -300,15 +312,19 @@ def find_player_url_from_search(driver: webdriver.Chrome, player_name: str) -> O
         URL profilu zawodnika lub None
     """
     try:
-        # Sprawdź cache
+        # Sprawdź cache (pamięć, potem magazyn na dysku)
         if player_name in PLAYER_URL_CACHE:
             return PLAYER_URL_CACHE[player_name]
+        stored_url = player_store.get(player_name, 'profile_url')
+        if stored_url:
+            PLAYER_URL_CACHE[player_name] = stored_url
+            return stored_url
         
         # Livesport search URL
         search_url = f"https://www.livesport.com/pl/szukaj/?q={player_name.replace(' ', '+')}"
         
         driver.get(search_url)
-        time.sleep(1.5)
+        wait_for_page(driver, 'player_search', 'tennis', legacy_sleep=1.5)
         
         soup = BeautifulSoup(driver.page_source, 'html.parser')
         
@@ -321,10 +337,10 @@ def find_player_url_from_search(driver: webdriver.Chrome, player_name: str) -> O
             
             # Sprawdź czy to właściwy zawodnik
             if player_name.lower() in link_text:
-                if href.startswith('http'):
-                    return href
-                else:
-                    return f"https://www.livesport.com{href}"
+                player_url = href if href.startswith('http') else f"https://www.livesport.com{href}"
+                PLAYER_URL_CACHE[player_name] = player_url
+                player_store.put(player_name, profile_url=player_url)
+                return player_url
         
         return None
         
@@ -337,13 +353,14 @@ def find_player_url_from_search(driver: webdriver.Chrome, player_name: str) -> O
 # 3. STATYSTYKI NAWIERZCHNI
 # ==========================================
 
-def extract_surface_statistics(driver: webdriver.Chrome, player_url: str) -> Dict[str, Dict]:
+def extract_surface_statistics(driver: webdriver.Chrome, player_url: str, player_name: str = '') -> Dict[str, Dict]:
     """
     Zbiera statystyki zawodnika na różnych nawierzchniach.
     
     Args:
         driver: Selenium WebDriver
         player_url: URL profilu zawodnika
+        player_name: Nazwa zawodnika (opcjonalne - klucz magazynu tennis_player_store)
     
     Returns:
         {
@@ -363,12 +380,17 @@ def extract_surface_statistics(driver: webdriver.Chrome, player_url: str) -> Dic
         'grass': {'wins': 0, 'total': 0, 'win_rate': 0.0, 'recent_form': []}
     }
     
+    if player_name:
+        cached_stats = player_store.get(player_name, 'surface_stats')
+        if cached_stats:
+            return cached_stats
+    
     try:
         # Przejdź na stronę statystyk zawodnika
         stats_url = player_url.rstrip('/') + '/statystyki/'
         
         driver.get(stats_url)
-        time.sleep(2)
+        wait_for_page(driver, 'player_stats', 'tennis', legacy_sleep=2.0)
         
         soup = BeautifulSoup(driver.page_source, 'html.parser')
         
@@ -407,6 +429,9 @@ def extract_surface_statistics(driver: webdriver.Chrome, player_url: str) -> Dic
     except Exception as e:
         print(f"   ⚠️ Błąd pobierania statystyk nawierzchni: {e}")
     
+    if player_name and any(s['total'] for s in stats.values()):
+        player_store.put(player_name, surface_stats=stats)
+    
     return stats
 
 
@@ -487,6 +512,47 @@ def find_player_url_from_match_page(soup: BeautifulSoup, player_name: str) -> Op
         return None
 
 
+def get_player_profile(driver: webdriver.Chrome, player_name: str, soup: Optional[BeautifulSoup] = None,
+                       navigate: bool = True) -> Dict:
+    """
+    Profil zawodnika: najpierw magazyn, nawigacja tylko dla nieświeżych pól.
+    
+    Args:
+        driver: Selenium WebDriver
+        player_name: Nazwa zawodnika
+        soup: Strona meczu (źródło URL profilu bez wyszukiwarki)
+        navigate: False - tylko dane z magazynu, bez ładowania stron
+    
+    Returns:
+        {'profile_url', 'ranking', 'surface_stats', 'form'} - tylko dostępne pola
+    """
+    profile = player_store.get_profile(player_name)
+    if not navigate or not player_name:
+        return profile
+    
+    if 'profile_url' not in profile:
+        player_url = find_player_url_from_match_page(soup, player_name) if soup is not None else None
+        if player_url:
+            player_store.put(player_name, profile_url=player_url)
+        else:
+            player_url = find_player_url_from_search(driver, player_name)
+        if not player_url:
+            return profile
+        profile['profile_url'] = player_url
+    
+    if 'form' not in profile:
+        form = extract_player_detailed_form(driver, player_name, profile['profile_url'])
+        if form:
+            profile['form'] = form
+    
+    if 'surface_stats' not in profile:
+        stats = extract_surface_statistics(driver, profile['profile_url'], player_name)
+        if any(s.get('total') for s in stats.values()):
+            profile['surface_stats'] = stats
+    
+    return profile
+
+
 # ==========================================
 # EKSPORT
 # ==========================================
@@ -497,6 +563,7 @@ __all__ = [
     'extract_surface_statistics',
     'find_player_url_from_match_page',
     'find_player_url_from_search',
+    'get_player_profile',
     'PLAYER_URL_CACHE',
     'PLAYER_DATA_CACHE'
 ]
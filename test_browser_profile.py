@@ -0,0 +1,121 @@
+"""
+Test lekkiego profilu przeglądarki (browser_profile).
+
+Sprawdza:
+1. Opcje Chrome: strategia 'eager', przełączniki, scalone --disable-features i prefs
+2. Blokowanie zasobów przez CDP Network.setBlockedURLs
+3. Statystyki stron: KB/stronę i zaoszczędzony czas na 'load'
+"""
+
+import os
+import sys
+
+from selenium.webdriver.chrome.options import Options
+
+from browser_profile import (apply_lean_options, enable_resource_blocking, lean_enabled,
+                             PageMetrics, LEAN_ENV)
+
+
+def test_lean_options():
+    print("=" * 60)
+    print("TEST 1: Opcje profilu lekkiego")
+    print("=" * 60)
+    options = Options()
+    features = ['IsolateOrigins', 'site-per-process']
+    prefs = {'profile.default_content_setting_values.notifications': 2}
+    apply_lean_options(options, features, prefs)
+
+    assert options.page_load_strategy == 'eager'
+    assert '--disable-extensions' in options.arguments
+    assert features[:2] == ['IsolateOrigins', 'site-per-process'] and 'Translate' in features
+    assert prefs['profile.managed_default_content_settings.images'] == 2
+    assert prefs['profile.default_content_setting_values.notifications'] == 2
+    print("  ✅ PASS")
+
+
+def test_lean_enabled_env():
+    print("\n" + "=" * 60)
+    print("TEST 2: Włączanie przez parametr / zmienną środowiskową")
+    print("=" * 60)
+    old = os.environ.pop(LEAN_ENV, None)
+    try:
+        assert lean_enabled() is False
+        os.environ[LEAN_ENV] = '1'
+        assert lean_enabled() is True
+        assert lean_enabled(False) is False  # parametr ma pierwszeństwo
+    finally:
+        os.environ.pop(LEAN_ENV, None)
+        if old is not None:
+            os.environ[LEAN_ENV] = old
+    print("  ✅ PASS")
+
+
+class FakeCdpDriver:
+    def __init__(self, fail=False):
+        self.commands = []
+        self.fail = fail
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.fail:
+            raise RuntimeError('CDP niedostępne')
+        self.commands.append((cmd, params))
+
+
+def test_resource_blocking():
+    print("\n" + "=" * 60)
+    print("TEST 3: CDP Network.setBlockedURLs")
+    print("=" * 60)
+    driver = FakeCdpDriver()
+    assert enable_resource_blocking(driver) is True
+    assert driver.commands[0][0] == 'Network.enable'
+    cmd, params = driver.commands[1]
+    assert cmd == 'Network.setBlockedURLs'
+    assert '*.png' in params['urls'] and '*doubleclick.net*' in params['urls']
+    # Strony Livesport nie mogą być blokowane
+    assert not any('livesport' in p for p in params['urls'])
+    assert enable_resource_blocking(FakeCdpDriver(fail=True)) is False
+    print("  ✅ PASS")
+
+
+class FakeMetricsDriver:
+    def __init__(self, samples):
+        self.samples = list(samples)
+
+    def execute_script(self, script):
+        return self.samples.pop(0)
+
+
+def test_page_metrics_report():
+    print("\n" + "=" * 60)
+    print("TEST 4: KB/stronę i zaoszczędzony czas")
+    print("=" * 60)
+    metrics = PageMetrics()
+    metrics.lean = True
+    driver = FakeMetricsDriver([
+        {'bytes': 300 * 1024, 'resources': 40, 'dcl': 800, 'load': 2300, 'now': 2500},
+        {'bytes': 100 * 1024, 'resources': 20, 'dcl': 600, 'load': 0, 'now': 1600},  # 'load' jeszcze nie nastąpił
+        None,  # brak wpisu navigation - pomijamy
+    ])
+    for _ in range(3):
+        metrics.record(driver)
+    r = metrics.report()
+    assert r['pages'] == 2 and r['kb_per_page'] == 200.0, r
+    assert r['load_saved_s_total'] == 2.5 and r['load_saved_s_per_page'] == 1.25, r
+
+    default = PageMetrics()
+    default.record(FakeMetricsDriver([{'bytes': 1024, 'resources': 1, 'dcl': 500, 'load': 900, 'now': 950}]))
+    assert default.report()['load_saved_s_total'] == 0.0  # strategia 'normal' czeka na load
+    print(f"  ✅ PASS: {r}")
+
+
+if __name__ == '__main__':
+    try:
+        test_lean_options()
+        test_lean_enabled_env()
+        test_resource_blocking()
+        test_page_metrics_report()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,174 @@
+"""
+Test adaptacyjnej kolejności metod CloudflareBypass (bypass_method_stats).
+
+Sprawdza:
+1. Kolejność wg oczekiwanego czasu do sukcesu (a priori, po pomiarach, kara za świeżą porażkę)
+2. Wygaszanie starych statystyk (half-life) i trwałość między uruchomieniami + raport
+3. CloudflareBypass.get_page: najpierw metoda z najlepszą historią, zapis każdej próby
+"""
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+import cloudflare_bypass
+from bypass_method_stats import BypassMethodStats, domain_of
+from clearance_jar import ClearanceJar
+
+URL = 'https://www.forebet.com/en/football-tips-and-predictions-for-today'
+METHODS = [('undetected', None), ('puppeteer', None), ('flaresolverr', None), ('curl_cffi', None),
+           ('cloudscraper', None)]
+
+
+def _names(ordered):
+    return [name for name, _ in ordered]
+
+
+def test_order_by_expected_time():
+    print("=" * 60)
+    print("TEST 1: Kolejność wg oczekiwanego czasu do sukcesu")
+    print("=" * 60)
+    now = [1_000_000.0]
+    stats = BypassMethodStats(path=None, clock=lambda: now[0])
+    assert domain_of(URL) == 'forebet.com' and domain_of('https://api.sofascore.com/x') == 'api.sofascore.com'
+
+    # Bez historii: tanie metody HTTP przed przeglądarkami
+    assert _names(stats.order(URL, METHODS)) == ['curl_cffi', 'cloudscraper', 'puppeteer', 'flaresolverr',
+                                                 'undetected']
+
+    # curl_cffi dostaje challenge, undetected przechodzi (wolno, ale pewnie)
+    for _ in range(5):
+        stats.record(URL, 'curl_cffi', False, 1.5)
+        stats.record(URL, 'cloudscraper', False, 4.0)
+        stats.record(URL, 'undetected', True, 12.0)
+    now[0] += 2 * 3600  # po oknie kary za świeżą porażkę
+    ordered = _names(stats.order(URL, METHODS))
+    assert ordered[0] == 'undetected', ordered
+    estimate = stats.estimate(URL, 'undetected')
+    assert estimate['median_latency'] == 12.0 and estimate['success_rate'] > 0.8
+    assert stats.estimate(URL, 'curl_cffi')['success_rate'] < 0.2
+
+    # Inna domena ma własne statystyki
+    assert _names(stats.order('https://www.sofascore.com/', METHODS))[0] == 'curl_cffi'
+
+    # Świeża porażka (bez późniejszego sukcesu) - kara w koszcie
+    stats.record(URL, 'undetected', False, 30.0)
+    assert stats.estimate(URL, 'undetected')['cooling']
+    assert _names(stats.order(URL, METHODS))[0] != 'undetected'
+    now[0] += 3600
+    assert _names(stats.order(URL, METHODS))[0] == 'undetected'
+    print("  ✅ PASS")
+
+
+def test_decay_and_persistence():
+    print("\n" + "=" * 60)
+    print("TEST 2: Wygaszanie i trwałość statystyk")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='cf_stats_test_')
+    path = os.path.join(directory, 'stats.json')
+    now = [1_000_000.0]
+    try:
+        stats = BypassMethodStats(path=path, half_life=3600, clock=lambda: now[0])
+        for _ in range(8):
+            stats.record(URL, 'curl_cffi', True, 2.0)
+        assert stats.estimate(URL, 'curl_cffi')['attempts'] == 8.0
+
+        # Nowe uruchomienie: te same statystyki z pliku, wygaszone po 2 half-life
+        now[0] += 2 * 3600
+        reloaded = BypassMethodStats(path=path, half_life=3600, clock=lambda: now[0])
+        assert abs(reloaded.estimate(URL, 'curl_cffi')['attempts'] - 2.0) < 1e-9
+        # Po zmianie zabezpieczeń nowe porażki szybko przeważają stare sukcesy
+        for _ in range(8):
+            reloaded.record(URL, 'curl_cffi', False, 1.0)
+        now[0] += 3600
+        reloaded.record(URL, 'undetected', True, 15.0)
+        assert reloaded.estimate(URL, 'curl_cffi')['success_rate'] < 0.3
+        assert reloaded.estimate(URL, 'curl_cffi')['median_latency'] == 1.5
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            reloaded.print_report(['curl_cffi', 'undetected'])
+        report = output.getvalue()
+        # curl_cffi nadal pierwszy: 25% skuteczności przy 1.5 s to ~6 s oczekiwania, undetected ~20 s
+        assert 'forebet.com' in report and '1. curl_cffi' in report and '2. undetected' in report
+        assert 'min temu' in report and 'nigdy' in report
+        assert BypassMethodStats(path=path).domains() == ['forebet.com']
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_get_page_uses_order():
+    print("\n" + "=" * 60)
+    print("TEST 3: get_page - adaptacyjna kolejność i zapis prób")
+    print("=" * 60)
+    original_stats, original_ci = cloudflare_bypass.bypass_method_stats, cloudflare_bypass.IS_CI
+    original_jar = cloudflare_bypass.clearance_jar
+    original_available = dict(cloudflare_bypass.METHODS_AVAILABLE)
+    calls = []
+    page = '<html><body>' + '<div class="rcnt">Legia vs Lech</div>' * 50 + '</body></html>'
+    challenge = '<html><title>Just a moment...</title>' + ' ' * 2000 + '</html>'
+
+    def fake(name, html):
+        def method(url, timeout):
+            calls.append(name)
+            return html
+        return method
+
+    try:
+        stats = BypassMethodStats(path=None)
+        cloudflare_bypass.bypass_method_stats = stats
+        cloudflare_bypass.IS_CI = False
+        cloudflare_bypass.clearance_jar = ClearanceJar(path=None)
+        cloudflare_bypass.METHODS_AVAILABLE.update({name: True for name, _ in METHODS})
+        cloudflare_bypass.METHODS_AVAILABLE.update({'drissionpage': False, 'playwright': False, 'httpx': False})
+        bypass = cloudflare_bypass.CloudflareBypass(debug=False)
+        bypass._try_curl_cffi = fake('curl_cffi', challenge)
+        bypass._try_cloudscraper = fake('cloudscraper', None)
+        bypass._try_puppeteer = fake('puppeteer', page)
+        bypass._try_flaresolverr = fake('flaresolverr', page)
+        bypass._try_undetected_chrome = fake('undetected', page)
+
+        # 1. wywołanie: kolejność a priori - tanie metody, potem pierwsza przeglądarka
+        assert bypass.get_page(URL) == page and bypass.method_used == 'puppeteer'
+        assert calls == ['curl_cffi', 'cloudscraper', 'puppeteer']
+        # 2. wywołanie: puppeteer ma sukces w historii, tanie metody świeże porażki
+        calls.clear()
+        assert bypass.get_page(URL) == page and calls == ['puppeteer']
+        assert round(stats.estimate(URL, 'puppeteer')['attempts'], 6) == 2.0
+        assert stats.estimate(URL, 'curl_cffi')['cooling']
+
+        # CF_BYPASS_ADAPTIVE=0 - stała kolejność
+        calls.clear()
+        os.environ['CF_BYPASS_ADAPTIVE'] = '0'
+        try:
+            bypass.get_page(URL)
+        finally:
+            del os.environ['CF_BYPASS_ADAPTIVE']
+        assert calls == ['undetected']
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            cloudflare_bypass.print_available_methods()
+        assert 'forebet.com' in output.getvalue() and 'puppeteer' in output.getvalue()
+    finally:
+        cloudflare_bypass.bypass_method_stats, cloudflare_bypass.IS_CI = original_stats, original_ci
+        cloudflare_bypass.clearance_jar = original_jar
+        cloudflare_bypass.METHODS_AVAILABLE.clear()
+        cloudflare_bypass.METHODS_AVAILABLE.update(original_available)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_order_by_expected_time()
+        test_decay_and_persistence()
+        test_get_page_uses_order()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,192 @@
+"""
+Test słoika clearance Cloudflare (clearance_jar).
+
+Sprawdza:
+1. Zbieranie cf_clearance + User-Agent (formaty FlareSolverr/Selenium/dict), wygaśnięcie, współdzielenie
+2. CloudflareBypass.get_page: po FlareSolverr kolejny URL z clearance, challenge -> unieważnienie i metoda
+3. Odtwarzanie przez prawdziwe curl_cffi i httpx (lokalny serwer sprawdza cookie i User-Agent)
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import types
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+import cloudflare_bypass
+from bypass_method_stats import BypassMethodStats
+from clearance_jar import ClearanceJar
+
+UA = 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+URL = 'https://www.forebet.com/en/football-tips-and-predictions-for-today'
+PAGE = '<html><body><div class="schema">' + '<div class="rcnt">Legia vs Lech</div>' * 60 + '</div></body></html>'
+CHALLENGE = '<html><head><title>Just a moment...</title></head><body>' + ' ' * 2000 + '</body></html>'
+
+
+def test_harvest_and_expiry():
+    print("=" * 60)
+    print("TEST 1: Zbieranie clearance i wygaśnięcie")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='clearance_test_')
+    path = os.path.join(directory, 'jar.json')
+    now = [1_000_000.0]
+    try:
+        jar = ClearanceJar(path=path, ttl=1800, clock=lambda: now[0])
+        # Bez cf_clearance / bez UA - nic do zapamiętania
+        assert jar.harvest(URL, [{'name': '__cf_bm', 'value': 'x'}], UA, 'flaresolverr') is None
+        assert jar.harvest(URL, {'cf_clearance': 'abc'}, '', 'undetected') is None
+
+        # FlareSolverr: lista cookies z 'expires'
+        clearance = jar.harvest(URL, [{'name': 'cf_clearance', 'value': 'abc', 'expires': now[0] + 3600},
+                                      {'name': '__cf_bm', 'value': 'bm', 'expires': -1}], UA, 'flaresolverr')
+        assert clearance.domain == 'forebet.com' and clearance.cookies == {'cf_clearance': 'abc', '__cf_bm': 'bm'}
+        assert clearance.expires_at == now[0] + 3600
+        # Inny proces widzi ten sam słoik; inna ścieżka tej domeny też
+        shared = ClearanceJar(path=path, clock=lambda: now[0])
+        assert shared.get('https://forebet.com/en/basketball/predictions-today').user_agent == UA
+        assert oct(os.stat(path).st_mode & 0o777) == '0o600'
+
+        # Wygaśnięcie (z marginesem) usuwa wpis
+        now[0] += 3600 - 30
+        assert jar.get(URL) is None and shared.get(URL) is None
+
+        # Selenium: 'expiry'; cookie sesyjne -> TTL słoika
+        assert jar.harvest(URL, [{'name': 'cf_clearance', 'value': 'd', 'expiry': int(now[0]) + 600}], UA,
+                           'undetected').expires_at == int(now[0]) + 600
+        assert jar.harvest(URL, {'cf_clearance': 'e'}, UA, 'drissionpage').expires_at == now[0] + 1800
+        jar.invalidate(URL)
+        assert jar.get(URL) is None and jar.invalidated == 1 and jar.harvested == 3
+
+        os.environ['CF_CLEARANCE'] = '0'
+        try:
+            assert jar.harvest(URL, {'cf_clearance': 'f'}, UA, 'playwright') is None
+        finally:
+            del os.environ['CF_CLEARANCE']
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_get_page_replays_clearance():
+    print("\n" + "=" * 60)
+    print("TEST 2: get_page - FlareSolverr raz, potem clearance")
+    print("=" * 60)
+    originals = (cloudflare_bypass.clearance_jar, cloudflare_bypass.bypass_method_stats, cloudflare_bypass.IS_CI,
+                 cloudflare_bypass.requests, cloudflare_bypass.check_flaresolverr_health)
+    original_available = dict(cloudflare_bypass.METHODS_AVAILABLE)
+    flaresolverr_calls, replays = [], []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {'status': 'ok', 'solution': {
+                'response': PAGE, 'userAgent': UA,
+                'cookies': [{'name': 'cf_clearance', 'value': 'solved', 'expires': -1}]}}
+
+    def fake_post(url, headers=None, json=None, timeout=None):
+        flaresolverr_calls.append(json['url'])
+        return FakeResponse()
+
+    replay_result = [(200, PAGE)]
+
+    def fake_replay(url, clearance, timeout):
+        replays.append((url, clearance.cookies['cf_clearance'], clearance.user_agent))
+        return replay_result[0]
+
+    try:
+        jar = ClearanceJar(path=None)
+        cloudflare_bypass.clearance_jar = jar
+        cloudflare_bypass.bypass_method_stats = BypassMethodStats(path=None)
+        cloudflare_bypass.IS_CI = False
+        cloudflare_bypass.requests = types.SimpleNamespace(post=fake_post, exceptions=requests.exceptions)
+        cloudflare_bypass.check_flaresolverr_health = lambda force=False: True
+        cloudflare_bypass.METHODS_AVAILABLE.clear()
+        cloudflare_bypass.METHODS_AVAILABLE['flaresolverr'] = True
+        bypass = cloudflare_bypass.CloudflareBypass(debug=False)
+        bypass._replay_clearance = fake_replay
+
+        # 1. URL: brak clearance -> FlareSolverr, clearance zebrany
+        assert bypass.get_page(URL) == PAGE and bypass.method_used == 'flaresolverr'
+        assert jar.get(URL).cookies == {'cf_clearance': 'solved'} and not replays
+        # 2. URL tej domeny: clearance, bez FlareSolverr
+        basketball = 'https://www.forebet.com/en/basketball/predictions-today'
+        assert bypass.get_page(basketball) == PAGE and bypass.method_used == 'clearance'
+        assert replays == [(basketball, 'solved', UA)] and flaresolverr_calls == [URL]
+        # Challenge wrócił: unieważnienie, FlareSolverr, nowy clearance
+        replay_result[0] = (403, CHALLENGE)
+        assert bypass.get_page(URL) == PAGE and bypass.method_used == 'flaresolverr'
+        assert jar.invalidated == 1 and len(flaresolverr_calls) == 2 and jar.get(URL) is not None
+        assert (jar.replayed, jar.replay_hits, jar.harvested) == (2, 1, 2)
+    finally:
+        (cloudflare_bypass.clearance_jar, cloudflare_bypass.bypass_method_stats, cloudflare_bypass.IS_CI,
+         cloudflare_bypass.requests, cloudflare_bypass.check_flaresolverr_health) = originals
+        cloudflare_bypass.METHODS_AVAILABLE.clear()
+        cloudflare_bypass.METHODS_AVAILABLE.update(original_available)
+    print("  ✅ PASS")
+
+
+class _ClearanceHandler(BaseHTTPRequestHandler):
+    """Strona 'za Cloudflare': treść tylko z właściwym cf_clearance i User-Agent."""
+
+    def do_GET(self):
+        cookie = self.headers.get('Cookie', '')
+        passed = 'cf_clearance=good' in cookie and self.headers.get('User-Agent') == UA
+        body = (PAGE if passed else CHALLENGE).encode()
+        self.send_response(200 if passed else 403)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_replay_with_http_clients():
+    print("\n" + "=" * 60)
+    print("TEST 3: Odtwarzanie przez curl_cffi i httpx")
+    print("=" * 60)
+    server = HTTPServer(('127.0.0.1', 0), _ClearanceHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/en/football-tips"
+    original_jar = cloudflare_bypass.clearance_jar
+    original_available = dict(cloudflare_bypass.METHODS_AVAILABLE)
+    try:
+        bypass = cloudflare_bypass.CloudflareBypass(debug=False)
+        for client in ('curl_cffi', 'httpx'):
+            if not original_available.get(client):
+                print(f"  ⏭️ {client} niedostępny")
+                continue
+            cloudflare_bypass.METHODS_AVAILABLE.update({'curl_cffi': client == 'curl_cffi', 'httpx': True})
+            jar = ClearanceJar(path=None)
+            cloudflare_bypass.clearance_jar = jar
+            jar.harvest(url, {'cf_clearance': 'good'}, UA, 'undetected')
+            assert bypass._try_clearance(url, 10) == PAGE, client
+            jar.harvest(url, {'cf_clearance': 'expired-at-cloudflare'}, UA, 'undetected')
+            assert bypass._try_clearance(url, 10) is None and jar.get(url) is None, client
+            assert (jar.replayed, jar.replay_hits, jar.invalidated) == (2, 1, 1)
+    finally:
+        cloudflare_bypass.clearance_jar = original_jar
+        cloudflare_bypass.METHODS_AVAILABLE.clear()
+        cloudflare_bypass.METHODS_AVAILABLE.update(original_available)
+        server.shutdown()
+        server.server_close()
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_harvest_and_expiry()
+        test_get_page_replays_clearance()
+        test_replay_with_http_clients()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
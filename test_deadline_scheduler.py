@@ -0,0 +1,124 @@
+"""
+Test harmonogramu z terminem (deadline_scheduler).
+
+Sprawdza:
+1. Kolejność wg godziny rozpoczęcia i pomijanie rozpoczętych meczów
+2. Pomiar czasu na mecz, zrzucanie Gemini -> SofaScore -> forma (małe H2H) i przerwanie przed terminem
+3. Zrzucone etapy w kwalifikacji i FAZIE 2
+"""
+
+import sys
+from datetime import datetime
+
+import qualification
+from deadline_scheduler import DeadlineScheduler, order_by_kickoff, parse_deadline
+from phase2_pipeline import enrich_row
+from qualification import SHED, StagedQualifier, set_shed_stages
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_order_by_kickoff():
+    print("=" * 60)
+    print("TEST 1: Kolejność wg godziny rozpoczęcia")
+    print("=" * 60)
+    now = datetime(2025, 10, 5, 10, 30)
+    kickoffs = {'a': '18:00', 'b': '09:00', 'c': '10:45', 'd': '10:30'}
+    urls = ['a', 'x', 'b', 'c', 'd']
+    ordered, started = order_by_kickoff(urls, kickoffs, '2025-10-05', now=now)
+    assert ordered == ['c', 'a', 'x'] and started == ['b', 'd']
+    # Inny dzień - nic nie odpada, tylko sortowanie
+    ordered, started = order_by_kickoff(urls, kickoffs, '2025-10-06', now=now)
+    assert ordered == ['b', 'd', 'c', 'a', 'x'] and started == []
+
+    assert parse_deadline('11:00', now=now) == datetime(2025, 10, 5, 11, 0)
+    for bad in ('11', 'jutro', '25:00'):
+        try:
+            parse_deadline(bad, now=now)
+            assert False, bad
+        except ValueError:
+            pass
+    print("  ✅ PASS")
+
+
+def test_budget_sheds_and_stops():
+    print("\n" + "=" * 60)
+    print("TEST 2: Budżet czasu - zrzucanie pracy i przerwanie")
+    print("=" * 60)
+    clock = _Clock(datetime(2025, 10, 5, 10, 0).timestamp())
+    scheduler = DeadlineScheduler(datetime(2025, 10, 5, 11, 0), reserve_minutes=10, clock=clock)
+    try:
+        assert scheduler.time_left() == 50 * 60
+        scheduler.start_phase('phase1')
+        for qualified in (True, False, False, False):
+            clock.now += 10
+            scheduler.mark('phase1', qualified)
+        assert scheduler.latency['phase1'] == 10 and scheduler.qualify_rate() == 0.25
+
+        # 100 meczów x 10s + 25 kandydatów x 10s = 1250s < 2960s - bez zrzucania
+        assert scheduler.update(100) == []
+        # 250 meczów: 3125s / 2960s -> gemini
+        assert scheduler.update(250) == ['gemini']
+        # 300 meczów: 3750s -> presja 1.27 -> + sofascore
+        assert scheduler.update(300) == ['gemini', 'sofascore']
+        # Zrzucanie tylko narastająco
+        assert scheduler.update(10) == ['gemini', 'sofascore']
+        assert scheduler.update(400) == ['gemini', 'sofascore', 'advanced_form']
+        assert qualification._shed_stages == {'gemini', 'sofascore', 'advanced_form'}
+
+        assert not scheduler.should_stop('phase1')
+        clock.now = scheduler.deadline_ts - 5
+        assert scheduler.should_stop('phase1')
+        scheduler.note_stop('phase1', 7)
+        stats = scheduler.stats()
+        assert stats['stopped'] == {'phase1': 7} and stats['deadline'] == '11:00'
+        scheduler.print_report()
+    finally:
+        set_shed_stages(())
+    print("  ✅ PASS")
+
+
+def test_shed_stages_are_skipped():
+    print("\n" + "=" * 60)
+    print("TEST 3: Zrzucone etapy w kwalifikacji i FAZIE 2")
+    print("=" * 60)
+    try:
+        set_shed_stages({'gemini', 'advanced_form'})
+        low = StagedQualifier()
+        assert low.evaluate_h2h('A', 'B', 2, 2)
+        assert low.run_stage('advanced_form') is SHED and not low.run_stage('gemini')
+        assert low.run_stage('odds') and low.candidate
+        assert low.annotate({})['skipped_stages'] == 'advanced_form,gemini'
+
+        # Forma zrzucana tylko przy małej liczbie H2H
+        high = StagedQualifier()
+        assert high.evaluate_h2h('A', 'B', 5, 4)
+        assert high.run_stage('advanced_form') and not high.run_stage('gemini')
+
+        # FAZA 2: Gemini pominięte bez wywołania API
+        row = {'match_url': 'https://www.livesport.com/pl/mecz/pilka-nozna/x/', 'home_team': 'A',
+               'away_team': 'B'}
+        enrich_row(row, '2025-10-05', False, False, True, {'forebet': False, 'sofascore': False})
+        assert 'gemini_prediction' not in row
+    finally:
+        set_shed_stages(())
+    assert StagedQualifier().run_stage('gemini')
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_order_by_kickoff()
+        test_budget_sheds_and_stops()
+        test_shed_stages_are_skipped()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,141 @@
+"""
+Test cache snapshotów DOM (jeden sparsowany snapshot na URL per mecz).
+
+Sprawdza:
+1. Normalizacja kluczy (current_url vs URL zbudowany ręcznie)
+2. LRU + liczniki trafień/chybień, snapshoty per wątek (równoległe mecze)
+3. extract_advanced_team_form: max 1 dodatkowe ładowanie strony (u-siebie),
+   gdy driver jest już na zakładce H2H ogółem albo process_match zapisał jej snapshot
+"""
+
+import sys
+import threading
+
+from dom_snapshot_cache import DomSnapshotCache, snapshot_key, h2h_snapshot_cache
+
+
+def _row(home, away, sh, sa):
+    return (f'<a class="h2h__row"><span class="h2h__date">01.01.25</span>'
+            f'<span class="h2h__homeParticipant"><span class="h2h__participantInner">{home}</span></span>'
+            f'<span class="h2h__awayParticipant"><span class="h2h__participantInner">{away}</span></span>'
+            f'<span class="h2h__result"><span>{sh}</span><span>{sa}</span></span></a>')
+
+
+H2H_HTML = ('<html><body>'
+            '<div class="h2h__section">' + _row('Legia', 'X', 2, 0) + _row('Y', 'Legia', 1, 1) + '</div>'
+            '<div class="h2h__section">' + _row('Z', 'Lech', 0, 1) + _row('Lech', 'Q', 0, 3) + '</div>'
+            '</body></html>')
+
+
+class FakeDriver:
+    """Minimalny driver: liczy nawigacje, zwraca stały HTML H2H."""
+
+    def __init__(self, current_url):
+        self.current_url = current_url
+        self.page_source = H2H_HTML
+        self.gets = []
+
+    def get(self, url):
+        self.gets.append(url)
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        return 1
+
+
+def test_snapshot_key():
+    print("=" * 60)
+    print("TEST 1: Normalizacja kluczy")
+    print("=" * 60)
+    a = 'https://www.livesport.com/pl/mecz/pilka-nozna/a/b/h2h/ogolem/?mid=ABC'
+    b = 'https://www.livesport.com/pl/mecz/pilka-nozna/a/b/h2h/ogolem?mid=ABC&utm=1#x'
+    assert snapshot_key(a) == snapshot_key(b)
+    assert snapshot_key(a) != snapshot_key(a.replace('ogolem', 'u-siebie'))
+    assert snapshot_key(a) != snapshot_key(a.replace('ABC', 'DEF'))
+    print("  ✅ PASS")
+
+
+def test_lru_and_counters():
+    print("\n" + "=" * 60)
+    print("TEST 2: LRU + liczniki")
+    print("=" * 60)
+    cache = DomSnapshotCache(max_entries=2)
+    assert cache.get('http://x/1') is None
+    cache.put('http://x/1', 'one')
+    cache.put('http://x/2', 'two')
+    assert cache.get('http://x/1') == 'one'      # 1 staje się najnowszy
+    cache.put('http://x/3', 'three')             # wypiera 2
+    assert 'http://x/2' not in cache and 'http://x/1' in cache
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1, stats
+
+    # Równoległe mecze w wątkach (Playwright): begin_match innego wątku nie czyści naszych snapshotów
+    errors = []
+
+    def other_match(n):
+        try:
+            for i in range(200):
+                cache.begin_match()
+                cache.put(f'http://y/{n}/{i}', i)
+                assert cache.get(f'http://y/{n}/{i}') == i
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=other_match, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors and cache.get('http://x/1') == 'one' and len(cache) == 2
+    assert cache.stats()['hits'] == 2 + 800 and cache.stats()['matches'] == 800
+
+    cache.begin_match()
+    assert len(cache) == 0 and cache.stats()['hits'] == 802
+    print("  ✅ PASS")
+
+
+def test_advanced_form_page_loads():
+    print("\n" + "=" * 60)
+    print("TEST 3: Forma zaawansowana - ładowania stron")
+    print("=" * 60)
+    from livesport_h2h_scraper import extract_advanced_team_form
+
+    match_url = 'https://www.livesport.com/pl/mecz/pilka-nozna/legia/lech/?mid=ABC'
+    overall_url = 'https://www.livesport.com/pl/mecz/pilka-nozna/legia/lech/h2h/ogolem/?mid=ABC'
+    driver = FakeDriver(current_url=overall_url)  # process_match zostawił driver na zakładce H2H
+
+    h2h_snapshot_cache.begin_match()
+    hits_before = h2h_snapshot_cache.hits
+    result = extract_advanced_team_form(match_url, driver)
+
+    # Tylko /h2h/u-siebie/ wymaga nawigacji - ogółem i forma na wyjeździe z tego samego snapshotu
+    assert len(driver.gets) == 1 and '/h2h/u-siebie/' in driver.gets[0], driver.gets
+    assert h2h_snapshot_cache.hits - hits_before >= 1
+    assert result['home_form_overall'] == ['W', 'D'], result
+    assert result['away_form_overall'] == ['W', 'W'], result
+    assert result['away_form_away'] == ['W', 'W'], result  # perspektywa kolumny gościa (bez zmian)
+
+    # Snapshot H2H ogółem z process_match (parse_match_sections) - bez odczytu strony, driver gdzie indziej
+    from livesport_h2h_scraper import h2h_page_url
+    from section_parser import parse_match_sections
+    assert h2h_page_url(match_url.replace('/?mid', '/szczegoly/?mid')) == overall_url
+    h2h_snapshot_cache.begin_match()
+    h2h_snapshot_cache.put(h2h_page_url(match_url), parse_match_sections(H2H_HTML))
+    driver = FakeDriver(current_url='https://www.livesport.com/pl/mecz/inny/?mid=XYZ')
+    driver.page_source = '<html><body></body></html>'
+    again = extract_advanced_team_form(match_url, driver)
+    assert len(driver.gets) == 1 and '/h2h/u-siebie/' in driver.gets[0], driver.gets
+    assert again['home_form_overall'] == ['W', 'D'] and again['away_form_away'] == ['W', 'W'], again
+    print(f"  ✅ PASS: nawigacje={len(driver.gets)}, {h2h_snapshot_cache.stats()}")
+
+
+if __name__ == '__main__':
+    try:
+        test_snapshot_key()
+        test_lru_and_counters()
+        test_advanced_form_page_loads()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,130 @@
+"""
+Test puli przeglądarek (driver_pool).
+
+Sprawdza:
+1. Brak recyklingu poniżej progów (zamiast restartu co 80 meczów)
+2. Recykling po przekroczeniu limitu kart / nieudanym health check
+3. Podmiana na rozgrzany spare (z consent) zamiast zimnego startu
+4. Recykling wg RSS
+5. Zamknięcie puli zamyka spare i aktywny driver
+"""
+
+import sys
+import time
+
+import driver_pool
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    created = 0
+
+    def __init__(self):
+        FakeDriver.created += 1
+        self.id = FakeDriver.created
+        self.window_handles = ['main']
+        self.healthy = True
+        self.warmed = False
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _make_pool(**kwargs):
+    return DriverPool(factory=FakeDriver,
+                      warmup=lambda d: setattr(d, 'warmed', True),
+                      health_check=lambda d: d.healthy and not d.quit_called,
+                      **kwargs)
+
+
+def test_no_recycle_below_thresholds():
+    print("=" * 60)
+    print("TEST 1: Brak recyklingu poniżej progów")
+    print("=" * 60)
+    pool = _make_pool(check_every=1, warm_spare=False)
+    first = pool.driver
+    original = driver_pool.driver_rss_mb
+    driver_pool.driver_rss_mb = lambda d: 300.0
+    try:
+        for _ in range(200):
+            assert pool.after_match() is first
+    finally:
+        driver_pool.driver_rss_mb = original
+    assert pool.stats['recycles'] == 0
+    pool.close()
+    print("  ✅ PASS: 200 meczów bez restartu")
+
+
+def test_recycle_on_tabs_and_health_uses_warm_spare():
+    print("\n" + "=" * 60)
+    print("TEST 2: Recykling (karty / health) -> rozgrzany spare")
+    print("=" * 60)
+    pool = _make_pool(check_every=1, max_tabs=3)
+    first = pool.driver
+    pool._spare_thread.join(timeout=5)
+
+    first.window_handles = ['a', 'b', 'c', 'd']  # wyciek kart (popupy)
+    start = time.time()
+    second = pool.after_match()
+    assert second is not first and second.warmed, "spare powinien być rozgrzany"
+    assert (time.time() - start) < 0.5
+    assert pool.stats['reasons'] == {'tabs': 1} and pool.stats['cold_starts'] == 1
+
+    pool._spare_thread.join(timeout=5)
+    second.healthy = False
+    third = pool.after_match()
+    assert third is not second and third.warmed
+    assert pool.stats['reasons'] == {'tabs': 1, 'health': 1}
+
+    time.sleep(0.1)  # stary driver zamykany w tle
+    assert first.quit_called and second.quit_called
+    pool.close()
+    print(f"  ✅ PASS: {pool.stats['reasons']}")
+
+
+def test_recycle_on_rss():
+    print("\n" + "=" * 60)
+    print("TEST 3: Recykling wg RSS")
+    print("=" * 60)
+    pool = _make_pool(check_every=2, max_rss_mb=1000, warm_spare=False)
+    first = pool.driver
+    original = driver_pool.driver_rss_mb
+    driver_pool.driver_rss_mb = lambda d: 1200.0 if d is first else 400.0
+    try:
+        assert pool.after_match() is first        # mecz 1 - pomiar co 2 mecze
+        second = pool.after_match()               # mecz 2 - RSS > limit
+        assert second is not first
+        assert pool.stats['reasons'] == {'rss': 1}
+        assert pool.stats['cold_starts'] == 2     # bez spare -> zimny start
+    finally:
+        driver_pool.driver_rss_mb = original
+        pool.close()
+    print("  ✅ PASS")
+
+
+def test_close_releases_all():
+    print("\n" + "=" * 60)
+    print("TEST 4: Zamknięcie puli")
+    print("=" * 60)
+    adopted = FakeDriver()
+    pool = _make_pool(driver=adopted)
+    pool._spare_thread.join(timeout=5)
+    spare = pool._spare
+    assert pool.driver is adopted and spare is not None
+    pool.close()
+    assert adopted.quit_called and spare.quit_called
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_no_recycle_below_thresholds()
+        test_recycle_on_tabs_and_health_uses_warm_spare()
+        test_recycle_on_rss()
+        test_close_releases_all()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
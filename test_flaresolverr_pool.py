@@ -0,0 +1,253 @@
+"""
+Test puli sesji FlareSolverr (flaresolverr_pool) na lokalnym fałszywym FlareSolverr.
+
+Sprawdza:
+1. Jedna sesja na wiele pobrań (sporty x daty), limit sesji przy równoległych pobraniach, close()
+2. Health check (restart FlareSolverr -> nowa sesja), eksmisja bezczynnych, błąd -> sesja zniszczona
+3. CloudflareBypass._try_flaresolverr_with_session: sesja z puli zamiast create/destroy na każde pobranie
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cloudflare_bypass
+from clearance_jar import ClearanceJar
+from flaresolverr_pool import FlareSolverrSessionPool
+
+PAGE = '<html><body><div class="schema">' + '<div class="rcnt">Legia vs Lech</div>' * 60 + '</div></body></html>'
+UA = 'Mozilla/5.0 (X11; Linux x86_64) Chrome/131.0.0.0'
+
+
+class FakeFlareSolverr:
+    """Minimalny FlareSolverr: /health oraz /v1 z sessions.create/list/destroy i request.get."""
+
+    def __init__(self, request_delay: float = 0.0):
+        self.sessions = set()
+        self.commands = []
+        self.max_sessions = 0
+        self.request_delay = request_delay
+        self.response = PAGE
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self._reply({'status': 'ok', 'msg': 'FlareSolverr is ready!'})
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                self._reply(stub.handle(payload))
+
+            def _reply(self, data):
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, payload):
+        cmd, session = payload['cmd'], payload.get('session')
+        with self.lock:
+            self.commands.append(cmd)
+            if cmd == 'sessions.create':
+                self.sessions.add(session)
+                self.max_sessions = max(self.max_sessions, len(self.sessions))
+                return {'status': 'ok', 'session': session}
+            if cmd == 'sessions.list':
+                return {'status': 'ok', 'sessions': sorted(self.sessions)}
+            if cmd == 'sessions.destroy':
+                if session not in self.sessions:
+                    return {'status': 'error', 'message': 'This session does not exist.'}
+                self.sessions.discard(session)
+                return {'status': 'ok'}
+            if session and session not in self.sessions:
+                return {'status': 'error', 'message': 'This session does not exist.'}
+        time.sleep(self.request_delay)
+        return {'status': 'ok', 'solution': {'url': payload['url'], 'status': 200, 'response': self.response,
+                                             'userAgent': UA,
+                                             'cookies': [{'name': 'cf_clearance', 'value': 'ok', 'expires': -1}]}}
+
+    def count(self, cmd):
+        return self.commands.count(cmd)
+
+    def restart(self):
+        with self.lock:
+            self.sessions.clear()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_sessions_are_reused():
+    print("=" * 60)
+    print("TEST 1: Ponowne użycie sesji i limit puli")
+    print("=" * 60)
+    stub = FakeFlareSolverr(request_delay=0.05)
+    try:
+        pool = FlareSolverrSessionPool(url=stub.url, size=2)
+        for sport in ('football', 'basketball', 'volleyball'):
+            for date in ('2031-05-05', '2031-05-06'):
+                with pool.session() as session_id:
+                    solution = pool.request(session_id, f"https://www.forebet.com/en/{sport}/{date}")
+                    assert solution['response'] == PAGE
+        assert stub.count('sessions.create') == 1 and stub.count('request.get') == 6
+        assert pool.stats()['reused'] == 5
+
+        # 6 wątków, pula 2: nigdy więcej niż 2 sesje
+        errors = []
+
+        def fetch():
+            try:
+                with pool.session() as session_id:
+                    pool.request(session_id, 'https://www.forebet.com/en/hockey')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=fetch) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors and stub.max_sessions == 2 and stub.count('sessions.create') == 2
+        assert pool.stats()['idle'] == 2
+
+        pool.close()
+        assert not stub.sessions and stub.count('sessions.destroy') == 2
+    finally:
+        stub.stop()
+    print("  ✅ PASS")
+
+
+def test_health_eviction_and_errors():
+    print("\n" + "=" * 60)
+    print("TEST 2: Health check, eksmisja, błąd sesji")
+    print("=" * 60)
+    stub = FakeFlareSolverr()
+    now = [1_000.0]
+    try:
+        pool = FlareSolverrSessionPool(url=stub.url, size=2, idle_timeout=600, health_interval=60,
+                                       clock=lambda: now[0])
+        first = pool.acquire()
+        pool.release(first)
+
+        # FlareSolverr zrestartowany: po health_interval sesja szukana w sessions.list -> nowa
+        stub.restart()
+        now[0] += 120
+        second = pool.acquire()
+        assert second != first and second in stub.sessions and pool.replaced == 1
+        assert pool.request(second, 'https://www.forebet.com/')['status'] == 200
+        pool.release(second)
+
+        # Eksmisja po idle_timeout
+        now[0] += 601
+        third = pool.acquire()
+        assert third != second and second not in stub.sessions and pool.evicted == 1
+        pool.release(third)
+
+        # Błąd w bloku (np. restart bez health checku) - sesja niszczona, następna nowa
+        stub.restart()
+        try:
+            with pool.session() as session_id:
+                pool.request(session_id, 'https://www.forebet.com/')
+            assert False, 'request w nieistniejącej sesji powinien rzucić wyjątek'
+        except Exception as e:
+            assert 'does not exist' in str(e)
+        assert pool.stats()['idle'] == 0
+        with pool.session() as session_id:
+            assert pool.request(session_id, 'https://www.forebet.com/')['response'] == PAGE
+
+        # FLARESOLVERR_POOL=0: sesja niszczona po każdym użyciu
+        os.environ['FLARESOLVERR_POOL'] = '0'
+        try:
+            destroyed = stub.count('sessions.destroy')
+            with pool.session() as session_id:
+                pass
+            assert stub.count('sessions.destroy') == destroyed + 1 and pool.stats()['idle'] == 0
+        finally:
+            del os.environ['FLARESOLVERR_POOL']
+
+        # Pełna pula: acquire czeka na zwolnienie, potem limit czasu
+        a = pool.acquire()
+        pool.acquire()
+        timer = threading.Timer(0.2, pool.release, args=(a,))
+        timer.start()
+        assert pool.acquire(timeout=5) == a
+        try:
+            pool.acquire(timeout=0)
+            assert False, 'pełna pula powinna rzucić TimeoutError'
+        except TimeoutError:
+            pass
+        pool.close()
+    finally:
+        stub.stop()
+    print("  ✅ PASS")
+
+
+def test_bypass_uses_pool():
+    print("\n" + "=" * 60)
+    print("TEST 3: CloudflareBypass - sesja z puli")
+    print("=" * 60)
+    stub = FakeFlareSolverr()
+    originals = (cloudflare_bypass.flaresolverr_pool, cloudflare_bypass.FLARESOLVERR_URL,
+                 cloudflare_bypass.clearance_jar, cloudflare_bypass.time,
+                 dict(cloudflare_bypass._flaresolverr_health_cache))
+    try:
+        pool = FlareSolverrSessionPool(url=stub.url, size=1)
+        cloudflare_bypass.flaresolverr_pool = pool
+        cloudflare_bypass.FLARESOLVERR_URL = stub.url
+        cloudflare_bypass.clearance_jar = jar = ClearanceJar(path=None)
+        cloudflare_bypass._flaresolverr_health_cache.update({'last_check': 0, 'is_healthy': None})
+        bypass = cloudflare_bypass.CloudflareBypass(debug=False)
+        for sport in ('football', 'basketball', 'volleyball', 'handball'):
+            html = bypass._try_flaresolverr_with_session(f"https://www.forebet.com/en/{sport}", 30)
+            assert html == PAGE
+        assert stub.count('sessions.create') == 1 and stub.count('sessions.destroy') == 0
+        assert stub.count('request.get') == 4 and pool.stats()['idle'] == 1
+        assert jar.get('https://www.forebet.com/').cookies == {'cf_clearance': 'ok'}
+
+        # Sesja zniknęła (restart) - błąd, sesja wyrzucona z puli, kolejne pobranie na nowej
+        stub.restart()
+        assert bypass._try_flaresolverr_with_session('https://www.forebet.com/en/tennis', 30) is None
+        assert bypass._try_flaresolverr_with_session('https://www.forebet.com/en/tennis', 30) == PAGE
+        assert stub.count('sessions.create') == 2
+
+        # Odpowiedź bez treści Forebet (challenge do końca prób) - sesja nie wraca do puli
+        cloudflare_bypass.time = types.SimpleNamespace(sleep=lambda seconds: None, time=time.time)
+        stub.response = '<html><body><div class="lds-ring"></div>Just a moment...</body></html>'
+        destroyed = stub.count('sessions.destroy')
+        assert bypass._try_flaresolverr_with_session('https://www.forebet.com/en/hockey', 30) is None
+        assert stub.count('request.get') == 9 and stub.count('sessions.destroy') == destroyed + 1
+        assert pool.stats()['idle'] == 0
+        pool.close()
+    finally:
+        (cloudflare_bypass.flaresolverr_pool, cloudflare_bypass.FLARESOLVERR_URL,
+         cloudflare_bypass.clearance_jar, cloudflare_bypass.time, health) = originals
+        cloudflare_bypass._flaresolverr_health_cache.update(health)
+        stub.stop()
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_sessions_are_reused()
+        test_health_eviction_and_errors()
+        test_bypass_uses_pool()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
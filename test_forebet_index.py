@@ -0,0 +1,152 @@
+"""
+Test indeksu predykcji Forebet (forebet_index).
+
+Sprawdza:
+1. Jednorazowe parsowanie strony: nazwy drużyn i pola predykcji (1X2, %, wynik, O/U, BTTS, średnia goli)
+2. Lookup z shortlisty trigramów daje ten sam wynik co pełny skan strony, porównując tylko kandydatów
+3. search_forebet_prediction korzysta z indeksu (strona z cache, bez pobierania) + lookup_many
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import forebet_index
+import forebet_scraper
+from forebet_index import ForebetIndex, get_index, is_match
+from forebet_page_cache import ForebetPageCache
+from team_alias_store import TeamAliasStore
+from forebet_scraper import normalize_team_name, similarity_score
+
+CITIES = ['Warszawa', 'Krakow', 'Gdansk', 'Poznan', 'Lodz', 'Lublin', 'Szczecin', 'Bydgoszcz', 'Opole',
+          'Kielce', 'Rzeszow', 'Olsztyn', 'Torun', 'Radom', 'Plock', 'Tychy', 'Zabrze', 'Gliwice',
+          'Sosnowiec', 'Chorzow']
+NAMES = ['Polonia', 'Wisla', 'Lechia', 'Warta', 'Widzew', 'Motor', 'Pogon', 'Zawisza', 'Odra', 'Korona',
+         'Stal', 'Stomil', 'Elana', 'Broń', 'Wisła', 'GKS', 'Górnik', 'Piast', 'Zagłębie', 'Ruch']
+TEAMS = [f"{NAMES[i % 20]} {CITIES[(i * 7) % 20]}" for i in range(120)]
+
+
+def _row_html(i, home, away):
+    probs = (45 + i % 20, 25, 30 - i % 20)
+    return (f'<div class="rcnt tr_{i % 2}"><div class="tnms"><span class="homeTeam">'
+            f'<span itemprop="name">{home}</span></span><span class="awayTeam">'
+            f'<span itemprop="name">{away}</span></span></div>'
+            f'<div class="fprc">' + ''.join(f'<span>{p}</span>' for p in probs) + '</div>'
+            f'<div class="predict"><span class="forepr">1</span></div>'
+            f'<div class="ex_sc">{i % 3}<br>{(i + 1) % 2}</div><div class="avg_sc">{2 + (i % 4) * 0.4:.2f}</div></div>')
+
+
+PAGE = ('<html><body><div class="schema">' +
+        ''.join(_row_html(i, TEAMS[2 * i], TEAMS[2 * i + 1]) for i in range(60)) + '</div></body></html>')
+
+
+def _full_scan(index, home_team, away_team):
+    """Referencja: pełny skan jak dawniej w search_forebet_prediction."""
+    best, best_combined = None, 0.0
+    for row in index.rows:
+        home_score = similarity_score(home_team, row.home)
+        away_score = similarity_score(away_team, row.away)
+        combined = (home_score + away_score) / 2
+        if is_match(home_score, away_score) and combined > best_combined:
+            best, best_combined = row, combined
+    return best
+
+
+def test_parse_once():
+    print("=" * 60)
+    print("TEST 1: Parsowanie strony do indeksu")
+    print("=" * 60)
+    index = ForebetIndex.build(PAGE, 'football', normalize_team_name, similarity_score)
+    assert len(index.rows) == 60 and index.variant == 'div.rcnt' and not index.blocked
+    row = index.rows[5]
+    assert (row.home, row.away) == (TEAMS[10], TEAMS[11])
+    assert row.home_norm == normalize_team_name(TEAMS[10])
+    assert row.prediction == '1' and row.probability == 50.0
+    assert row.exact_score == '2-0' and row.btts == 'No'
+    assert row.avg_goals == 2.4 and row.over_under == 'Under 2.5'
+    assert index.rows[7].over_under == 'Over 2.5' and index.rows[4].btts == 'Yes'
+    assert set(row.fields()) == {'prediction', 'probability', 'exact_score', 'over_under', 'btts', 'avg_goals'}
+
+    # Koszykówka (2-way): brak O/U i BTTS
+    two_way = ('<div class="rcnt"><span class="homeTeam">Lakers</span><span class="awayTeam">Celtics</span>'
+               '<div class="fprc"><span>40</span><span>60</span></div><div class="avg_sc">212.5</div></div>')
+    basketball = ForebetIndex.build(two_way, 'basketball', normalize_team_name, similarity_score)
+    assert basketball.rows[0].fields() == {'prediction': '2', 'probability': 60.0, 'avg_goals': 212.5}
+
+    blocked = ForebetIndex.build('<html><body>Cloudflare - checking your browser</body></html>', 'football',
+                                 normalize_team_name, similarity_score)
+    assert blocked.blocked and not blocked.rows
+    print("  ✅ PASS")
+
+
+def test_lookup_matches_full_scan():
+    print("\n" + "=" * 60)
+    print("TEST 2: Lookup z shortlisty = pełny skan")
+    print("=" * 60)
+    index = ForebetIndex.build(PAGE, 'football', normalize_team_name, similarity_score)
+    queries = [(TEAMS[2 * i], TEAMS[2 * i + 1]) for i in range(0, 60, 3)]
+    queries += [('KS ' + TEAMS[20], TEAMS[21] + ' FC'), (TEAMS[40].upper(), TEAMS[41].lower()),
+                ('Nieistniejący Klub', 'Inna Drużyna'), (TEAMS[2], 'Ktokolwiek')]
+    for home_team, away_team in queries:
+        hit = index.lookup(home_team, away_team)
+        assert hit.row == _full_scan(index, home_team, away_team), (home_team, away_team)
+    assert index.lookup(TEAMS[30], TEAMS[31]).row.home == TEAMS[30]
+    assert index.lookup('Nieistniejący Klub', 'Inna Drużyna').row is None
+    # Shortlista: porównywany jest ułamek strony
+    assert index.compared < index.lookups * len(index.rows) / 2
+
+    started = time.perf_counter()
+    hits = index.lookup_many(queries * 10)
+    per_lookup = (time.perf_counter() - started) / len(hits)
+    print(f"  ⏱️ lookup: {per_lookup * 1e6:.0f} µs/mecz ({index.compared / index.lookups:.1f} kandydatów)")
+    assert [hit.row for hit in hits[:len(queries)]] == [index.lookup(h, a).row for h, a in queries]
+    assert index.find_exact(TEAMS[30].lower(), TEAMS[31].upper()).home == TEAMS[30]
+    print("  ✅ PASS")
+
+
+def test_search_uses_index():
+    print("\n" + "=" * 60)
+    print("TEST 3: search_forebet_prediction z indeksem strony")
+    print("=" * 60)
+    original_cache, original_aliases = forebet_scraper.forebet_page_cache, forebet_scraper.team_alias_store
+    cwd = os.getcwd()
+    directory = tempfile.mkdtemp(prefix='forebet_index_test_')
+    forebet_index.clear_indexes()
+    try:
+        os.chdir(directory)
+        forebet_scraper.forebet_page_cache = ForebetPageCache(None)
+        forebet_scraper.team_alias_store = TeamAliasStore(path=os.path.join(directory, 'aliases.sqlite'))
+        forebet_scraper.forebet_page_cache.put('football', '2031-05-05', PAGE)
+
+        result = forebet_scraper.search_forebet_prediction(TEAMS[10], TEAMS[11], '2031-05-05', use_xvfb=False)
+        assert result['success'] and result['home_team_forebet'] == TEAMS[10]
+        assert (result['prediction'], result['probability'], result['exact_score']) == ('1', 50.0, '2-0')
+        assert (result['over_under'], result['btts'], result['avg_goals']) == ('Under 2.5', 'No', 2.4)
+
+        index, built = get_index('football', '2031-05-05',
+                                 forebet_scraper.forebet_page_cache.get('football', '2031-05-05').html,
+                                 normalize_team_name, similarity_score)
+        assert not built and index.lookups == 1
+        forebet_scraper.search_forebet_prediction(TEAMS[12], TEAMS[13], '2031-05-05', use_xvfb=False)
+        assert index.lookups == 2
+    finally:
+        os.chdir(cwd)
+        forebet_scraper.team_alias_store.close()
+        forebet_scraper.forebet_page_cache, forebet_scraper.team_alias_store = original_cache, original_aliases
+        forebet_index.clear_indexes()
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_parse_once()
+        test_lookup_matches_full_scan()
+        test_search_uses_index()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,145 @@
+"""
+Test trwałego cache stron Forebet (forebet_page_cache).
+
+Sprawdza:
+1. Zapis skompresowany na dysk i odczyt przez inny proces (nowa instancja)
+2. Pamięć trzyma tylko zwarte wiersze meczów (bez soup), TTL i wyłączony SWR
+3. Stale-while-revalidate: przeterminowana strona od razu + jedno odświeżenie w tle
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+import forebet_page_cache
+from forebet_page_cache import ForebetPageCache, compact_listing
+
+ROWS = ''.join(
+    f'<div class="rcnt tr_{i % 2}"><span class="homeTeam"><span itemprop="name">Home {i}</span></span>'
+    f'<span class="awayTeam"><span itemprop="name">Away {i}</span></span>'
+    f'<div class="fprc"><span>50</span><span>30</span><span>20</span></div></div>'
+    for i in range(40))
+PAGE = ('<html><head><title>Football predictions</title><script>' + 'var x = 1;' * 2000 +
+        '</script></head><body><nav>' + '<a href="/en/x">menu</a>' * 300 + '</nav>' +
+        f'<div class="schema">{ROWS}</div><footer>' + 'forebet ' * 1000 + '</footer></body></html>')
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_disk_shared_between_processes():
+    print("=" * 60)
+    print("TEST 1: Skompresowany zapis na dysk współdzielony między procesami")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='forebet_cache_test_')
+    try:
+        clock = _Clock(1_700_000_000.0)
+        writer = ForebetPageCache(directory, ttl=3600, clock=clock)
+        assert writer.get('Football', '2025-10-05') is None
+        writer.put('Football', '2025-10-05', PAGE)
+        files = [f for f in os.listdir(directory) if not f.startswith('.')]
+        assert len(files) == 1 and files[0].startswith('football_2025-10-05.html.')
+        assert os.path.getsize(os.path.join(directory, files[0])) * 5 < len(PAGE.encode('utf-8'))
+
+        # "Inny proces" - pusta pamięć, strona z dysku z wiekiem wg czasu pobrania
+        clock.now += 120
+        reader = ForebetPageCache(directory, ttl=3600, clock=clock)
+        page = reader.get('football', '2025-10-05')
+        assert page and page.source == 'disk' and not page.stale and page.age == 120
+        assert page.html.count('class="rcnt') == 40 and 'Home 39' in page.html
+        assert reader.get('football', '2025-10-05').source == 'memory'
+        assert reader.get('football', '2025-10-06') is None
+        assert reader.stats()['disk'] == 1 and reader.stats()['memory'] == 1
+
+        reader.invalidate('football', '2025-10-05')
+        assert ForebetPageCache(directory, clock=clock).get('football', '2025-10-05') is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_compact_memory_and_ttl():
+    print("\n" + "=" * 60)
+    print("TEST 2: Zwarty wynik w pamięci, TTL bez SWR")
+    print("=" * 60)
+    compact = compact_listing(PAGE)
+    assert len(compact) < len(PAGE) / 3
+    assert 'var x' not in compact and compact.count('class="fprc"') == 40
+    # Strona bez div.rcnt zostaje w całości (inne warianty parsowania)
+    other = '<table><tr class="tr_0"><td>A</td></tr></table>'
+    assert compact_listing(other) == other
+
+    clock = _Clock(1_700_000_000.0)
+    cache = ForebetPageCache(None, ttl=60, stale_while_revalidate=False, clock=clock)
+    cache.put('basketball', '2025-10-05', PAGE)
+    html, fetched_at = cache._memory['basketball_2025-10-05']
+    assert isinstance(html, str) and html == compact and fetched_at == clock.now
+    clock.now += 59
+    assert cache.get('basketball', '2025-10-05').html == compact
+    clock.now += 2
+    assert cache.get('basketball', '2025-10-05') is None and not cache._memory
+    print("  ✅ PASS")
+
+
+def test_stale_while_revalidate():
+    print("\n" + "=" * 60)
+    print("TEST 3: Stale-while-revalidate - odświeżenie w tle")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='forebet_cache_test_')
+    try:
+        clock = _Clock(1_700_000_000.0)
+        cache = ForebetPageCache(directory, ttl=60, stale_while_revalidate=True, max_stale=600, clock=clock)
+        cache.put('hockey', '2025-10-05', PAGE)
+        clock.now += 300
+
+        release = threading.Event()
+        calls = []
+
+        def revalidate():
+            calls.append(threading.current_thread().name)
+            release.wait(5)
+            cache.put('hockey', '2025-10-05', PAGE.replace('Home 0<', 'Home NEW<'))
+            return True
+
+        page = cache.get('hockey', '2025-10-05', revalidate=revalidate)
+        assert page and page.stale and page.age == 300 and 'Home NEW' not in page.html
+        # Drugie wywołanie w trakcie odświeżania nie uruchamia kolejnego
+        assert cache.get('hockey', '2025-10-05', revalidate=revalidate).stale
+        assert any(f.endswith('.lock') for f in os.listdir(directory))
+        release.set()
+        cache.wait_for_revalidation()
+        assert len(calls) == 1 and calls[0].startswith('forebet-revalidate-')
+
+        page = cache.get('hockey', '2025-10-05', revalidate=revalidate)
+        assert not page.stale and 'Home NEW' in page.html
+        assert not any(f.endswith('.lock') for f in os.listdir(directory))
+        assert cache.stats()['revalidated'] == 1 and cache.stats()['stale'] == 2
+
+        # Starsza niż max_stale - brak (pobierz synchronicznie)
+        clock.now += 601
+        assert cache.get('hockey', '2025-10-05', revalidate=revalidate) is None
+        assert len(calls) == 1
+        cache.print_report()
+        forebet_page_cache.print_forebet_page_cache_report()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_disk_shared_between_processes()
+        test_compact_memory_and_ttl()
+        test_stale_while_revalidate()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
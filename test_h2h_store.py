@@ -0,0 +1,174 @@
+"""
+Test historii H2H (h2h_store).
+
+Sprawdza:
+1. Nieuporządkowany klucz pary (A-B = B-A) i dopisywanie tylko nowszych spotkań
+2. Parser kończy na znanym spotkaniu (reszta z magazynu); pusta strona -> magazyn tylko na życzenie
+3. Analityka offline (stats / pair / export)
+"""
+
+import csv
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+from bs4 import BeautifulSoup
+
+import h2h_store
+from h2h_store import H2HStore, date_to_iso, h2h_known_until, sync_h2h_history
+
+
+def _meeting(date, home_goals, away_goals, home='Legia Warszawa', away='Lech Poznań'):
+    winner = 'home' if home_goals > away_goals else 'away' if away_goals > home_goals else 'draw'
+    return {'date': date, 'home': home, 'away': away, 'score': f"{home_goals}-{away_goals}", 'winner': winner}
+
+
+FIRST_RUN = [_meeting('12.03.24', 2, 1), _meeting('05.11.23', 0, 0, 'Lech Poznań', 'Legia Warszawa'),
+             _meeting('20.05.23', 1, 3)]
+SECOND_RUN = [_meeting('04.10.25', 1, 0), _meeting('18.04.25', 2, 2)] + FIRST_RUN[:3]
+
+
+def test_incremental_sync():
+    print("=" * 60)
+    print("TEST 1: Dopisywanie tylko nowszych spotkań")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='h2h_store_test_')
+    try:
+        assert date_to_iso('12.03.24') == '2024-03-12' and date_to_iso('1.2.1999') == '1999-02-01'
+        assert date_to_iso('wczoraj') == ''
+        store = H2HStore(path=os.path.join(directory, 'h2h.sqlite'))
+        assert store.add_new_meetings('football', 'Legia Warszawa', 'Lech Poznań', FIRST_RUN) == 3
+        assert store.latest_date('football', 'LEGIA WARSZAWA', 'Lech Poznan') == '2024-03-12'
+        # Kolejny dzień / tryb GOŚCIE - te same spotkania, nic nowego
+        assert store.add_new_meetings('football', 'Legia Warszawa', 'Lech Poznań', FIRST_RUN) == 0
+        assert store.add_new_meetings('football', 'Legia Warszawa', 'Lech Poznań', SECOND_RUN) == 2
+        meetings = store.meetings('football', 'Legia Warszawa', 'Lech Poznań')
+        assert [m['date_iso'] for m in meetings] == ['2025-10-04', '2025-04-18', '2024-03-12', '2023-11-05',
+                                                     '2023-05-20']
+        # B-A to ta sama historia: bez ponownego zapisu, spotkania z własnymi gospodarzami
+        assert store.add_new_meetings('football', 'Lech Poznań', 'Legia Warszawa', SECOND_RUN) == 0
+        assert store.meetings('football', 'Lech Poznań', 'Legia Warszawa') == meetings
+        assert meetings[3]['home'] == 'Lech Poznań' and meetings[3]['score'] == '0-0'
+        assert store.stats() == {'football': {'meetings': 5, 'pairs': 1}}
+        # Inny sport to osobny klucz
+        assert store.meetings('hockey', 'Legia Warszawa', 'Lech Poznań') == []
+        store.close()
+
+        # Baza ze starym, uporządkowanym kluczem - kierunek B-A scalany przy połączeniu
+        old_db = os.path.join(directory, 'old.sqlite')
+        conn = sqlite3.connect(old_db)
+        conn.execute("CREATE TABLE meetings (sport TEXT, home_key TEXT, away_key TEXT, date TEXT, date_iso TEXT,"
+                     " home TEXT, away TEXT, score TEXT, winner TEXT,"
+                     " PRIMARY KEY (sport, home_key, away_key, date_iso, home, away))")
+        conn.executemany("INSERT INTO meetings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [
+            ('football', 'legia warszawa', 'lech poznan', '12.03.24', '2024-03-12', 'Legia Warszawa',
+             'Lech Poznań', '2-1', 'home'),
+            ('football', 'lech poznan', 'legia warszawa', '12.03.24', '2024-03-12', 'Legia Warszawa',
+             'Lech Poznań', '2-1', 'home')])
+        conn.commit()
+        conn.close()
+        old = H2HStore(path=old_db)
+        assert old.stats() == {'football': {'meetings': 1, 'pairs': 1}}
+        assert old.latest_date('football', 'Legia Warszawa', 'Lech Poznań') == '2024-03-12'
+        old.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def _h2h_page(meetings):
+    rows = ''.join(
+        f'<a class="h2h__row"><span class="h2h__date">{m["date"]}</span>'
+        f'<span class="h2h__homeParticipant"><span class="h2h__participantInner">{m["home"]}</span></span>'
+        f'<span class="h2h__awayParticipant"><span class="h2h__participantInner">{m["away"]}</span></span>'
+        f'<span class="h2h__result"><span>{m["score"].split("-")[0]}</span><span>{m["score"].split("-")[1]}</span>'
+        f'</span></a>' for m in meetings)
+    return BeautifulSoup(f'<div class="h2h__section">Pojedynki bezpośrednie {rows}</div>', 'html.parser')
+
+
+def test_parser_stops_at_known_meeting():
+    print("\n" + "=" * 60)
+    print("TEST 2: Parser kończy na znanym spotkaniu, magazyn tylko na życzenie")
+    print("=" * 60)
+    from livesport_h2h_scraper import parse_h2h_from_soup
+
+    directory = tempfile.mkdtemp(prefix='h2h_store_test_')
+    original = h2h_store.h2h_store
+    h2h_store.h2h_store = H2HStore(path=os.path.join(directory, 'h2h.sqlite'))
+    try:
+        assert h2h_known_until('football', 'Legia Warszawa', 'Lech Poznań') == ''
+        first = parse_h2h_from_soup(_h2h_page(FIRST_RUN), 'Legia Warszawa')
+        assert sync_h2h_history('football', 'Legia Warszawa', 'Lech Poznań', first) == first
+
+        # Kolejny dzień, tryb GOŚCIE (B-A): dwa nowe spotkania, parser kończy na 12.03.24
+        known = h2h_known_until('football', 'Lech Poznań', 'Legia Warszawa')
+        assert known == '2024-03-12'
+        parsed = parse_h2h_from_soup(_h2h_page(SECOND_RUN), 'Lech Poznań', known_until=known)
+        assert [m['date'] for m in parsed] == ['04.10.25', '18.04.25', '12.03.24']
+        assert parsed[-1] == {'date': '12.03.24', 'known': True}
+        h2h = sync_h2h_history('football', 'Lech Poznań', 'Legia Warszawa', parsed)
+        assert [m['date'] for m in h2h] == [m['date'] for m in SECOND_RUN]
+        assert [m.get('source') for m in h2h] == [None, None, 'h2h_store', 'h2h_store', 'h2h_store']
+        assert h2h[2]['home'] == 'Legia Warszawa' and h2h[2]['winner'] == 'home'
+        assert h2h_store.h2h_store.early_stops == 1 and h2h_store.h2h_store.inserted == 5
+
+        # Pusta sekcja H2H (nieudane ładowanie) nie kwalifikuje meczu z magazynu...
+        assert sync_h2h_history('football', 'Legia Warszawa', 'Lech Poznań', []) == []
+        assert h2h_store.h2h_store.fallbacks == 0
+        # ...chyba że włączono H2H_STORE_FALLBACK=1 - wtedy wiersze oznaczone jako z magazynu
+        os.environ['H2H_STORE_FALLBACK'] = '1'
+        try:
+            stored = sync_h2h_history('football', 'Legia Warszawa', 'Lech Poznań', [])
+        finally:
+            del os.environ['H2H_STORE_FALLBACK']
+        assert len(stored) == 5 and stored[0]['score'] == '1-0'
+        assert set(stored[0]) == {'date', 'home', 'away', 'score', 'winner', 'raw', 'source'}
+        assert all(m['source'] == 'h2h_store' for m in stored) and h2h_store.h2h_store.fallbacks == 1
+        assert sync_h2h_history('football', 'Nieznani', 'Lech Poznań', [], use_stored=True) == []
+        assert sync_h2h_history('football', '', 'Lech Poznań', [], use_stored=True) == []
+    finally:
+        h2h_store.h2h_store.close()
+        h2h_store.h2h_store = original
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_offline_analytics():
+    print("\n" + "=" * 60)
+    print("TEST 3: Analityka offline (CLI)")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='h2h_store_test_')
+    db = os.path.join(directory, 'h2h.sqlite')
+    try:
+        store = H2HStore(path=db)
+        store.add_new_meetings('football', 'Legia Warszawa', 'Lech Poznań', SECOND_RUN)
+        store.add_new_meetings('tennis', 'Hurkacz H.', 'Sinner J.', [_meeting('01.09.25', 2, 0, 'Hurkacz H.', 'Sinner J.')])
+        assert store.stats() == {'football': {'meetings': 5, 'pairs': 1}, 'tennis': {'meetings': 1, 'pairs': 1}}
+        assert store.pairs()[0]['meetings'] == 5
+        store.close()
+
+        output = os.path.join(directory, 'export.csv')
+        assert h2h_store.main(['--db', db, 'stats']) == 0
+        assert h2h_store.main(['--db', db, 'pair', 'football', 'Legia Warszawa', 'Lech Poznań']) == 0
+        assert h2h_store.main(['--db', db, 'export', '--output', output]) == 0
+        with open(output, encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 6 and rows[0]['sport'] == 'football' and rows[0]['date_iso'] == '2025-10-04'
+        assert h2h_store.main(['--db', os.path.join(directory, 'brak.sqlite'), 'stats']) == 1
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_incremental_sync()
+        test_parser_stops_at_known_meeting()
+        test_offline_analytics()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,153 @@
+"""
+Test cache linków i równoległego zbierania (link_cache + get_match_links_from_day).
+
+Sprawdza:
+1. Klucz (data, sport, ligi), TTL i pomijanie pustych list
+2. Sporty zbierane równolegle - każdy wątek z własną przeglądarką
+3. Drugie uruchomienie dnia: linki z cache, bez otwierania stron
+4. Scalanie w kolejności sportów bez duplikatów
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import livesport_h2h_scraper as scraper
+from link_cache import LinkCache
+
+
+def test_cache_key_and_ttl():
+    print("=" * 60)
+    print("TEST 1: Klucz cache i TTL")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='link_cache_test_')
+    try:
+        cache = LinkCache(cache_dir=directory, ttl_hours=1)
+        assert cache.get('2025-10-05', 'football') is None
+        cache.put('2025-10-05', 'football', None, ['u1', 'u2'])
+        cache.put('2025-10-05', 'basketball', None, [])  # nieudane zbieranie - nie zapisujemy
+        assert cache.get('2025-10-05', 'football') == ['u1', 'u2']
+        assert cache.get('2025-10-05', 'basketball') is None
+        # Ligi są częścią klucza (kolejność bez znaczenia)
+        cache.put('2025-10-05', 'football', ['premier-league', 'ekstraklasa'], ['u3'])
+        assert cache.get('2025-10-05', 'football', ['ekstraklasa', 'premier-league']) == ['u3']
+        assert cache.get('2025-10-05', 'football') == ['u1', 'u2']
+        assert cache.get('2025-10-06', 'football') is None
+
+        expired = LinkCache(cache_dir=directory, ttl_hours=0)
+        time.sleep(0.01)
+        assert expired.get('2025-10-05', 'football') is None
+        assert not [f for f in os.listdir(directory) if f.endswith('.tmp')]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+class FakeDriver:
+    def __init__(self, name):
+        self.name = name
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _patch_scraper(directory, sport_links, calls, started):
+    originals = (scraper._collect_sport_links, scraper.start_driver, scraper.link_cache)
+
+    def fake_collect(driver, sport, date, leagues=None):
+        calls.append((driver.name, sport, threading.current_thread().name))
+        time.sleep(0.2)  # "ładowanie strony"
+        return list(sport_links[sport])
+
+    def fake_start_driver(headless=True):
+        driver = FakeDriver(f"extra{len(started) + 1}")
+        started.append(driver)
+        return driver
+
+    scraper._collect_sport_links = fake_collect
+    scraper.start_driver = fake_start_driver
+    scraper.link_cache = LinkCache(cache_dir=directory, ttl_hours=6)
+    return originals
+
+
+def _restore_scraper(originals):
+    scraper._collect_sport_links, scraper.start_driver, scraper.link_cache = originals
+
+
+def test_parallel_discovery_and_cache():
+    print("\n" + "=" * 60)
+    print("TEST 2-4: Równoległe zbieranie, cache, scalanie")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='link_cache_test_')
+    sport_links = {
+        'football': ['f1', 'f2', 'shared'],
+        'basketball': ['b1', 'shared'],
+        'volleyball': ['v1'],
+    }
+    calls, started = [], []
+    originals = _patch_scraper(directory, sport_links, calls, started)
+    old_env = os.environ.pop('LINK_CACHE', None)
+    try:
+        main_driver = FakeDriver('main')
+        sports = ['football', 'basketball', 'volleyball', 'unknown-sport']
+        start = time.time()
+        links = scraper.get_match_links_from_day(main_driver, '2025-10-05', sports, workers=3)
+        elapsed = time.time() - start
+
+        assert links == ['f1', 'f2', 'shared', 'b1', 'v1'], links
+        assert sorted(sport for _, sport, _ in calls) == ['basketball', 'football', 'volleyball']
+        assert len({thread for _, _, thread in calls}) > 1, "zbieranie powinno działać w kilku wątkach"
+        assert elapsed < 0.55, f"brak równoległości ({elapsed:.2f}s)"
+        assert started and all(d.quit_called for d in started)
+        assert not main_driver.quit_called  # główny driver należy do wywołującego
+
+        # Drugie uruchomienie (np. tryb GOŚCIE) - wszystko z cache
+        calls.clear()
+        again = scraper.get_match_links_from_day(FakeDriver('main2'), '2025-10-05', sports, workers=3)
+        assert again == links and calls == []
+        assert scraper.link_cache.stats()['hits'] == 3
+    finally:
+        _restore_scraper(originals)
+        if old_env is not None:
+            os.environ['LINK_CACHE'] = old_env
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"  ✅ PASS: {len(links)} linków, {elapsed:.2f}s dla 3 sportów")
+
+
+def test_cache_disabled_serial():
+    print("\n" + "=" * 60)
+    print("TEST 5: LINK_CACHE=0 i jedna przeglądarka")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='link_cache_test_')
+    calls, started = [], []
+    originals = _patch_scraper(directory, {'football': ['f1'], 'tennis': ['t1']}, calls, started)
+    os.environ['LINK_CACHE'] = '0'
+    try:
+        for _ in range(2):
+            links = scraper.get_match_links_from_day(FakeDriver('main'), '2025-10-05', ['football', 'tennis'],
+                                                     workers=1)
+            assert links == ['f1', 't1']
+        assert len(calls) == 4 and started == []
+        assert {driver for driver, _, _ in calls} == {'main'}
+        assert not os.listdir(directory)
+    finally:
+        os.environ.pop('LINK_CACHE', None)
+        _restore_scraper(originals)
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_cache_key_and_ttl()
+        test_parallel_discovery_and_cache()
+        test_cache_disabled_serial()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,227 @@
+"""
+Test klienta HTTP H2H Livesport (livesport_h2h_api).
+
+Testy działają na lokalnym stubie HTTP, który odtwarza nagrane payloady feedów:
+- test_livesport_h2h_feed.txt   (df_hh_1_<event_id>)
+- test_livesport_event_feed.txt (dc_1_<event_id>)
+
+Sprawdza:
+1. Parsowanie feedu (zakładki, grupy, wiersze)
+2. H2H w formacie identycznym z parse_h2h_from_soup()
+3. Forma ogółem / u siebie / na wyjeździe
+4. Błąd HTTP lub feed bez pojedynków -> None (fallback Selenium) + circuit breaker, klient per wątek
+5. process_match używa HTTP i nie nawiguje przeglądarką
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from bs4 import BeautifulSoup
+
+import livesport_h2h_api
+from livesport_h2h_api import LivesportH2HAPI, parse_feed
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EVENT_ID = 'ABC12345'
+MATCH_URL = f'https://www.livesport.com/pl/mecz/pilka-nozna/legia/lech/?mid={EVENT_ID}'
+
+RECORDED = {
+    f'/x/feed/df_hh_1_{EVENT_ID}': 'test_livesport_h2h_feed.txt',
+    f'/x/feed/dc_1_{EVENT_ID}': 'test_livesport_event_feed.txt',
+}
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        _ReplayHandler.requests_seen.append((self.path, self.headers.get('x-fsign')))
+        name = RECORDED.get(self.path)
+        if not name:
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(os.path.join(HERE, name), 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ReplayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/x/feed/"
+
+
+def test_parse_feed():
+    print("=" * 60)
+    print("TEST 1: Parsowanie feedu")
+    print("=" * 60)
+    assert parse_feed('AA÷x¬AD÷1¬~AE÷Home¬~') == [{'AA': 'x', 'AD': '1'}, {'AE': 'Home'}]
+    with open(os.path.join(HERE, 'test_livesport_h2h_feed.txt'), encoding='utf-8') as f:
+        tabs = LivesportH2HAPI.parse_h2h_feed(f.read())
+    assert [t['tab'] for t in tabs] == ['Ogółem', 'Gospodarze - u siebie', 'Goście - na wyjeździe']
+    assert len(tabs[0]['groups']) == 3 and len(tabs[0]['groups'][2]['rows']) == 4
+    print("  ✅ PASS")
+
+
+def test_h2h_same_shape_as_soup_parser():
+    print("\n" + "=" * 60)
+    print("TEST 2: H2H przez HTTP = format parse_h2h_from_soup")
+    print("=" * 60)
+    from livesport_h2h_scraper import parse_h2h_from_soup
+
+    server, base_url = _start_stub()
+    try:
+        data = LivesportH2HAPI(base_url=base_url).get_h2h_for_match(MATCH_URL)
+    finally:
+        server.shutdown()
+
+    assert data and data['success']
+    assert data['home_team'] == 'Legia Warszawa' and data['away_team'] == 'Lech Poznań'
+    assert data['match_time'] and data['match_time'].startswith('16.10.2025'), data['match_time']
+    assert all(fsign for _, fsign in _ReplayHandler.requests_seen)
+
+    # Ten sam mecz wyrenderowany jako DOM Livesport
+    rows = ''.join(
+        f'<a class="h2h__row"><span class="h2h__date">{m["date"]}</span>'
+        f'<span class="h2h__homeParticipant"><span class="h2h__participantInner">{m["home"]}</span></span>'
+        f'<span class="h2h__awayParticipant"><span class="h2h__participantInner">{m["away"]}</span></span>'
+        f'<span class="h2h__result"><span>{m["score"].split("-")[0]}</span><span>{m["score"].split("-")[1]}</span></span></a>'
+        for m in data['h2h'])
+    soup = BeautifulSoup(f'<div class="h2h__section">Pojedynki bezpośrednie{rows}</div>', 'html.parser')
+
+    assert data['h2h'] == parse_h2h_from_soup(soup, 'Legia Warszawa')
+    assert data['h2h'][0] == {'date': '02.01.24', 'home': 'Legia Warszawa', 'away': 'Lech Poznań',
+                              'score': '2-1', 'winner': 'home', 'raw': '02.01.24 Legia Warszawa 2-1 Lech Poznań'}
+    print(f"  ✅ PASS: {len(data['h2h'])} meczów H2H")
+
+
+def test_form_tabs():
+    print("\n" + "=" * 60)
+    print("TEST 3: Forma ogółem / u siebie / na wyjeździe")
+    print("=" * 60)
+    server, base_url = _start_stub()
+    try:
+        data = LivesportH2HAPI(base_url=base_url).get_h2h_for_event(EVENT_ID)
+    finally:
+        server.shutdown()
+    assert data['home_form_overall'] == ['W', 'D', 'W', 'L', 'W'], data['home_form_overall']
+    assert data['away_form_overall'] == ['L', 'D', 'L', 'L', 'W'], data['away_form_overall']
+    assert data['home_form_home'] == ['W', 'L', 'W']
+    assert data['away_form_away'] == ['L', 'L', 'W']
+    print("  ✅ PASS")
+
+
+def test_http_failure_falls_back():
+    print("\n" + "=" * 60)
+    print("TEST 4: Błąd HTTP -> fallback + circuit breaker")
+    print("=" * 60)
+    server, base_url = _start_stub()
+    no_h2h_path = None
+    try:
+        api = LivesportH2HAPI(base_url=base_url, timeout=2)
+        unknown = MATCH_URL.replace(EVENT_ID, 'ZZZ99999')
+        for _ in range(livesport_h2h_api.MAX_CONSECUTIVE_FAILURES):
+            assert api.get_h2h_for_match(unknown) is None
+        assert api.disabled
+        seen = len(_ReplayHandler.requests_seen)
+        assert api.get_h2h_for_match(MATCH_URL) is None   # wyłączony - bez żądań
+        assert len(_ReplayHandler.requests_seen) == seen
+
+        # Feed bez grupy pojedynków (zmieniony format) - brak H2H to nie sukces, tylko fallback
+        with open(os.path.join(HERE, 'test_livesport_h2h_feed.txt'), encoding='utf-8') as f:
+            feed = f.read()
+        start = feed.index('~KB÷Pojedynki bezpośrednie')
+        no_h2h = feed[:start] + feed[feed.index('~KA÷', start):]
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+            f.write(no_h2h)
+            no_h2h_path = f.name
+        RECORDED['/x/feed/df_hh_1_NOH2H001'] = no_h2h_path
+        RECORDED['/x/feed/dc_1_NOH2H001'] = 'test_livesport_event_feed.txt'
+        fresh = LivesportH2HAPI(base_url=base_url)
+        data = fresh.get_h2h_for_event('NOH2H001')
+        assert data['home_team'] and data['home_form_overall'] and data['h2h'] == [] and not data['success']
+        assert fresh.get_h2h_for_match(MATCH_URL.replace(EVENT_ID, 'NOH2H001')) is None
+
+        # Klient z get_livesport_h2h() - osobny w każdym wątku
+        clients = []
+        original_cls = livesport_h2h_api.LivesportH2HAPI
+        livesport_h2h_api.LivesportH2HAPI = lambda: clients.append(original_cls(base_url=base_url)) or clients[-1]
+        try:
+            threads = [threading.Thread(target=livesport_h2h_api.get_livesport_h2h, args=(MATCH_URL,))
+                       for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            livesport_h2h_api.LivesportH2HAPI = original_cls
+        assert len(clients) == 3 and all(client.stats['success'] == 1 for client in clients)
+    finally:
+        RECORDED.pop('/x/feed/df_hh_1_NOH2H001', None)
+        RECORDED.pop('/x/feed/dc_1_NOH2H001', None)
+        if no_h2h_path:
+            os.unlink(no_h2h_path)
+        server.shutdown()
+    print("  ✅ PASS")
+
+
+class _NoNavigationDriver:
+    current_url = 'about:blank'
+
+    def __init__(self):
+        self.gets = 0
+
+    def get(self, url):
+        self.gets += 1
+
+    def execute_script(self, *args):
+        return 0
+
+
+def test_process_match_uses_http_first():
+    print("\n" + "=" * 60)
+    print("TEST 5: process_match - HTTP przed Selenium")
+    print("=" * 60)
+    import livesport_h2h_scraper as scraper
+
+    server, base_url = _start_stub()
+    api = LivesportH2HAPI(base_url=base_url)
+    original = scraper.get_livesport_h2h, scraper.LIVESPORT_HTTP_H2H_AVAILABLE
+    scraper.get_livesport_h2h = api.get_h2h_for_match
+    scraper.LIVESPORT_HTTP_H2H_AVAILABLE = True
+    try:
+        driver = _NoNavigationDriver()
+        out = scraper.process_match(MATCH_URL, driver, sport='basketball')  # basketball: bez kursów w teście
+    finally:
+        scraper.get_livesport_h2h, scraper.LIVESPORT_HTTP_H2H_AVAILABLE = original
+        server.shutdown()
+
+    assert driver.gets == 0
+    assert out['home_team'] == 'Legia Warszawa' and out['h2h_count'] == 4
+    assert out['home_wins_in_h2h_last5'] == 2 and out['qualifies'] is False
+    print("  ✅ PASS: 0 nawigacji przeglądarki")
+
+
+if __name__ == '__main__':
+    try:
+        test_parse_feed()
+        test_h2h_same_shape_as_soup_parser()
+        test_form_tabs()
+        test_http_failure_falls_back()
+        test_process_match_uses_http_first()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,139 @@
+"""
+Test oczekiwania na gotowość strony (page_readiness).
+
+Sprawdza:
+1. Strona gotowa od razu -> brak czekania (zamiast sztywnego sleepa)
+2. Stabilizacja liczby wierszy H2H (lazy-load); stałe 0 wierszy to nie "gotowe"
+3. Timeout nigdy nie przekracza dawnego sleepa
+4. Adaptacyjny sufit z zaobserwowanych czasów (próbki ze starszej wersji pliku pomijane)
+5. Raport oszczędności na mecz
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+import page_readiness
+from page_readiness import PageReadiness
+
+
+class FakeDriver:
+    """Driver zwracający liczbę elementów wg selektora z kolejnych wywołań."""
+
+    def __init__(self, counts):
+        # counts: selektor -> lista kolejnych liczb (ostatnia powtarzana)
+        self.counts = {k: list(v) for k, v in counts.items()}
+
+    def execute_script(self, script, selector):
+        seq = self.counts.get(selector, [0])
+        return seq.pop(0) if len(seq) > 1 else seq[0]
+
+
+def test_ready_immediately():
+    print("=" * 60)
+    print("TEST 1: Strona gotowa od razu")
+    print("=" * 60)
+    r = PageReadiness(stats_file=None)
+    driver = FakeDriver({page_readiness.READY_CONDITIONS['match']['ready']: [1]})
+    start = time.time()
+    assert r.wait(driver, 'match', 'football', legacy_sleep=3.0) is True
+    assert time.time() - start < 0.5
+    print("  ✅ PASS: brak zbędnego czekania")
+
+
+def test_waits_for_stable_rows():
+    print("\n" + "=" * 60)
+    print("TEST 2: Stabilizacja wierszy H2H")
+    print("=" * 60)
+    r = PageReadiness(stats_file=None)
+    cond = page_readiness.READY_CONDITIONS['h2h']
+    driver = FakeDriver({cond['ready']: [0, 1], cond['stable']: [2, 5, 5]})
+    assert r.wait(driver, 'h2h', 'football', legacy_sleep=3.0) is True
+    assert r.stats['h2h']['ready'] == 1
+
+    # Sekcja H2H jest, wierszy jeszcze brak - czekamy do sufitu, bez próbki zaniżającej sufit
+    driver = FakeDriver({cond['ready']: [1], cond['stable']: [0]})
+    start = time.time()
+    assert r.wait(driver, 'h2h', 'football', legacy_sleep=1.0) is False
+    assert time.time() - start >= 0.9
+    assert r.stats['h2h']['timeouts'] == 1 and len(r.samples[('football', 'h2h')]) == 1
+
+    # Wiersze dochodzą po chwili - gotowe dopiero przy ustabilizowanej liczbie > 0
+    driver = FakeDriver({cond['ready']: [1], cond['stable']: [0, 0, 0, 3, 3, 3]})
+    assert r.wait(driver, 'h2h', 'football', legacy_sleep=3.0) is True
+    assert driver.counts[cond['stable']] == [3]
+    print("  ✅ PASS: czeka na ustabilizowaną liczbę wierszy")
+
+
+def test_timeout_capped_by_legacy_sleep():
+    print("\n" + "=" * 60)
+    print("TEST 3: Timeout ograniczony dawnym sleepem")
+    print("=" * 60)
+    r = PageReadiness(stats_file=None)
+    driver = FakeDriver({})  # brak H2H na stronie
+    start = time.time()
+    assert r.wait(driver, 'h2h', 'volleyball', legacy_sleep=0.5) is False
+    elapsed = time.time() - start
+    assert elapsed < 0.8, elapsed
+    assert r.stats['h2h']['timeouts'] == 1
+    print(f"  ✅ PASS: timeout po {elapsed:.2f}s (sleep=0.5s)")
+
+
+def test_adaptive_ceiling():
+    print("\n" + "=" * 60)
+    print("TEST 4: Adaptacyjny sufit")
+    print("=" * 60)
+    r = PageReadiness(stats_file=None)
+    assert r.ceiling('football', 'h2h') == page_readiness.READY_CEILINGS['football']
+    for v in [0.5, 0.6, 0.7, 0.8, 0.9, 1.0]:
+        r._record('football', 'h2h', v, 3.0, True)
+    ceiling = r.ceiling('football', 'h2h')
+    assert ceiling == 1.0 * page_readiness.ADAPTIVE_MARGIN, ceiling
+    # Inne sporty bez zmian
+    assert r.ceiling('volleyball', 'h2h') == page_readiness.READY_CEILINGS['volleyball']
+
+    # Zapis i odczyt próbek; plik bez wersji (próbki H2H przy 0 wierszy) ignorowany
+    directory = tempfile.mkdtemp(prefix='page_readiness_test_')
+    path = os.path.join(directory, 'stats.json')
+    r.stats_file = path
+    r.save_samples()
+    assert PageReadiness(stats_file=path).ceiling('football', 'h2h') == ceiling
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'samples': {'football|h2h': [0.4] * 10}}, f)
+    assert PageReadiness(stats_file=path).ceiling('football', 'h2h') == page_readiness.READY_CEILINGS['football']
+    os.remove(path)
+    os.rmdir(directory)
+    print(f"  ✅ PASS: sufit football/h2h = {ceiling:.2f}s")
+
+
+def test_report_saved_per_match():
+    print("\n" + "=" * 60)
+    print("TEST 5: Raport oszczędności")
+    print("=" * 60)
+    r = PageReadiness(stats_file=None)
+    r.begin_match()
+    r._record('football', 'match', 0.4, 3.0, True)
+    r._record('football', 'h2h', 0.6, 2.5, True)
+    r.begin_match()
+    r._record('football', 'match', 1.0, 3.0, True)
+    rep = r.report()
+    assert rep['matches'] == 2
+    assert rep['saved_s'] == 6.5, rep
+    assert rep['saved_per_match_s'] == 3.25, rep
+    print(f"  ✅ PASS: {rep['saved_per_match_s']}s/mecz")
+
+
+if __name__ == '__main__':
+    try:
+        test_ready_immediately()
+        test_waits_for_stable_rows()
+        test_timeout_capped_by_legacy_sleep()
+        test_adaptive_ceiling()
+        test_report_saved_per_match()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
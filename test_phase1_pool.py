@@ -0,0 +1,60 @@
+"""
+Test puli workerów FAZY 1 (--workers N).
+
+Sprawdza:
+1. Scalanie wyników workerów w kolejności wejściowych URLi
+2. Indeksy kwalifikujących się meczów zgodne z trybem szeregowym
+3. Rozpoznawanie URLi tenisowych (dispatch tenis / sporty drużynowe)
+"""
+
+import sys
+
+from phase1_pool import merge_phase1_results, is_tennis_url
+
+
+def test_merge_deterministic_order():
+    """Wyniki przychodzą w dowolnej kolejności - scalenie wg indeksu URLa."""
+    print("=" * 60)
+    print("TEST 1: Scalanie w deterministycznej kolejności")
+    print("=" * 60)
+
+    # Worker 2 skończył przed workerem 1, mecz #2 pominięty po błędach
+    results_by_index = {
+        3: {'match_url': 'u3', 'qualifies': True},
+        0: {'match_url': 'u0', 'qualifies': False},
+        1: {'match_url': 'u1', 'qualifies': True},
+    }
+    rows, qualifying_indices = merge_phase1_results(results_by_index)
+
+    assert [r['match_url'] for r in rows] == ['u0', 'u1', 'u3']
+    # Indeksy odnoszą się do listy rows (jak w trybie szeregowym: pominięte nie zajmują miejsca)
+    assert qualifying_indices == [1, 2]
+    print("  ✅ PASS: kolejność i indeksy kwalifikujących")
+
+
+def test_merge_empty():
+    rows, qualifying_indices = merge_phase1_results({})
+    assert rows == [] and qualifying_indices == []
+    print("  ✅ PASS: pusty wynik")
+
+
+def test_tennis_dispatch():
+    print("\n" + "=" * 60)
+    print("TEST 2: Rozpoznawanie tenisa")
+    print("=" * 60)
+    assert is_tennis_url('https://www.livesport.com/pl/mecz/tenis/a-b/?mid=X')
+    assert is_tennis_url('https://www.livesport.com/en/match/tennis/a-b/')
+    assert not is_tennis_url('https://www.livesport.com/pl/mecz/pilka-nozna/a-b/?mid=X')
+    print("  ✅ PASS: tenis vs sporty drużynowe")
+
+
+if __name__ == '__main__':
+    try:
+        test_merge_deterministic_order()
+        test_merge_empty()
+        test_tennis_dispatch()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
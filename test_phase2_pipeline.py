@@ -0,0 +1,122 @@
+"""
+Test FAZY 2 w potoku (phase2_pipeline).
+
+Sprawdza:
+1. Wzbogacanie nakłada się na FAZĘ 1 - czas ~ max(faza1, faza2), nie suma
+2. Callback on_done (dziennik) dla każdego meczu, pomijanie wzbogaconych (--resume)
+3. Wspólne funkcje trybu szeregowego (data meczu, is_enriched)
+4. Rate limit AI Forebet rozdziela sloty między wątkami pipeline
+"""
+
+import sys
+import threading
+import time
+
+from phase2_pipeline import EnrichmentPipeline, enrich_row, is_enriched, match_date_for
+
+
+def _fake_enrich(calls):
+    def enrich(row, date, use_forebet, use_sofascore, use_gemini, available, prefix=''):
+        calls.append((row['match_url'], threading.current_thread().name))
+        time.sleep(0.2)  # "zapytanie sieciowe"
+        row['forebet_prediction'] = '1'
+        return row
+    return enrich
+
+
+def _no_prefetch(sports, date, use_forebet, use_sofascore):
+    return {'forebet': use_forebet, 'sofascore': use_sofascore}
+
+
+def test_pipeline_overlaps_phase1():
+    print("=" * 60)
+    print("TEST 1: FAZA 2 równolegle z FAZĄ 1")
+    print("=" * 60)
+    calls, done = [], []
+    pipeline = EnrichmentPipeline('2025-10-05', ['football'], use_forebet=True, workers=3,
+                                  on_done=lambda row: done.append(row['match_url']),
+                                  enrich=_fake_enrich(calls), prepare=_no_prefetch)
+    start = time.time()
+    pipeline.start()
+    for i in range(6):
+        time.sleep(0.1)  # "przeglądarka" - FAZA 1
+        if i % 2 == 0:
+            pipeline.submit({'match_url': f'u{i}', 'qualifies': True})
+    stats = pipeline.close()
+    elapsed = time.time() - start
+
+    # Szeregowo: 0.6s FAZA 1 + 3 x 0.2s FAZA 2; w potoku zostaje tylko ogon ostatniego meczu
+    assert sorted(done) == ['u0', 'u2', 'u4']
+    assert stats['processed'] == 3 and stats['enriched'] == 3 and stats['submitted'] == 3
+    assert elapsed < 0.6 + 0.3, f"brak nakładania faz ({elapsed:.2f}s)"
+    assert all(name.startswith('phase2-') for _, name in calls)
+    print(f"  ✅ PASS: {elapsed:.2f}s")
+
+
+def test_skip_already_enriched():
+    print("\n" + "=" * 60)
+    print("TEST 2: --resume - mecze wzbogacone w dzienniku są pomijane")
+    print("=" * 60)
+    calls, done = [], []
+    pipeline = EnrichmentPipeline('2025-10-05', ['football'], use_gemini=True, workers=2,
+                                  on_done=lambda row: done.append(row['match_url']),
+                                  skip_urls={'u1'}, enrich=_fake_enrich(calls), prepare=_no_prefetch)
+    pipeline.start()
+    pipeline.submit({'match_url': 'u1', 'qualifies': True})
+    pipeline.submit({'match_url': 'u2', 'qualifies': True})
+    stats = pipeline.close()
+    assert [url for url, _ in calls] == ['u2'] and done == ['u2']
+    assert stats['skipped'] == 1 and stats['processed'] == 1
+    print("  ✅ PASS")
+
+
+def test_shared_helpers():
+    print("\n" + "=" * 60)
+    print("TEST 3: Funkcje wspólne z trybem szeregowym")
+    print("=" * 60)
+    assert match_date_for({'match_time': '5.10.2025 18:00'}, '2025-10-04') == '2025-10-05'
+    assert match_date_for({'match_time': '18:00'}, '2025-10-04') == '2025-10-04'
+    row = {'match_url': 'https://www.livesport.com/pl/mecz/pilka-nozna/x/', 'home_team': 'A', 'away_team': 'B'}
+    assert enrich_row(row, '2025-10-05', True, True, False, {'forebet': False, 'sofascore': False}) is row
+    assert not is_enriched(row)
+    assert is_enriched({'sofascore_home_win_prob': 55})
+    print("  ✅ PASS")
+
+
+def test_ai_rate_limit_threads():
+    print("\n" + "=" * 60)
+    print("TEST 4: Rate limit AI wspólny dla wątków")
+    print("=" * 60)
+    import forebet_scraper
+    forebet_scraper._last_ai_call_time = 0.0
+    start = time.time()
+    waits = []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        waits.append(forebet_scraper._reserve_ai_call())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Każdy wątek dostaje własny slot - żadne dwa wywołania nie startują razem
+    slots = sorted(start + w for w in waits)
+    interval = forebet_scraper._AI_MIN_INTERVAL
+    assert all(b - a >= interval - 0.05 for a, b in zip(slots, slots[1:])), waits
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_pipeline_overlaps_phase1()
+        test_skip_already_enriched()
+        test_shared_helpers()
+        test_ai_rate_limit_threads()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,198 @@
+"""
+Test silnika Playwright (playwright_engine) - bez uruchamiania Chromium.
+
+Sprawdza:
+1. Adapter API Selenium nad stroną Playwright (skrypty, lokatory, wyjątki)
+2. FAZA 1: wiele meczów w locie w jednym procesie, kolejność wyników, przerwanie
+3. Raport pamięci na stronę
+"""
+
+import sys
+import threading
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+import phase1_pool  # noqa: F401 - import scrapera poza mierzonym czasem
+from playwright_engine import (PlaywrightDriver, PlaywrightEngine, _EventLoopThread, run_phase1_playwright,
+                               selector_for)
+
+
+class _FakeLocator:
+    def __init__(self, selector, count):
+        self.selector = selector
+        self._count = count
+
+    async def count(self):
+        return self._count
+
+    def nth(self, i):
+        return self
+
+    async def inner_text(self):
+        return f"tekst {self.selector}"
+
+
+class _FakePage:
+    url = 'https://www.livesport.com/pl/mecz/x/'
+
+    def __init__(self):
+        self.calls = []
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.calls.append(('goto', url, wait_until, timeout))
+        self.url = url
+
+    async def content(self):
+        return '<html>ok</html>'
+
+    async def evaluate(self, expression, arg):
+        self.calls.append(('evaluate', expression, arg))
+        return 3
+
+    def locator(self, selector):
+        return _FakeLocator(selector, 0 if 'brak' in selector else 2)
+
+
+class _FakeContext:
+    pages = [object()]
+
+    async def close(self):
+        self.closed = True
+
+
+def test_selenium_adapter():
+    print("=" * 60)
+    print("TEST 1: Adapter API Selenium")
+    print("=" * 60)
+    assert selector_for(By.XPATH, "//a[@href]") == "xpath=//a[@href]"
+    assert selector_for(By.ID, "onetrust-accept-btn-handler") == '[id="onetrust-accept-btn-handler"]'
+    assert selector_for(By.CSS_SELECTOR, "div.event__match") == "css=div.event__match"
+
+    runner = _EventLoopThread()
+    try:
+        page, context = _FakePage(), _FakeContext()
+        driver = PlaywrightDriver(runner, context, page)
+        driver.set_page_load_timeout(30)
+        driver.get('https://www.livesport.com/pl/mecz/a/')
+        assert page.calls[0][1:] == ('https://www.livesport.com/pl/mecz/a/', 'load', 30000)
+        assert driver.current_url == 'https://www.livesport.com/pl/mecz/a/'
+        assert driver.page_source == '<html>ok</html>'
+        # Skrypt Selenium ('return', arguments) przekazany jako ciało funkcji
+        assert driver.execute_script("return arguments[0].length;", [1, 2, 3]) == 3
+        assert page.calls[-1][2] == ["return arguments[0].length;", [[1, 2, 3]]]
+        assert len(driver.find_elements(By.CSS_SELECTOR, 'a.h2h')) == 2
+        assert driver.find_element(By.CSS_SELECTOR, 'a.h2h').text == 'tekst css=a.h2h'
+        try:
+            driver.find_element(By.ID, 'brak')
+            assert False, "brak NoSuchElementException"
+        except NoSuchElementException:
+            pass
+        assert driver.window_handles == [0]
+        driver.quit()
+        assert context.closed and driver.closed
+    finally:
+        runner.stop()
+    print("  ✅ PASS")
+
+
+class _FakeEngine:
+    def __init__(self):
+        self.samples = []
+        self.drivers = 0
+
+    def new_driver(self):
+        self.drivers += 1
+        return _FakeDriver()
+
+    def sample_memory(self):
+        self.samples.append({'pages': self.drivers})
+
+    def print_report(self):
+        pass
+
+
+class _FakeDriver:
+    closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+def test_many_matches_in_flight():
+    print("\n" + "=" * 60)
+    print("TEST 2: Wiele meczów w locie w jednym procesie")
+    print("=" * 60)
+    in_flight = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def process(url, driver, headless=True, away_team_focus=False, prefix='', pool=None):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        time.sleep(0.1)  # "ładowanie strony"
+        with lock:
+            in_flight['now'] -= 1
+        if url.endswith('/5/'):
+            return None, driver
+        return {'match_url': url, 'qualifies': url.endswith(('/1/', '/3/'))}, driver
+
+    urls = [f"https://www.livesport.com/pl/mecz/{i}/" for i in range(16)]
+    results = []
+    engine = _FakeEngine()
+    start = time.time()
+    rows, qualifying = run_phase1_playwright(urls, concurrency=8, engine=engine, process=process,
+                                             on_result=lambda idx, info: results.append(idx))
+    elapsed = time.time() - start
+    assert in_flight['max'] == 8 and engine.drivers == 8
+    assert elapsed < 0.6, f"brak współbieżności ({elapsed:.2f}s)"
+    assert [r['match_url'] for r in rows] == [u for u in urls if not u.endswith('/5/')]
+    assert [rows[k]['match_url'] for k in qualifying] == [urls[1], urls[3]]
+    assert sorted(results) == list(range(16)) and engine.samples
+
+    # Koniec budżetu czasu - kolejka porzucona
+    rows, _ = run_phase1_playwright(urls, concurrency=2, engine=_FakeEngine(), process=process,
+                                    should_stop=lambda: True)
+    assert len(rows) <= 2
+    print(f"  ✅ PASS: 16 meczów w {elapsed:.2f}s")
+
+
+class _HeapDriver:
+    closed = False
+
+    def __init__(self, heap):
+        self.heap = heap
+
+    def js_heap_mb(self):
+        return self.heap
+
+
+def test_memory_per_page():
+    print("\n" + "=" * 60)
+    print("TEST 3: Pamięć na stronę")
+    print("=" * 60)
+    engine = PlaywrightEngine(rss_probe=lambda: 800.0)
+    assert engine.sample_memory() is None and engine.memory_report() == {}
+    engine._drivers = [_HeapDriver(20.0), _HeapDriver(30.0), _HeapDriver(None), _HeapDriver(40.0)]
+    assert engine.sample_memory() == {'pages': 4, 'browser_rss_mb': 800.0, 'rss_per_page_mb': 200.0,
+                                      'js_heap_per_page_mb': 30.0}
+    engine._drivers[0].closed = True
+    engine.sample_memory()
+    report = engine.memory_report()
+    assert report['max_pages'] == 4 and report['samples'] == 2
+    assert report['avg_rss_per_page_mb'] == round((200.0 + 800.0 / 3) / 2, 1)
+    engine.print_report()
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_selenium_adapter()
+        test_many_matches_in_flight()
+        test_memory_per_page()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,232 @@
+"""
+Test długo żyjącego workera Puppeteer (puppeteer_worker) na lokalnym workerze protokołu JSON-lines.
+
+Sprawdza:
+1. Sześć stron sportów Forebet = jedno uruchomienie workera, błąd strony nie zabija workera, recykling
+2. Padnięcie workera (restart + ponowna próba), timeout (worker zabity), nieudany start, close()
+3. CloudflareBypass._try_puppeteer i fetch_forebet_with_puppeteer przez worker (+ prawdziwy node, jeśli jest)
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import cloudflare_bypass
+import forebet_scraper
+import puppeteer_worker as puppeteer_worker_module
+from clearance_jar import ClearanceJar
+from puppeteer_worker import PuppeteerWorker, PuppeteerWorkerError, WORKER_SCRIPT
+
+PAGE = '<html><body><div class="schema">' + '<div class="rcnt">Legia vs Lech</div>' * 60 + '</div></body></html>'
+UA = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0'
+
+# Worker mówiący protokołem puppeteer_worker.js (bez przeglądarki); każdy start dopisuje linię do pliku
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, sys, time
+    with open(sys.argv[1], 'a') as f:
+        f.write('launch\\n')
+    if os.path.exists(sys.argv[1] + '.broken'):
+        sys.stderr.write('Error: Cannot find module puppeteer-extra\\n')
+        sys.exit(1)
+    print('DevTools listening on ws://127.0.0.1/devtools', flush=True)
+    print(json.dumps({'event': 'ready', 'launch_ms': 5, 'user_agent': %r}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get('cmd') == 'shutdown':
+            break
+        url = request.get('url') or 'https://www.forebet.com/en/%%s/predictions-today' %% request.get('sport')
+        if 'crash' in url and not os.path.exists(sys.argv[1] + '.crashed'):
+            open(sys.argv[1] + '.crashed', 'w').close()
+            os._exit(1)
+        if 'hang' in url:
+            time.sleep(60)
+        if 'fail' in url:
+            print(json.dumps({'id': request['id'], 'ok': False, 'error': 'net::ERR_NAME_NOT_RESOLVED', 'ms': 3}),
+                  flush=True)
+            continue
+        print(json.dumps({'id': request['id'], 'ok': True, 'url': url, 'status': 200, 'html': %r,
+                          'cookies': [{'name': 'cf_clearance', 'value': 'from-worker', 'expires': -1}],
+                          'user_agent': %r, 'ms': 1200, 'data': {'wait': request.get('wait_selector')}}),
+              flush=True)
+''') % (UA, PAGE, UA)
+
+SPORTS = ('football', 'basketball', 'volleyball', 'handball', 'hockey', 'tennis')
+
+
+def _fake_worker(directory, **kwargs):
+    script = os.path.join(directory, 'fake_worker.py')
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write(FAKE_WORKER)
+    launches = os.path.join(directory, 'launches.txt')
+    return PuppeteerWorker(command=[sys.executable, script, launches], **kwargs), launches
+
+
+def _launches(path):
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return len(f.readlines())
+
+
+def test_one_browser_for_all_sports():
+    print("=" * 60)
+    print("TEST 1: Jedno uruchomienie na sześć sportów")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='puppeteer_worker_test_')
+    try:
+        worker, launches = _fake_worker(directory, max_pages=8)
+        assert worker.available() and not worker.running() and _launches(launches) == 0
+        for sport in SPORTS:
+            page = worker.fetch_forebet(sport=sport)
+            assert page.html == PAGE and page.status == 200 and sport in page.url
+            assert page.user_agent == UA and page.elapsed == 1.2
+            assert page.data == {'wait': puppeteer_worker_module.FOREBET_CONTENT_SELECTORS}
+        assert _launches(launches) == 1 and worker.running()
+
+        # Błąd nawigacji - wyjątek, ale worker (i przeglądarka) działa dalej
+        try:
+            worker.fetch('https://fail.example/')
+            assert False, 'błąd strony powinien rzucić PuppeteerWorkerError'
+        except PuppeteerWorkerError as e:
+            assert 'ERR_NAME_NOT_RESOLVED' in str(e)
+        assert worker.fetch('https://www.sofascore.com/x', extract='fan_votes').html == PAGE
+        assert _launches(launches) == 1
+
+        # Recykling po max_pages stronach
+        worker.fetch('https://www.forebet.com/en/rugby/predictions-today')
+        assert _launches(launches) == 2
+        stats = worker.stats()
+        assert stats['requests'] == 9 and stats['failures'] == 1 and stats['restarts'] == 1
+        worker.close()
+        assert not worker.running()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_crash_timeout_and_broken_install():
+    print("\n" + "=" * 60)
+    print("TEST 2: Padnięcie, timeout, nieudany start")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='puppeteer_worker_test_')
+    original_grace = puppeteer_worker_module.REQUEST_GRACE
+    try:
+        worker, launches = _fake_worker(directory)
+        worker.fetch(sport='football')
+
+        # Worker padł w trakcie żądania - restart i ta sama strona pobrana
+        assert worker.fetch('https://www.forebet.com/en/crash').html == PAGE
+        assert _launches(launches) == 2 and worker.restarts == 1 and worker.failures == 0
+
+        # Zawieszona karta - worker zabity, kolejne pobranie na nowym
+        puppeteer_worker_module.REQUEST_GRACE = 0
+        process = worker._process
+        try:
+            worker.fetch('https://www.forebet.com/en/hang', timeout=0.5)
+            assert False, 'zawieszony worker powinien rzucić PuppeteerWorkerError'
+        except PuppeteerWorkerError as e:
+            assert 'nie odpowiedział' in str(e)
+        assert process.poll() is not None and not worker.running()
+        puppeteer_worker_module.REQUEST_GRACE = original_grace
+        assert worker.fetch(sport='tennis').html == PAGE and _launches(launches) == 3
+        worker.close()
+
+        # Brak puppeteer-extra: worker kończy się przed 'ready' - czytelny błąd z logów
+        open(launches + '.broken', 'w').close()
+        try:
+            worker.fetch(sport='football')
+            assert False, 'nieudany start powinien rzucić PuppeteerWorkerError'
+        except PuppeteerWorkerError as e:
+            assert 'Cannot find module' in str(e)
+        assert not worker.running()
+        assert not PuppeteerWorker(command=['node-does-not-exist', WORKER_SCRIPT]).available()
+    finally:
+        puppeteer_worker_module.REQUEST_GRACE = original_grace
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+class _ForebetHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = PAGE.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _node_worker_runs() -> bool:
+    try:
+        result = subprocess.run(['node', '-e', "require('puppeteer-extra'); require('puppeteer-extra-plugin-stealth')"],
+                                capture_output=True, cwd=os.path.dirname(WORKER_SCRIPT), timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+def test_scrapers_use_worker():
+    print("\n" + "=" * 60)
+    print("TEST 3: CloudflareBypass i fetch_forebet_with_puppeteer przez worker")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='puppeteer_worker_test_')
+    originals = (cloudflare_bypass.puppeteer_worker, cloudflare_bypass.clearance_jar,
+                 forebet_scraper.puppeteer_worker)
+    try:
+        worker, launches = _fake_worker(directory)
+        cloudflare_bypass.puppeteer_worker = worker
+        forebet_scraper.puppeteer_worker = worker
+        cloudflare_bypass.clearance_jar = jar = ClearanceJar(path=None)
+        bypass = cloudflare_bypass.CloudflareBypass(debug=False)
+        for sport in SPORTS[:3]:
+            assert bypass._try_puppeteer(f"https://www.forebet.com/en/{sport}/predictions-today", 30) == PAGE
+        for sport in SPORTS[3:]:
+            assert forebet_scraper.fetch_forebet_with_puppeteer(sport) == PAGE
+        assert _launches(launches) == 1 and worker.stats()['requests'] == 6
+        assert jar.get('https://www.forebet.com/').cookies == {'cf_clearance': 'from-worker'}
+        assert jar.get('https://www.forebet.com/').user_agent == UA
+        worker.close()
+    finally:
+        (cloudflare_bypass.puppeteer_worker, cloudflare_bypass.clearance_jar,
+         forebet_scraper.puppeteer_worker) = originals
+        shutil.rmtree(directory, ignore_errors=True)
+
+    # Prawdziwy puppeteer_worker.js z przeglądarką - tylko gdy zainstalowane puppeteer-extra
+    if not _node_worker_runs():
+        print("  ⏭️ node/puppeteer-extra niedostępne - pomijam prawdziwą przeglądarkę")
+        print("  ✅ PASS")
+        return
+    server = HTTPServer(('127.0.0.1', 0), _ForebetHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    worker = PuppeteerWorker()
+    try:
+        for sport in ('football', 'basketball'):
+            page = worker.fetch(f"http://127.0.0.1:{server.server_port}/en/{sport}", wait_selector='div.rcnt',
+                                consent=False)
+            assert 'Legia vs Lech' in page.html and page.status == 200
+        assert worker.launches == 1
+    finally:
+        worker.close()
+        server.shutdown()
+        server.server_close()
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_one_browser_for_all_sports()
+        test_crash_timeout_and_broken_install()
+        test_scrapers_use_worker()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
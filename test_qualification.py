@@ -0,0 +1,146 @@
+"""
+Test kwalifikacji etapami (qualification + process_match).
+
+Sprawdza:
+1. Kolejność etapów teams -> h2h_count -> h2h_win_rate i etap odcięcia
+2. Drogie etapy (forma, kursy, Forebet, Gemini) tylko dla kandydatów; zrzucona forma nie odcina meczu
+3. Podsumowanie odcięć dla całego dnia
+"""
+
+import sys
+
+from qualification import SHED, StagedQualifier, set_shed_stages, summarize_cutoffs
+
+
+def test_stage_order():
+    print("=" * 60)
+    print("TEST 1: Etapy i etap odcięcia")
+    print("=" * 60)
+    cases = [
+        (('', 'Legia', 5, 5), 'teams'),
+        (('Lech', 'Legia', 0, 0), 'h2h_count'),
+        (('Lech', 'Legia', 5, 2), 'h2h_win_rate'),
+        (('Lech', 'Legia', 5, 3), ''),
+    ]
+    for args, expected in cases:
+        qualifier = StagedQualifier()
+        assert qualifier.evaluate_h2h(*args) == (expected == '')
+        assert qualifier.cutoff_stage == expected, (args, qualifier.cutoff_stage)
+
+    qualifier = StagedQualifier()
+    qualifier.evaluate_h2h('Lech', 'Legia', 4, 1)
+    assert not qualifier.run_stage('odds') and not qualifier.run_stage('odds')
+    assert qualifier.run_stage('odds') is not SHED  # odcięty mecz to nie zrzucony etap
+    assert not qualifier.check('tennis_score', True)  # po odcięciu kolejne etapy nic nie zmieniają
+    out = qualifier.annotate({})
+    assert out == {'cutoff_stage': 'h2h_win_rate', 'skipped_stages': 'odds'}
+    print("  ✅ PASS")
+
+
+def _fake_http_data(home_wins, meetings=5):
+    h2h = []
+    for i in range(meetings):
+        winner = 'home' if i < home_wins else 'away'
+        h2h.append({'home': 'Lech Poznań', 'away': 'Legia Warszawa', 'score': '2-1' if winner == 'home' else '0-1',
+                    'winner': winner, 'date': '01.01.25'})
+    form = ['W', 'L', 'D', 'W', 'W']
+    return {
+        'home_team': 'Lech Poznań', 'away_team': 'Legia Warszawa', 'match_time': '05.10.2025 18:00',
+        'h2h': h2h,
+        'home_form_overall': form, 'home_form_home': form,
+        'away_form_overall': form, 'away_form_away': form,
+    }
+
+
+class _FakeDriver:
+    current_url = 'about:blank'
+
+    def get(self, url):
+        raise AssertionError('process_match nie powinien ładować stron w tym teście')
+
+    def execute_script(self, *args):
+        return 0
+
+
+def _run_process_match(home_wins, meetings=5):
+    import livesport_h2h_scraper as scraper
+
+    calls = []
+    originals = (scraper.get_livesport_h2h, scraper.LIVESPORT_HTTP_H2H_AVAILABLE,
+                 scraper._advanced_form_from_http, scraper.fetch_odds_from_livesport)
+
+    def fake_advanced_form(http_data):
+        calls.append('advanced_form')
+        return originals[2](http_data)
+
+    def fake_odds(driver, url, sport):
+        calls.append('odds')
+        return {'odds_found': False}
+
+    scraper.get_livesport_h2h = lambda url: _fake_http_data(home_wins, meetings)
+    scraper.LIVESPORT_HTTP_H2H_AVAILABLE = True
+    scraper._advanced_form_from_http = fake_advanced_form
+    scraper.fetch_odds_from_livesport = fake_odds
+    try:
+        out = scraper.process_match('https://www.livesport.com/pl/mecz/pilka-nozna/abc/?mid=ABC123',
+                                    _FakeDriver(), sport='football')
+    finally:
+        (scraper.get_livesport_h2h, scraper.LIVESPORT_HTTP_H2H_AVAILABLE,
+         scraper._advanced_form_from_http, scraper.fetch_odds_from_livesport) = originals
+    return out, calls
+
+
+def test_process_match_skips_expensive_stages():
+    print("\n" + "=" * 60)
+    print("TEST 2: process_match - forma i kursy tylko dla kandydatów")
+    print("=" * 60)
+    out, calls = _run_process_match(home_wins=2)
+    assert out['qualifies'] is False and out['cutoff_stage'] == 'h2h_win_rate'
+    assert calls == []
+    assert out['skipped_stages'] == 'advanced_form,odds'
+    assert out['home_form'] == ['W', 'L', 'D', 'W', 'W']  # tania forma do wyświetlenia zostaje
+
+    out, calls = _run_process_match(home_wins=4)
+    assert out['qualifies'] is True and out['cutoff_stage'] == ''
+    assert calls == ['advanced_form', 'odds'] and out['skipped_stages'] == ''
+
+    # --deadline zrzucił formę: 2/2 H2H (< LOW_H2H_COUNT) nadal kwalifikuje, pomijana tylko forma
+    try:
+        set_shed_stages({'advanced_form'})
+        out, calls = _run_process_match(home_wins=2, meetings=2)
+    finally:
+        set_shed_stages(())
+    assert out['qualifies'] is True and out['cutoff_stage'] == ''
+    assert calls == ['odds'] and out['skipped_stages'] == 'advanced_form'
+    assert out['home_form'] == ['W', 'L', 'D', 'W', 'W']
+    print("  ✅ PASS")
+
+
+def test_summary():
+    print("\n" + "=" * 60)
+    print("TEST 3: Podsumowanie odcięć")
+    print("=" * 60)
+    rows = [
+        {'cutoff_stage': 'h2h_win_rate', 'skipped_stages': 'advanced_form,odds,forebet'},
+        {'cutoff_stage': 'h2h_win_rate', 'skipped_stages': 'advanced_form,odds'},
+        {'cutoff_stage': 'h2h_count', 'skipped_stages': 'advanced_form'},
+        {'cutoff_stage': '', 'skipped_stages': ''},
+        {'match_url': 'błąd ładowania - brak pól kwalifikacji'},
+    ]
+    summary = summarize_cutoffs(rows)
+    assert summary['matches'] == 4 and summary['qualified'] == 1
+    assert summary['cutoffs'] == {'h2h_win_rate': 2, 'h2h_count': 1}
+    assert summary['skipped'] == {'advanced_form': 3, 'odds': 2, 'forebet': 1}
+    print(f"  ✅ PASS: {summary}")
+
+
+if __name__ == '__main__':
+    try:
+        test_stage_order()
+        test_process_match_skips_expensive_stages()
+        test_summary()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
@@ -0,0 +1,126 @@
+"""
+Test dziennika przebiegu (run_journal).
+
+Sprawdza:
+1. Jedna linia JSONL na mecz, odczyt po ponownym otwarciu (--resume)
+2. Urwana ostatnia linia (awaria w trakcie zapisu) jest pomijana
+3. materialize(): kolejność URLi + pola FAZY 2 nałożone na wiersze FAZY 1
+4. Start bez --resume zaczyna dziennik od zera
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+from run_journal import RunJournal, journal_path_for, phase2_fields
+
+
+def _tmp_path():
+    directory = tempfile.mkdtemp(prefix='journal_test_')
+    return directory, journal_path_for(os.path.join(directory, 'livesport_h2h_2025-10-05_football_EMAIL.csv'))
+
+
+def test_append_and_resume():
+    print("=" * 60)
+    print("TEST 1: Zapis i wznowienie")
+    print("=" * 60)
+    directory, path = _tmp_path()
+    try:
+        assert path.endswith('_EMAIL.journal.jsonl')
+        journal = RunJournal(path)
+        journal.record_phase1(0, 'u0', {'match_url': 'u0', 'qualifies': True})
+        journal.record_phase1(1, 'u1', {'match_url': 'u1', 'qualifies': False})
+        journal.close()
+
+        with open(path, encoding='utf-8') as f:
+            assert len(f.readlines()) == 2
+
+        resumed = RunJournal(path, resume=True)
+        assert resumed.resumed_records == 2
+        assert resumed.done_urls(phase=1) == {'u0', 'u1'}
+        assert resumed.done_urls(phase=2) == set()
+        resumed.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_torn_last_line():
+    print("\n" + "=" * 60)
+    print("TEST 2: Urwana ostatnia linia")
+    print("=" * 60)
+    directory, path = _tmp_path()
+    try:
+        journal = RunJournal(path)
+        journal.record_phase1(0, 'u0', {'match_url': 'u0', 'qualifies': True})
+        journal.close()
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"phase": 1, "index": 1, "url": "u1", "info": {"match_')  # awaria w trakcie zapisu
+
+        resumed = RunJournal(path, resume=True)
+        assert resumed.done_urls() == {'u0'}
+        resumed.record_phase1(1, 'u1', {'match_url': 'u1', 'qualifies': False})
+        resumed.close()
+        assert [r['match_url'] for r in RunJournal(path, resume=True).materialize()] == ['u0', 'u1']
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_materialize_order_and_phase2():
+    print("\n" + "=" * 60)
+    print("TEST 3: materialize - kolejność i FAZA 2")
+    print("=" * 60)
+    directory, path = _tmp_path()
+    try:
+        journal = RunJournal(path)
+        # Wyniki puli workerów przychodzą w dowolnej kolejności
+        journal.record_phase1(2, 'u2', {'match_url': 'u2', 'qualifies': True, 'h2h_last5': [{'score': '2-1'}]})
+        journal.record_phase1(0, 'u0', {'match_url': 'u0', 'qualifies': True})
+        row = {'match_url': 'u0', 'qualifies': True, 'forebet_prediction': '1',
+               'sofascore_home_win_prob': 55, 'home_team': 'A'}
+        fields = phase2_fields(row)
+        assert fields == {'forebet_prediction': '1', 'sofascore_home_win_prob': 55}
+        journal.record_phase2('u0', fields)
+        journal.record_phase2('missing', {'forebet_prediction': 'X'})  # brak FAZY 1 - ignorowane
+
+        rows = journal.materialize(['u0', 'u1', 'u2'])
+        assert [r['match_url'] for r in rows] == ['u0', 'u2']
+        assert rows[0]['forebet_prediction'] == '1' and rows[0]['sofascore_home_win_prob'] == 55
+        assert rows[1]['h2h_last5'] == [{'score': '2-1'}]
+        assert journal.done_urls(phase=2) == {'u0', 'missing'}
+        journal.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_fresh_run_truncates():
+    print("\n" + "=" * 60)
+    print("TEST 4: Nowy przebieg bez --resume")
+    print("=" * 60)
+    directory, path = _tmp_path()
+    try:
+        journal = RunJournal(path)
+        journal.record_phase1(0, 'u0', {'match_url': 'u0'})
+        journal.close()
+        fresh = RunJournal(path)
+        assert fresh.done_urls() == set() and fresh.materialize() == []
+        fresh.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_append_and_resume()
+        test_torn_last_line()
+        test_materialize_order_and_phase2()
+        test_fresh_run_truncates()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
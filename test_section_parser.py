@@ -0,0 +1,146 @@
+"""
+Test częściowego parsowania strony meczu (section_parser).
+
+Sprawdza, że parse_match_sections() daje TE SAME wyniki co pełne
+BeautifulSoup(html, 'html.parser'):
+1. Zapisane strony H2H (tennis_h2h_*.html, debug_html/)
+2. Nagłówek, forma (metody 1-3) i kursy na syntetycznej stronie
+3. Częściowe drzewo jest mniejsze od pełnego
+"""
+
+import glob
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+from section_parser import parse_match_sections, LXML_AVAILABLE
+from livesport_h2h_scraper import parse_h2h_from_soup, extract_team_form, extract_betting_odds
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEADER_SELECTORS = [
+    "div.smv__participantRow.smv__homeParticipant a.participant__participantName",
+    "div.smv__participantRow.smv__awayParticipant a.participant__participantName",
+    "a.participant__participantName",
+    "div.duelParticipant__startTime",
+]
+
+
+def _fixture_files():
+    files = glob.glob(os.path.join(BASE_DIR, 'tennis_h2h_*.html'))
+    files += glob.glob(os.path.join(BASE_DIR, 'debug_html', '*.html'))
+    return sorted(files)
+
+
+def _outputs(soup, home='', away=''):
+    """Wszystko, co process_match czyta ze strony."""
+    return {
+        'title': soup.title.string if soup.title else None,
+        'header': [[el.get_text(strip=True) for el in soup.select(sel)] for sel in HEADER_SELECTORS],
+        'h2h': parse_h2h_from_soup(soup, home),
+        'home_form': extract_team_form(soup, None, 'home', home),
+        'away_form': extract_team_form(soup, None, 'away', away),
+        'odds': extract_betting_odds(soup),
+    }
+
+
+def test_fixtures_identical():
+    print("=" * 60)
+    print("TEST 1: Zapisane strony - wyniki identyczne z pełnym parsowaniem")
+    print("=" * 60)
+    files = _fixture_files()
+    assert files, "brak plików tennis_h2h_*.html / debug_html/"
+    with_h2h = 0
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        full = _outputs(BeautifulSoup(html, 'html.parser'))
+        home = full['header'][2][0] if full['header'][2] else ''
+        full = _outputs(BeautifulSoup(html, 'html.parser'), home)
+        partial = _outputs(parse_match_sections(html), home)
+        assert partial == full, f"{os.path.basename(path)}: {partial} != {full}"
+        with_h2h += bool(full['h2h'])
+    assert with_h2h >= 1, "żadna strona nie zawiera wierszy H2H"
+    print(f"  ✅ PASS: {len(files)} stron ({with_h2h} z H2H)")
+
+
+SYNTHETIC_PAGE = """<!DOCTYPE html>
+<html><head><title>Legia - Lech 12.05.2025 18:00 | Livesport</title>
+<script type="application/ld+json">{"@type": "SportsEvent", "name": "Legia - Lech"}</script>
+<script>window.environment = {"odds": "1.23"};</script></head>
+<body>
+<div class="header"><nav>Menu <span>W</span></nav></div>
+<div class="duelParticipant">
+  <div class="duelParticipant__startTime"><div>12.05.2025 18:00</div></div>
+  <div class="smv__participantRow smv__homeParticipant">
+    <a class="participant__participantName" href="/druzyna/legia/">Legia</a>
+    <div class="smv__form"><div class="form__cell form__cell--win"></div><div class="form__cell form__cell--loss"></div>
+    <div class="form__cell form__cell--draw"></div></div>
+  </div>
+  <div class="smv__participantRow smv__awayParticipant">
+    <a class="participant__participantName" href="/druzyna/lech/">Lech &amp; Co</a>
+  </div>
+</div>
+<div class="sidebar"><p><span>L</span></p><div>
+<span>D</span></div><span>W
+</span></div>
+<div class="recentForm__row"><span>2 - 1</span></div>
+<div class="oddsRow"><button class="oddsCell">1.85</button><button class="oddsCell">2.10</button></div>
+<div data-home-odds="1.90" data-away-odds="2.05"></div>
+<div class="h2h__section"><div class="section__title">Pojedynki bezpośrednie</div>
+  <a class="h2h__row"><span class="h2h__date">01.03.25</span>
+    <span class="h2h__homeParticipant"><span class="h2h__participantInner">Legia</span></span>
+    <span class="h2h__awayParticipant"><span class="h2h__participantInner">Lech</span></span>
+    <span class="h2h__result"><span>2</span><span>0</span></span></a>
+</div>
+<footer><div>Reklama</div></footer>
+</body></html>"""
+
+
+def test_synthetic_page_identical():
+    print("\n" + "=" * 60)
+    print("TEST 2: Syntetyczna strona - nagłówek, forma, kursy, H2H")
+    print("=" * 60)
+    full = _outputs(BeautifulSoup(SYNTHETIC_PAGE, 'html.parser'), 'Legia', 'Lech')
+    partial = _outputs(parse_match_sections(SYNTHETIC_PAGE), 'Legia', 'Lech')
+    assert partial == full, f"{partial} != {full}"
+    assert full['header'][1] == ['Lech & Co'] and full['header'][3] == ['12.05.2025 18:00']
+    assert full['home_form'] == ['W', 'L', 'D']
+    assert full['odds'] == {'home_odds': 1.90, 'away_odds': 2.05}
+    assert len(full['h2h']) == 1
+
+    # Forma metodą 2 (pojedyncze litery W/L/D rozsiane po stronie)
+    no_containers = SYNTHETIC_PAGE.replace('smv__form', 'smv__stats')
+    full2 = extract_team_form(BeautifulSoup(no_containers, 'html.parser'), None, 'home', 'Legia')
+    partial2 = extract_team_form(parse_match_sections(no_containers), None, 'home', 'Legia')
+    assert partial2 == full2 and len(full2) >= 3, (partial2, full2)
+    print(f"  ✅ PASS: forma={full['home_form']} forma(metoda 2)={full2} kursy={full['odds']}")
+
+
+def test_partial_tree_is_smaller():
+    print("\n" + "=" * 60)
+    print("TEST 3: Częściowe drzewo mniejsze od pełnego")
+    print("=" * 60)
+    if not LXML_AVAILABLE:
+        print("  ⚠️ SKIP: brak lxml (pełne parsowanie)")
+        return
+    largest = max(_fixture_files(), key=os.path.getsize)
+    with open(largest, encoding='utf-8') as f:
+        html = f.read()
+    full_nodes = len(BeautifulSoup(html, 'html.parser').find_all(True))
+    partial_nodes = len(parse_match_sections(html).find_all(True))
+    assert partial_nodes < full_nodes, (partial_nodes, full_nodes)
+    print(f"  ✅ PASS: {partial_nodes} / {full_nodes} elementów")
+
+
+if __name__ == '__main__':
+    try:
+        test_fixtures_identical()
+        test_synthetic_page_identical()
+        test_partial_tree_is_smaller()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
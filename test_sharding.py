@@ -0,0 +1,155 @@
+"""
+Test podziału na shardy i scalania wyników (sharding).
+
+Sprawdza:
+1. Stabilny, rozłączny podział URLi wg ID wydarzenia (?mid=)
+2. Scalanie CSV + _predictions.json do plików jak z jednej maszyny
+3. Scalanie eksportu frontendu (results/matches_*.json) i brakujące shardy
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+import sharding
+from sharding import (event_id, find_shard_files, parse_shard, select_shard, shard_arg, shard_manifest, shard_of,
+                      shard_path, write_manifest)
+
+URLS = [f"https://www.livesport.com/pl/mecz/pilka-nozna/team-{i}/rywal-{i}/?mid=Ab{i:06d}" for i in range(60)]
+
+
+def _row(url, i):
+    row = {'match_url': url, 'home_team': f'Team {i}', 'away_team': f'Rywal {i}', 'qualifies': i % 3 == 0,
+           'win_rate': round(0.2 * (i % 5), 1), 'h2h_count': i % 6}
+    if i % 4 == 0:
+        row['forebet_prediction'] = '1'
+    # Dodatkowe kolumny tylko w pojedynczych wierszach: 58 w shardzie 1, 10 w shardzie 3
+    if i == 10:
+        row['odds_source'] = 'bet365'
+    if i == 58:
+        row['gemini_recommendation'] = 'HIGH'
+    return row
+
+
+def test_stable_partition():
+    print("=" * 60)
+    print("TEST 1: Stabilny podział wg ID wydarzenia")
+    print("=" * 60)
+    assert parse_shard('2/3') == (2, 3)
+    for bad in ('0/3', '4/3', '1-3', '', '1/0'):
+        try:
+            parse_shard(bad)
+            assert False, bad
+        except ValueError:
+            pass
+    # --shard walidowany przez argparse: błąd użycia (exit 2) zamiast tracebacku
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shard', type=shard_arg)
+    assert parser.parse_args(['--shard', '2/3']).shard == '2/3'
+    try:
+        shard_arg('4/3')
+        assert False, 'shard_arg powinien odrzucić 4/3'
+    except argparse.ArgumentTypeError as e:
+        assert '4/3' in str(e)
+    assert event_id(URLS[5]) == 'Ab000005'
+    # Ten sam mecz z innym sufiksem URLa (h2h/kursy) trafia do tego samego shardu
+    assert shard_of(URLS[5], 3) == shard_of(URLS[5].replace('/?mid', '/h2h/ogolem/?mid'), 3)
+    assert event_id('https://www.livesport.com/pl/mecz/x/y/') == '/pl/mecz/x/y'
+
+    shards = [select_shard(URLS, (i, 3)) for i in (1, 2, 3)]
+    assert sorted(sum(shards, [])) == sorted(URLS)
+    assert all(shards) and len(set(sum(shards, []))) == len(URLS)
+    # Kolejność wejściowa zachowana w obrębie shardu
+    assert all(shard == [u for u in URLS if u in shard] for shard in shards)
+    assert shard_path('outputs/x_EMAIL.csv', (2, 3)) == 'outputs/x_EMAIL_shard2of3.csv'
+    print("  ✅ PASS")
+
+
+def _write_shard_outputs(directory, shard):
+    urls = select_shard(URLS, shard)
+    rows = [_row(url, URLS.index(url)) for url in urls]
+    csv_path = shard_path(os.path.join(directory, 'livesport_h2h_2025-10-05_football_EMAIL.csv'), shard)
+    pd.DataFrame(rows).to_csv(csv_path, index=False, encoding='utf-8-sig')
+    write_manifest(csv_path, shard, URLS)
+    qualifying = [r for r in rows if r['qualifies']]
+    if qualifying:
+        with open(csv_path.replace('.csv', '_predictions.json'), 'w', encoding='utf-8') as f:
+            json.dump(qualifying, f, ensure_ascii=False, indent=2)
+    frontend = {'date': '2025-10-05', 'sport': 'football', 'generatedAt': f'2025-10-05T10:0{shard[0]}:00',
+                'stats': {}, 'shard': shard_manifest(shard, URLS),
+                'matches': [{'matchUrl': r['match_url'], 'qualifies': r['qualifies'],
+                             'formAdvantage': r['h2h_count'] > 3} for r in rows]}
+    with open(shard_path(os.path.join(directory, 'matches_2025-10-05_football.json'), shard), 'w',
+              encoding='utf-8') as f:
+        json.dump(frontend, f, ensure_ascii=False, indent=2)
+
+
+def test_merge_csv_and_predictions():
+    print("\n" + "=" * 60)
+    print("TEST 2: Scalanie CSV + predykcji jak z jednej maszyny")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='sharding_test_')
+    try:
+        for i in (1, 2, 3):
+            _write_shard_outputs(directory, (i, 3))
+        base = os.path.join(directory, 'livesport_h2h_2025-10-05_football_EMAIL.csv')
+        single = os.path.join(directory, 'single.csv')
+        rows = [_row(url, i) for i, url in enumerate(URLS)]
+        pd.DataFrame(rows).to_csv(single, index=False, encoding='utf-8-sig')
+
+        result = sharding.merge_csv(base)
+        assert result == {'rows': 60, 'predictions': 20}
+        with open(base, encoding='utf-8-sig') as f, open(single, encoding='utf-8-sig') as g:
+            assert f.read() == g.read()
+        with open(base.replace('.csv', '_predictions.json'), encoding='utf-8') as f:
+            assert json.load(f) == [r for r in rows if r['qualifies']]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_merge_frontend_and_missing_shard():
+    print("\n" + "=" * 60)
+    print("TEST 3: Eksport frontendu i brakujący shard")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='sharding_test_')
+    try:
+        for i in (1, 3):
+            _write_shard_outputs(directory, (i, 3))
+        base_json = os.path.join(directory, 'matches_2025-10-05_football.json')
+        base_csv = os.path.join(directory, 'livesport_h2h_2025-10-05_football_EMAIL.csv')
+        try:
+            find_shard_files(base_csv)
+            assert False, "brakujący shard 2/3 nie wykryty"
+        except ValueError as e:
+            assert '[2]' in str(e)
+        assert sharding.main(['merge', base_csv]) == 1
+
+        _write_shard_outputs(directory, (2, 3))
+        assert sharding.main(['merge', base_csv, base_json]) == 0
+        with open(base_json, encoding='utf-8') as f:
+            merged = json.load(f)
+        assert [m['matchUrl'] for m in merged['matches']] == URLS
+        assert merged['stats'] == {'total': 60, 'qualifying': 20,
+                                   'formAdvantage': sum(1 for i in range(60) if i % 6 > 3)}
+        assert merged['generatedAt'] == '2025-10-05T10:03:00' and 'shard' not in merged
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_stable_partition()
+        test_merge_csv_and_predictions()
+        test_merge_frontend_and_missing_shard()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
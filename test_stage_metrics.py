@@ -0,0 +1,157 @@
+"""
+Test metryk czasów etapów (stage_metrics).
+
+Sprawdza:
+1. Percentyle (najbliższa ranga)
+2. Plik JSONL per przebieg, rekordy retry (strona / mecz), p50/p90/p99 per sport i etap
+3. Plik Prometheus i endpoint GET /metrics w api_server
+4. Sprzątanie plików starych przebiegów przy starcie nowego
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from stage_metrics import StageMetrics, percentile, current_run_id, RUN_ID_ENV
+
+
+def test_percentile():
+    print("=" * 60)
+    print("TEST 1: Percentyle (najbliższa ranga)")
+    print("=" * 60)
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.9) == 90.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([3.0], 0.99) == 3.0 and percentile([], 0.5) == 0.0
+    print("  ✅ PASS")
+
+
+def _record_run(metrics):
+    for i in range(10):
+        metrics.record_match('football', {'h2h': 1.0 + i, 'qualify': 0.5, 'forebet': 0.0}, 2.0 + i,
+                             url=f'u{i}', qualifies=(i % 2 == 0))
+    metrics.record_match('basketball', {'h2h': 4.0, 'qualify': 0.2}, 4.5, url='b1')
+    metrics.record_retry('football', 'u3')
+    metrics.record_retry('football', 'u7')
+    metrics.record_retry('football', 'u7', level='page')
+
+
+def test_summary_per_sport_and_stage():
+    print("\n" + "=" * 60)
+    print("TEST 2: Podsumowanie przebiegu")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='stage_metrics_test_')
+    old_run = os.environ.get(RUN_ID_ENV)
+    try:
+        metrics = StageMetrics(directory=directory)
+        os.environ[RUN_ID_ENV] = 'poprzedni-przebieg'
+        metrics.record_match('football', {'h2h': 99.0}, 99.0)
+        os.environ[RUN_ID_ENV] = 'test-run'
+        assert current_run_id() == 'test-run'
+        _record_run(metrics)
+
+        # Każdy przebieg we własnym pliku - podsumowanie nie czyta poprzednich
+        assert sorted(os.listdir(directory)) == ['poprzedni-przebieg.jsonl', 'test-run.jsonl']
+        with open(metrics.path_for(), encoding='utf-8') as f:
+            assert len(f.readlines()) == 14  # 11 meczów + 3 retry
+
+        summary = metrics.summarize()
+        assert summary['run_id'] == 'test-run'
+        assert summary['matches'] == {'football': 10, 'basketball': 1}
+        assert summary['retries'] == {'football': {'match': 2, 'page': 1}}
+        h2h = summary['stages']['football']['h2h']
+        assert h2h['count'] == 10 and h2h['p50'] == 5.0 and h2h['p90'] == 9.0 and h2h['p99'] == 10.0
+        assert h2h['sum'] == 55.0
+        assert 'forebet' not in summary['stages']['football']  # etap pominięty (0.0)
+        assert summary['stages']['football']['total']['p50'] == 6.0
+        assert summary['stages']['basketball']['h2h']['count'] == 1
+    finally:
+        if old_run is None:
+            os.environ.pop(RUN_ID_ENV, None)
+        else:
+            os.environ[RUN_ID_ENV] = old_run
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"  ✅ PASS: football h2h {h2h}")
+
+
+def test_prometheus_file_and_endpoint():
+    print("\n" + "=" * 60)
+    print("TEST 3: Prometheus + GET /metrics")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='stage_metrics_test_')
+    old_run = os.environ.get(RUN_ID_ENV)
+    try:
+        os.environ[RUN_ID_ENV] = 'prom-run'
+        metrics = StageMetrics(directory=os.path.join(directory, 'stage_timings'))
+        _record_run(metrics)
+        prom_path = os.path.join(directory, 'stage_metrics.prom')
+        metrics.write_summary(metrics.summarize(), os.path.join(directory, 'summary.json'), prom_path)
+
+        with open(prom_path, encoding='utf-8') as f:
+            text = f.read()
+        assert '# TYPE livesport_stage_seconds summary' in text
+        assert 'livesport_stage_seconds{sport="football",stage="h2h",quantile="0.9"} 9.0' in text
+        assert 'livesport_stage_seconds_count{sport="football",stage="h2h"} 10' in text
+        assert '# TYPE livesport_match_retries_total counter' in text
+        assert 'livesport_match_retries_total{sport="football",level="match"} 2' in text
+        assert 'livesport_match_retries_total{sport="football",level="page"} 1' in text
+        assert 'livesport_matches_total{sport="basketball"} 1' in text
+
+        import api_server
+        original = api_server.PROMETHEUS_METRICS_FILE
+        api_server.PROMETHEUS_METRICS_FILE = prom_path
+        try:
+            client = api_server.app.test_client()
+            response = client.get('/metrics')
+            assert response.status_code == 200
+            assert response.mimetype == 'text/plain'
+            assert response.get_data(as_text=True) == text
+            api_server.PROMETHEUS_METRICS_FILE = os.path.join(directory, 'brak.prom')
+            assert client.get('/metrics').status_code == 404
+        finally:
+            api_server.PROMETHEUS_METRICS_FILE = original
+    finally:
+        if old_run is None:
+            os.environ.pop(RUN_ID_ENV, None)
+        else:
+            os.environ[RUN_ID_ENV] = old_run
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_prune_old_runs():
+    print("\n" + "=" * 60)
+    print("TEST 4: Sprzątanie starych przebiegów")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='stage_metrics_test_')
+    try:
+        now = time.time()
+        for i in range(5):
+            path = os.path.join(directory, f'run-{i}.jsonl')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{}\n')
+            os.utime(path, (now - 100 * (5 - i), now - 100 * (5 - i)))  # run-4 najnowszy
+        metrics = StageMetrics(directory=directory, keep_runs=2)
+        assert metrics.prune_runs() == 3
+        assert sorted(os.listdir(directory)) == ['run-3.jsonl', 'run-4.jsonl']
+        assert metrics.prune_runs() == 0
+        assert StageMetrics(directory=os.path.join(directory, 'brak')).prune_runs() == 0
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_percentile()
+        test_summary_per_sport_and_stage()
+        test_prometheus_file_and_endpoint()
+        test_prune_old_runs()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
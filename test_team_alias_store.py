@@ -0,0 +1,206 @@
+"""
+Test tabeli aliasów drużyn między źródłami (team_alias_store).
+
+Sprawdza:
+1. Zapis potwierdzonych dopasowań (próg fuzzy, AI zawsze, konflikt = wyższy wynik) i resolve_pair
+2. Narzędzia: list / prune (filtry, dry run) / add / stats
+3. Forebet: alias z dopasowania AI - kolejne wyszukanie bez fuzzy i bez AI; SofaScore: alias -> event ID
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import forebet_index
+import forebet_scraper
+import sofascore_scraper
+import team_alias_store
+from forebet_page_cache import ForebetPageCache
+from team_alias_store import TeamAliasStore
+
+PAGE = ('<html><body><div class="schema">'
+        '<div class="rcnt"><span class="homeTeam">Resovia</span><span class="awayTeam">Kedzierzyn-Kozle</span>'
+        '<div class="fprc"><span>55</span><span>45</span></div><div class="predict"><span class="forepr">1</span>'
+        '</div></div>'
+        '<div class="rcnt"><span class="homeTeam">Projekt Warszawa</span><span class="awayTeam">Jastrzebski Wegiel'
+        '</span><div class="fprc"><span>40</span><span>60</span></div></div>'
+        '</div></body></html>')
+
+
+def test_record_and_resolve():
+    print("=" * 60)
+    print("TEST 1: Zapis dopasowań i resolve_pair")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='team_alias_test_')
+    try:
+        store = TeamAliasStore(path=os.path.join(directory, 'aliases.sqlite'), min_score=0.6)
+        assert store.resolve_pair('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'ZAKSA') is None
+        assert store.misses == 1
+
+        # Fuzzy poniżej progu - nie zapisane; AI - zawsze
+        assert not store.record('volleyball', 'livesport', 'forebet', 'ZAKSA', 'Kedzierzyn-Kozle', 0.2)
+        assert store.record('volleyball', 'livesport', 'forebet', 'ZAKSA', 'Kedzierzyn-Kozle', 0.2, method='ai')
+        store.record_pair('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'ZAKSA',
+                          'Resovia', 'Kedzierzyn-Kozle', 0.7, 0.2)
+        assert store.recorded == 2
+        # Klucz znormalizowany: wielkość liter i polskie znaki bez znaczenia
+        assert store.resolve_pair('volleyball', 'livesport', 'forebet', 'RESOVIA RZESZOW', 'Zaksa') == \
+            ('Resovia', 'Kedzierzyn-Kozle')
+        # Inny sport / inny cel to osobne klucze
+        assert store.resolve('football', 'livesport', 'forebet', 'ZAKSA') is None
+        assert store.resolve('volleyball', 'livesport', 'sofascore', 'ZAKSA') is None
+
+        # Konflikt: słabszy inny alias nie nadpisuje, mocniejszy tak; ten sam alias nie obniża wyniku
+        assert not store.record('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'Resovia II', 0.65)
+        assert store.record('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'Resovia', 0.61)
+        [entry] = store.entries(name='Resovia Rzeszow')
+        assert (entry['alias'], entry['score']) == ('Resovia', 0.7)
+        assert store.record('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'Asseco Resovia', 0.9)
+        assert store.resolve('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów') == 'Asseco Resovia'
+
+        store.mark_used('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'ZAKSA')
+        assert [e['hits'] for e in store.entries()] == [1, 1] and store.hits == 1
+
+        os.environ['TEAM_ALIASES'] = '0'
+        try:
+            assert store.resolve_pair('volleyball', 'livesport', 'forebet', 'Resovia Rzeszów', 'ZAKSA') is None
+        finally:
+            del os.environ['TEAM_ALIASES']
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_inspect_and_prune():
+    print("\n" + "=" * 60)
+    print("TEST 2: Narzędzia list / prune / add / stats")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='team_alias_test_')
+    db = os.path.join(directory, 'aliases.sqlite')
+    now = [1_000_000.0]
+    try:
+        assert team_alias_store.main(['--db', db, 'stats']) == 1  # brak bazy
+        store = TeamAliasStore(path=db, min_score=0.5, clock=lambda: now[0])
+        store.record('football', 'livesport', 'forebet', 'Legia Warszawa', 'Legia', 0.8)
+        store.record('football', 'livesport', 'forebet', 'Lech Poznań', 'Lechia Gdansk', 0.52)
+        store.record('football', 'livesport', 'sofascore', 'Lech Poznań', 'Lech Poznan', 0.95)
+        now[0] += 40 * 86400
+        store.record('football', 'livesport', 'forebet', 'Wisła Kraków', 'Wisla Krakow', 0.3, method='ai')
+
+        assert len(store.entries(target='forebet')) == 3
+        assert [e['alias'] for e in store.entries(below=0.6)] == ['Lechia Gdansk', 'Wisla Krakow']
+        assert [e['alias'] for e in store.entries(unused_days=30)] == ['Lechia Gdansk', 'Legia', 'Lech Poznan']
+        try:
+            store.prune()
+            assert False, 'prune bez filtra powinien rzucić ValueError'
+        except ValueError:
+            pass
+        store.close()
+
+        assert team_alias_store.main(['--db', db, 'prune']) == 1
+        assert team_alias_store.main(['--db', db, 'prune', '--name', 'Lech Poznan', '--target', 'forebet',
+                                      '--dry-run']) == 0
+        assert team_alias_store.main(['--db', db, 'prune', '--name', 'Lech Poznan', '--target', 'forebet']) == 0
+        assert team_alias_store.main(['--db', db, 'add', 'football', 'livesport', 'forebet', 'Lech Poznań',
+                                      'Lech']) == 0
+        assert team_alias_store.main(['--db', db, 'list', '--method', 'ai']) == 0
+        assert team_alias_store.main(['--db', db, 'stats']) == 0
+
+        store = TeamAliasStore(path=db)
+        assert store.resolve('football', 'livesport', 'forebet', 'Lech Poznań') == 'Lech'
+        assert store.resolve('football', 'livesport', 'sofascore', 'Lech Poznań') == 'Lech Poznan'
+        assert store.prune(method='ai') == 1
+        stats = store.stats()
+        assert stats['livesport -> forebet']['aliases'] == 2 and stats['livesport -> sofascore']['aliases'] == 1
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def test_sources_skip_fuzzy_and_ai():
+    print("\n" + "=" * 60)
+    print("TEST 3: Alias pomija fuzzy i AI (Forebet, SofaScore)")
+    print("=" * 60)
+    originals = (forebet_scraper.forebet_page_cache, forebet_scraper.team_alias_store,
+                 forebet_scraper.find_forebet_match_with_gemini, sofascore_scraper.team_alias_store,
+                 sofascore_scraper._retry_request_with_session)
+    cwd = os.getcwd()
+    directory = tempfile.mkdtemp(prefix='team_alias_test_')
+    ai_calls = []
+
+    def fake_ai(home_team, away_team, available_matches):
+        ai_calls.append((home_team, away_team))
+        return 'Resovia', 'Kedzierzyn-Kozle'
+
+    forebet_index.clear_indexes()
+    try:
+        os.chdir(directory)
+        store = TeamAliasStore(path=os.path.join(directory, 'aliases.sqlite'))
+        forebet_scraper.forebet_page_cache = ForebetPageCache(None)
+        forebet_scraper.forebet_page_cache.put('volleyball', '2031-05-05', PAGE)
+        forebet_scraper.team_alias_store = sofascore_scraper.team_alias_store = store
+        forebet_scraper.find_forebet_match_with_gemini = fake_ai
+
+        # 1. uruchomienie: fuzzy nie znajduje, AI tak -> alias zapisany
+        result = forebet_scraper.search_forebet_prediction('Rzeszów', 'ZAKSA', '2031-05-05',
+                                                           sport='volleyball', use_xvfb=False)
+        assert result['success'] and result['home_team_forebet'] == 'Resovia' and len(ai_calls) == 1
+        assert [e['method'] for e in store.entries()] == ['ai', 'ai']
+        html = forebet_scraper.forebet_page_cache.get('volleyball', '2031-05-05').html
+        index, _ = forebet_index.get_index('volleyball', '2031-05-05', html, forebet_scraper.normalize_team_name,
+                                           forebet_scraper.similarity_score)
+        lookups = index.lookups
+        forebet_scraper._forebet_cache.clear()  # kolejne uruchomienie - bez cache wyników
+
+        # 2. uruchomienie: alias - bez lookup (fuzzy) i bez AI
+        result = forebet_scraper.search_forebet_prediction('Rzeszów', 'ZAKSA', '2031-05-05',
+                                                           sport='volleyball', use_xvfb=False)
+        assert result['success'] and result['prediction'] == '1'
+        assert len(ai_calls) == 1 and index.lookups == lookups and store.hits == 1
+
+        # SofaScore: dopasowanie fuzzy zapisane, kolejne wyszukanie z aliasu
+        events = {'events': [{'id': 7, 'homeTeam': {'name': 'Asseco Resovia'}, 'awayTeam': {'name': 'ZAKSA'}},
+                             {'id': 8, 'homeTeam': {'name': 'Projekt Warszawa'},
+                              'awayTeam': {'name': 'Jastrzębski Węgiel'}}]}
+        sofascore_scraper._retry_request_with_session = lambda url, timeout=10: _FakeResponse(events)
+        assert sofascore_scraper._search_event_for_date('Resovia Rzeszów', 'ZAKSA Kędzierzyn-Koźle',
+                                                        'volleyball', '2031-05-05') == 7
+        assert store.resolve('volleyball', 'livesport', 'sofascore', 'Resovia Rzeszów') == 'Asseco Resovia'
+        assert sofascore_scraper._search_event_for_date('Resovia Rzeszów', 'ZAKSA Kędzierzyn-Koźle',
+                                                        'volleyball', '2031-05-05') == 7
+        assert store.hits == 2
+        store.close()
+    finally:
+        os.chdir(cwd)
+        (forebet_scraper.forebet_page_cache, forebet_scraper.team_alias_store,
+         forebet_scraper.find_forebet_match_with_gemini, sofascore_scraper.team_alias_store,
+         sofascore_scraper._retry_request_with_session) = originals
+        forebet_scraper._forebet_cache.clear()
+        forebet_index.clear_indexes()
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_record_and_resolve()
+        test_inspect_and_prune()
+        test_sources_skip_fuzzy_and_ai()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
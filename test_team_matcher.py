@@ -0,0 +1,118 @@
+"""
+Test wspólnego silnika dopasowania nazw drużyn (team_matcher).
+
+Sprawdza:
+1. Normalizacja, trigramy i wektorowy Dice; best_match/match_all bez scoringu źródła
+2. Shortlista + scoring źródła daje ten sam wynik co pełna pętla (forebet similarity_score)
+3. Źródła: dopasowanie wyników do predykcji (ResultScraper), wydarzeń SofaScore i URLi Livesport (Forebet-first)
+"""
+
+import random
+import sys
+
+from forebet_first_scraper import find_livesport_match_url
+from forebet_scraper import find_best_match, normalize_team_name, similarity_score
+from result_scraper import MatchResult, ResultScraper
+from sofascore_scraper import _shortlisted_events
+from team_matcher import TeamMatcher, best_match, get_matcher, match_all, normalize_name, trigrams
+
+CLUBS = ['Legia Warszawa', 'Lech Poznań', 'Wisła Kraków', 'Cracovia', 'Górnik Zabrze', 'Śląsk Wrocław',
+         'Jagiellonia Białystok', 'Pogoń Szczecin', 'Raków Częstochowa', 'Zagłębie Lubin', 'Piast Gliwice',
+         'Widzew Łódź', 'Motor Lublin', 'Korona Kielce', 'Stal Mielec', 'Puszcza Niepołomice',
+         'Resovia Rzeszów', 'Asseco Resovia', 'Trefl Gdańsk', 'Projekt Warszawa', 'ZAKSA Kędzierzyn-Koźle',
+         'Real Madrid', 'Atletico Madrid', 'Manchester United', 'Manchester City', 'Paris Saint-Germain']
+
+
+def test_index_and_dice():
+    print("=" * 60)
+    print("TEST 1: Indeks trigramów i wektorowy Dice")
+    print("=" * 60)
+    assert normalize_name('  Śląsk  Wrocław! ') == 'slask wroclaw'
+    assert normalize_name('Łódź-Widzew') == 'lodz widzew'
+    assert trigrams('ab') == {'  a', ' ab', 'ab '} and trigrams('') == set()
+
+    matcher = TeamMatcher(CLUBS)
+    scores = matcher.dice('Legia Warszawa')
+    assert len(scores) == len(CLUBS) and scores[0] == 1.0
+    assert scores.argmax() == 0 and 0 < scores[CLUBS.index('Projekt Warszawa')] < 1
+    assert matcher.best_match('slask wroclaw') == ('Śląsk Wrocław', 1.0)
+    name, score = matcher.best_match('Slask Wroclaw II')
+    assert name == 'Śląsk Wrocław' and 0.5 < score < 1
+    assert matcher.best_match('Zupełnie Inna Nazwa', threshold=0.6) == (None, 0.0)
+    assert matcher.shortlist('Manchester Utd', limit=2) == [CLUBS.index('Manchester United'),
+                                                           CLUBS.index('Manchester City')]
+    assert [m[0] for m in matcher.match_all(['Lech Poznan', 'Cracovia Krakow'])] == ['Lech Poznań', 'Cracovia']
+
+    # Funkcje modułu: ten sam indeks dla tej samej listy kandydatów
+    assert best_match('Pogon Szczecin', CLUBS)[0] == 'Pogoń Szczecin'
+    assert get_matcher(CLUBS) is get_matcher(list(CLUBS))
+    assert match_all(['x'], []) == [(None, 0.0)] and best_match('', CLUBS) == (None, 0.0)
+    print("  ✅ PASS")
+
+
+def test_shortlist_agrees_with_full_loop():
+    print("\n" + "=" * 60)
+    print("TEST 2: Shortlista + similarity_score = pełna pętla")
+    print("=" * 60)
+    rng = random.Random(3)
+    cities = ['Warszawa', 'Kraków', 'Gdańsk', 'Poznań', 'Lublin', 'Rzeszów', 'Opole', 'Kielce', 'Toruń', 'Płock',
+              'Madrid', 'Porto', 'Lyon', 'Praha', 'Wien', 'Zagreb', 'Sofia', 'Riga']
+    stems = ['Legia', 'Wisła', 'Polonia', 'Stal', 'Górnik', 'Olimpia', 'Victoria', 'Sparta', 'Slavia',
+             'Rapid', 'Dynamo', 'Akademia', 'Racing', 'Hajduk', 'Levski', 'Zenit']
+    teams = sorted({f"{rng.choice(stems)} {rng.choice(cities)}" for _ in range(400)})
+    matcher = TeamMatcher(teams, normalize=normalize_team_name, score=similarity_score)
+    agree = 0
+    queries = [name.replace('ł', 'l').replace('ó', 'o') for name in rng.sample(teams, 40)]
+    queries += ['KS ' + rng.choice(teams) for _ in range(10)]
+    for query in queries:
+        full = max(teams, key=lambda candidate: similarity_score(query, candidate))
+        name, score = matcher.best_match(query)
+        agree += name == full or abs(score - similarity_score(query, full)) < 1e-9
+    assert agree == len(queries), f"{agree}/{len(queries)}"
+    # forebet_scraper.find_best_match korzysta z silnika
+    assert find_best_match('Legia Warszawa', CLUBS) == ('Legia Warszawa', 1.0)
+    assert find_best_match('', CLUBS) == (None, 0.0)
+    print("  ✅ PASS")
+
+
+def test_sources_use_matcher():
+    print("\n" + "=" * 60)
+    print("TEST 3: Wyniki -> predykcje i wydarzenia SofaScore")
+    print("=" * 60)
+    predictions = [{'id': i, 'home_team': home, 'away_team': away}
+                   for i, (home, away) in enumerate(zip(CLUBS[::2], CLUBS[1::2]))]
+    results = [MatchResult('m1', 'Wisla Krakow', 'Cracovia', 2, 1, '1', 'football', '2025-10-05'),
+               MatchResult('m2', 'Zaksa Kedzierzyn-Kozle', 'Real Madrid CF', 0, 0, 'X', 'football', '2025-10-05'),
+               MatchResult('m3', 'Nieznani', 'Ktokolwiek', 1, 3, '2', 'football', '2025-10-05')]
+    matched = ResultScraper().match_with_predictions(results, predictions)
+    assert [m['prediction_id'] for m in matched] == [1, 10]
+    assert matched[0]['actual_result'] == '1' and matched[1]['actual_result'] == 'X'
+
+    events = [{'id': 100 + i, 'homeTeam': {'name': home}, 'awayTeam': {'name': away}}
+              for i, (home, away) in enumerate(zip(CLUBS[::2], CLUBS[1::2]))]
+    events.append({'id': 999, 'homeTeam': {'name': ''}, 'awayTeam': {'name': 'X'}})
+    shortlisted = _shortlisted_events('Legia', 'Lech Poznan', events)
+    assert shortlisted[0][0]['id'] == 100 and len(shortlisted) < len(events)
+    assert all(event['id'] != 999 for event, _, _ in shortlisted)
+
+    # Forebet-first: wszystkie mecze dnia (nie tylko pierwsze 50), kandydaci z shortlisty
+    urls = [f"https://www.livesport.com/pl/mecz/pilka-nozna/klub-{i}-Ab{i:06d}/rywal-{i}-Cd{i:06d}/?mid=Ef{i:06d}"
+            for i in range(3000)]
+    target = 'https://www.livesport.com/pl/mecz/pilka-nozna/legia-warszawa-Ab0X1Y2Z/lech-poznan-Cd0X1Y2Z/?mid=EfLEGIA1'
+    urls.insert(2500, target)
+    assert find_livesport_match_url(urls, 'Legia Warszawa', 'Lech Poznań') == target
+    assert find_livesport_match_url(urls, 'Legia Warszawa', 'Górnik Zabrze') is None
+    assert find_livesport_match_url([], 'Legia', 'Lech') is None
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_index_and_dice()
+        test_shortlist_agrees_with_full_loop()
+        test_sources_use_matcher()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)
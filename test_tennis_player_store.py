@@ -0,0 +1,169 @@
+"""
+Test magazynu profili zawodników (tennis_player_store + tennis_scraper_v3_helpers).
+
+Sprawdza:
+1. Klucz = znormalizowana nazwa, TTL osobno dla każdego pola
+2. Funkcje pomocnicze czytają magazyn przed nawigacją
+3. get_player_profile nawiguje tylko dla nieświeżych pól
+4. Forma ze strony meczu ma pierwszeństwo przed formą z magazynu
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import tennis_scraper_v3_helpers as helpers
+from tennis_player_store import TennisPlayerStore, normalize_player_name
+
+
+FORM = [{'result': 'W', 'date': '01.10.25', 'opponent': 'Novak Djokovic', 'score': '2-0', 'surface': 'hard'}]
+SURFACE = {
+    'clay': {'wins': 30, 'total': 40, 'win_rate': 0.75, 'recent_form': []},
+    'hard': {'wins': 0, 'total': 0, 'win_rate': 0.0, 'recent_form': []},
+    'grass': {'wins': 0, 'total': 0, 'win_rate': 0.0, 'recent_form': []},
+}
+
+
+class _NoNavigationDriver:
+    current_url = 'about:blank'
+
+    def get(self, url):
+        raise AssertionError(f'nieoczekiwana nawigacja: {url}')
+
+
+def test_normalized_key_and_field_ttl():
+    print("=" * 60)
+    print("TEST 1: Klucz i TTL per pole")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='player_store_test_')
+    try:
+        assert normalize_player_name('  Świątek  I. ') == 'swiatek i'
+        store = TennisPlayerStore(path=os.path.join(directory, 'players.sqlite'))
+        store.put('Świątek I.', ranking=2, form=FORM, profile_url='https://www.livesport.com/pl/gracz/swiatek-iga/abc/')
+        store.put('Hurkacz H.', form=[])  # pusta forma nie jest zapisywana
+        assert store.get('swiatek i', 'ranking') == 2
+        assert store.get('SWIATEK I.', 'form') == FORM
+        assert store.stale_fields('Świątek I.') == ['surface_stats']
+        assert store.get_profile('Hurkacz H.') == {}
+        store.close()
+
+        # Ta sama baza, forma przeterminowana (TTL 0), ranking nadal świeży
+        time.sleep(0.01)
+        reopened = TennisPlayerStore(path=os.path.join(directory, 'players.sqlite'), ttl_hours={'form': 0})
+        profile = reopened.get_profile('Świątek I.')
+        assert 'form' not in profile and profile['ranking'] == 2
+        reopened.put('Świątek I.', ranking=1)
+        assert reopened.get('Świątek I.', 'ranking') == 1
+        assert reopened.get('Świątek I.', 'profile_url').endswith('/abc/')  # inne pola bez zmian
+        reopened.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def _use_store(store):
+    original = helpers.player_store
+    helpers.player_store = store
+    helpers.PLAYER_URL_CACHE.clear()
+    return original
+
+
+def test_helpers_read_store_first():
+    print("\n" + "=" * 60)
+    print("TEST 2: Funkcje pomocnicze - magazyn przed nawigacją")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='player_store_test_')
+    store = TennisPlayerStore(path=os.path.join(directory, 'players.sqlite'))
+    original = _use_store(store)
+    try:
+        url = 'https://www.livesport.com/pl/gracz/hurkacz-hubert/xyz/'
+        store.put('Hurkacz H.', profile_url=url, form=FORM, surface_stats=SURFACE)
+        driver = _NoNavigationDriver()
+        assert helpers.find_player_url_from_search(driver, 'Hurkacz H.') == url
+        assert helpers.extract_player_detailed_form(driver, 'Hurkacz H.') == FORM
+        assert helpers.extract_surface_statistics(driver, url, 'Hurkacz H.') == SURFACE
+    finally:
+        helpers.player_store = original
+        store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS: 0 nawigacji")
+
+
+def test_profile_navigates_only_stale_fields():
+    print("\n" + "=" * 60)
+    print("TEST 3: get_player_profile - nawigacja tylko dla nieświeżych pól")
+    print("=" * 60)
+    directory = tempfile.mkdtemp(prefix='player_store_test_')
+    store = TennisPlayerStore(path=os.path.join(directory, 'players.sqlite'))
+    original = _use_store(store)
+    originals = (helpers.extract_player_detailed_form, helpers.extract_surface_statistics)
+    calls = []
+
+    def fake_surface(driver, player_url, player_name=''):
+        calls.append(('surface', player_name))
+        store.put(player_name, surface_stats=SURFACE)
+        return SURFACE
+
+    def fake_form(driver, player_name, player_url=None):
+        calls.append(('form', player_name))
+        return FORM
+
+    helpers.extract_surface_statistics = fake_surface
+    helpers.extract_player_detailed_form = fake_form
+    try:
+        store.put('Hurkacz H.', profile_url='https://www.livesport.com/pl/gracz/hurkacz-hubert/xyz/', form=FORM)
+        driver = _NoNavigationDriver()
+
+        assert helpers.get_player_profile(driver, 'Hurkacz H.', navigate=False) == {
+            'profile_url': 'https://www.livesport.com/pl/gracz/hurkacz-hubert/xyz/', 'form': FORM}
+        assert calls == []
+
+        profile = helpers.get_player_profile(driver, 'Hurkacz H.')
+        assert calls == [('surface', 'Hurkacz H.')]  # forma świeża - tylko statystyki nawierzchni
+        assert profile['surface_stats'] == SURFACE
+
+        helpers.get_player_profile(driver, 'Hurkacz H.')
+        assert len(calls) == 1  # drugie uruchomienie - wszystko z magazynu
+    finally:
+        helpers.extract_player_detailed_form, helpers.extract_surface_statistics = originals
+        helpers.player_store = original
+        store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+    print("  ✅ PASS")
+
+
+def test_page_form_wins_over_store():
+    print("\n" + "=" * 60)
+    print("TEST 4: Forma ze strony przed formą z magazynu")
+    print("=" * 60)
+    from bs4 import BeautifulSoup
+    from livesport_h2h_scraper import DEFAULT_TENNIS_FORM, extract_player_form_simple, merge_player_form
+
+    profile = {'form': [{'result': 'L'}, {'result': 'L'}, {'result': 'W'}]}
+    page = BeautifulSoup('<div class="form">WWLWW</div>', 'html.parser')
+    page_form = extract_player_form_simple(page, 'Hurkacz H.', [], fallback=False)
+    assert page_form == ['W', 'W', 'L', 'W', 'W']
+    assert merge_player_form(page_form, profile) == page_form
+
+    empty = BeautifulSoup('<div></div>', 'html.parser')
+    assert extract_player_form_simple(empty, 'Hurkacz H.', []) == list(DEFAULT_TENNIS_FORM)
+    no_page_form = extract_player_form_simple(empty, 'Hurkacz H.', [], fallback=False)
+    assert no_page_form == []
+    assert merge_player_form(no_page_form, profile) == ['L', 'L', 'W']  # brak na stronie - magazyn
+    assert merge_player_form([], {}) == list(DEFAULT_TENNIS_FORM)
+    print("  ✅ PASS")
+
+
+if __name__ == '__main__':
+    try:
+        test_normalized_key_and_field_ttl()
+        test_helpers_read_store_first()
+        test_profile_navigates_only_stale_fields()
+        test_page_form_wins_over_store()
+        print("\n✅ WSZYSTKIE TESTY PRZESZŁY POMYŚLNIE!")
+        sys.exit(0)
+    except AssertionError as e:
+        print(f"\n❌ TEST NIE PRZESZEDŁ: {e}")
+        sys.exit(1)